@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Preço de Apostas Múltiplas (Acumuladores)
+Autor: Manus AI
+Data: 19/10/2026
+
+Cada perna é uma seleção de um jogo com a probabilidade prevista e a odd
+oferecida: {'id_jogo', 'mercado', 'selecao', 'prob', 'odd'}. As pernas 1X2 são
+obtidas das previsões (legs_from_predictions); pernas de outros mercados (ex.:
+mais de 2.5 golos) podem ser acrescentadas com as suas probabilidades.
+
+Com jogos independentes e no máximo uma perna por jogo, uma combinação tem
+probabilidade prod(p), odd prod(odd) e valor esperado prod(p * odd) - 1.
+AccumulatorPricer guarda as pernas em arrays numpy e:
+
+- price: probabilidade, odd e valor esperado de combinações dadas, em vetor
+- top_k: melhores combinações por valor esperado, por pesquisa em feixe (beam
+  search) em espaço logarítmico: cada camada acrescenta uma perna a todas as
+  combinações do feixe numa só operação matricial e corta as que ficam abaixo
+  de min_prob (a probabilidade só diminui com mais pernas). Com min_prob, o
+  feixe guarda as melhores combinações de cada faixa de probabilidade já gasta
+  (como na programação dinâmica da mochila), para não o encher só de pernas de
+  odd alta. A pesquisa é aproximada; um feixe maior aproxima-a da enumeração
+  completa.
+"""
+
+import math
+from typing import Dict, Iterable, List, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ('casa', 'empate', 'fora')
+MARKET_1X2 = '1x2'
+DEFAULT_BEAM = 2000
+# Faixas de log(probabilidade) entre 0 e log(min_prob) com lugares próprios no feixe
+BUDGET_BINS = 40
+
+
+def legs_from_predictions(predictions: Iterable, odds: Dict) -> List[Dict]:
+    """Pernas 1X2 das previsões (MatchPrediction ou dicionários) com odd em `odds`.
+
+    odds: {id_jogo: {'casa': 2.10, 'empate': 3.40, 'fora': 3.60}}; as chaves
+    podem ser inteiros ou texto (como num ficheiro JSON).
+    """
+    legs = []
+    for prediction in predictions:
+        if isinstance(prediction, dict):
+            id_jogo = prediction['id_jogo']
+            p = prediction['probabilidades']
+            probs = (p['vitoria_casa'] / 100, p['empate'] / 100, p['vitoria_fora'] / 100)
+        else:
+            id_jogo = prediction.id_jogo
+            probs = (prediction.prob_casa, prediction.prob_empate, prediction.prob_fora)
+
+        cotacoes = odds.get(id_jogo) or odds.get(str(id_jogo))
+        if not cotacoes:
+            continue
+        for selecao, prob in zip(OUTCOMES, probs):
+            odd = cotacoes.get(selecao)
+            if odd:
+                legs.append({'id_jogo': id_jogo, 'mercado': MARKET_1X2, 'selecao': selecao,
+                             'prob': prob, 'odd': float(odd)})
+    return legs
+
+
+class AccumulatorPricer:
+    """Pernas em arrays numpy para o preço e a pesquisa de combinações (requer numpy)."""
+
+    def __init__(self, legs: Sequence[Dict]):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("O preço de acumuladores requer o pacote 'numpy' (pip install numpy)")
+
+        self.np = np
+        self.legs = list(legs)
+        jogos = {}
+        self.jogo = np.array([jogos.setdefault(leg['id_jogo'], len(jogos)) for leg in self.legs], dtype=np.int64)
+        # Perna sentinela (prob = odd = 1) no fim, para combinações de tamanhos diferentes
+        self.prob = np.array([leg['prob'] for leg in self.legs] + [1.0])
+        self.odd = np.array([leg['odd'] for leg in self.legs] + [1.0])
+        self.n_jogos = len(jogos)
+
+    def price(self, combinacoes: Sequence[Sequence[int]]) -> Dict:
+        """Probabilidade, odd e valor esperado de combinações (listas de índices de pernas)."""
+        np = self.np
+        largura = max((len(c) for c in combinacoes), default=0)
+        idx = np.full((len(combinacoes), largura), len(self.legs), dtype=np.int64)
+        for i, combinacao in enumerate(combinacoes):
+            idx[i, :len(combinacao)] = combinacao
+        prob = self.prob[idx].prod(axis=1)
+        odd = self.odd[idx].prod(axis=1)
+        return {'probabilidade': prob, 'odd': odd, 'valor_esperado': prob * odd - 1}
+
+    def top_k(self, pernas: int = 10, k: int = 20, min_pernas: int = 2, min_prob: float = 0.0,
+              beam: int = DEFAULT_BEAM) -> List[Dict]:
+        """As k combinações de min_pernas a `pernas` pernas com maior valor esperado."""
+        np = self.np
+        validas = np.flatnonzero((self.prob[:-1] > 0) & (self.odd[:-1] > 1))
+        if not len(validas) or pernas < 1:
+            return []
+
+        log_p = np.log(self.prob[validas])
+        log_r = log_p + np.log(self.odd[validas])
+        # Jogos ordenados pelo melhor valor: as boas combinações ficam com espaço para crescer
+        melhor = np.full(self.n_jogos, -np.inf)
+        np.maximum.at(melhor, self.jogo[validas], log_r)
+        posicao = np.empty(self.n_jogos, dtype=np.int64)
+        posicao[np.argsort(-melhor, kind='stable')] = np.arange(self.n_jogos)
+        rank = posicao[self.jogo[validas]]
+        limite = math.log(min_prob) if min_prob > 0 else -np.inf
+
+        # Estado do feixe: pernas (índices em `validas`), último jogo, soma de log r e de log p
+        cand = np.flatnonzero(log_p >= limite)
+        cand = cand[self._select(log_r[cand], log_p[cand], limite, beam)]
+        estado = cand[:, None]
+        ultimo, score, lp = rank[cand], log_r[cand], log_p[cand]
+
+        melhores_idx, melhores_score = [], []
+        for tamanho in range(1, pernas + 1):
+            if tamanho >= min_pernas and len(score):
+                melhores_idx.append(estado)
+                melhores_score.append(score)
+                self._keep_top(melhores_idx, melhores_score, k)
+            if tamanho == pernas or not len(score):
+                break
+
+            # Acrescentar uma perna de um jogo posterior a cada combinação, em matriz (feixe x pernas)
+            novo = score[:, None] + log_r[None, :]
+            novo_lp = lp[:, None] + log_p[None, :]
+            novo[(rank[None, :] <= ultimo[:, None]) | (novo_lp < limite)] = -np.inf
+            plano = novo.ravel()
+            finitos = np.flatnonzero(np.isfinite(plano))
+            novo_lp = novo_lp.ravel()[finitos]
+            escolhidos = self._select(plano[finitos], novo_lp, limite, beam)
+            finitos = finitos[escolhidos]
+            linhas, colunas = np.divmod(finitos, len(log_r))
+            estado = np.hstack([estado[linhas], colunas[:, None]])
+            ultimo, score, lp = rank[colunas], plano[finitos], novo_lp[escolhidos]
+
+        if not melhores_idx:
+            return []
+        estado, score = melhores_idx[0], melhores_score[0]
+        resultado = []
+        for i in np.argsort(-score, kind='stable'):
+            indices = [int(validas[j]) for j in estado[i] if j >= 0]
+            pernas_i = [self.legs[j] for j in indices]
+            prob = math.prod(leg['prob'] for leg in pernas_i)
+            odd = math.prod(leg['odd'] for leg in pernas_i)
+            resultado.append({'pernas': pernas_i, 'probabilidade': prob, 'odd': odd,
+                              'valor_esperado': prob * odd - 1})
+        return resultado
+
+    def _select(self, score, lp, limite: float, beam: int):
+        """Índices dos estados a manter no feixe: os melhores por faixa de probabilidade gasta."""
+        np = self.np
+        if len(score) <= beam:
+            return np.arange(len(score))
+        if not np.isfinite(limite):
+            return np.argpartition(-score, beam - 1)[:beam]
+        faixa = np.minimum((lp / limite * BUDGET_BINS).astype(np.int64), BUDGET_BINS - 1)
+        # Uma só chave de ordenação: faixa e, dentro dela, score decrescente (score normalizado para [0, 1])
+        amplitude = score.max() - score.min() or 1.0
+        ordem = np.argsort(faixa + (score.max() - score) / (amplitude * 1.001))
+        faixas = faixa[ordem]
+        posicao = np.arange(len(ordem)) - np.searchsorted(faixas, faixas)
+        return ordem[posicao < max(beam // BUDGET_BINS, 1)]
+
+    def _keep_top(self, melhores_idx: List, melhores_score: List, k: int):
+        """Junta os candidatos acumulados (de tamanhos diferentes) e mantém só os k melhores."""
+        np = self.np
+        largura = max(e.shape[1] for e in melhores_idx)
+        # -1 completa as combinações mais curtas
+        estado = np.vstack([np.pad(e, ((0, 0), (0, largura - e.shape[1])), constant_values=-1)
+                            for e in melhores_idx])
+        score = np.concatenate(melhores_score)
+        if len(score) > k:
+            top = np.argpartition(-score, k - 1)[:k]
+            estado, score = estado[top], score[top]
+        melhores_idx[:] = [estado]
+        melhores_score[:] = [score]
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Backtesting do Motor de Previsão
+Autor: Manus AI
+Data: 19/10/2026
+
+Repete as previsões para jogos já finalizados e compara-as com o resultado real
+(precisão, Brier score, log loss e calibração: erro de calibração esperado (ECE)
+e diagrama de fiabilidade por resultado), conforme o plano de validação do todo.md.
+
+Nota: com o armazenamento habitual, os componentes do motor usam todo o
+histórico finalizado disponível na base de dados, incluindo o próprio jogo
+avaliado; esses resultados servem para comparar versões do modelo e não como
+estimativa fiel do desempenho fora da amostra. Com PointInTimeSQLiteBackend,
+cada jogo é previsto só com o que se sabia antes da sua data (ponto no tempo),
+e só esses resultados podem ajustar a calibração (calibration.py).
+"""
+
+import math
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import logging
+
+from instrumentation import Metrics
+from storage import StorageBackend, SQLiteBackend, _PinnedConnection
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ('casa', 'empate', 'fora')
+RELIABILITY_BINS = 10
+
+
+class PointInTimeSQLiteBackend(StorageBackend):
+    """Base SQLite vista como estava antes de uma data de corte, só de leitura (vistas TEMP).
+
+    - jogo: os jogos a partir da data de corte aparecem como agendados e sem
+      golos, pelo que os desempenhos, a forma casa/fora e o resto do que se
+      junta a jogo finalizado só contam jogos anteriores;
+    - confrontos_diretos: só os anteriores à data de corte;
+    - lesoes: só as ativas na data de corte (sem data de fim, para contarem
+      como atuais).
+
+    Os agregados mantidos à parte (forma com decaimento, xG, armazém de
+    features) não têm data e não são filtrados. Sem data de corte (None), as
+    vistas mostram a base inteira. Dentro de pinned(), set_cutoff muda a data
+    da ligação da thread sem recriar as vistas.
+    """
+
+    name = 'sqlite-point-in-time'
+    read_only = True
+
+    def __init__(self, db_path: str = "football_data.db", metrics: Optional[Metrics] = None,
+                 data_corte: Optional[str] = None):
+        self.db_path = db_path
+        self.metrics = metrics or Metrics()
+        self.data_corte = data_corte
+        self._local = threading.local()
+        self._views = None
+
+    def _open(self) -> sqlite3.Connection:
+        conn = self.metrics.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('CREATE TEMP TABLE ponto_no_tempo (data_corte TEXT)')
+        cursor.execute('INSERT INTO ponto_no_tempo (data_corte) VALUES (?)', (self.data_corte,))
+        if self._views is None:
+            self._views = self._view_sql(cursor)
+        for sql in self._views:
+            cursor.execute(sql)
+        return conn
+
+    def _view_sql(self, cursor) -> List[str]:
+        """CREATE TEMP VIEW de jogo, confrontos_diretos e lesoes, filtradas pela data de corte."""
+        def colunas(tabela):
+            cursor.execute(f'PRAGMA main.table_info({tabela})')
+            return [row[1] for row in cursor.fetchall()]
+
+        sem_corte = 'c.data_corte IS NULL'
+        anterior = f"({sem_corte} OR substr(t.data_jogo, 1, 10) < c.data_corte)"
+        jogo = []
+        for coluna in colunas('jogo'):
+            if coluna in ('golos_casa', 'golos_fora'):
+                jogo.append(f"CASE WHEN {anterior} THEN t.{coluna} END AS {coluna}")
+            elif coluna == 'status':
+                jogo.append(f"CASE WHEN {anterior} THEN t.status ELSE 'agendado' END AS status")
+            else:
+                jogo.append(f"t.{coluna}")
+
+        lesoes = [f"CASE WHEN {sem_corte} THEN t.{c} END AS {c}" if c == 'data_fim_estimada' else f"t.{c}"
+                  for c in colunas('lesoes')]
+
+        return [
+            f"CREATE TEMP VIEW jogo AS SELECT {', '.join(jogo)} FROM main.jogo t, ponto_no_tempo c",
+            f"CREATE TEMP VIEW confrontos_diretos AS SELECT {', '.join('t.' + c for c in colunas('confrontos_diretos'))} "
+            f"FROM main.confrontos_diretos t, ponto_no_tempo c "
+            f"WHERE {sem_corte} OR substr(t.data_confronto, 1, 10) < c.data_corte",
+            f"CREATE TEMP VIEW lesoes AS SELECT {', '.join(lesoes)} FROM main.lesoes t, ponto_no_tempo c "
+            f"WHERE {sem_corte} OR (substr(t.data_inicio, 1, 10) < c.data_corte AND "
+            f"(t.data_fim_estimada IS NULL OR substr(t.data_fim_estimada, 1, 10) >= c.data_corte))"
+        ]
+
+    def set_cutoff(self, data_corte: Optional[str]):
+        """Muda a data de corte (AAAA-MM-DD, exclusiva) das ligações seguintes e da ligação fixada."""
+        self.data_corte = data_corte
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            pinned.execute('UPDATE ponto_no_tempo SET data_corte = ?', (data_corte,))
+
+    def connect(self):
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            return _PinnedConnection(pinned)
+        return self._open()
+
+    @contextmanager
+    def pinned(self):
+        """Uma só ligação (vistas criadas uma vez) para a thread."""
+        if getattr(self._local, 'conn', None) is not None:
+            yield
+            return
+        self._local.conn = self._open()
+        try:
+            yield
+        finally:
+            self._local.conn.close()
+            self._local.conn = None
+
+    def table_columns(self, conn, tabela: str) -> List[str]:
+        return SQLiteBackend.table_columns(self, conn, tabela)
+
+    def bulk_insert(self, conn, tabela: str, colunas, linhas) -> int:
+        raise ValueError("O modo ponto no tempo é só de leitura; use a base viva")
+
+    def factory(self) -> Callable[[], StorageBackend]:
+        return partial(PointInTimeSQLiteBackend, self.db_path, data_corte=self.data_corte)
+
+
+def match_outcome(golos_casa: int, golos_fora: int) -> str:
+    """Devolve o resultado de um jogo ('casa', 'empate' ou 'fora')."""
+    if golos_casa > golos_fora:
+        return 'casa'
+    if golos_casa < golos_fora:
+        return 'fora'
+    return 'empate'
+
+
+def _point_in_time_options(engine) -> List[str]:
+    """Opções do motor que leem agregados de todo o histórico (incompatíveis com o ponto no tempo)."""
+    return [nome for nome, ativa in (
+        ('half_life', engine.half_life is not None),
+        ('feature_store', engine.feature_store is not None),
+        ('use_xg', engine.use_xg),
+        ('model', engine.model is not None)
+    ) if ativa]
+
+
+def _finished_fixtures(engine, data_inicio: str, data_fim: str, liga: Optional[str],
+                       epoca: Optional[str]) -> Iterator[tuple]:
+    """Jogos finalizados com resultado: (fixture, golos_casa, golos_fora), numa só consulta."""
+    for *fixture, golos_casa, golos_fora in engine.iter_fixtures(data_inicio, data_fim, liga, status='finalizado',
+                                                                 epoca=epoca, com_resultado=True):
+        if golos_casa is not None and golos_fora is not None:
+            yield tuple(fixture), golos_casa, golos_fora
+
+
+def run_backtest(engine, data_inicio: str, data_fim: str, liga: Optional[str] = None,
+                 epoca: Optional[str] = None) -> Iterator[Dict]:
+    """Gera, para cada jogo finalizado no intervalo, as probabilidades previstas e o resultado real.
+
+    Com um motor sobre PointInTimeSQLiteBackend, cada jogo é previsto com a
+    data de corte no próprio dia (ponto_no_tempo=True nos resultados).
+    """
+    storage = engine.collector.storage
+    ponto_no_tempo = isinstance(storage, PointInTimeSQLiteBackend)
+    if ponto_no_tempo:
+        opcoes = _point_in_time_options(engine)
+        if opcoes:
+            raise ValueError(f"O backtest em ponto no tempo não suporta {', '.join(opcoes)}: "
+                             f"são agregados de todo o histórico")
+        storage.set_cutoff(None)
+
+    with storage.pinned():
+        try:
+            jogos = _finished_fixtures(engine, data_inicio, data_fim, liga, epoca)
+            if ponto_no_tempo:
+                # Lidos antes de mudar a data de corte, que esconde os resultados
+                jogos = list(jogos)
+            for (id_jogo, data_jogo, id_casa, id_fora, id_competicao), golos_casa, golos_fora in jogos:
+                if ponto_no_tempo:
+                    storage.set_cutoff(str(data_jogo)[:10])
+
+                prediction = engine.predict_match_compact(id_casa, id_fora, id_competicao, data_jogo)
+                yield {
+                    'id_jogo': id_jogo,
+                    'data_jogo': data_jogo,
+                    'prob_casa': prediction.prob_casa,
+                    'prob_empate': prediction.prob_empate,
+                    'prob_fora': prediction.prob_fora,
+                    'resultado': match_outcome(golos_casa, golos_fora),
+                    'ponto_no_tempo': ponto_no_tempo
+                }
+        finally:
+            if ponto_no_tempo:
+                storage.set_cutoff(None)
+
+
+def summarize_backtest(results: Iterable[Dict], bins: int = RELIABILITY_BINS) -> Dict:
+    """Calcula as métricas de avaliação de um backtest.
+    
+    O ECE é a média, pelos três resultados, da diferença ponderada entre a
+    probabilidade média prevista e a frequência observada em cada intervalo;
+    `fiabilidade` contém esses intervalos (o diagrama de fiabilidade).
+    """
+    total = 0
+    acertos = 0
+    brier = 0.0
+    log_loss = 0.0
+    # Por resultado e intervalo: [jogos, soma das probabilidades, ocorrências]
+    reliability = [[[0, 0.0, 0] for _ in range(bins)] for _ in OUTCOMES]
+
+    for result in results:
+        probs = [result['prob_casa'], result['prob_empate'], result['prob_fora']]
+        real = OUTCOMES.index(result['resultado'])
+
+        total += 1
+        if max(range(3), key=lambda i: probs[i]) == real:
+            acertos += 1
+        brier += sum((p - (1.0 if i == real else 0.0)) ** 2 for i, p in enumerate(probs))
+        log_loss -= math.log(max(probs[real], 1e-15))
+        for i, p in enumerate(probs):
+            cell = reliability[i][min(int(p * bins), bins - 1)]
+            cell[0] += 1
+            cell[1] += p
+            cell[2] += 1 if i == real else 0
+
+    if total == 0:
+        return {'total_jogos': 0}
+
+    ece = 0.0
+    fiabilidade = {}
+    for outcome, cells in zip(OUTCOMES, reliability):
+        fiabilidade[outcome] = []
+        for k, (n, soma_p, ocorrencias) in enumerate(cells):
+            if n == 0:
+                continue
+            ece += n / total * abs(soma_p / n - ocorrencias / n) / len(OUTCOMES)
+            fiabilidade[outcome].append({
+                'intervalo': f"{k / bins:.1f}-{(k + 1) / bins:.1f}",
+                'prob_media': round(soma_p / n, 4),
+                'frequencia': round(ocorrencias / n, 4),
+                'jogos': n
+            })
+
+    return {
+        'total_jogos': total,
+        'precisao': round(acertos * 100 / total, 2),
+        'brier_score': round(brier / total, 4),
+        'log_loss': round(log_loss / total, 4),
+        'ece': round(ece, 4),
+        'fiabilidade': fiabilidade
+    }
+
+
+def format_reliability(fiabilidade: Dict) -> str:
+    """Diagrama de fiabilidade em texto (prevista vs observada por intervalo)."""
+    lines = []
+    for outcome, cells in fiabilidade.items():
+        lines.append(f"[{outcome}] intervalo   prevista  observada  jogos")
+        for cell in cells:
+            barra = '#' * int(round(cell['frequencia'] * 20))
+            lines.append(f"  {cell['intervalo']:>9}   {cell['prob_media']:>8.3f}  {cell['frequencia']:>9.3f}"
+                         f"  {cell['jogos']:>5}  {barra}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+    from prediction_engine import FootballPredictionEngine
+
+    data_inicio = sys.argv[1] if len(sys.argv) > 1 else '1900-01-01'
+    data_fim = sys.argv[2] if len(sys.argv) > 2 else '2999-12-31'
+
+    summary = summarize_backtest(run_backtest(FootballPredictionEngine(), data_inicio, data_fim))
+    fiabilidade = summary.pop('fiabilidade', {})
+    print("=== BACKTEST ===")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    print(format_reliability(fiabilidade))
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Simulação da Banca e de Estratégias de Aposta
+Autor: Manus AI
+Data: 19/10/2026
+
+Reproduz as previsões guardadas (tabela previsoes, ver change_tracking.py) dos
+jogos já finalizados contra as odds registadas (tabela odds). Em cada jogo a
+aposta é o resultado de maior valor esperado (p * odd - 1), se este superar o
+valor mínimo da estratégia. Estratégias de aposta:
+
+- 'fixa': montante fixo (fração da banca inicial)
+- 'kelly': fração de Kelly (p * odd - 1) / (odd - 1) da banca atual, vezes
+  `fracao` (Kelly fracionado), limitada a `maximo`
+- stop_loss (opcional, em qualquer estratégia): deixa de apostar quando a banca
+  cai abaixo dessa fração da banca inicial
+
+Além da sequência real, cada estratégia é avaliada em `reamostragens`
+sequências bootstrap dos mesmos jogos (com reposição), todas de uma vez: a banca
+é um vetor numpy com uma posição por reamostragem e cada jogo é um passo
+vetorizado. As reamostragens usam a mesma semente em todas as estratégias (as
+comparações são feitas sobre as mesmas sequências) e as estratégias podem ser
+distribuídas por um pool de processos.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+STAKING = ('fixa', 'kelly')
+PERCENTILES = (5, 50, 95)
+
+
+class StakingStrategy:
+    """Regras de aposta de uma estratégia."""
+
+    def __init__(self, nome: str, tipo: str = 'fixa', stake: float = 0.02, fracao: float = 1.0,
+                 maximo: float = 0.25, stop_loss: Optional[float] = None, valor_minimo: float = 0.0):
+        if tipo not in STAKING:
+            raise ValueError(f"Estratégia de aposta desconhecida: {tipo} (use {', '.join(STAKING)})")
+        self.nome = nome
+        self.tipo = tipo
+        self.stake = stake
+        self.fracao = fracao
+        self.maximo = maximo
+        self.stop_loss = stop_loss
+        self.valor_minimo = valor_minimo
+
+    def to_dict(self) -> Dict:
+        return {'nome': self.nome, 'tipo': self.tipo, 'stake': self.stake, 'fracao': self.fracao,
+                'maximo': self.maximo, 'stop_loss': self.stop_loss, 'valor_minimo': self.valor_minimo}
+
+
+DEFAULT_STRATEGIES = [
+    StakingStrategy('fixa_2%', 'fixa', stake=0.02),
+    StakingStrategy('fixa_2%_stop_50%', 'fixa', stake=0.02, stop_loss=0.5),
+    StakingStrategy('kelly', 'kelly'),
+    StakingStrategy('kelly_1/2', 'kelly', fracao=0.5),
+    StakingStrategy('kelly_1/4', 'kelly', fracao=0.25)
+]
+
+
+def load_history(collector, data_inicio: str, data_fim: str, casa_apostas: Optional[str] = None) -> Dict:
+    """Jogos finalizados com previsão guardada e odds, por ordem cronológica (requer numpy).
+
+    Devolve {'ids', 'probs' (n, 3), 'odds' (n, 3), 'resultado' (n,)}; sem casa de
+    apostas, usa a melhor odd de cada resultado.
+    """
+    import numpy as np
+
+    conn = collector._connect()
+    cursor = conn.cursor()
+    query = '''
+        SELECT j.id_jogo, j.golos_casa, j.golos_fora, p.dados,
+               MAX(o.odd_casa), MAX(o.odd_empate), MAX(o.odd_fora)
+        FROM jogo j
+        JOIN previsoes p ON p.id_jogo = j.id_jogo
+        JOIN odds o ON o.id_jogo = j.id_jogo
+        WHERE j.status = 'finalizado' AND j.data_jogo BETWEEN ? AND ?
+          AND j.golos_casa IS NOT NULL AND j.golos_fora IS NOT NULL
+    '''
+    params = [data_inicio, data_fim]
+    if casa_apostas is not None:
+        query += ' AND o.casa_apostas = ?'
+        params.append(casa_apostas)
+    query += ' GROUP BY j.id_jogo ORDER BY j.data_jogo, j.id_jogo'
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    ids, probs, odds, resultado = [], [], [], []
+    for id_jogo, golos_casa, golos_fora, dados, *cotacoes in rows:
+        if None in cotacoes:
+            continue
+        p = json.loads(dados)['probabilidades']
+        ids.append(id_jogo)
+        probs.append((p['vitoria_casa'] / 100, p['empate'] / 100, p['vitoria_fora'] / 100))
+        odds.append(cotacoes)
+        resultado.append(0 if golos_casa > golos_fora else 1 if golos_casa == golos_fora else 2)
+
+    return {'ids': ids, 'probs': np.array(probs, dtype=float).reshape(-1, 3),
+            'odds': np.array(odds, dtype=float).reshape(-1, 3), 'resultado': np.array(resultado, dtype=np.int64)}
+
+
+def _select_bets(history: Dict, strategy: StakingStrategy):
+    """Aposta de cada jogo (resultado de maior valor esperado): odd, ganha?, fração de Kelly e se aposta."""
+    import numpy as np
+
+    probs, odds = history['probs'], history['odds']
+    valor = probs * odds - 1
+    escolha = valor.argmax(axis=1)
+    linhas = np.arange(len(escolha))
+    odd = odds[linhas, escolha]
+    aposta = valor[linhas, escolha] > strategy.valor_minimo
+    ganha = escolha == history['resultado']
+    kelly = np.clip(valor[linhas, escolha] / np.maximum(odd - 1, 1e-9) * strategy.fracao, 0.0, strategy.maximo)
+    return odd, ganha, kelly, aposta
+
+
+def _run(strategy: StakingStrategy, odd, ganha, kelly, aposta, banca_inicial: float):
+    """Percorre os jogos (colunas) para todas as sequências (linhas) de uma vez."""
+    import numpy as np
+
+    n_seq, n_jogos = odd.shape
+    banca = np.full(n_seq, banca_inicial)
+    pico = banca.copy()
+    drawdown = np.zeros(n_seq)
+    apostado = np.zeros(n_seq)
+    apostas = np.zeros(n_seq, dtype=np.int64)
+    limite = strategy.stop_loss * banca_inicial if strategy.stop_loss is not None else 0.0
+    stake_fixo = strategy.stake * banca_inicial
+
+    for j in range(n_jogos):
+        ativa = aposta[:, j] & (banca > limite)
+        if strategy.tipo == 'fixa':
+            stake = np.minimum(stake_fixo, banca)
+        else:
+            stake = banca * kelly[:, j]
+        stake = np.where(ativa, stake, 0.0)
+        banca = banca + np.where(ganha[:, j], stake * (odd[:, j] - 1), -stake)
+        apostado += stake
+        apostas += ativa
+        np.maximum(pico, banca, out=pico)
+        np.maximum(drawdown, 1 - banca / pico, out=drawdown)
+
+    return banca, drawdown, apostado, apostas
+
+
+def _simulate_strategy(history: Dict, strategy: StakingStrategy, reamostragens: int,
+                       banca_inicial: float, seed: int) -> Dict:
+    import numpy as np
+
+    odd, ganha, kelly, aposta = _select_bets(history, strategy)
+    n = len(odd)
+
+    # Sequência real (linha 0) e reamostragens bootstrap, iguais em todas as estratégias
+    indices = np.vstack([np.arange(n)[None, :], np.random.default_rng(seed).integers(0, n, size=(reamostragens, n))])
+    banca, drawdown, apostado, apostas = _run(strategy, odd[indices], ganha[indices], kelly[indices],
+                                              aposta[indices], banca_inicial)
+
+    lucro = banca - banca_inicial
+    roi = np.divide(lucro, apostado, out=np.zeros_like(lucro), where=apostado > 0)
+    limite = strategy.stop_loss * banca_inicial if strategy.stop_loss is not None else 0.01 * banca_inicial
+
+    def distribuicao(valores, escala: float = 1.0, casas: int = 2):
+        return {f'p{p}': round(float(np.percentile(valores, p)) * escala, casas) for p in PERCENTILES}
+
+    boot = slice(1, None)
+    return {
+        'estrategia': strategy.nome,
+        'parametros': strategy.to_dict(),
+        'jogos': n,
+        'apostas': int(apostas[0]),
+        'banca_final': round(float(banca[0]), 2),
+        'lucro': round(float(lucro[0]), 2),
+        'roi': round(float(roi[0]) * 100, 2),
+        'drawdown_maximo': round(float(drawdown[0]) * 100, 2),
+        'reamostragens': reamostragens,
+        'bootstrap': {
+            'banca_final': distribuicao(banca[boot]),
+            'roi': distribuicao(roi[boot], 100),
+            'drawdown_maximo': distribuicao(drawdown[boot], 100),
+            'prob_lucro': round(float(np.mean(lucro[boot] > 0)) * 100, 1),
+            'prob_ruina': round(float(np.mean(banca[boot] <= limite)) * 100, 1)
+        } if reamostragens and n else {}
+    }
+
+
+def _simulate_in_worker(args) -> Dict:
+    return _simulate_strategy(*args)
+
+
+def simulate(history: Dict, estrategias: Optional[Sequence[StakingStrategy]] = None,
+             reamostragens: int = 1000, banca_inicial: float = 100.0, seed: int = 42,
+             workers: int = 1) -> List[Dict]:
+    """Resultados de cada estratégia na sequência real e nas reamostragens bootstrap."""
+    estrategias = list(estrategias or DEFAULT_STRATEGIES)
+    tarefas = [(history, strategy, reamostragens, banca_inicial, seed) for strategy in estrategias]
+    if workers <= 1 or len(tarefas) == 1:
+        results = [_simulate_strategy(*tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tarefas))) as pool:
+            results = list(pool.map(_simulate_in_worker, tarefas))
+    logger.info(f"{len(results)} estratégias simuladas em {len(history['ids'])} jogos "
+                f"({reamostragens} reamostragens)")
+    return results
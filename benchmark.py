@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Benchmarks com Dados Sintéticos à Escala de Produção
+Autor: Manus AI
+Data: 19/10/2026
+
+Gerador de ligas sintéticas com semente fixa (equipas com força latente,
+calendário de ida e volta, golos de Poisson, plantéis completos por jogo) e
+carregamento em bloco na base de dados, mais um conjunto de benchmarks:
+- débito de ingestão (linhas/s) por bulk_insert, com e sem validação
+- latência de predict_match (p50/p99)
+- débito e memória de pico de generate_daily_analysis
+
+Os resultados são acrescentados a um histórico JSON Lines para acompanhar a
+evolução entre versões.
+"""
+
+import os
+import json
+import math
+import time
+import random
+import datetime
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+from football_betting_analyzer import FootballDataCollector
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCALES = {
+    'small': {'n_teams': 20, 'n_seasons': 2, 'players_per_team': 18},
+    'medium': {'n_teams': 100, 'n_seasons': 5, 'players_per_team': 22},
+    'production': {'n_teams': 200, 'n_seasons': 10, 'players_per_team': 25}
+}
+
+TEAMS_PER_LEAGUE = 20
+SCHEDULED_MATCHDAYS = 2  # últimas jornadas da última época ficam por jogar
+
+POSITIONS = (['Guarda-redes'] * 2 + ['Defesa Central'] * 4 + ['Defesa'] * 4 +
+             ['Médio Defensivo'] * 3 + ['Médio'] * 3 + ['Médio Ofensivo'] * 3 +
+             ['Extremo'] * 3 + ['Avançado'] * 3)
+
+INJURY_TYPES = ['Muscular', 'Ligamentar', 'Óssea', 'Contusão']
+SEVERITIES = ['Ligeira', 'Moderada', 'Grave', 'Muito Grave']
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    """Amostra de uma distribuição de Poisson (método de Knuth)."""
+    limit = math.exp(-lam)
+    k = 0
+    p = rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _round_robin(teams: List[int]) -> List[List[Tuple[int, int]]]:
+    """Calendário de ida e volta pelo método do círculo."""
+    teams = list(teams)
+    if len(teams) % 2:
+        teams.append(None)
+    n = len(teams)
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            home, away = teams[i], teams[n - 1 - i]
+            if home is not None and away is not None:
+                pairs.append((home, away) if r % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        teams.insert(1, teams.pop())
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+class SyntheticDataGenerator:
+    """Gera ligas sintéticas realistas e carrega-as em bloco na base de dados."""
+
+    def __init__(self, seed: int = 42, n_teams: int = 20, n_seasons: int = 2,
+                 players_per_team: int = 18, first_season: Optional[int] = None):
+        self.seed = seed
+        self.n_teams = n_teams
+        self.n_seasons = n_seasons
+        self.players_per_team = players_per_team
+        self.first_season = first_season or (datetime.date.today().year - n_seasons)
+
+    @classmethod
+    def from_scale(cls, scale: str, seed: int = 42) -> 'SyntheticDataGenerator':
+        if scale not in SCALES:
+            raise ValueError(f"Escala '{scale}' desconhecida (use: {', '.join(SCALES)})")
+        return cls(seed=seed, **SCALES[scale])
+
+    def load(self, db_path: str, batch_size: int = 5000, validar: bool = True) -> Dict:
+        """Cria o esquema e carrega todos os dados sintéticos; devolve contagens e débito.
+
+        As linhas passam por FootballDataCollector.bulk_insert (o caminho de
+        produção: validação com quarentena, competições/épocas e forma com
+        decaimento), com as pragmas normais da base de dados.
+        """
+        collector = FootballDataCollector(db_path)
+        rng = random.Random(self.seed)
+
+        counts = {}
+        start = time.perf_counter()
+
+        def insert(table: str, columns: List[str], rows):
+            total = collector.bulk_insert(table, (dict(zip(columns, row)) for row in rows),
+                                          batch_size=batch_size, validar=validar)
+            counts[table] = counts.get(table, 0) + total
+
+        conn = collector._connect()
+        cursor = conn.cursor()
+        # Equipas, agrupadas em ligas de TEAMS_PER_LEAGUE
+        cursor.execute('SELECT COALESCE(MAX(id_equipa), 0), (SELECT COALESCE(MAX(id_jogador), 0) FROM jogador), '
+                       '(SELECT COALESCE(MAX(id_jogo), 0) FROM jogo) FROM equipa')
+        team_base, player_base, match_base = cursor.fetchone()
+        conn.close()
+
+        team_ids = [team_base + i + 1 for i in range(self.n_teams)]
+        ratings = {team_id: rng.gauss(0.0, 0.35) for team_id in team_ids}
+        leagues = [team_ids[i:i + TEAMS_PER_LEAGUE] for i in range(0, self.n_teams, TEAMS_PER_LEAGUE)]
+        insert('equipa', ['id_equipa', 'nome_equipa', 'pais', 'liga'], (
+            (team_id, f"Equipa Sintética {team_id}", 'Sintético', f"Liga Sintética {league_no + 1}")
+            for league_no, league in enumerate(leagues) for team_id in league
+        ))
+
+        # Plantéis
+        squads = {}
+        player_rows = []
+        next_player = player_base + 1
+        for team_id in team_ids:
+            squad = []
+            for i in range(self.players_per_team):
+                posicao = POSITIONS[i % len(POSITIONS)]
+                squad.append((next_player, posicao))
+                player_rows.append((next_player, f"Jogador {next_player}", posicao, team_id, rng.randint(18, 36)))
+                next_player += 1
+            squads[team_id] = squad
+        insert('jogador', ['id_jogador', 'nome_jogador', 'posicao', 'id_equipa', 'idade'], player_rows)
+        del player_rows
+
+        # Jogos, desempenho das equipas e dos jogadores
+        next_match = [match_base + 1]
+        matches = []
+
+        def season_matches():
+            for season in range(self.n_seasons):
+                season_start = datetime.date(self.first_season + season, 8, 1)
+                last_season = season == self.n_seasons - 1
+                for league in leagues:
+                    rounds = _round_robin(league)
+                    for round_no, pairs in enumerate(rounds):
+                        data_jogo = season_start + datetime.timedelta(days=7 * round_no + rng.randint(0, 2))
+                        scheduled = last_season and round_no >= len(rounds) - SCHEDULED_MATCHDAYS
+                        for home, away in pairs:
+                            match_id = next_match[0]
+                            next_match[0] += 1
+                            if scheduled:
+                                yield (match_id, data_jogo.isoformat(), home, away, None, None, 'agendado')
+                                continue
+                            diff = ratings[home] - ratings[away]
+                            golos_casa = _poisson(rng, 1.45 * math.exp(diff))
+                            golos_fora = _poisson(rng, 1.15 * math.exp(-diff))
+                            matches.append((match_id, home, away, golos_casa, golos_fora, data_jogo.isoformat()))
+                            yield (match_id, data_jogo.isoformat(), home, away, golos_casa, golos_fora, 'finalizado')
+
+        insert('jogo', ['id_jogo', 'data_jogo', 'id_equipa_casa', 'id_equipa_fora',
+                        'golos_casa', 'golos_fora', 'status'], season_matches())
+
+        def team_rows():
+            for match_id, home, away, golos_casa, golos_fora, _ in matches:
+                diff = ratings[home] - ratings[away]
+                posse = min(max(50 + diff * 15 + rng.gauss(0, 6), 25), 75)
+                for team_id, gm, gs, pb, sign in ((home, golos_casa, golos_fora, posse, 1),
+                                                  (away, golos_fora, golos_casa, 100 - posse, -1)):
+                    yield (match_id, team_id, gm, gs,
+                           gm + _poisson(rng, 3.5 + sign * diff), _poisson(rng, 3.5 - sign * diff),
+                           round(pb, 1), _poisson(rng, 5), _poisson(rng, 1.8),
+                           1 if rng.random() < 0.04 else 0, 1 if gs == 0 else 0,
+                           1 if rng.random() < 0.03 else 0, 1 if rng.random() < 0.1 else 0)
+
+        insert('desempenho_equipa_jogo', [
+            'id_jogo', 'id_equipa', 'golos_marcados', 'golos_sofridos', 'remates_baliza',
+            'remates_sofridos', 'posse_bola', 'cantos', 'cartoes_amarelos', 'cartoes_vermelhos',
+            'clean_sheet', 'falhas_penalti', 'penaltis_sofridos'
+        ], team_rows())
+
+        def player_game_rows():
+            for match_id, home, away, golos_casa, golos_fora, _ in matches:
+                for team_id, goals in ((home, golos_casa), (away, golos_fora)):
+                    squad = squads[team_id]
+                    starters = set(rng.sample(range(len(squad)), min(11, len(squad))))
+                    # Os golos são atribuídos sobretudo a atacantes e médios
+                    scorers = [rng.randrange(len(squad) // 2, len(squad)) for _ in range(goals)]
+                    for idx, (player_id, posicao) in enumerate(squad):
+                        minutos = rng.randint(60, 90) if idx in starters else (rng.randint(1, 30) if rng.random() < 0.25 else 0)
+                        if minutos == 0:
+                            yield (match_id, player_id, 0, 0, 0, 0, 0, 0, 0, 0.0, 0, 0, 0, 0, 0, 0)
+                            continue
+                        remates = _poisson(rng, 1.2)
+                        yield (match_id, player_id, scorers.count(idx),
+                               1 if rng.random() < 0.08 else 0, minutos,
+                               1 if rng.random() < 0.12 else 0, 1 if rng.random() < 0.005 else 0,
+                               remates, sum(1 for _ in range(remates) if rng.random() < 0.4),
+                               round(rng.uniform(65, 95), 1),
+                               _poisson(rng, 1.5), _poisson(rng, 1.0), _poisson(rng, 1.1),
+                               _poisson(rng, 1.0), 0, 0)
+
+        insert('desempenho_jogador_jogo', [
+            'id_jogo', 'id_jogador', 'golos', 'assistencias', 'minutos_jogados', 'cartoes_amarelos',
+            'cartoes_vermelhos', 'remates', 'remates_baliza', 'passes_completos', 'desarmes',
+            'intercecoes', 'faltas_cometidas', 'faltas_sofridas', 'penaltis_marcados', 'penaltis_sofridos'
+        ], player_game_rows())
+
+        # Lesões ativas (cerca de 5% dos jogadores) e confrontos diretos
+        today = datetime.date.today()
+        insert('lesoes', ['id_jogador', 'data_inicio', 'data_fim_estimada', 'tipo_lesao', 'gravidade', 'impacto_equipa'], (
+            (player_id, (today - datetime.timedelta(days=rng.randint(1, 30))).isoformat(),
+             (today + datetime.timedelta(days=rng.randint(1, 60))).isoformat(),
+             rng.choice(INJURY_TYPES), rng.choice(SEVERITIES), rng.randint(1, 5))
+            for squad in squads.values() for player_id, _ in squad if rng.random() < 0.05
+        ))
+
+        # Confrontos diretos a partir dos jogos finalizados
+        insert('confrontos_diretos', ['id_equipa1', 'id_equipa2', 'data_confronto', 'vencedor',
+                                      'golos_equipa1', 'golos_equipa2', 'local'], (
+            (home, away, data_jogo, home if golos_casa > golos_fora else (away if golos_fora > golos_casa else None),
+             golos_casa, golos_fora, 'Casa')
+            for _, home, away, golos_casa, golos_fora, data_jogo in matches
+        ))
+
+        elapsed = time.perf_counter() - start
+        total_rows = sum(counts.values())
+        logger.info(f"Dados sintéticos carregados: {total_rows} linhas em {elapsed:.1f}s")
+        return {
+            'validacao': validar,
+            'linhas': counts,
+            'total_linhas': total_rows,
+            'segundos': round(elapsed, 3),
+            'linhas_por_segundo': round(total_rows / elapsed, 1) if elapsed > 0 else None
+        }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * pct), len(sorted_values) - 1)]
+
+
+def bench_predict_match(engine, n_calls: int = 100, seed: int = 42) -> Dict:
+    """Mede a latência de predict_match em pares de equipas de jogos existentes."""
+    conn = engine.collector._connect()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id_equipa_casa, id_equipa_fora FROM jogo ORDER BY id_jogo DESC LIMIT 10000')
+    pairs = cursor.fetchall()
+    conn.close()
+
+    if not pairs:
+        return {'chamadas': 0}
+
+    rng = random.Random(seed)
+    times = []
+    for _ in range(n_calls):
+        id_casa, id_fora = rng.choice(pairs)
+        start = time.perf_counter()
+        engine.predict_match(id_casa, id_fora)
+        times.append((time.perf_counter() - start) * 1000)
+
+    times.sort()
+    return {
+        'chamadas': n_calls,
+        'p50_ms': round(_percentile(times, 0.50), 3),
+        'p99_ms': round(_percentile(times, 0.99), 3),
+        'media_ms': round(sum(times) / len(times), 3)
+    }
+
+
+def bench_daily_analysis(engine, data_inicio: Optional[str] = None, data_fim: Optional[str] = None) -> Dict:
+    """Mede o débito e a memória de pico de generate_daily_analysis.
+
+    Sem datas, usa o intervalo de todos os jogos agendados.
+    """
+    if data_inicio is None:
+        conn = engine.collector._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(data_jogo), MAX(data_jogo) FROM jogo WHERE status = 'agendado'")
+        data_inicio, data_fim = cursor.fetchone()
+        conn.close()
+        if data_inicio is None:
+            return {'jogos': 0}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = 0
+    for _ in engine.iter_daily_analysis(data_inicio, data_fim):
+        total += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'jogos': total,
+        'segundos': round(elapsed, 3),
+        'jogos_por_segundo': round(total / elapsed, 2) if elapsed > 0 else None,
+        'memoria_pico_mb': round(peak / 1024 / 1024, 2)
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record_result(result: Dict, history_path: str) -> Optional[Dict]:
+    """Acrescenta o resultado ao histórico e devolve o resultado anterior (se existir)."""
+    previous = None
+    if os.path.exists(history_path):
+        with open(history_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    previous = json.loads(line)
+
+    with open(history_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result, ensure_ascii=False) + '\n')
+    return previous
+
+
+def run_benchmarks(db_path: str, scale: Optional[str] = None, seed: int = 42, n_calls: int = 100,
+                   history_path: Optional[str] = None, engine=None) -> Dict:
+    """Executa os benchmarks (gerando dados sintéticos se scale for indicado)."""
+    result = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revisao': _git_revision(),
+        'python': platform.python_version(),
+        'escala': scale,
+        'semente': seed
+    }
+
+    if scale is not None:
+        generator = SyntheticDataGenerator.from_scale(scale, seed)
+        result['ingestao'] = generator.load(db_path)
+        # Os mesmos dados sem validação, numa base temporária, para medir o custo da validação
+        with tempfile.TemporaryDirectory() as directory:
+            result['ingestao_sem_validacao'] = generator.load(os.path.join(directory, 'bench.db'), validar=False)
+
+    if engine is None:
+        from prediction_engine import FootballPredictionEngine
+        engine = FootballPredictionEngine(db_path)
+
+    result['predict_match'] = bench_predict_match(engine, n_calls, seed)
+    result['generate_daily_analysis'] = bench_daily_analysis(engine)
+
+    if history_path:
+        previous = record_result(result, history_path)
+        if previous and previous.get('predict_match', {}).get('p50_ms'):
+            result['variacao_p50_pct'] = round(
+                (result['predict_match']['p50_ms'] / previous['predict_match']['p50_ms'] - 1) * 100, 1)
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    scale = sys.argv[1] if len(sys.argv) > 1 else 'small'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else f"bench_{scale}.db"
+
+    if os.path.exists(db_path):
+        print(f"A base de dados {db_path} já existe; remova-a ou indique outro caminho.")
+        sys.exit(1)
+
+    print(json.dumps(run_benchmarks(db_path, scale, history_path='bench_history.jsonl'),
+                     ensure_ascii=False, indent=2))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Calibração das Probabilidades
+Autor: Manus AI
+Data: 19/10/2026
+
+As probabilidades de predict_match resultam de pontuações normalizadas e de um
+termo heurístico para o empate, pelo que não estão calibradas. Este módulo
+ajusta um mapeamento sobre os resultados de um backtest em ponto no tempo
+(run_backtest com backtest.PointInTimeSQLiteBackend; as previsões feitas com o
+resultado já na base ficariam demasiado confiantes):
+
+- 'isotonica': regressão isotónica (pool adjacent violators) por resultado,
+  guardada como tabela de consulta com GRID_SIZE pontos; aplicar custa uma
+  indexação por resultado e uma renormalização.
+- 'logistica': regressão logística multinomial sobre o logaritmo das três
+  probabilidades (3 x 4 coeficientes); o ajuste requer numpy.
+
+O calibrador é guardado num pequeno ficheiro JSON e aplicado pelo motor
+(FootballPredictionEngine(calibration_path=...)) ou em lote com apply_many.
+"""
+
+import json
+import math
+from typing import Dict, List, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ('casa', 'empate', 'fora')
+METHODS = ('isotonica', 'logistica')
+GRID_SIZE = 101  # pontos da tabela de consulta (passo de 0.01)
+EPSILON = 1e-6
+# Limite inferior da tabela isotónica: com poucos jogos nos extremos, a regressão
+# chega a 0 e um único resultado inesperado tornaria o log loss ilimitado
+PROBABILITY_FLOOR = 0.01
+
+
+def _pav(points: List[Tuple[float, float]]) -> List[Tuple[float, float, float]]:
+    """Regressão isotónica crescente; devolve blocos (x_min, x_max, valor)."""
+    blocks = []  # [soma_y, n, x_min, x_max]
+    for x, y in sorted(points):
+        blocks.append([y, 1, x, x])
+        while len(blocks) > 1 and blocks[-2][0] / blocks[-2][1] >= blocks[-1][0] / blocks[-1][1]:
+            soma, n, _, x_max = blocks.pop()
+            blocks[-1][0] += soma
+            blocks[-1][1] += n
+            blocks[-1][3] = x_max
+    return [(x_min, x_max, soma / n) for soma, n, x_min, x_max in blocks]
+
+
+def _isotonic_grid(points: List[Tuple[float, float]]) -> List[float]:
+    """Avalia a função isotónica numa grelha regular de [0, 1] (interpolação entre blocos)."""
+    blocks = _pav(points)
+    # Um ponto de controlo no centro de cada bloco; fora deles o valor é constante
+    xs = [(x_min + x_max) / 2 for x_min, x_max, _ in blocks]
+    ys = [value for _, _, value in blocks]
+
+    grid = []
+    k = 0
+    for i in range(GRID_SIZE):
+        x = i / (GRID_SIZE - 1)
+        while k < len(xs) - 1 and xs[k + 1] <= x:
+            k += 1
+        if x <= xs[0]:
+            value = ys[0]
+        elif k == len(xs) - 1:
+            value = ys[-1]
+        else:
+            t = (x - xs[k]) / (xs[k + 1] - xs[k])
+            value = ys[k] + t * (ys[k + 1] - ys[k])
+        grid.append(round(min(max(value, PROBABILITY_FLOOR), 1 - PROBABILITY_FLOOR), 6))
+    return grid
+
+
+class Calibrator:
+    """Mapeamento de probabilidades (casa, empate, fora) brutas para calibradas."""
+
+    def __init__(self, metodo: str, parametros: Dict, jogos: int = 0):
+        if metodo not in METHODS:
+            raise ValueError(f"Método de calibração desconhecido: {metodo}")
+        self.metodo = metodo
+        self.parametros = parametros
+        self.jogos = jogos
+
+    @classmethod
+    def fit(cls, results: Sequence[Dict], metodo: str = 'isotonica') -> 'Calibrator':
+        """Ajusta o calibrador aos resultados de run_backtest em ponto no tempo."""
+        results = list(results)
+        if not results:
+            raise ValueError("Sem jogos para ajustar a calibração")
+        dentro_da_amostra = sum(1 for r in results if not r.get('ponto_no_tempo'))
+        if dentro_da_amostra:
+            raise ValueError(f"{dentro_da_amostra} resultados não são de um backtest em ponto no tempo; "
+                             f"use run_backtest com PointInTimeSQLiteBackend")
+
+        if metodo == 'isotonica':
+            parametros = {
+                outcome: _isotonic_grid([
+                    (r[f'prob_{outcome}'], 1.0 if r['resultado'] == outcome else 0.0) for r in results
+                ])
+                for outcome in OUTCOMES
+            }
+        elif metodo == 'logistica':
+            parametros = _fit_multinomial(results)
+        else:
+            raise ValueError(f"Método de calibração desconhecido: {metodo}")
+
+        logger.info(f"Calibração {metodo} ajustada com {len(results)} jogos")
+        return cls(metodo, parametros, len(results))
+
+    def apply(self, prob_casa: float, prob_empate: float, prob_fora: float) -> Tuple[float, float, float]:
+        """Calibra as probabilidades de um jogo (0-1) e renormaliza."""
+        probs = (prob_casa, prob_empate, prob_fora)
+        if self.metodo == 'isotonica':
+            scale = GRID_SIZE - 1
+            values = [self.parametros[o][min(max(int(p * scale + 0.5), 0), scale)]
+                      for o, p in zip(OUTCOMES, probs)]
+        else:
+            logs = [math.log(max(p, EPSILON)) for p in probs]
+            values = []
+            for row in self.parametros['coeficientes']:
+                values.append(row[3] + sum(w * x for w, x in zip(row, logs)))
+            top = max(values)
+            values = [math.exp(v - top) for v in values]
+        total = sum(values)
+        return tuple(v / total for v in values)
+
+    def apply_many(self, probs):
+        """Calibra uma matriz (n, 3) de probabilidades de uma só vez (requer numpy)."""
+        import numpy as np
+
+        probs = np.asarray(probs, dtype=float)
+        if self.metodo == 'isotonica':
+            scale = GRID_SIZE - 1
+            idx = np.clip(np.rint(probs * scale).astype(int), 0, scale)
+            table = np.array([self.parametros[o] for o in OUTCOMES])
+            values = table[np.arange(3), idx]
+        else:
+            coef = np.array(self.parametros['coeficientes'])
+            values = np.log(np.clip(probs, EPSILON, 1.0)) @ coef[:, :3].T + coef[:, 3]
+            values = np.exp(values - values.max(axis=1, keepdims=True))
+        return values / values.sum(axis=1, keepdims=True)
+
+    def to_dict(self) -> Dict:
+        return {'metodo': self.metodo, 'jogos': self.jogos, 'parametros': self.parametros}
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str) -> 'Calibrator':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['metodo'], data['parametros'], data.get('jogos', 0))
+
+
+def _fit_multinomial(results: List[Dict], iterations: int = 500, learning_rate: float = 0.5,
+                     l2: float = 1e-3) -> Dict:
+    """Regressão logística multinomial sobre log(p) por descida de gradiente (requer numpy)."""
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("A calibração logística requer o pacote 'numpy' (pip install numpy)")
+
+    x = np.log(np.clip(np.array([[r['prob_casa'], r['prob_empate'], r['prob_fora']] for r in results]),
+                       EPSILON, 1.0))
+    x = np.hstack([x, np.ones((len(results), 1))])
+    y = np.zeros((len(results), 3))
+    y[np.arange(len(results)), [OUTCOMES.index(r['resultado']) for r in results]] = 1.0
+
+    # Começar na identidade: softmax(log p) = p (sem calibração)
+    w = np.hstack([np.eye(3), np.zeros((3, 1))])
+    for _ in range(iterations):
+        logits = x @ w.T
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        p /= p.sum(axis=1, keepdims=True)
+        grad = (p - y).T @ x / len(results) + l2 * w
+        w -= learning_rate * grad
+
+    return {'coeficientes': [[round(float(v), 6) for v in row] for row in w]}
+
+
+if __name__ == "__main__":
+    import sys
+    from prediction_engine import FootballPredictionEngine
+    from backtest import PointInTimeSQLiteBackend, run_backtest
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 calibration.py DESTINO.json [isotonica|logistica] [DATA_INICIO] [DATA_FIM]")
+        sys.exit(1)
+
+    metodo = sys.argv[2] if len(sys.argv) > 2 else 'isotonica'
+    data_inicio = sys.argv[3] if len(sys.argv) > 3 else '1900-01-01'
+    data_fim = sys.argv[4] if len(sys.argv) > 4 else '2999-12-31'
+
+    engine = FootballPredictionEngine(storage=PointInTimeSQLiteBackend())
+    results = list(run_backtest(engine, data_inicio, data_fim))
+    calibrator = Calibrator.fit(results, metodo)
+    calibrator.save(sys.argv[1])
+    print(f"Calibração {metodo} guardada em {sys.argv[1]} ({len(results)} jogos)")
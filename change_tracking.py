@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Registo de Alterações e Re-previsão Seletiva
+Autor: Manus AI
+Data: 19/10/2026
+
+Triggers SQLite registam em `registo_alteracoes` cada linha inserida, alterada
+ou removida nas tabelas que alimentam o motor de previsão, já resolvida para as
+equipas afetadas (o grafo de dependências linha → equipa):
+
+- jogo, confrontos_diretos          → ambas as equipas
+- desempenho_equipa_jogo            → a equipa
+- desempenho_jogador_jogo, lesoes   → a equipa do jogador
+- jogador                           → a equipa antiga e a nova
+- xg_equipa                         → a equipa
+
+O RePredictionWorker lê as alterações pendentes, encontra os jogos agendados
+dessas equipas e recalcula apenas essas previsões, guardando-as em `previsoes`.
+
+Nota: as lesões deixam de contar quando passa a data_fim_estimada sem que
+nenhuma linha mude; para isso, use refresh_all uma vez por dia.
+
+Os triggers e o registo são próprios do SQLite: o RePredictionWorker recusa
+outros backends. Depois de instalados, os triggers registam cada alteração
+mesmo sem nenhum worker a correr, e o registo só é limpo até à posição do
+consumidor mais atrasado (estado_alteracoes) quando um worker processa
+alterações. Se a re-previsão deixar de ser usada, remova os triggers com
+remove_change_tracking (`football_cli.py repredict --remove-tracking`); caso
+contrário, `registo_alteracoes` cresce sem limite.
+"""
+
+import json
+import time
+import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (tabela, [expressões SQL das equipas afetadas para NEW/OLD])
+TRACKED_TABLES = {
+    'jogo': ['{row}.id_equipa_casa', '{row}.id_equipa_fora'],
+    'confrontos_diretos': ['{row}.id_equipa1', '{row}.id_equipa2'],
+    'desempenho_equipa_jogo': ['{row}.id_equipa'],
+    'desempenho_jogador_jogo': ['(SELECT id_equipa FROM jogador WHERE id_jogador = {row}.id_jogador)'],
+    'lesoes': ['(SELECT id_equipa FROM jogador WHERE id_jogador = {row}.id_jogador)'],
+    'jogador': ['{row}.id_equipa'],
+    'xg_equipa': ['{row}.id_equipa']
+}
+
+PRIMARY_KEYS = {
+    'jogo': 'id_jogo',
+    'confrontos_diretos': 'id_confronto',
+    'desempenho_equipa_jogo': 'id',
+    'desempenho_jogador_jogo': 'id',
+    'lesoes': 'id_lesao',
+    'jogador': 'id_jogador',
+    'xg_equipa': 'id_equipa'
+}
+
+
+def install_change_tracking(conn):
+    """Cria as tabelas do registo de alterações, as previsões guardadas e os triggers."""
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS registo_alteracoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            id_linha INTEGER,
+            operacao TEXT NOT NULL,
+            id_equipa INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS previsoes (
+            id_jogo INTEGER PRIMARY KEY,
+            dados TEXT NOT NULL,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (id_jogo) REFERENCES jogo (id_jogo)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS estado_alteracoes (
+            consumidor TEXT PRIMARY KEY,
+            ultimo_id INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    for tabela, expressions in TRACKED_TABLES.items():
+        pk = PRIMARY_KEYS[tabela]
+        for operacao, rows in (('INSERT', ['NEW']), ('UPDATE', ['OLD', 'NEW']), ('DELETE', ['OLD'])):
+            pk_row = 'OLD' if operacao == 'DELETE' else 'NEW'
+            inserts = '\n'.join(
+                f"INSERT INTO registo_alteracoes (tabela, id_linha, operacao, id_equipa) "
+                f"VALUES ('{tabela}', {pk_row}.{pk}, '{operacao}', {expr.format(row=row)});"
+                for row in rows for expr in expressions
+            )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS cdc_{tabela}_{operacao.lower()}
+                AFTER {operacao} ON {tabela}
+                BEGIN
+                    {inserts}
+                END
+            ''')
+
+    conn.commit()
+
+
+def remove_change_tracking(conn) -> int:
+    """Remove os triggers, o registo de alterações e os consumidores (as previsões guardadas ficam).
+
+    Devolve o número de alterações pendentes descartadas.
+    """
+    cursor = conn.cursor()
+    for tabela in TRACKED_TABLES:
+        for operacao in ('insert', 'update', 'delete'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS cdc_{tabela}_{operacao}')
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'registo_alteracoes'")
+    pendentes = 0
+    if cursor.fetchone():
+        cursor.execute('SELECT COUNT(*) FROM registo_alteracoes')
+        pendentes = cursor.fetchone()[0]
+    cursor.execute('DROP TABLE IF EXISTS registo_alteracoes')
+    cursor.execute('DROP TABLE IF EXISTS estado_alteracoes')
+    conn.commit()
+    return pendentes
+
+
+class RePredictionWorker:
+    """Recalcula apenas as previsões dos jogos cujos dados de entrada mudaram (requer SQLite)."""
+
+    def __init__(self, engine, consumidor: str = 'repredicao'):
+        if engine.collector.storage.name != 'sqlite':
+            raise ValueError(f"A re-previsão seletiva usa triggers SQLite na base viva; "
+                             f"o backend '{engine.collector.storage.name}' não é suportado")
+        self.engine = engine
+        self.consumidor = consumidor
+
+        conn = self.engine.collector._connect()
+        install_change_tracking(conn)
+        conn.execute('INSERT OR IGNORE INTO estado_alteracoes (consumidor, ultimo_id) VALUES (?, 0)',
+                     (consumidor,))
+        conn.commit()
+        conn.close()
+
+    def _store(self, cursor, fixtures: Iterable) -> int:
+        fixtures = list(fixtures)
+        agendas = self.engine.schedule.factors_many(fixtures)
+        total = 0
+        for (id_jogo, data_jogo, id_casa, id_fora, id_competicao), agenda in zip(fixtures, agendas):
+            prediction = self.engine.predict_match_compact(id_casa, id_fora, id_competicao, data_jogo, agenda)
+            prediction.id_jogo = id_jogo
+            prediction.data_jogo = data_jogo
+            cursor.execute('''
+                INSERT INTO previsoes (id_jogo, dados, atualizado_em) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (id_jogo) DO UPDATE SET dados = excluded.dados, atualizado_em = excluded.atualizado_em
+            ''', (id_jogo, prediction.to_json()))
+            total += 1
+        return total
+
+    def affected_teams(self, cursor) -> Tuple[Set[int], int]:
+        """Devolve as equipas com alterações pendentes e o último id do registo lido."""
+        cursor.execute('SELECT ultimo_id FROM estado_alteracoes WHERE consumidor = ?', (self.consumidor,))
+        ultimo_id = cursor.fetchone()[0]
+
+        cursor.execute('''
+            SELECT id, id_equipa FROM registo_alteracoes WHERE id > ? ORDER BY id
+        ''', (ultimo_id,))
+        teams = set()
+        for change_id, id_equipa in cursor.fetchall():
+            ultimo_id = change_id
+            if id_equipa is not None:
+                teams.add(id_equipa)
+        return teams, ultimo_id
+
+    def run_once(self, data_inicio: Optional[str] = None) -> int:
+        """Processa as alterações pendentes e devolve o número de jogos re-previstos."""
+        data_inicio = data_inicio or datetime.date.today().isoformat()
+        conn = self.engine.collector._connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT 1 FROM registo_alteracoes
+                WHERE tabela = 'jogo' AND id > (SELECT ultimo_id FROM estado_alteracoes WHERE consumidor = ?)
+                LIMIT 1
+            ''', (self.consumidor,))
+            if cursor.fetchone():
+                # Jogos novos ou alterados mudam o descanso e a congestão das equipas
+                self.engine.refresh_schedule()
+            teams, ultimo_id = self.affected_teams(cursor)
+            total = 0
+            if teams:
+                placeholders = ', '.join('?' for _ in teams)
+                cursor.execute(f'''
+                    SELECT id_jogo, data_jogo, id_equipa_casa, id_equipa_fora, id_competicao
+                    FROM jogo
+                    WHERE status = 'agendado' AND data_jogo >= ?
+                      AND (id_equipa_casa IN ({placeholders}) OR id_equipa_fora IN ({placeholders}))
+                    ORDER BY data_jogo, id_jogo
+                ''', [data_inicio, *teams, *teams])
+                total = self._store(cursor, cursor.fetchall())
+
+            # Avançar o cursor e descartar alterações já consumidas
+            cursor.execute('UPDATE estado_alteracoes SET ultimo_id = ? WHERE consumidor = ?',
+                           (ultimo_id, self.consumidor))
+            cursor.execute('''
+                DELETE FROM registo_alteracoes WHERE id <= (SELECT MIN(ultimo_id) FROM estado_alteracoes)
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+        if total:
+            logger.info(f"{total} jogos re-previstos ({len(teams)} equipas alteradas)")
+        return total
+
+    def refresh_all(self, data_inicio: Optional[str] = None, data_fim: str = '2999-12-31') -> int:
+        """Recalcula todas as previsões de jogos agendados no intervalo."""
+        data_inicio = data_inicio or datetime.date.today().isoformat()
+        fixtures = list(self.engine.iter_fixtures(data_inicio, data_fim))
+
+        conn = self.engine.collector._connect()
+        cursor = conn.cursor()
+        try:
+            total = self._store(cursor, fixtures)
+            conn.commit()
+        finally:
+            conn.close()
+        return total
+
+    def get_predictions(self, data_jogo: str) -> List[Dict]:
+        """Devolve as previsões guardadas dos jogos de uma data."""
+        conn = self.engine.collector._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT p.dados FROM previsoes p
+            JOIN jogo j ON p.id_jogo = j.id_jogo
+            WHERE j.data_jogo = ?
+            ORDER BY j.id_jogo
+        ''', (data_jogo,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [json.loads(row[0]) for row in rows]
+
+    def run_forever(self, interval: float = 1.0, on_update: Optional[Callable[[int], None]] = None):
+        """Verifica periodicamente o registo de alterações.
+
+        on_update (opcional) é chamado com o número de jogos re-previstos em cada
+        verificação que alterou previsões (ex.: publicar os documentos do dashboard).
+        """
+        logger.info(f"Re-previsão ativa (intervalo {interval}s)")
+        while True:
+            total = self.run_once()
+            if total and on_update is not None:
+                on_update(total)
+            time.sleep(interval)
+
+
+if __name__ == "__main__":
+    from prediction_engine import FootballPredictionEngine
+
+    worker = RePredictionWorker(FootballPredictionEngine())
+    print(f"Previsões iniciais: {worker.refresh_all()}")
+    worker.run_forever()
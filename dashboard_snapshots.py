@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Publicação Estática dos Dados do Dashboard
+Autor: Manus AI
+Data: 19/10/2026
+
+O frontend (React) pede em cada carregamento /api/predictions?date=AAAA-MM-DD,
+/api/team_stats e /api/injuries. publish_dashboard gera esses documentos uma
+vez, depois de cada execução de previsões, como ficheiros JSON já comprimidos
+(gzip), que qualquer servidor de ficheiros estáticos serve sem Python:
+
+    destino/
+      current -> versions/1760000000000000000   (ligação trocada de forma atómica)
+      versions/1760000000000000000/
+        manifest.json                (versão, datas e tamanho/sha256 de cada ficheiro)
+        api/predictions/2025-06-28.json  (+ .json.gz)
+        api/predictions/index.json       (todas as datas publicadas)
+        api/team_stats.json              (+ .json.gz)
+        api/injuries.json                (+ .json.gz)
+
+Cada publicação é uma pasta nova com as datas do seu intervalo; os documentos
+das datas publicadas antes e fora desse intervalo passam da versão atual para a
+nova sem alteração (ligação física, ou cópia se não for possível), pelo que o
+índice e os documentos antigos continuam disponíveis. Só quando a pasta está
+completa o ponteiro `current` passa a apontar para ela (os pedidos em curso continuam a ler a versão
+anterior, mantida até `keep` versões). Exemplo de configuração nginx, com a
+raiz em destino/current:
+
+    location = /api/predictions { gzip_static on; default_type application/json;
+                                  try_files /api/predictions/$arg_date.json =404; }
+    location /api/ { gzip_static on; default_type application/json; try_files $uri.json =404; }
+
+As previsões vêm de iter_predictions ou, sem recálculo, das guardadas pelo
+RePredictionWorker (tabela previsoes); os textos JSON guardados são copiados
+sem voltar a ser serializados.
+"""
+
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import datetime
+import time
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+CURRENT_LINK = 'current'
+VERSIONS_DIR = 'versions'
+# Jogos da forma das equipas (como get_team_performance)
+TEAM_STATS_MATCHES = 10
+
+_PREDICTIONS_DOCUMENT = re.compile(r'^api/predictions/(\d{4}-\d{2}-\d{2})\.json$')
+
+
+def _dates(data_inicio: str, data_fim: str) -> Iterator[str]:
+    dia = datetime.date.fromisoformat(data_inicio)
+    fim = datetime.date.fromisoformat(data_fim)
+    while dia <= fim:
+        yield dia.isoformat()
+        dia += datetime.timedelta(days=1)
+
+
+def _with_id(id_jogo: int, dados: str) -> str:
+    """Acrescenta a chave 'id' (usada pelo frontend) ao texto JSON de uma previsão."""
+    return f'{{"id": {int(id_jogo)}, {dados[1:]}' if dados != '{}' else f'{{"id": {int(id_jogo)}}}'
+
+
+def stored_predictions(collector, data_inicio: str, data_fim: str) -> Iterator[Tuple[str, str]]:
+    """(data, texto JSON) das previsões guardadas na tabela previsoes, por data."""
+    conn = collector._connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT j.id_jogo, j.data_jogo, p.dados FROM previsoes p
+            JOIN jogo j ON p.id_jogo = j.id_jogo
+            WHERE j.data_jogo >= ? AND j.data_jogo < ?
+            ORDER BY j.data_jogo, j.id_jogo
+        ''', (data_inicio, (datetime.date.fromisoformat(data_fim) + datetime.timedelta(days=1)).isoformat()))
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for id_jogo, data_jogo, dados in rows:
+                yield str(data_jogo)[:10], _with_id(id_jogo, dados)
+    finally:
+        conn.close()
+
+
+def computed_predictions(engine, data_inicio: str, data_fim: str, workers: int = 1) -> Iterator[Tuple[str, str]]:
+    """(data, texto JSON) das previsões calculadas pelo motor para os jogos agendados."""
+    for prediction in engine.iter_predictions(data_inicio, data_fim, workers=workers):
+        yield str(prediction.data_jogo)[:10], _with_id(prediction.id_jogo, prediction.to_json())
+
+
+def team_stats(collector, num_jogos: int = TEAM_STATS_MATCHES) -> List[Dict]:
+    """Golos marcados/sofridos e % de clean sheets dos últimos jogos de cada equipa, numa só consulta."""
+    conn = collector._connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT e.id_equipa, e.nome_equipa, AVG(r.golos_marcados), AVG(r.golos_sofridos),
+                   SUM(r.clean_sheet) * 100.0 / COUNT(*), COUNT(*)
+            FROM (
+                SELECT dej.id_equipa, dej.golos_marcados, dej.golos_sofridos, dej.clean_sheet,
+                       ROW_NUMBER() OVER (PARTITION BY dej.id_equipa
+                                          ORDER BY j.data_jogo DESC, j.id_jogo DESC) AS ordem
+                FROM desempenho_equipa_jogo dej
+                JOIN jogo j ON dej.id_jogo = j.id_jogo
+                WHERE j.status = 'finalizado'
+            ) r
+            JOIN equipa e ON e.id_equipa = r.id_equipa
+            WHERE r.ordem <= ?
+            GROUP BY e.id_equipa, e.nome_equipa
+            ORDER BY e.nome_equipa
+        ''', (num_jogos,))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+    return [{'id_equipa': id_equipa, 'name': nome, 'golos_marcados': round(marcados or 0, 2),
+             'golos_sofridos': round(sofridos or 0, 2), 'clean_sheets': round(clean_sheets or 0, 1),
+             'jogos': jogos}
+            for id_equipa, nome, marcados, sofridos, clean_sheets, jogos in rows]
+
+
+def active_injuries(collector) -> List[Dict]:
+    """Lesões ativas de todas as equipas (os mesmos critérios de get_team_injuries)."""
+    conn = collector._connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT jg.id_jogador, jg.nome_jogador, e.nome_equipa, jg.posicao, l.tipo_lesao, l.gravidade,
+                   l.impacto_equipa, l.data_inicio, l.data_fim_estimada
+            FROM lesoes l
+            JOIN jogador jg ON l.id_jogador = jg.id_jogador
+            LEFT JOIN equipa e ON e.id_equipa = jg.id_equipa
+            WHERE l.data_fim_estimada IS NULL OR l.data_fim_estimada >= date('now')
+            ORDER BY l.impacto_equipa DESC, l.data_inicio DESC
+        ''')
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+    return [{'id_jogador': id_jogador, 'player': nome, 'team': equipa, 'position': posicao, 'injury': tipo,
+             'severity': gravidade, 'impact': impacto, 'data_inicio': str(inicio) if inicio else None,
+             'data_fim_estimada': str(fim) if fim else None}
+            for id_jogador, nome, equipa, posicao, tipo, gravidade, impacto, inicio, fim in rows]
+
+
+class SnapshotPublisher:
+    """Escreve versões completas dos documentos e troca o ponteiro `current` no fim."""
+
+    def __init__(self, destino: str, keep: int = 3, compresslevel: int = 9):
+        self.destino = destino
+        self.keep = max(keep, 1)
+        self.compresslevel = compresslevel
+        self.versao = None
+        self.ficheiros: Dict[str, Dict] = {}
+
+    def begin(self) -> str:
+        self.versao = str(time.time_ns())
+        self.ficheiros = {}
+        os.makedirs(self._version_dir(), exist_ok=False)
+        return self.versao
+
+    def _version_dir(self, versao: Optional[str] = None) -> str:
+        return os.path.join(self.destino, VERSIONS_DIR, versao or self.versao)
+
+    def write(self, caminho: str, texto: str):
+        """Grava um documento (caminho relativo, ex.: 'api/injuries.json') e a cópia .gz."""
+        dados = texto.encode('utf-8')
+        completo = os.path.join(self._version_dir(), caminho)
+        os.makedirs(os.path.dirname(completo), exist_ok=True)
+        with open(completo, 'wb') as f:
+            f.write(dados)
+        # mtime=0: o mesmo conteúdo gera sempre o mesmo .gz (ETags estáveis)
+        comprimido = gzip.compress(dados, compresslevel=self.compresslevel, mtime=0)
+        with open(completo + '.gz', 'wb') as f:
+            f.write(comprimido)
+        self.ficheiros[caminho] = {'bytes': len(dados), 'bytes_gzip': len(comprimido),
+                                   'sha256': hashlib.sha256(dados).hexdigest()}
+
+    def previous(self) -> Optional[Dict]:
+        """Manifesto da versão atual (None antes da primeira publicação)."""
+        try:
+            with open(os.path.join(self.destino, CURRENT_LINK, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        # A pasta da versão, e não o ponteiro, que pode mudar durante a publicação
+        manifest['pasta'] = os.path.realpath(os.path.join(self.destino, CURRENT_LINK))
+        return manifest
+
+    def carry(self, caminho: str, anterior: Dict) -> bool:
+        """Reutiliza um documento (e a cópia .gz) da versão anterior; False se não existir."""
+        info = anterior.get('ficheiros', {}).get(caminho)
+        origem = os.path.join(anterior['pasta'], caminho)
+        if info is None or not os.path.exists(origem) or not os.path.exists(origem + '.gz'):
+            return False
+        completo = os.path.join(self._version_dir(), caminho)
+        os.makedirs(os.path.dirname(completo), exist_ok=True)
+        for sufixo in ('', '.gz'):
+            try:
+                os.link(origem + sufixo, completo + sufixo)
+            except OSError:
+                shutil.copy2(origem + sufixo, completo + sufixo)
+        self.ficheiros[caminho] = info
+        return True
+
+    def write_json(self, caminho: str, documento):
+        self.write(caminho, json.dumps(documento, ensure_ascii=False, separators=(',', ':')))
+
+    def commit(self, extra: Optional[Dict] = None) -> Dict:
+        """Grava o manifesto, aponta `current` para a nova versão e remove as antigas."""
+        manifest = {'versao': self.versao, 'gerado_em': datetime.datetime.now().isoformat(timespec='seconds'),
+                    **(extra or {}), 'ficheiros': self.ficheiros}
+        with open(os.path.join(self._version_dir(), 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        link = os.path.join(self.destino, CURRENT_LINK)
+        link_tmp = f"{link}.tmp"
+        if os.path.lexists(link_tmp):
+            os.remove(link_tmp)
+        os.symlink(os.path.join(VERSIONS_DIR, self.versao), link_tmp)
+        os.replace(link_tmp, link)
+
+        versions = sorted((v for v in os.listdir(os.path.join(self.destino, VERSIONS_DIR)) if v.isdigit()), key=int)
+        for versao in versions[:-self.keep]:
+            shutil.rmtree(self._version_dir(versao), ignore_errors=True)
+        return manifest
+
+    def abort(self):
+        """Descarta uma versão incompleta (o ponteiro não muda)."""
+        if self.versao is not None:
+            shutil.rmtree(self._version_dir(), ignore_errors=True)
+
+
+def publish_dashboard(engine, destino: str, data_inicio: str, data_fim: Optional[str] = None,
+                      guardadas: bool = False, workers: int = 1, keep: int = 3) -> Dict:
+    """Publica as previsões de cada data do intervalo, a forma das equipas e as lesões.
+
+    Com guardadas=True, usa as previsões da tabela previsoes em vez de as
+    recalcular. Todas as datas do intervalo têm documento (lista vazia sem
+    jogos); as datas publicadas antes, fora do intervalo, passam da versão
+    atual sem alteração e index.json lista a união. Devolve o manifesto da
+    versão publicada.
+    """
+    data_fim = data_fim or data_inicio
+    start = time.perf_counter()
+    publisher = SnapshotPublisher(destino, keep=keep)
+    anterior = publisher.previous()
+    publisher.begin()
+    try:
+        mantidas = []
+        if anterior is not None:
+            for caminho in sorted(anterior.get('ficheiros', {})):
+                documento = _PREDICTIONS_DOCUMENT.match(caminho)
+                if documento is None or data_inicio <= documento.group(1) <= data_fim:
+                    continue
+                if publisher.carry(caminho, anterior):
+                    mantidas.append(documento.group(1))
+
+        predictions: Iterable[Tuple[str, str]] = (
+            stored_predictions(engine.collector, data_inicio, data_fim) if guardadas
+            else computed_predictions(engine, data_inicio, data_fim, workers)
+        )
+        # As previsões chegam por ordem de data: cada dia é escrito assim que termina
+        datas = list(_dates(data_inicio, data_fim))
+        pendentes = deque(datas)
+        total = 0
+        for data, grupo in groupby(predictions, key=itemgetter(0)):
+            while pendentes and pendentes[0] < data:
+                publisher.write(f'api/predictions/{pendentes.popleft()}.json', '[]')
+            if not pendentes or pendentes[0] != data:
+                continue
+            textos = [texto for _, texto in grupo]
+            publisher.write(f'api/predictions/{pendentes.popleft()}.json', '[' + ','.join(textos) + ']')
+            total += len(textos)
+        for dia in pendentes:
+            publisher.write(f'api/predictions/{dia}.json', '[]')
+        publisher.write_json('api/predictions/index.json', sorted(set(datas) | set(mantidas)))
+
+        publisher.write_json('api/team_stats.json', team_stats(engine.collector))
+        publisher.write_json('api/injuries.json', active_injuries(engine.collector))
+        manifest = publisher.commit({'datas': [data_inicio, data_fim], 'previsoes': total,
+                                     'datas_mantidas': len(mantidas)})
+    except BaseException:
+        publisher.abort()
+        raise
+
+    logger.info(f"Dashboard publicado em {destino} (versão {manifest['versao']}): {total} previsões, "
+                f"{len(publisher.ficheiros)} documentos em {time.perf_counter() - start:.2f}s")
+    return manifest
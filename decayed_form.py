@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Forma com Decaimento Temporal
+Autor: Manus AI
+Data: 19/10/2026
+
+Alternativa às médias simples dos últimos N jogos: cada jogo pesa
+0.5 ** (dias_desde_o_jogo / meia_vida), pelo que a forma recente conta mais e
+não há um corte brusco no jogo N+1.
+
+As médias ponderadas são mantidas de forma incremental como somas com
+decaimento por (equipa, meia_vida) e (jogador, meia_vida):
+
+    novo jogo na data d, posterior à data de referência r:
+        f = 0.5 ** ((d - r) / meia_vida)
+        soma = soma * f + valor;  peso = peso * f + 1;  r = d
+
+A média em qualquer instante é soma / peso (o decaimento comum até à data
+atual cancela-se), pelo que ler a forma de uma equipa custa O(1) e cada jogo
+novo atualiza apenas as suas equipas e jogadores. Cada meia-vida é uma feature
+independente, registada em `estado_forma_decaida` e atualizada a cada carga de
+desempenhos (ver FootballDataCollector.bulk_insert).
+
+Os desempenhos são aplicados pela ordem de inserção, quando o jogo fica
+finalizado: os que chegam antes do resultado ficam em `forma_decaida_pendente`
+e entram na atualização seguinte ao fecho do jogo (set_match_result ou uma
+carga de jogos; ver DECAYED_TRIGGERS). Cada atualização só lê as somas das
+equipas e jogadores das linhas aplicadas. Como as somas não dependem da ordem,
+o resultado é o mesmo de rebuild_decayed_form. Alterações ou remoções de linhas
+já aplicadas (ou um jogo que deixa de estar finalizado) exigem
+rebuild_decayed_form.
+"""
+
+import datetime
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tabelas de desempenho que alimentam as somas com decaimento
+DECAYED_SOURCES = ('desempenho_equipa_jogo', 'desempenho_jogador_jogo')
+# Tabelas cujas cargas atualizam as somas: os desempenhos e os jogos (um jogo
+# finalizado liberta os desempenhos pendentes)
+DECAYED_TRIGGERS = DECAYED_SOURCES + ('jogo',)
+# Ids por consulta das somas existentes (limite de parâmetros do SQLite)
+LOOKUP_CHUNK = 500
+
+TEAM_COLUMNS = [
+    'golos_marcados', 'golos_sofridos', 'remates_baliza', 'posse_bola',
+    'cantos', 'cartoes_amarelos', 'cartoes_vermelhos', 'clean_sheet'
+]
+
+PLAYER_COLUMNS = [
+    'golos', 'assistencias', 'minutos_jogados', 'cartoes_amarelos', 'cartoes_vermelhos',
+    'remates', 'remates_baliza', 'passes_completos', 'desarmes', 'intercecoes'
+]
+
+# (tabela de origem, tabela de somas, chave, colunas); a ordem é a de estado_forma_decaida
+_SPECS = [
+    ('desempenho_equipa_jogo', 'forma_equipa_decaida', 'id_equipa', TEAM_COLUMNS),
+    ('desempenho_jogador_jogo', 'forma_jogador_decaida', 'id_jogador', PLAYER_COLUMNS)
+]
+
+
+def _day(data) -> int:
+    return datetime.date.fromisoformat(str(data)[:10]).toordinal()
+
+
+def _accumulate(state: Optional[list], dia: int, values, half_life: float) -> list:
+    """Acrescenta um jogo ao estado [dia_referencia, peso, somas...]."""
+    if state is None:
+        return [dia, 1.0, *values]
+    dias = dia - state[0]
+    if dias >= 0:
+        f = 0.5 ** (dias / half_life)
+        return [dia, state[1] * f + 1.0, *(s * f + v for s, v in zip(state[2:], values))]
+    # Jogo anterior à referência (carga fora de ordem): entra já com o seu decaimento
+    w = 0.5 ** (-dias / half_life)
+    return [state[0], state[1] + w, *(s + w * v for s, v in zip(state[2:], values))]
+
+
+def _load_states(cursor, half_life: float, target: str, key: str, columns: List[str],
+                 entities, states: Dict[int, Optional[list]]):
+    """Lê as somas guardadas das entidades ainda não carregadas (None se não existirem)."""
+    novas = sorted(e for e in entities if e not in states)
+    for start in range(0, len(novas), LOOKUP_CHUNK):
+        chunk = novas[start:start + LOOKUP_CHUNK]
+        states.update(dict.fromkeys(chunk))
+        cursor.execute(f'''
+            SELECT {key}, data_referencia, peso, {', '.join('soma_' + c for c in columns)}
+            FROM {target} WHERE meia_vida = ? AND {key} IN ({', '.join('?' for _ in chunk)})
+        ''', (half_life, *chunk))
+        states.update({row[0]: [_day(row[1]), *row[2:]] for row in cursor.fetchall()})
+
+
+def _update_source(conn, half_life: float, source: str, target: str, key: str,
+                   columns: List[str], ultimo_id: int) -> Tuple[int, bool]:
+    """Aplica as linhas novas e as pendentes; devolve (último id visto, somas alteradas)."""
+    cursor = conn.cursor()
+    lookup = conn.cursor()
+    states: Dict[int, Optional[list]] = {}
+
+    # Linhas novas e as pendentes de cargas anteriores (jogo ainda não finalizado)
+    cursor.execute(f'''
+        SELECT d.id, j.status, d.{key}, j.data_jogo, {', '.join('d.' + c for c in columns)}
+        FROM {source} d
+        LEFT JOIN jogo j ON d.id_jogo = j.id_jogo
+        WHERE d.id > ? OR d.id IN (
+            SELECT id FROM forma_decaida_pendente WHERE meia_vida = ? AND tabela = ?
+        )
+        ORDER BY d.id
+    ''', (ultimo_id, half_life, source))
+
+    changed = set()
+    pending = []
+    while True:
+        rows = cursor.fetchmany(5000)
+        if not rows:
+            break
+        # Só as somas das entidades deste bloco (não as de todas as equipas/jogadores)
+        _load_states(lookup, half_life, target, key, columns,
+                     {row[2] for row in rows if row[1] == 'finalizado'}, states)
+        for row in rows:
+            ultimo_id = max(ultimo_id, row[0])
+            if row[1] != 'finalizado':
+                pending.append(row[0])
+                continue
+            entity = row[2]
+            states[entity] = _accumulate(states.get(entity), _day(row[3]),
+                                         [v or 0 for v in row[4:]], half_life)
+            changed.add(entity)
+
+    # Pendentes aplicados ou removidos saem; os restantes ficam para a próxima carga
+    cursor.execute('DELETE FROM forma_decaida_pendente WHERE meia_vida = ? AND tabela = ?',
+                   (half_life, source))
+    if pending:
+        cursor.executemany('''
+            INSERT INTO forma_decaida_pendente (meia_vida, tabela, id) VALUES (?, ?, ?)
+        ''', [(half_life, source, id_linha) for id_linha in pending])
+
+    if changed:
+        cursor.executemany(f'''
+            INSERT INTO {target} ({key}, meia_vida, data_referencia, peso, {', '.join('soma_' + c for c in columns)})
+            VALUES ({', '.join('?' for _ in range(len(columns) + 4))})
+            ON CONFLICT ({key}, meia_vida) DO UPDATE SET
+                data_referencia = excluded.data_referencia, peso = excluded.peso,
+                {', '.join(f'soma_{c} = excluded.soma_{c}' for c in columns)}
+        ''', [
+            (entity, half_life, datetime.date.fromordinal(states[entity][0]).isoformat(), *states[entity][1:])
+            for entity in changed
+        ])
+    return ultimo_id, bool(changed)
+
+
+def update_decayed_form(conn, half_life: float) -> bool:
+    """Aplica os desempenhos novos às somas de uma meia-vida (regista-a se for nova).
+
+    Não faz commit. Devolve True se alguma soma mudou.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT ultimo_id_equipa, ultimo_id_jogador FROM estado_forma_decaida WHERE meia_vida = ?
+    ''', (half_life,))
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute('''
+            INSERT INTO estado_forma_decaida (meia_vida, ultimo_id_equipa, ultimo_id_jogador) VALUES (?, 0, 0)
+        ''', (half_life,))
+        row = (0, 0)
+
+    ultimos = []
+    alterado = False
+    for (source, target, key, columns), ultimo_id in zip(_SPECS, row):
+        ultimo_id, changed = _update_source(conn, half_life, source, target, key, columns, ultimo_id)
+        ultimos.append(ultimo_id)
+        alterado = alterado or changed
+
+    if tuple(ultimos) != tuple(row):
+        cursor.execute('''
+            UPDATE estado_forma_decaida SET ultimo_id_equipa = ?, ultimo_id_jogador = ? WHERE meia_vida = ?
+        ''', (*ultimos, half_life))
+    return alterado
+
+
+def update_decayed_forms(conn) -> int:
+    """Atualiza todas as meias-vidas registadas (chamado após cargas de DECAYED_TRIGGERS)."""
+    cursor = conn.cursor()
+    cursor.execute('SELECT meia_vida FROM estado_forma_decaida')
+    half_lives = [row[0] for row in cursor.fetchall()]
+    for half_life in half_lives:
+        update_decayed_form(conn, half_life)
+    return len(half_lives)
+
+
+def rebuild_decayed_form(conn, half_life: float):
+    """Recalcula de raiz as somas de uma meia-vida (após alterar ou remover desempenhos)."""
+    cursor = conn.cursor()
+    for _, target, _, _ in _SPECS:
+        cursor.execute(f'DELETE FROM {target} WHERE meia_vida = ?', (half_life,))
+    cursor.execute('DELETE FROM estado_forma_decaida WHERE meia_vida = ?', (half_life,))
+    cursor.execute('DELETE FROM forma_decaida_pendente WHERE meia_vida = ?', (half_life,))
+    update_decayed_form(conn, half_life)
+    conn.commit()
+    logger.info(f"Forma com decaimento recalculada (meia-vida {half_life} dias)")
+
+
+def decayed_team_performance(conn, id_equipa: int, half_life: float) -> Dict:
+    """Desempenho da equipa com decaimento, no formato de get_team_performance."""
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT peso, {', '.join('soma_' + c for c in TEAM_COLUMNS)}
+        FROM forma_equipa_decaida WHERE id_equipa = ? AND meia_vida = ?
+    ''', (id_equipa, half_life))
+    row = cursor.fetchone()
+    if not row or not row[0]:
+        return {}
+
+    peso = row[0]
+    medias = dict(zip(TEAM_COLUMNS, (soma / peso for soma in row[1:])))
+    return {
+        'media_golos_marcados': round(medias['golos_marcados'], 2),
+        'media_golos_sofridos': round(medias['golos_sofridos'], 2),
+        'media_remates_baliza': round(medias['remates_baliza'], 2),
+        'media_posse_bola': round(medias['posse_bola'], 2),
+        'media_cantos': round(medias['cantos'], 2),
+        'media_cartoes_amarelos': round(medias['cartoes_amarelos'], 2),
+        'media_cartoes_vermelhos': round(medias['cartoes_vermelhos'], 2),
+        'percentagem_clean_sheets': round(medias['clean_sheet'] * 100, 2),
+        'total_jogos': round(peso, 2),
+        'diferenca_golos': round(medias['golos_marcados'] - medias['golos_sofridos'], 2)
+    }
+
+
+def decayed_team_players(conn, id_equipa: int, half_life: float) -> List[Dict]:
+    """Desempenho com decaimento de todos os jogadores da equipa, numa só consulta.
+
+    Os totais são somas com decaimento e total_jogos é o peso (número efetivo de jogos).
+    """
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT jg.id_jogador, jg.posicao, f.peso, {', '.join('f.soma_' + c for c in PLAYER_COLUMNS)}
+        FROM jogador jg
+        JOIN forma_jogador_decaida f ON f.id_jogador = jg.id_jogador
+        WHERE jg.id_equipa = ? AND f.meia_vida = ? AND f.peso > 0
+        ORDER BY jg.id_jogador
+    ''', (id_equipa, half_life))
+
+    players = []
+    for id_jogador, posicao, peso, *somas in cursor.fetchall():
+        s = dict(zip(PLAYER_COLUMNS, somas))
+        players.append({
+            'id_jogador': id_jogador,
+            'posicao': posicao,
+            'total_golos': round(s['golos'], 2),
+            'total_assistencias': round(s['assistencias'], 2),
+            'media_minutos': round(s['minutos_jogados'] / peso, 2),
+            'total_cartoes_amarelos': round(s['cartoes_amarelos'], 2),
+            'total_cartoes_vermelhos': round(s['cartoes_vermelhos'], 2),
+            'media_remates': round(s['remates'] / peso, 2),
+            'media_remates_baliza': round(s['remates_baliza'] / peso, 2),
+            'media_passes_completos': round(s['passes_completos'] / peso, 2),
+            'media_desarmes': round(s['desarmes'] / peso, 2),
+            'media_intercecoes': round(s['intercecoes'] / peso, 2),
+            'total_jogos': round(peso, 2)
+        })
+    return players
+
+
+if __name__ == "__main__":
+    import sys
+    from football_betting_analyzer import FootballDataCollector
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "football_data.db"
+    half_life = float(sys.argv[2]) if len(sys.argv) > 2 else 90.0
+
+    conn = FootballDataCollector(db_path)._connect()
+    rebuild_decayed_form(conn, half_life)
+    conn.close()
+    print(f"Forma com decaimento (meia-vida {half_life} dias) recalculada em {db_path}")
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Resolução de Nomes de Equipas e Jogadores
+Autor: Manus AI
+Data: 19/10/2026
+
+Os fornecedores de dados usam nomes diferentes para a mesma entidade
+("Benfica", "SL Benfica", "S.L. Benfica"). EntityIndex carrega uma vez as
+equipas, os jogadores e os aliases (tabelas alias_equipa e alias_jogador) e
+resolve nomes em memória:
+
+1. cache por nome original (ingestões repetem os mesmos nomes milhões de vezes)
+2. nome normalizado (sem acentos, pontuação nem siglas como FC/SL/CD) ou alias
+3. semelhança de trigramas (coeficiente de Dice) acima de FUZZY_THRESHOLD, se
+   houver um único melhor candidato com as mesmas designações de equipa
+   secundária (B, II, Sub-23, reservas, feminina...): "Benfica B" nunca
+   resolve para "Benfica"
+
+Ao criar entidades (get_or_create_team, resolve_rows com criar_equipa) só
+contam nomes exatos e aliases; um nome apenas semelhante a outro é recusado
+até ser registado como alias ou criado explicitamente.
+
+Também serve ao motor de previsão a consulta id -> nome sem ir à base de dados.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from itertools import chain
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+FUZZY_THRESHOLD = 0.7
+
+# Siglas e palavras que não distinguem equipas ("FC Porto" = "Porto")
+STOPWORDS = frozenset({
+    'fc', 'sc', 'sl', 'cf', 'cd', 'ac', 'afc', 'ud', 'sad', 'club', 'clube', 'futebol',
+    'de', 'do', 'da', 'dos', 'das', 'the'
+})
+
+# Designações de equipas secundárias, escalões e equipas femininas (token -> classe);
+# distinguem equipas com o mesmo nome base ("Benfica B" != "Benfica")
+SQUAD_TOKENS = {
+    'b': 'b', 'ii': 'b', 'c': 'c', 'iii': 'c',
+    'reservas': 'reservas', 'reserves': 'reservas', 'reserve': 'reservas', 'res': 'reservas',
+    'castilla': 'reservas', 'jong': 'reservas',
+    'juniores': 'juniores', 'juniors': 'juniores', 'junior': 'juniores', 'youth': 'juniores',
+    'primavera': 'juniores', 'academy': 'juniores', 'academia': 'juniores',
+    'feminino': 'feminino', 'femenino': 'feminino', 'femminile': 'feminino', 'women': 'feminino',
+    'womens': 'feminino', 'ladies': 'feminino', 'fem': 'feminino'
+}
+
+_AGE_GROUP = re.compile(r'^(?:u|sub)(\d{2})$')
+
+# Colunas com nomes aceites por resolve_rows: (coluna do nome, coluna do id, entidade)
+NAME_COLUMNS = {
+    'jogo': [('equipa_casa', 'id_equipa_casa', 'equipa'), ('equipa_fora', 'id_equipa_fora', 'equipa')],
+    'jogador': [('equipa', 'id_equipa', 'equipa')],
+    'desempenho_equipa_jogo': [('equipa', 'id_equipa', 'equipa')],
+    'desempenho_jogador_jogo': [('equipa', None, 'equipa'), ('jogador', 'id_jogador', 'jogador')],
+    'lesoes': [('equipa', None, 'equipa'), ('jogador', 'id_jogador', 'jogador')],
+    'remate': [('equipa', 'id_equipa', 'equipa'), ('jogador', 'id_jogador', 'jogador')]
+}
+
+_UNRESOLVED = {'equipa': 'Equipa desconhecida ou ambígua', 'jogador': 'Jogador desconhecido ou ambíguo'}
+
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(nome: str) -> str:
+    """Forma canónica de um nome: minúsculas, sem acentos, pontuação nem STOPWORDS."""
+    texto = unicodedata.normalize('NFKD', nome)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower().replace('.', '')
+    tokens = [t for t in _SEPARATORS.split(texto) if t]
+    significativos = [t for t in tokens if t not in STOPWORDS]
+    # Um nome só com siglas (ex.: "AC") fica como está
+    return ' '.join(significativos or tokens)
+
+
+def squad_signature(chave: str) -> FrozenSet[str]:
+    """Designações de equipa secundária de um nome normalizado (ex.: 'benfica u 23' -> {'u23'})."""
+    tokens = chave.split()
+    marcas = set()
+    for i, token in enumerate(tokens):
+        if token in ('u', 'sub') and i + 1 < len(tokens) and tokens[i + 1].isdigit():
+            marcas.add('u' + tokens[i + 1])
+            continue
+        escalao = _AGE_GROUP.match(token)
+        if escalao:
+            marcas.add('u' + escalao.group(1))
+        elif token in SQUAD_TOKENS:
+            marcas.add(SQUAD_TOKENS[token])
+    return frozenset(marcas)
+
+
+def _trigrams(chave: str) -> Set[str]:
+    padded = f'  {chave} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrigramIndex:
+    """Índice invertido de trigramas para a procura aproximada de nomes normalizados."""
+
+    def __init__(self):
+        self._keys: List[Tuple[int, int, FrozenSet[str]]] = []  # (id, número de trigramas, designações)
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, chave: str, entity_id: int):
+        grams = _trigrams(chave)
+        pos = len(self._keys)
+        self._keys.append((entity_id, len(grams), squad_signature(chave)))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(pos)
+
+    def best(self, chave: str, threshold: float) -> Optional[int]:
+        """Id com maior coeficiente de Dice (>= threshold); None se não houver ou se empatar.
+
+        Só são candidatos os nomes com as mesmas designações de equipa secundária.
+        """
+        grams = _trigrams(chave)
+        assinatura = squad_signature(chave)
+        # Contagem em C (Counter) dos trigramas comuns com cada nome indexado
+        counts = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+
+        best_score, best_ids = threshold, set()
+        for pos, comuns in counts.items():
+            entity_id, n, designacoes = self._keys[pos]
+            if designacoes != assinatura:
+                continue
+            score = 2 * comuns / (len(grams) + n)
+            if score > best_score:
+                best_score, best_ids = score, {entity_id}
+            elif score == best_score:
+                best_ids.add(entity_id)
+        return next(iter(best_ids)) if len(best_ids) == 1 else None
+
+
+class _NameTable:
+    """Nomes normalizados (e aliases) de um tipo de entidade, com cache e procura aproximada."""
+
+    def __init__(self):
+        self.exact: Dict[str, int] = {}
+        self.ambiguous: Set[str] = set()
+        self.fuzzy = _TrigramIndex()
+        self.cache: Dict[Tuple[str, Optional[float]], Optional[int]] = {}
+
+    def add(self, nome: str, entity_id: int, normalizado: bool = False, alias: bool = False):
+        chave = nome if normalizado else normalize_name(nome)
+        atual = self.exact.get(chave)
+        if atual == entity_id:
+            return
+        if alias or (atual is None and chave not in self.ambiguous):
+            # Um alias explícito prevalece sobre nomes repetidos
+            self.exact[chave] = entity_id
+            self.ambiguous.discard(chave)
+        elif atual is not None:
+            # Duas entidades com o mesmo nome: só um alias explícito as distingue
+            del self.exact[chave]
+            self.ambiguous.add(chave)
+        # Com a mesma chave para duas entidades, a procura aproximada empata e não resolve
+        self.fuzzy.add(chave, entity_id)
+        # Resultados em cache (incluindo "não encontrado") podem ter mudado
+        self.cache.clear()
+
+    def resolve(self, nome: str, threshold: Optional[float]) -> Optional[int]:
+        try:
+            return self.cache[(nome, threshold)]
+        except KeyError:
+            pass
+        chave = normalize_name(nome)
+        entity_id = self.exact.get(chave)
+        if entity_id is None and threshold is not None and chave not in self.ambiguous:
+            entity_id = self.fuzzy.best(chave, threshold)
+        self.cache[(nome, threshold)] = entity_id
+        return entity_id
+
+    def is_ambiguous(self, nome: str) -> bool:
+        return normalize_name(nome) in self.ambiguous
+
+
+class EntityIndex:
+    """Índice em memória de equipas e jogadores (nomes, aliases e procura aproximada)."""
+
+    def __init__(self, fuzzy_threshold: Optional[float] = FUZZY_THRESHOLD):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.team_names: Dict[int, str] = {}
+        self.team_competitions: Dict[int, Optional[int]] = {}
+        self.player_teams: Dict[int, Optional[int]] = {}
+        self.players_loaded = False
+        self._teams = _NameTable()
+        self._players = _NameTable()
+        # Jogadores por equipa, para desambiguar nomes comuns
+        self._team_players: Dict[int, _NameTable] = {}
+
+    @classmethod
+    def load(cls, conn, jogadores: bool = True, aliases: bool = True,
+             fuzzy_threshold: Optional[float] = FUZZY_THRESHOLD) -> 'EntityIndex':
+        """Carrega as equipas e (opcionalmente) os aliases e os jogadores numa só passagem."""
+        index = cls(fuzzy_threshold)
+        cursor = conn.cursor()
+        cursor.execute('SELECT id_equipa, nome_equipa, id_competicao FROM equipa')
+        for id_equipa, nome, id_competicao in cursor.fetchall():
+            index.add_team(id_equipa, nome, id_competicao)
+        if aliases:
+            cursor.execute('SELECT alias, id_equipa FROM alias_equipa')
+            for alias, id_equipa in cursor.fetchall():
+                index._teams.add(alias, id_equipa, normalizado=True, alias=True)
+
+        if jogadores:
+            index.players_loaded = True
+            cursor.execute('SELECT id_jogador, nome_jogador, id_equipa FROM jogador')
+            for id_jogador, nome, id_equipa in cursor.fetchall():
+                index.add_player(id_jogador, nome, id_equipa)
+            if aliases:
+                cursor.execute('SELECT alias, id_jogador FROM alias_jogador')
+                for alias, id_jogador in cursor.fetchall():
+                    index._add_player_alias(alias, id_jogador)
+
+        logger.info(f"Índice de entidades carregado: {len(index.team_names)} equipas, "
+                    f"{len(index.player_teams)} jogadores")
+        return index
+
+    def add_team(self, id_equipa: int, nome: str, id_competicao: Optional[int] = None):
+        self.team_names[id_equipa] = nome
+        self.team_competitions[id_equipa] = id_competicao
+        self._teams.add(nome, id_equipa)
+
+    def add_team_alias(self, alias: str, id_equipa: int):
+        self._teams.add(normalize_name(alias), id_equipa, normalizado=True, alias=True)
+
+    def add_player(self, id_jogador: int, nome: str, id_equipa: Optional[int] = None):
+        self.player_teams[id_jogador] = id_equipa
+        self._players.add(nome, id_jogador)
+        if id_equipa is not None:
+            self._team_players.setdefault(id_equipa, _NameTable()).add(nome, id_jogador)
+
+    def add_player_alias(self, alias: str, id_jogador: int):
+        self._add_player_alias(normalize_name(alias), id_jogador)
+
+    def _add_player_alias(self, chave: str, id_jogador: int):
+        self._players.add(chave, id_jogador, normalizado=True, alias=True)
+        id_equipa = self.player_teams.get(id_jogador)
+        if id_equipa is not None:
+            self._team_players.setdefault(id_equipa, _NameTable()).add(chave, id_jogador, normalizado=True, alias=True)
+
+    def team_name(self, id_equipa: int) -> Optional[str]:
+        return self.team_names.get(id_equipa)
+
+    def resolve_team(self, nome: str, fuzzy: bool = True) -> Optional[int]:
+        """Id da equipa com este nome ou alias (None se desconhecida ou ambígua)."""
+        return self._teams.resolve(nome, self.fuzzy_threshold if fuzzy else None)
+
+    def team_is_ambiguous(self, nome: str) -> bool:
+        """True se o nome normalizado pertence a várias equipas (só um alias as distingue)."""
+        return self._teams.is_ambiguous(nome)
+
+    def player_is_ambiguous(self, nome: str, id_equipa: int) -> bool:
+        """True se o nome normalizado pertence a vários jogadores do plantel da equipa."""
+        plantel = self._team_players.get(id_equipa)
+        return plantel is not None and plantel.is_ambiguous(nome)
+
+    def resolve_player(self, nome: str, id_equipa: Optional[int] = None, fuzzy: bool = True) -> Optional[int]:
+        """Id do jogador; com id_equipa, procura primeiro (e aproximadamente) no plantel da equipa.
+
+        Sem equipa, só nomes exatos e não ambíguos são resolvidos.
+        """
+        if id_equipa is not None:
+            plantel = self._team_players.get(id_equipa)
+            if plantel is not None:
+                id_jogador = plantel.resolve(nome, self.fuzzy_threshold if fuzzy else None)
+                if id_jogador is not None:
+                    return id_jogador
+        return self._players.resolve(nome, None)
+
+
+def resolve_rows(linhas: Iterable[Dict], tabela: str, index: EntityIndex,
+                 criar_equipa: Optional[Callable[[str], int]] = None) -> Iterator[Dict]:
+    """Substitui as colunas de nomes (NAME_COLUMNS) pelos ids, linha a linha.
+
+    Com criar_equipa, as equipas só são resolvidas por nome exato ou alias e
+    as restantes passam a criar_equipa (que decide sobre nomes semelhantes);
+    outros nomes por resolver levantam ValueError.
+    """
+    colunas = NAME_COLUMNS.get(tabela, [])
+    for linha in linhas:
+        linha = dict(linha)
+        id_equipa = linha.get('id_equipa')
+        for coluna_nome, coluna_id, entidade in colunas:
+            nome = linha.pop(coluna_nome, None)
+            if nome in (None, ''):
+                continue
+            if entidade == 'equipa':
+                entity_id = index.resolve_team(nome, fuzzy=criar_equipa is None)
+                if entity_id is None and criar_equipa is not None:
+                    entity_id = criar_equipa(nome)
+                id_equipa = entity_id
+            else:
+                entity_id = index.resolve_player(nome, id_equipa)
+            if entity_id is None:
+                raise ValueError(f"{_UNRESOLVED[entidade]} em '{tabela}': {nome}")
+            if coluna_id is not None:
+                linha[coluna_id] = entity_id
+        yield linha
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Armazém de Features em Disco (memory-mapped)
+Autor: Manus AI
+Data: 19/10/2026
+
+Este módulo constrói um ficheiro binário com as features agregadas de equipas e
+jogadores a partir das tabelas do FootballDataCollector. O ficheiro é aberto com
+`mmap`, pelo que vários processos de previsão partilham as mesmas páginas de
+memória sem copiar nem interpretar dados.
+
+Formato (little-endian, versão 2):
+- Cabeçalho fixo (ver HEADER_FORMAT)
+- int64[n_equipas]                   ids das equipas (ordenados)
+- float64[n_equipas * n_feat_equipa] features das equipas
+- int64[n_jogadores]                 ids das equipas dos jogadores (ordenados)
+- int64[n_jogadores]                 ids dos jogadores
+- float64[n_jogadores * n_feat_jog]  features dos jogadores
+
+Em máquinas big-endian, os blocos são convertidos na escrita e copiados (sem
+mmap partilhado) na leitura. O cabeçalho guarda a hora de construção: um
+armazém mais antigo do que a última escrita na base de dados está
+desatualizado (ver FeatureStore.is_stale).
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'FBFS'
+FORMAT_VERSION = 2
+HEADER_FORMAT = '<4sHHIIIIqI'
+HEADER_SIZE = 40  # cabeçalho alinhado a 8 bytes
+
+TEAM_FEATURES = [
+    'media_golos_marcados',
+    'media_golos_sofridos',
+    'media_remates_baliza',
+    'media_posse_bola',
+    'media_cantos',
+    'media_cartoes_amarelos',
+    'media_cartoes_vermelhos',
+    'percentagem_clean_sheets',
+    'total_jogos'
+]
+
+PLAYER_FEATURES = [
+    'total_golos',
+    'total_assistencias',
+    'media_minutos',
+    'total_cartoes_amarelos',
+    'total_cartoes_vermelhos',
+    'media_remates',
+    'media_remates_baliza',
+    'media_passes_completos',
+    'media_desarmes',
+    'media_intercecoes',
+    'total_jogos',
+    'grupo_posicao'
+]
+
+# Grupos de posição usados no cálculo do impacto dos jogadores
+POSITION_GROUPS = {
+    'Avançado': 0,
+    'Extremo': 0,
+    'Médio': 1,
+    'Médio Defensivo': 1,
+    'Médio Ofensivo': 1
+}
+DEFAULT_POSITION_GROUP = 2  # Defesas e Guarda-redes
+
+# Janelas dos últimos N jogos (as mesmas de get_team_performance/calculate_player_impact)
+TEAM_WINDOW = 10
+PLAYER_WINDOW = 20
+
+assert struct.calcsize(HEADER_FORMAT) <= HEADER_SIZE
+
+
+def position_group(posicao: Optional[str]) -> int:
+    """Devolve o grupo de posição (0 atacante, 1 médio, 2 defesa/guarda-redes)."""
+    return POSITION_GROUPS.get(posicao, DEFAULT_POSITION_GROUP)
+
+
+def _league_filter(column: str, liga: Optional[str]) -> str:
+    """Condição SQL que limita `column` às equipas de uma competição."""
+    if liga is None:
+        return ''
+    return f'''AND {column} IN (
+        SELECT e.id_equipa FROM equipa e
+        JOIN competicao c ON e.id_competicao = c.id_competicao
+        WHERE c.nome = ?
+    )'''
+
+
+def build_feature_store(db_path: str, output_path: str, liga: Optional[str] = None) -> Dict:
+    """Constrói o ficheiro de features a partir da base de dados SQLite.
+
+    As agregações são as mesmas de get_team_performance/get_player_performance
+    (últimos TEAM_WINDOW/PLAYER_WINDOW jogos), calculadas numa única consulta
+    com janelas por entidade. Com liga, o ficheiro só contém as equipas dessa
+    competição e os seus jogadores (com os jogos de todas as competições).
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    liga_params = (liga,) if liga is not None else ()
+
+    cursor.execute(f'''
+        SELECT
+            id_equipa,
+            AVG(golos_marcados),
+            AVG(golos_sofridos),
+            AVG(remates_baliza),
+            AVG(posse_bola),
+            AVG(cantos),
+            AVG(cartoes_amarelos),
+            AVG(cartoes_vermelhos),
+            SUM(clean_sheet) * 100.0 / COUNT(*),
+            COUNT(*)
+        FROM (
+            SELECT dej.*, ROW_NUMBER() OVER (
+                PARTITION BY dej.id_equipa ORDER BY j.data_jogo DESC, j.id_jogo DESC
+            ) AS ordem
+            FROM desempenho_equipa_jogo dej
+            JOIN jogo j ON dej.id_jogo = j.id_jogo
+            WHERE j.status = 'finalizado' {_league_filter('dej.id_equipa', liga)}
+        ) recentes
+        WHERE ordem <= ?
+        GROUP BY id_equipa
+        ORDER BY id_equipa
+    ''', liga_params + (TEAM_WINDOW,))
+    team_rows = cursor.fetchall()
+
+    cursor.execute(f'''
+        SELECT
+            jg.id_equipa,
+            jg.id_jogador,
+            jg.posicao,
+            SUM(golos),
+            SUM(assistencias),
+            AVG(minutos_jogados),
+            SUM(cartoes_amarelos),
+            SUM(cartoes_vermelhos),
+            AVG(remates),
+            AVG(remates_baliza),
+            AVG(passes_completos),
+            AVG(desarmes),
+            AVG(intercecoes),
+            COUNT(*)
+        FROM (
+            SELECT dpj.*, ROW_NUMBER() OVER (
+                PARTITION BY dpj.id_jogador ORDER BY j.data_jogo DESC, j.id_jogo DESC
+            ) AS ordem
+            FROM desempenho_jogador_jogo dpj
+            JOIN jogo j ON dpj.id_jogo = j.id_jogo
+            WHERE j.status = 'finalizado'
+        ) recentes
+        JOIN jogador jg ON recentes.id_jogador = jg.id_jogador
+        WHERE ordem <= ? AND jg.id_equipa IS NOT NULL {_league_filter('jg.id_equipa', liga)}
+        GROUP BY jg.id_jogador
+        ORDER BY jg.id_equipa, jg.id_jogador
+    ''', (PLAYER_WINDOW,) + liga_params)
+    player_rows = cursor.fetchall()
+    conn.close()
+
+    team_ids = array('q', (row[0] for row in team_rows))
+    team_values = array('d')
+    for row in team_rows:
+        team_values.extend(value or 0.0 for value in row[1:])
+
+    player_teams = array('q', (row[0] for row in player_rows))
+    player_ids = array('q', (row[1] for row in player_rows))
+    player_values = array('d')
+    for row in player_rows:
+        player_values.extend(value or 0.0 for value in row[3:])
+        player_values.append(float(position_group(row[2])))
+
+    header = struct.pack(
+        HEADER_FORMAT, MAGIC, FORMAT_VERSION, 0,
+        len(team_ids), len(TEAM_FEATURES),
+        len(player_ids), len(PLAYER_FEATURES),
+        int(time.time()), 0
+    ).ljust(HEADER_SIZE, b'\0')
+
+    # Escrever para ficheiro temporário e substituir atomicamente, para que
+    # processos com o ficheiro antigo aberto não vejam dados parciais
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for block in (team_ids, team_values, player_teams, player_ids, player_values):
+            if sys.byteorder == 'big':
+                # array.tofile escreve na ordem nativa; o formato é little-endian
+                block = array(block.typecode, block)
+                block.byteswap()
+            block.tofile(f)
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"Armazém de features criado em {output_path} "
+                f"({len(team_ids)} equipas, {len(player_ids)} jogadores)")
+    return {'equipas': len(team_ids), 'jogadores': len(player_ids)}
+
+
+class FeatureStore:
+    """Acesso só de leitura a um ficheiro de features mapeado em memória."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _flags, n_teams, n_team_feats,
+         n_players, n_player_feats, built_at, _reserved) = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Ficheiro '{path}' não é um armazém de features válido")
+        if version != FORMAT_VERSION or n_team_feats != len(TEAM_FEATURES) or n_player_feats != len(PLAYER_FEATURES):
+            self.close()
+            raise ValueError(f"Versão {version} do armazém de features não suportada")
+
+        self.built_at = built_at
+        self.n_teams = n_teams
+        self.n_players = n_players
+
+        # Vistas sem cópia sobre as páginas partilhadas do mmap
+        view = memoryview(self._mmap)
+        offset = HEADER_SIZE
+        sizes = [
+            ('team_ids', 'q', n_teams),
+            ('team_values', 'd', n_teams * n_team_feats),
+            ('player_teams', 'q', n_players),
+            ('player_ids', 'q', n_players),
+            ('player_values', 'd', n_players * n_player_feats)
+        ]
+        self._views = []
+        for name, fmt, count in sizes:
+            block = view[offset:offset + count * 8].cast(fmt)
+            if sys.byteorder == 'big':
+                # Cópia convertida para a ordem nativa (sem partilha de páginas)
+                copia = array(fmt, block)
+                copia.byteswap()
+                block.release()
+                block = copia
+            else:
+                self._views.append(block)
+            setattr(self, f"_{name}", block)
+            offset += count * 8
+        self._views.append(view)
+
+    def is_stale(self, db_path: str) -> bool:
+        """True se a base SQLite (ou o seu WAL) foi alterada depois da construção do armazém."""
+        alteracoes = [os.path.getmtime(caminho) for caminho in (db_path, f"{db_path}-wal")
+                      if os.path.exists(caminho)]
+        return bool(alteracoes) and int(max(alteracoes)) > self.built_at
+
+    def close(self):
+        """Liberta as vistas e fecha o mapeamento."""
+        for block in getattr(self, '_views', []):
+            block.release()
+        self._views = []
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _team_row(self, id_equipa: int) -> int:
+        pos = bisect_left(self._team_ids, id_equipa)
+        if pos < self.n_teams and self._team_ids[pos] == id_equipa:
+            return pos
+        return -1
+
+    def team_performance(self, id_equipa: int) -> Dict:
+        """Devolve as features da equipa no mesmo formato de get_team_performance."""
+        row = self._team_row(id_equipa)
+        if row < 0:
+            return {}
+
+        n = len(TEAM_FEATURES)
+        values = self._team_values[row * n:(row + 1) * n]
+        performance = {name: round(value, 2) for name, value in zip(TEAM_FEATURES, values)}
+        performance['diferenca_golos'] = round(values[0] - values[1], 2)
+        performance['total_jogos'] = int(values[-1])
+        return performance
+
+    def team_players(self, id_equipa: int) -> List[Dict]:
+        """Devolve as features de todos os jogadores com jogos de uma equipa."""
+        start = bisect_left(self._player_teams, id_equipa)
+        end = bisect_right(self._player_teams, id_equipa)
+
+        n = len(PLAYER_FEATURES)
+        players = []
+        for row in range(start, end):
+            values = self._player_values[row * n:(row + 1) * n]
+            performance = {name: round(value, 2) for name, value in zip(PLAYER_FEATURES, values)}
+            for key in ('total_golos', 'total_assistencias', 'total_cartoes_amarelos',
+                        'total_cartoes_vermelhos', 'total_jogos', 'grupo_posicao'):
+                performance[key] = int(values[PLAYER_FEATURES.index(key)])
+            performance['id_jogador'] = self._player_ids[row]
+            players.append(performance)
+        return players
+
+    def as_numpy(self) -> Dict:
+        """Devolve os blocos como arrays NumPy sem cópia (requer numpy)."""
+        import numpy as np
+
+        return {
+            'team_ids': np.frombuffer(self._team_ids, dtype='=i8'),
+            'team_values': np.frombuffer(self._team_values, dtype='=f8').reshape(self.n_teams, len(TEAM_FEATURES)),
+            'player_teams': np.frombuffer(self._player_teams, dtype='=i8'),
+            'player_ids': np.frombuffer(self._player_ids, dtype='=i8'),
+            'player_values': np.frombuffer(self._player_values, dtype='=f8').reshape(self.n_players, len(PLAYER_FEATURES))
+        }
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "football_data.db"
+    output_path = sys.argv[2] if len(sys.argv) > 2 else "football_features.fbfs"
+    liga = sys.argv[3] if len(sys.argv) > 3 else None
+
+    stats = build_feature_store(db_path, output_path, liga)
+    print(f"Armazém de features criado em: {output_path}")
+    print(f"Equipas: {stats['equipas']} | Jogadores: {stats['jogadores']}")
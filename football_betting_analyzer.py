@@ -8,27 +8,73 @@ Este sistema recolhe e processa dados de futebol para fornecer previsões diári
 baseadas em escalações, desempenho de jogadores, lesões e histórico entre equipas.
 """
 
-import sqlite3
 import requests
 import json
 import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
+from instrumentation import Metrics
+from storage import StorageBackend, SQLiteBackend
+from decayed_form import DECAYED_TRIGGERS, TEAM_COLUMNS, PLAYER_COLUMNS, update_decayed_forms
+from entity_resolution import EntityIndex, normalize_name, resolve_rows
+from ingest_validation import quarantine, validate_batch
+from xg_pipeline import refresh_team_xg
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# As épocas começam em julho (ex.: 2024-08-10 pertence à época 2024/25)
+SEASON_START_MONTH = 7
+
+# Índices das consultas por equipa, jogador e competição
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_jogo_competicao_data ON jogo (id_competicao, data_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_jogo_epoca ON jogo (id_epoca)',
+    'CREATE INDEX IF NOT EXISTS idx_jogo_data ON jogo (data_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_jogo_casa ON jogo (id_equipa_casa, data_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_jogo_fora ON jogo (id_equipa_fora, data_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_equipa_competicao ON equipa (id_competicao)',
+    'CREATE INDEX IF NOT EXISTS idx_jogador_equipa ON jogador (id_equipa)',
+    'CREATE INDEX IF NOT EXISTS idx_dej_equipa ON desempenho_equipa_jogo (id_equipa, id_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_dpj_jogador ON desempenho_jogador_jogo (id_jogador, id_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_lesoes_jogador ON lesoes (id_jogador)',
+    'CREATE INDEX IF NOT EXISTS idx_confrontos_equipas ON confrontos_diretos (id_equipa1, id_equipa2)',
+    'CREATE INDEX IF NOT EXISTS idx_remate_jogo ON remate (id_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_xg_jogo_equipa ON xg_jogo (id_equipa)'
+]
+
+
+def season_for_date(data_jogo: str) -> Tuple[str, str, str]:
+    """Devolve (nome, data_inicio, data_fim) da época de uma data AAAA-MM-DD."""
+    ano, mes = int(data_jogo[:4]), int(data_jogo[5:7])
+    if mes < SEASON_START_MONTH:
+        ano -= 1
+    return (f"{ano}/{(ano + 1) % 100:02d}",
+            f"{ano}-{SEASON_START_MONTH:02d}-01",
+            f"{ano + 1}-{SEASON_START_MONTH - 1:02d}-30")
+
 class FootballDataCollector:
     """Classe responsável pela recolha de dados de futebol."""
     
-    def __init__(self, db_path: str = "football_data.db"):
+    def __init__(self, db_path: str = "football_data.db", metrics: Optional[Metrics] = None,
+                 storage: Optional[StorageBackend] = None):
         self.db_path = db_path
-        self.init_database()
+        self.metrics = metrics or Metrics()
+        self.storage = storage or SQLiteBackend(db_path, self.metrics)
+        # Índice de nomes em memória (carregado no primeiro uso, ver entity_index)
+        self._entities: Optional[EntityIndex] = None
+        # Cópias de leitura não são alteradas; o esquema vem da base viva
+        if not self.storage.read_only:
+            self.init_database()
+    
+    def _connect(self):
+        """Abre uma ligação à base de dados através do backend de armazenamento."""
+        return self.storage.connect()
     
     def init_database(self):
         """Inicializa a base de dados com as tabelas necessárias."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Tabela Equipa
@@ -38,6 +84,9 @@ class FootballDataCollector:
                 nome_equipa TEXT NOT NULL,
                 pais TEXT,
                 liga TEXT,
+                id_competicao INTEGER,
+                latitude REAL,
+                longitude REAL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
@@ -65,6 +114,8 @@ class FootballDataCollector:
                 golos_casa INTEGER,
                 golos_fora INTEGER,
                 status TEXT DEFAULT 'agendado',
+                id_competicao INTEGER,
+                id_epoca INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (id_equipa_casa) REFERENCES equipa (id_equipa),
                 FOREIGN KEY (id_equipa_fora) REFERENCES equipa (id_equipa)
@@ -153,65 +204,593 @@ class FootballDataCollector:
             )
         ''')
         
+        # Remates (um por linha, com o xG do remate)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS remate (
+                id_remate INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_jogo INTEGER NOT NULL,
+                id_equipa INTEGER NOT NULL,
+                id_jogador INTEGER,
+                minuto INTEGER,
+                x REAL,
+                y REAL,
+                parte_corpo TEXT DEFAULT 'pe',
+                situacao TEXT DEFAULT 'jogo_corrido',
+                resultado TEXT,
+                xg REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (id_jogo) REFERENCES jogo (id_jogo),
+                FOREIGN KEY (id_equipa) REFERENCES equipa (id_equipa),
+                FOREIGN KEY (id_jogador) REFERENCES jogador (id_jogador)
+            )
+        ''')
+        
+        # xG agregado por jogo e equipa, e média móvel por equipa (ver xg_pipeline.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS xg_jogo (
+                id_jogo INTEGER NOT NULL,
+                id_equipa INTEGER NOT NULL,
+                xg REAL DEFAULT 0.0,
+                xga REAL DEFAULT 0.0,
+                remates INTEGER DEFAULT 0,
+                remates_contra INTEGER DEFAULT 0,
+                PRIMARY KEY (id_jogo, id_equipa),
+                FOREIGN KEY (id_jogo) REFERENCES jogo (id_jogo),
+                FOREIGN KEY (id_equipa) REFERENCES equipa (id_equipa)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS xg_equipa (
+                id_equipa INTEGER PRIMARY KEY,
+                jogos INTEGER DEFAULT 0,
+                media_xg REAL DEFAULT 0.0,
+                media_xga REAL DEFAULT 0.0,
+                atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (id_equipa) REFERENCES equipa (id_equipa)
+            )
+        ''')
+        
+        # Forma com decaimento temporal: somas por entidade e meia-vida (ver decayed_form.py)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS forma_equipa_decaida (
+                id_equipa INTEGER NOT NULL,
+                meia_vida REAL NOT NULL,
+                data_referencia DATE NOT NULL,
+                peso REAL DEFAULT 0.0,
+                {', '.join(f'soma_{c} REAL DEFAULT 0.0' for c in TEAM_COLUMNS)},
+                PRIMARY KEY (id_equipa, meia_vida)
+            )
+        ''')
+        
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS forma_jogador_decaida (
+                id_jogador INTEGER NOT NULL,
+                meia_vida REAL NOT NULL,
+                data_referencia DATE NOT NULL,
+                peso REAL DEFAULT 0.0,
+                {', '.join(f'soma_{c} REAL DEFAULT 0.0' for c in PLAYER_COLUMNS)},
+                PRIMARY KEY (id_jogador, meia_vida)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estado_forma_decaida (
+                meia_vida REAL PRIMARY KEY,
+                ultimo_id_equipa INTEGER NOT NULL DEFAULT 0,
+                ultimo_id_jogador INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # Desempenhos já vistos cujo jogo ainda não está finalizado
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS forma_decaida_pendente (
+                meia_vida REAL NOT NULL,
+                tabela TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                PRIMARY KEY (meia_vida, tabela, id)
+            )
+        ''')
+        
+        # Competições e épocas
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS competicao (
+                id_competicao INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL UNIQUE,
+                pais TEXT,
+                tipo TEXT DEFAULT 'liga',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS epoca (
+                id_epoca INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_competicao INTEGER NOT NULL,
+                nome TEXT NOT NULL,
+                data_inicio DATE,
+                data_fim DATE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (id_competicao, nome),
+                FOREIGN KEY (id_competicao) REFERENCES competicao (id_competicao)
+            )
+        ''')
+        
+        # Ponderações do modelo por competição (JSON com as chaves de engine.weights)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS parametros_liga (
+                id_competicao INTEGER PRIMARY KEY,
+                pesos TEXT NOT NULL,
+                atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (id_competicao) REFERENCES competicao (id_competicao)
+            )
+        ''')
+        
+        # Nomes alternativos (normalizados com normalize_name) usados pelos fornecedores
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alias_equipa (
+                alias TEXT PRIMARY KEY,
+                id_equipa INTEGER NOT NULL,
+                fonte TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (id_equipa) REFERENCES equipa (id_equipa)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alias_jogador (
+                alias TEXT NOT NULL,
+                id_jogador INTEGER NOT NULL,
+                fonte TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (alias, id_jogador),
+                FOREIGN KEY (id_jogador) REFERENCES jogador (id_jogador)
+            )
+        ''')
+        
+        # Odds 1X2 oferecidas por cada casa de apostas ('' quando a fonte não a indica)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS odds (
+                id_jogo INTEGER NOT NULL,
+                casa_apostas TEXT NOT NULL DEFAULT '',
+                odd_casa REAL,
+                odd_empate REAL,
+                odd_fora REAL,
+                recolhido_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id_jogo, casa_apostas),
+                FOREIGN KEY (id_jogo) REFERENCES jogo (id_jogo)
+            )
+        ''')
+        
+        # Linhas rejeitadas pela validação da ingestão (ver ingest_validation.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS quarentena (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabela TEXT NOT NULL,
+                dados TEXT NOT NULL,
+                motivos TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        self._migrate_competitions(conn)
+        self._migrate_locations(conn)
+        for index in INDEXES:
+            cursor.execute(index)
+        self.sync_competitions(conn)
+        
         conn.commit()
         conn.close()
         logger.info("Base de dados inicializada com sucesso.")
     
-    def add_team(self, nome_equipa: str, pais: str = None, liga: str = None) -> int:
-        """Adiciona uma nova equipa à base de dados."""
-        conn = sqlite3.connect(self.db_path)
+    def _migrate_competitions(self, conn):
+        """Acrescenta as colunas de competição/época a bases criadas antes delas."""
+        cursor = conn.cursor()
+        for tabela, colunas in (('equipa', ['id_competicao']), ('jogo', ['id_competicao', 'id_epoca'])):
+            existentes = self.storage.table_columns(conn, tabela)
+            for coluna in colunas:
+                if coluna not in existentes:
+                    cursor.execute(f'ALTER TABLE {tabela} ADD COLUMN {coluna} INTEGER')
+                    logger.info(f"Coluna {tabela}.{coluna} adicionada")
+    
+    def _migrate_locations(self, conn):
+        """Acrescenta as coordenadas (opcionais) do estádio a bases criadas antes delas."""
+        existentes = self.storage.table_columns(conn, 'equipa')
+        for coluna in ('latitude', 'longitude'):
+            if coluna not in existentes:
+                conn.cursor().execute(f'ALTER TABLE equipa ADD COLUMN {coluna} REAL')
+                logger.info(f"Coluna equipa.{coluna} adicionada")
+    
+    def sync_competitions(self, conn=None) -> int:
+        """Preenche competição e época nas equipas e jogos que ainda não as têm.
+        
+        As competições são criadas a partir de equipa.liga e cada jogo herda a
+        competição da equipa da casa. Devolve o número de jogos atualizados.
+        """
+        own_conn = conn is None
+        conn = conn or self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
-            INSERT INTO equipa (nome_equipa, pais, liga)
-            VALUES (?, ?, ?)
-        ''', (nome_equipa, pais, liga))
+            INSERT INTO competicao (nome, pais)
+            SELECT liga, MIN(pais) FROM equipa
+            WHERE liga IS NOT NULL AND liga NOT IN (SELECT nome FROM competicao)
+            GROUP BY liga
+        ''')
+        cursor.execute('''
+            UPDATE equipa SET id_competicao = (
+                SELECT id_competicao FROM competicao c WHERE c.nome = equipa.liga
+            )
+            WHERE id_competicao IS NULL AND liga IS NOT NULL
+        ''')
+        cursor.execute('''
+            UPDATE jogo SET id_competicao = (
+                SELECT id_competicao FROM equipa e WHERE e.id_equipa = jogo.id_equipa_casa
+            )
+            WHERE id_competicao IS NULL
+        ''')
         
-        team_id = cursor.lastrowid
+        cursor.execute('''
+            SELECT id_jogo, id_competicao, data_jogo FROM jogo
+            WHERE id_epoca IS NULL AND id_competicao IS NOT NULL
+        ''')
+        pendentes = cursor.fetchall()
+        epocas = {}
+        updates = []
+        for id_jogo, id_competicao, data_jogo in pendentes:
+            nome, inicio, fim = season_for_date(data_jogo)
+            key = (id_competicao, nome)
+            if key not in epocas:
+                epocas[key] = self._season_id(cursor, id_competicao, nome, inicio, fim)
+            updates.append((epocas[key], id_jogo))
+        if updates:
+            cursor.executemany('UPDATE jogo SET id_epoca = ? WHERE id_jogo = ?', updates)
+            logger.info(f"Competição/época atribuída a {len(updates)} jogos")
+        
+        if own_conn:
+            conn.commit()
+            conn.close()
+        return len(updates)
+    
+    def _competition_id(self, cursor, nome: str, pais: str = None, tipo: str = 'liga') -> int:
+        cursor.execute('SELECT id_competicao FROM competicao WHERE nome = ?', (nome,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute('INSERT INTO competicao (nome, pais, tipo) VALUES (?, ?, ?)', (nome, pais, tipo))
+        return cursor.lastrowid
+    
+    def _season_id(self, cursor, id_competicao: int, nome: str,
+                   data_inicio: str = None, data_fim: str = None) -> int:
+        cursor.execute('SELECT id_epoca FROM epoca WHERE id_competicao = ? AND nome = ?', (id_competicao, nome))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute('''
+            INSERT INTO epoca (id_competicao, nome, data_inicio, data_fim) VALUES (?, ?, ?, ?)
+        ''', (id_competicao, nome, data_inicio, data_fim))
+        return cursor.lastrowid
+    
+    def add_competition(self, nome: str, pais: str = None, tipo: str = 'liga') -> int:
+        """Adiciona uma competição (ou devolve a existente com o mesmo nome)."""
+        conn = self._connect()
+        id_competicao = self._competition_id(conn.cursor(), nome, pais, tipo)
+        conn.commit()
+        conn.close()
+        return id_competicao
+    
+    def add_season(self, id_competicao: int, nome: str, data_inicio: str = None, data_fim: str = None) -> int:
+        """Adiciona uma época a uma competição (ou devolve a existente)."""
+        conn = self._connect()
+        id_epoca = self._season_id(conn.cursor(), id_competicao, nome, data_inicio, data_fim)
+        conn.commit()
+        conn.close()
+        return id_epoca
+    
+    def add_team(self, nome_equipa: str, pais: str = None, liga: str = None) -> int:
+        """Adiciona uma nova equipa à base de dados."""
+        conn = self._connect()
+        team_id, id_competicao = self._insert_team(conn.cursor(), nome_equipa, pais, liga)
         conn.commit()
         conn.close()
         
+        self._team_added(team_id, nome_equipa, id_competicao)
         logger.info(f"Equipa '{nome_equipa}' adicionada com ID {team_id}")
         return team_id
     
+    def _insert_team(self, cursor, nome_equipa: str, pais: str = None, liga: str = None) -> Tuple[int, Optional[int]]:
+        """Insere a equipa na transação do cursor; devolve (id_equipa, id_competicao)."""
+        id_competicao = self._competition_id(cursor, liga, pais) if liga else None
+        cursor.execute('''
+            INSERT INTO equipa (nome_equipa, pais, liga, id_competicao)
+            VALUES (?, ?, ?, ?)
+        ''', (nome_equipa, pais, liga, id_competicao))
+        return cursor.lastrowid, id_competicao
+    
+    def _team_added(self, team_id: int, nome_equipa: str, id_competicao: Optional[int]):
+        """Atualiza o índice de entidades (se carregado) depois de gravada uma equipa."""
+        if self._entities is not None:
+            self._entities.add_team(team_id, nome_equipa, id_competicao)
+    
+    def set_team_location(self, id_equipa: int, latitude: float, longitude: float):
+        """Guarda as coordenadas do estádio da equipa (usadas nas distâncias de viagem)."""
+        conn = self._connect()
+        conn.cursor().execute('UPDATE equipa SET latitude = ?, longitude = ? WHERE id_equipa = ?',
+                              (latitude, longitude, id_equipa))
+        conn.commit()
+        conn.close()
+    
+    def add_odds(self, id_jogo: int, odd_casa: float, odd_empate: float, odd_fora: float,
+                 casa_apostas: str = ''):
+        """Guarda (ou atualiza) as odds 1X2 de um jogo numa casa de apostas."""
+        conn = self._connect()
+        conn.cursor().execute('''
+            INSERT INTO odds (id_jogo, casa_apostas, odd_casa, odd_empate, odd_fora) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id_jogo, casa_apostas) DO UPDATE SET
+                odd_casa = excluded.odd_casa, odd_empate = excluded.odd_empate, odd_fora = excluded.odd_fora,
+                recolhido_em = CURRENT_TIMESTAMP
+        ''', (id_jogo, casa_apostas, odd_casa, odd_empate, odd_fora))
+        conn.commit()
+        conn.close()
+    
+    def get_odds(self, ids_jogos: Iterable[int], casa_apostas: Optional[str] = None) -> Dict[int, Dict[str, float]]:
+        """Odds 1X2 dos jogos: as de uma casa de apostas ou, sem ela, a melhor de cada resultado."""
+        ids_jogos = list(ids_jogos)
+        conn = self._connect()
+        cursor = conn.cursor()
+        odds = {}
+        try:
+            for i in range(0, len(ids_jogos), 500):
+                chunk = ids_jogos[i:i + 500]
+                query = f'''
+                    SELECT id_jogo, MAX(odd_casa), MAX(odd_empate), MAX(odd_fora) FROM odds
+                    WHERE id_jogo IN ({', '.join('?' for _ in chunk)})
+                '''
+                params = list(chunk)
+                if casa_apostas is not None:
+                    query += ' AND casa_apostas = ?'
+                    params.append(casa_apostas)
+                cursor.execute(query + ' GROUP BY id_jogo', params)
+                for id_jogo, casa, empate, fora in cursor.fetchall():
+                    odds[id_jogo] = {'casa': casa, 'empate': empate, 'fora': fora}
+        finally:
+            conn.close()
+        return odds
+    
     def add_player(self, nome_jogador: str, posicao: str, id_equipa: int, idade: int = None) -> int:
         """Adiciona um novo jogador à base de dados."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._connect()
+        player_id = self._insert_player(conn.cursor(), nome_jogador, posicao, id_equipa, idade)
+        conn.commit()
+        conn.close()
         
+        self._player_added(player_id, nome_jogador, id_equipa)
+        logger.info(f"Jogador '{nome_jogador}' adicionado com ID {player_id}")
+        return player_id
+    
+    def _insert_player(self, cursor, nome_jogador: str, posicao: str, id_equipa: int, idade: int = None) -> int:
         cursor.execute('''
             INSERT INTO jogador (nome_jogador, posicao, id_equipa, idade)
             VALUES (?, ?, ?, ?)
         ''', (nome_jogador, posicao, id_equipa, idade))
-        
-        player_id = cursor.lastrowid
+        return cursor.lastrowid
+    
+    def _player_added(self, player_id: int, nome_jogador: str, id_equipa: int):
+        if self._entities is not None and self._entities.players_loaded:
+            self._entities.add_player(player_id, nome_jogador, id_equipa)
+    
+    def entity_index(self, refresh: bool = False) -> EntityIndex:
+        """Índice de nomes de equipas e jogadores, carregado uma vez por coletor."""
+        if self._entities is None or refresh:
+            conn = self._connect()
+            try:
+                self._entities = EntityIndex.load(conn)
+            finally:
+                conn.close()
+        return self._entities
+    
+    def add_alias(self, alias: str, id_equipa: int = None, id_jogador: int = None, fonte: str = None):
+        """Regista um nome alternativo de uma equipa ou de um jogador."""
+        if (id_equipa is None) == (id_jogador is None):
+            raise ValueError("Indique id_equipa ou id_jogador")
+        chave = normalize_name(alias)
+        conn = self._connect()
+        if id_equipa is not None:
+            conn.cursor().execute('''
+                INSERT INTO alias_equipa (alias, id_equipa, fonte) VALUES (?, ?, ?)
+                ON CONFLICT (alias) DO UPDATE SET id_equipa = excluded.id_equipa, fonte = excluded.fonte
+            ''', (chave, id_equipa, fonte))
+        else:
+            conn.cursor().execute('''
+                INSERT INTO alias_jogador (alias, id_jogador, fonte) VALUES (?, ?, ?)
+                ON CONFLICT (alias, id_jogador) DO UPDATE SET fonte = excluded.fonte
+            ''', (chave, id_jogador, fonte))
         conn.commit()
         conn.close()
         
-        logger.info(f"Jogador '{nome_jogador}' adicionado com ID {player_id}")
-        return player_id
+        if self._entities is not None:
+            if id_equipa is not None:
+                self._entities.add_team_alias(alias, id_equipa)
+            else:
+                self._entities.add_player_alias(alias, id_jogador)
+    
+    def get_or_create_team(self, nome_equipa: str, pais: str = None, liga: str = None) -> int:
+        """Devolve o id da equipa com este nome (ou alias) ou cria-a.
+        
+        Um nome apenas semelhante a uma equipa existente (ou partilhado por
+        várias) levanta ValueError em vez de criar um duplicado ou reutilizar
+        outra equipa: registe-o com add_alias ou crie a equipa com add_team.
+        """
+        index = self.entity_index()
+        id_equipa = index.resolve_team(nome_equipa, fuzzy=False)
+        if id_equipa is not None:
+            return id_equipa
+        if index.team_is_ambiguous(nome_equipa):
+            raise ValueError(f"Equipa ambígua: '{nome_equipa}' corresponde a várias equipas; registe um alias")
+        semelhante = index.resolve_team(nome_equipa)
+        if semelhante is not None:
+            raise ValueError(f"Equipa desconhecida: '{nome_equipa}' é semelhante a "
+                             f"'{index.team_name(semelhante)}' (id {semelhante}); registe um alias ou use add_team")
+        return self.add_team(nome_equipa, pais, liga)
+    
+    def get_or_create_player(self, nome_jogador: str, id_equipa: int, posicao: str = None,
+                             idade: int = None) -> int:
+        """Devolve o id do jogador com este nome (ou alias) no plantel da equipa ou cria-o.
+        
+        Como em get_or_create_team, nomes apenas semelhantes ou ambíguos levantam ValueError.
+        """
+        index = self.entity_index()
+        id_jogador = index.resolve_player(nome_jogador, id_equipa, fuzzy=False)
+        if id_jogador is not None:
+            return id_jogador
+        if index.player_is_ambiguous(nome_jogador, id_equipa):
+            raise ValueError(f"Jogador ambíguo: '{nome_jogador}' corresponde a vários jogadores da equipa "
+                             f"{id_equipa}; registe um alias")
+        semelhante = index.resolve_player(nome_jogador, id_equipa)
+        if semelhante is not None:
+            raise ValueError(f"Jogador desconhecido: '{nome_jogador}' é semelhante ao jogador {semelhante}; "
+                             f"registe um alias ou use add_player")
+        return self.add_player(nome_jogador, posicao, id_equipa, idade)
+    
+    def resolve_names(self, tabela: str, linhas: Iterable[Dict], criar_equipas: bool = False) -> Iterable[Dict]:
+        """Converte colunas com nomes (ex.: equipa_casa, jogador) nos ids, para bulk_insert.
+        
+        Com criar_equipas, as equipas desconhecidas são criadas (sem competição)
+        e só nomes exatos ou aliases contam como existentes (ver get_or_create_team).
+        """
+        return resolve_rows(linhas, tabela, self.entity_index(),
+                            self.get_or_create_team if criar_equipas else None)
     
     def add_match(self, data_jogo: str, id_equipa_casa: int, id_equipa_fora: int, 
-                  golos_casa: int = None, golos_fora: int = None, status: str = 'agendado') -> int:
-        """Adiciona um novo jogo à base de dados."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO jogo (data_jogo, id_equipa_casa, id_equipa_fora, golos_casa, golos_fora, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (data_jogo, id_equipa_casa, id_equipa_fora, golos_casa, golos_fora, status))
-        
-        match_id = cursor.lastrowid
+                  golos_casa: int = None, golos_fora: int = None, status: str = 'agendado',
+                  id_competicao: int = None) -> int:
+        """Adiciona um novo jogo à base de dados.
+        
+        Sem id_competicao, o jogo pertence à competição da equipa da casa; a
+        época é deduzida da data.
+        """
+        conn = self._connect()
+        match_id = self._insert_match(conn.cursor(), data_jogo, id_equipa_casa, id_equipa_fora,
+                                      golos_casa, golos_fora, status, id_competicao)
         conn.commit()
         conn.close()
         
         logger.info(f"Jogo adicionado com ID {match_id}")
         return match_id
     
+    def _insert_match(self, cursor, data_jogo: str, id_equipa_casa: int, id_equipa_fora: int,
+                      golos_casa: int = None, golos_fora: int = None, status: str = 'agendado',
+                      id_competicao: int = None) -> int:
+        if id_competicao is None:
+            cursor.execute('SELECT id_competicao FROM equipa WHERE id_equipa = ?', (id_equipa_casa,))
+            row = cursor.fetchone()
+            id_competicao = row[0] if row else None
+        id_epoca = None
+        if id_competicao is not None:
+            id_epoca = self._season_id(cursor, id_competicao, *season_for_date(data_jogo))
+        
+        cursor.execute('''
+            INSERT INTO jogo (data_jogo, id_equipa_casa, id_equipa_fora, golos_casa, golos_fora, status,
+                              id_competicao, id_epoca)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (data_jogo, id_equipa_casa, id_equipa_fora, golos_casa, golos_fora, status,
+              id_competicao, id_epoca))
+        return cursor.lastrowid
+    
+    def set_match_result(self, id_jogo: int, golos_casa: int = None, golos_fora: int = None,
+                         status: str = 'finalizado'):
+        """Regista o resultado (ou outra mudança de estado) de um jogo.
+        
+        O xG médio (xg_equipa) e a forma com decaimento só contam jogos
+        finalizados; são atualizados para as duas equipas na mesma transação.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE jogo SET golos_casa = ?, golos_fora = ?, status = ? WHERE id_jogo = ?
+            ''', (golos_casa, golos_fora, status, id_jogo))
+            if cursor.rowcount == 0:
+                raise ValueError(f"Jogo {id_jogo} não existe")
+            cursor.execute('SELECT id_equipa_casa, id_equipa_fora FROM jogo WHERE id_jogo = ?', (id_jogo,))
+            refresh_team_xg(conn, cursor.fetchone())
+            update_decayed_forms(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        
+        logger.info(f"Jogo {id_jogo}: {status}")
+    
+    def bulk_insert(self, tabela: str, linhas: Iterable[Dict], batch_size: int = 5000,
+                    validar: bool = True) -> int:
+        """Insere linhas em bloco numa tabela, numa única transação.
+        
+        As colunas são as chaves da primeira linha e têm de existir na tabela.
+        No PostgreSQL cada bloco é carregado com COPY. Com validar, cada bloco
+        é verificado antes da inserção e as linhas inválidas vão para a
+        tabela quarentena (ver ingest_validation.py). Devolve o número de
+        linhas inseridas na tabela.
+        """
+        conn = self._connect()
+        
+        colunas_tabela = set(self.storage.table_columns(conn, tabela))
+        if not colunas_tabela:
+            conn.close()
+            raise ValueError(f"Tabela '{tabela}' não existe")
+        
+        total = 0
+        rejeitadas = 0
+        colunas = None
+        batch = []
+        try:
+            for linha in linhas:
+                if colunas is None:
+                    colunas = list(linha.keys())
+                    desconhecidas = [c for c in colunas if c not in colunas_tabela]
+                    if desconhecidas:
+                        raise ValueError(f"Colunas desconhecidas em '{tabela}': {', '.join(desconhecidas)}")
+                batch.append(tuple(linha.get(c) for c in colunas))
+                if len(batch) >= batch_size:
+                    inseridas, falhadas = self._insert_batch(conn, tabela, colunas, batch, validar)
+                    total += inseridas
+                    rejeitadas += falhadas
+                    batch = []
+            if batch:
+                inseridas, falhadas = self._insert_batch(conn, tabela, colunas, batch, validar)
+                total += inseridas
+                rejeitadas += falhadas
+            if tabela in ('equipa', 'jogo'):
+                self.sync_competitions(conn)
+            if tabela in DECAYED_TRIGGERS:
+                update_decayed_forms(conn)
+            conn.commit()
+            if tabela in ('equipa', 'jogador', 'alias_equipa', 'alias_jogador'):
+                # Recarregado no próximo uso
+                self._entities = None
+        finally:
+            conn.close()
+        
+        if rejeitadas:
+            logger.warning(f"{rejeitadas} linhas rejeitadas em '{tabela}' (ver tabela quarentena)")
+        logger.info(f"{total} linhas inseridas em '{tabela}'")
+        return total
+    
+    def _insert_batch(self, conn, tabela: str, colunas: List[str], batch: List[tuple],
+                      validar: bool) -> Tuple[int, int]:
+        """Valida e insere um bloco; devolve (linhas inseridas, linhas em quarentena)."""
+        rejeitadas = []
+        if validar:
+            with self.metrics.timer('validacao_ingestao'):
+                batch, rejeitadas = validate_batch(conn, tabela, colunas, batch)
+            if rejeitadas:
+                quarantine(self.storage, conn, tabela, colunas, rejeitadas)
+                self.metrics.count('linhas_quarentena', len(rejeitadas))
+        inseridas = self.storage.bulk_insert(conn, tabela, colunas, batch) if batch else 0
+        return inseridas, len(rejeitadas)
+    
     def get_team_performance(self, id_equipa: int, num_jogos: int = 10) -> Dict:
         """Obtém o desempenho de uma equipa nos últimos N jogos."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -223,13 +802,16 @@ class FootballDataCollector:
                 AVG(cantos) as media_cantos,
                 AVG(cartoes_amarelos) as media_cartoes_amarelos,
                 AVG(cartoes_vermelhos) as media_cartoes_vermelhos,
-                SUM(clean_sheet) * 100.0 / COUNT(*) as percentagem_clean_sheets,
+                SUM(clean_sheet) * 100.0 / NULLIF(COUNT(*), 0) as percentagem_clean_sheets,
                 COUNT(*) as total_jogos
-            FROM desempenho_equipa_jogo dej
-            JOIN jogo j ON dej.id_jogo = j.id_jogo
-            WHERE dej.id_equipa = ? AND j.status = 'finalizado'
-            ORDER BY j.data_jogo DESC
-            LIMIT ?
+            FROM (
+                SELECT dej.*
+                FROM desempenho_equipa_jogo dej
+                JOIN jogo j ON dej.id_jogo = j.id_jogo
+                WHERE dej.id_equipa = ? AND j.status = 'finalizado'
+                ORDER BY j.data_jogo DESC, j.id_jogo DESC
+                LIMIT ?
+            ) recentes
         ''', (id_equipa, num_jogos))
         
         result = cursor.fetchone()
@@ -253,7 +835,7 @@ class FootballDataCollector:
     
     def get_player_performance(self, id_jogador: int, num_jogos: int = 20) -> Dict:
         """Obtém o desempenho de um jogador nos últimos N jogos."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -269,11 +851,14 @@ class FootballDataCollector:
                 AVG(desarmes) as media_desarmes,
                 AVG(intercecoes) as media_intercecoes,
                 COUNT(*) as total_jogos
-            FROM desempenho_jogador_jogo dpj
-            JOIN jogo j ON dpj.id_jogo = j.id_jogo
-            WHERE dpj.id_jogador = ? AND j.status = 'finalizado'
-            ORDER BY j.data_jogo DESC
-            LIMIT ?
+            FROM (
+                SELECT dpj.*
+                FROM desempenho_jogador_jogo dpj
+                JOIN jogo j ON dpj.id_jogo = j.id_jogo
+                WHERE dpj.id_jogador = ? AND j.status = 'finalizado'
+                ORDER BY j.data_jogo DESC, j.id_jogo DESC
+                LIMIT ?
+            ) recentes
         ''', (id_jogador, num_jogos))
         
         result = cursor.fetchone()
@@ -296,9 +881,28 @@ class FootballDataCollector:
         else:
             return {}
     
+    def get_team_xg(self, id_equipa: int) -> Dict:
+        """Obtém o xG/xGA médio da equipa nos últimos jogos com remates registados."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT jogos, media_xg, media_xga FROM xg_equipa WHERE id_equipa = ?
+        ''', (id_equipa,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row or not row[0]:
+            return {}
+        return {
+            'total_jogos': row[0],
+            'media_xg': round(row[1], 3),
+            'media_xga': round(row[2], 3),
+            'diferenca_xg': round(row[1] - row[2], 3)
+        }
+    
     def get_head_to_head(self, id_equipa1: int, id_equipa2: int, num_confrontos: int = 10) -> Dict:
         """Obtém o histórico de confrontos diretos entre duas equipas."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -355,7 +959,7 @@ class FootballDataCollector:
     
     def get_team_injuries(self, id_equipa: int) -> List[Dict]:
         """Obtém a lista de jogadores lesionados de uma equipa."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -366,7 +970,8 @@ class FootballDataCollector:
                 l.gravidade,
                 l.data_inicio,
                 l.data_fim_estimada,
-                l.impacto_equipa
+                l.impacto_equipa,
+                l.id_jogador
             FROM lesoes l
             JOIN jogador j ON l.id_jogador = j.id_jogador
             WHERE j.id_equipa = ? AND (l.data_fim_estimada IS NULL OR l.data_fim_estimada >= date('now'))
@@ -384,7 +989,8 @@ class FootballDataCollector:
                 'gravidade': lesao[3],
                 'data_inicio': lesao[4],
                 'data_fim_estimada': lesao[5],
-                'impacto_equipa': lesao[6]
+                'impacto_equipa': lesao[6],
+                'id_jogador': lesao[7]
             }
             for lesao in lesoes
         ]
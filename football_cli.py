@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Interface de Linha de Comandos do Analisador de Apostas de Futebol
+Autor: Manus AI
+Data: 19/10/2026
+
+Subcomandos: init-db, ingest, alias, predict, accumulator, bankroll, backtest, train, export, bench,
+repredict, serve, archive e publish.
+Os módulos do sistema só são importados dentro de cada subcomando, para que
+`--help` e os comandos leves arranquem sem custo.
+
+Exemplos:
+    python3 football_cli.py init-db
+    python3 football_cli.py ingest jogos.csv --table jogo
+    python3 football_cli.py ingest remates.ndjson --table remate
+    python3 football_cli.py ingest resultados.csv --table jogo --resolve-names --create-teams
+    python3 football_cli.py alias "S.L. Benfica" --team 1 --source fornecedor_a
+    python3 football_cli.py predict --date 2025-06-28
+    python3 football_cli.py predict --range 2025-06-01 2025-06-30 --league "Primeira Liga" --workers 8
+    python3 football_cli.py accumulator --date 2025-06-28 --odds odds.json --legs 10 --min-prob 0.001
+    python3 football_cli.py ingest odds.csv --table odds
+    python3 football_cli.py bankroll --range 2024-08-01 2025-05-31 --resamples 5000 --workers 4
+    python3 football_cli.py backtest --range 2024-08-01 2025-05-31
+    python3 football_cli.py backtest --range 2023-08-01 2024-05-31 --fit-calibration calibracao.json
+    python3 football_cli.py --calibration calibracao.json backtest --range 2024-08-01 2025-05-31 --reliability
+    python3 football_cli.py train --range 2015-08-01 2024-05-31 --output modelo.json
+    python3 football_cli.py --model modelo.json predict --date 2025-06-28
+    python3 football_cli.py export --range 2025-06-01 2025-06-30 --format csv --output previsoes.csv
+    python3 football_cli.py bench --matches 200
+    python3 football_cli.py --db bench.db bench --synthetic production --history-file bench_history.jsonl
+    python3 football_cli.py repredict --all --watch
+    python3 football_cli.py --snapshot serve --port 8766 --threads 8
+    python3 football_cli.py --snapshot ingest jogos.csv --table jogo
+    python3 football_cli.py --snapshot predict --date 2025-06-28
+    python3 football_cli.py archive --closed
+    python3 football_cli.py publish --range 2025-06-01 2025-06-30 --output www
+    python3 football_cli.py repredict --watch --publish www
+    python3 football_cli.py --history backtest --range 2015-08-01 2025-05-31
+"""
+
+import sys
+import argparse
+
+
+def _date_range(args):
+    """Devolve (data_inicio, data_fim) a partir de --date ou --range."""
+    if args.range:
+        return args.range[0], args.range[1]
+    if args.date:
+        return args.date, args.date
+    import datetime
+    today = datetime.date.today().isoformat()
+    return today, today
+
+
+def _storage(args, escrita: bool = False):
+    """Backend da base de dados; com --snapshot, as leituras usam a cópia publicada.
+
+    Com --history, as leituras incluem as épocas arquivadas (archive).
+    """
+    from storage import backend_from_url
+    return backend_from_url(args.db, args.metrics, snapshot=args.snapshot and not escrita,
+                            history=args.history and not escrita)
+
+
+def _engine(args, escrita: bool = False, storage=None):
+    from prediction_engine import FootballPredictionEngine
+    return FootballPredictionEngine(args.db, args.feature_store, metrics=args.metrics,
+                                    storage=storage or _storage(args, escrita), use_xg=args.xg,
+                                    half_life=args.half_life, calibration_path=args.calibration,
+                                    model_path=args.model)
+
+
+def cmd_init_db(args):
+    from football_betting_analyzer import FootballDataCollector
+
+    FootballDataCollector(args.db, storage=_storage(args, escrita=True))
+    print(f"Base de dados inicializada em: {args.db}")
+
+
+def cmd_ingest(args):
+    import csv
+    import json
+    from football_betting_analyzer import FootballDataCollector
+
+    collector = FootballDataCollector(args.db, storage=_storage(args, escrita=True))
+    formato = args.format or ('ndjson' if args.file.endswith(('.ndjson', '.jsonl')) else 'csv')
+
+    stream = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8', newline='')
+    try:
+        if formato == 'csv':
+            # Valores vazios no CSV correspondem a NULL
+            linhas = ({k: (v if v != '' else None) for k, v in row.items()} for row in csv.DictReader(stream))
+        else:
+            linhas = (json.loads(line) for line in stream if line.strip())
+        if args.table == 'remate':
+            # Remates: xG em falta calculado e agregados dos jogos afetados atualizados
+            from xg_pipeline import ingest_shots
+            total = ingest_shots(collector, linhas, batch_size=args.batch_size,
+                                 validar=not args.no_validate)['remates']
+        else:
+            if args.resolve_names:
+                # Colunas com nomes (ex.: equipa_casa, jogador) convertidas nos ids
+                linhas = collector.resolve_names(args.table, linhas, criar_equipas=args.create_teams)
+            total = collector.bulk_insert(args.table, linhas, batch_size=args.batch_size,
+                                          validar=not args.no_validate)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(f"{total} linhas inseridas em '{args.table}'")
+
+    if args.snapshot and collector.storage.name == 'sqlite':
+        from storage import publish_snapshot
+        print(f"Cópia de leitura publicada: {publish_snapshot(args.db)}")
+
+
+def cmd_alias(args):
+    from football_betting_analyzer import FootballDataCollector
+
+    collector = FootballDataCollector(args.db, storage=_storage(args, escrita=True))
+    collector.add_alias(args.name, id_equipa=args.team, id_jogador=args.player, fonte=args.source)
+    print(f"Alias '{args.name}' registado")
+
+
+def cmd_result(args):
+    from football_betting_analyzer import FootballDataCollector
+
+    collector = FootballDataCollector(args.db, storage=_storage(args, escrita=True))
+    collector.set_match_result(args.match, args.home_goals, args.away_goals, status=args.status)
+    print(f"Jogo {args.match}: {args.status}")
+
+
+def cmd_predict(args):
+    data_inicio, data_fim = _date_range(args)
+    engine = _engine(args)
+
+    total = 0
+    for prediction in engine.iter_predictions(data_inicio, data_fim, liga=args.league,
+                                              workers=args.workers, epoca=args.season):
+        total += 1
+        if args.json:
+            print(prediction.to_json())
+            continue
+        print(f"[{prediction.data_jogo}] {prediction.equipa_casa} vs {prediction.equipa_fora}: "
+              f"{prediction.previsao_principal} ({prediction.confianca * 100:.1f}%) | "
+              f"Casa {prediction.prob_casa * 100:.1f}% | "
+              f"Empate {prediction.prob_empate * 100:.1f}% | "
+              f"Fora {prediction.prob_fora * 100:.1f}%")
+
+    if total == 0 and not args.json:
+        print(f"Nenhum jogo agendado entre {data_inicio} e {data_fim}")
+
+
+def cmd_accumulator(args):
+    import json
+    from accumulators import AccumulatorPricer, legs_from_predictions
+
+    data_inicio, data_fim = _date_range(args)
+    engine = _engine(args)
+    predictions = list(engine.iter_predictions(data_inicio, data_fim, liga=args.league,
+                                               workers=args.workers, epoca=args.season))
+    if args.odds:
+        with open(args.odds, encoding='utf-8') as f:
+            odds = json.load(f)
+    else:
+        odds = engine.collector.get_odds([p.id_jogo for p in predictions], args.bookmaker)
+    legs = legs_from_predictions(predictions, odds)
+    combinacoes = AccumulatorPricer(legs).top_k(pernas=args.legs, k=args.top, min_pernas=args.min_legs,
+                                                min_prob=args.min_prob, beam=args.beam)
+
+    if args.json:
+        for combinacao in combinacoes:
+            print(json.dumps(combinacao, ensure_ascii=False))
+        return
+    if not combinacoes:
+        print(f"Nenhuma combinação com odds entre {data_inicio} e {data_fim}")
+    for combinacao in combinacoes:
+        pernas = ', '.join(f"{leg['id_jogo']}:{leg['selecao']}@{leg['odd']}" for leg in combinacao['pernas'])
+        print(f"VE {combinacao['valor_esperado'] * 100:+.1f}% | odd {combinacao['odd']:.2f} | "
+              f"prob {combinacao['probabilidade'] * 100:.2f}% | {pernas}")
+
+
+def cmd_bankroll(args):
+    import json
+    from bankroll import DEFAULT_STRATEGIES, StakingStrategy, load_history, simulate
+    from football_betting_analyzer import FootballDataCollector
+
+    data_inicio, data_fim = args.range if args.range else ('1900-01-01', '2999-12-31')
+    collector = FootballDataCollector(args.db, storage=_storage(args))
+    history = load_history(collector, data_inicio, data_fim, args.bookmaker)
+    estrategias = DEFAULT_STRATEGIES
+    if args.min_edge:
+        estrategias = [StakingStrategy(**{**s.to_dict(), 'valor_minimo': args.min_edge}) for s in estrategias]
+    results = simulate(history, estrategias, reamostragens=args.resamples, banca_inicial=args.bankroll,
+                       seed=args.seed, workers=args.workers)
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+        return
+    if not history['ids']:
+        print(f"Nenhum jogo finalizado com previsão guardada e odds entre {data_inicio} e {data_fim}")
+        return
+    print(f"=== BANCA ({len(history['ids'])} jogos, {args.resamples} reamostragens) ===")
+    for r in results:
+        b = r['bootstrap']
+        print(f"{r['estrategia']}: {r['apostas']} apostas | lucro {r['lucro']:+.2f} | ROI {r['roi']:+.2f}% | "
+              f"drawdown {r['drawdown_maximo']:.1f}%")
+        if b:
+            print(f"    ROI p5/p50/p95 {b['roi']['p5']:+.1f}/{b['roi']['p50']:+.1f}/{b['roi']['p95']:+.1f}% | "
+                  f"drawdown p50/p95 {b['drawdown_maximo']['p50']:.1f}/{b['drawdown_maximo']['p95']:.1f}% | "
+                  f"P(lucro) {b['prob_lucro']}% | P(ruína) {b['prob_ruina']}%")
+
+
+def cmd_backtest(args):
+    import json
+    from backtest import run_backtest, summarize_backtest, format_reliability
+
+    data_inicio, data_fim = args.range if args.range else ('1900-01-01', '2999-12-31')
+    if args.point_in_time or args.fit_calibration:
+        # Cada jogo é previsto só com os dados anteriores à sua data (obrigatório para calibrar)
+        from storage import backend_from_url
+        engine = _engine(args, storage=backend_from_url(args.db, args.metrics, snapshot=args.snapshot,
+                                                        history=args.history, point_in_time=True))
+    else:
+        engine = _engine(args)
+    if args.fit_calibration:
+        # O calibrador é ajustado sobre as probabilidades brutas do modelo
+        engine.calibrator = None
+    results = run_backtest(engine, data_inicio, data_fim, liga=args.league, epoca=args.season)
+
+    if args.fit_calibration:
+        from calibration import Calibrator
+        results = list(results)
+        Calibrator.fit(results, args.method).save(args.fit_calibration)
+        print(f"Calibração {args.method} guardada em {args.fit_calibration}", file=sys.stderr)
+    summary = summarize_backtest(results)
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+        return
+    fiabilidade = summary.pop('fiabilidade', {})
+    print("=== BACKTEST ===")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    if args.reliability:
+        print(format_reliability(fiabilidade))
+
+
+def cmd_train(args):
+    import json
+    from football_betting_analyzer import FootballDataCollector
+    from ml_model import train_model
+
+    data_inicio, data_fim = args.range if args.range else ('1900-01-01', '2999-12-31')
+    collector = FootballDataCollector(args.db, storage=_storage(args))
+    resumo = train_model(collector, args.output, data_inicio, data_fim, backend=args.backend,
+                         janela=args.window, validacao=args.validation)
+
+    if args.json:
+        print(json.dumps(resumo, ensure_ascii=False))
+        return
+    print(f"Modelo {resumo['backend']} guardado em {args.output} ({resumo['jogos']} jogos)")
+    print(f"Matriz: {resumo['segundos_matriz']}s | Treino: {resumo['segundos_treino']}s")
+    if 'validacao' in resumo:
+        v = resumo['validacao']
+        print(f"Validação ({v['jogos']} jogos): log loss {v['log_loss']} "
+              f"(referência {v['log_loss_referencia']}) | acerto {v['taxa_acerto']}%")
+
+
+def cmd_export(args):
+    from prediction_export import write_predictions
+
+    data_inicio, data_fim = _date_range(args)
+    engine = _engine(args)
+    predictions = engine.iter_predictions(data_inicio, data_fim, liga=args.league,
+                                          workers=args.workers, epoca=args.season)
+    total = write_predictions(predictions, args.format, args.output)
+
+    if args.output != '-':
+        print(f"{total} previsões exportadas para {args.output}")
+
+
+def cmd_bench(args):
+    import os
+    import json
+    from benchmark import run_benchmarks
+
+    if args.synthetic and os.path.exists(args.db):
+        raise ValueError(f"A base de dados {args.db} já existe; indique um novo --db para os dados sintéticos")
+
+    result = run_benchmarks(args.db, scale=args.synthetic, seed=args.seed, n_calls=args.matches,
+                            history_path=args.history_file, engine=None if args.synthetic else _engine(args))
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+        return
+
+    for chave, rotulo in (('ingestao', 'Ingestão'), ('ingestao_sem_validacao', 'Ingestão sem validação')):
+        if chave in result:
+            ingestao = result[chave]
+            print(f"{rotulo}: {ingestao['total_linhas']} linhas em {ingestao['segundos']}s "
+                  f"({ingestao['linhas_por_segundo']} linhas/s)")
+    pm = result['predict_match']
+    if pm.get('chamadas'):
+        print(f"predict_match ({pm['chamadas']} chamadas): p50 {pm['p50_ms']} ms | p99 {pm['p99_ms']} ms")
+    else:
+        print("Sem jogos na base de dados para medir")
+    da = result['generate_daily_analysis']
+    if da.get('jogos'):
+        print(f"generate_daily_analysis: {da['jogos']} jogos em {da['segundos']}s "
+              f"({da['jogos_por_segundo']} jogos/s, pico {da['memoria_pico_mb']} MB)")
+    if 'variacao_p50_pct' in result:
+        print(f"Variação do p50 face à execução anterior: {result['variacao_p50_pct']:+}%")
+
+
+def cmd_repredict(args):
+    import datetime
+    from change_tracking import RePredictionWorker, remove_change_tracking
+
+    if args.remove_tracking:
+        from football_betting_analyzer import FootballDataCollector
+        conn = FootballDataCollector(args.db, storage=_storage(args, escrita=True))._connect()
+        try:
+            pendentes = remove_change_tracking(conn)
+        finally:
+            conn.close()
+        print(f"Registo de alterações removido ({pendentes} alterações pendentes descartadas)")
+        return
+
+    # As previsões são guardadas na base viva
+    worker = RePredictionWorker(_engine(args, escrita=True))
+
+    def publicar(total: int):
+        # Documentos estáticos do dashboard com as previsões guardadas dos próximos dias
+        if args.publish and total:
+            from dashboard_snapshots import publish_dashboard
+            hoje = datetime.date.today()
+            fim = hoje + datetime.timedelta(days=args.publish_days - 1)
+            publish_dashboard(worker.engine, args.publish, hoje.isoformat(), fim.isoformat(), guardadas=True)
+
+    if args.all:
+        total = worker.refresh_all()
+        print(f"{total} previsões recalculadas")
+        publicar(total)
+    if args.watch:
+        worker.run_forever(args.interval, on_update=publicar)
+    else:
+        total = worker.run_once()
+        print(f"{total} jogos re-previstos")
+        publicar(total)
+
+
+def cmd_serve(args):
+    import asyncio
+    from prediction_service import PredictionService
+
+    service = PredictionService(_engine(args), max_workers=args.threads,
+                                max_pending=args.max_pending, timeout=args.timeout)
+    print(f"Serviço de previsões em {args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+def cmd_archive(args):
+    from football_betting_analyzer import FootballDataCollector
+    from season_archive import archive_season, closed_seasons, list_archives
+
+    collector = FootballDataCollector(args.db, storage=_storage(args, escrita=True))
+    epocas = closed_seasons(collector) if args.closed else args.season or []
+    for epoca in epocas:
+        resultado = archive_season(collector, epoca, vacuum=not args.no_vacuum)
+        print(f"Época {resultado['epoca']}: {resultado['linhas'].get('jogo', 0)} jogos "
+              f"arquivados em {resultado['caminho']}")
+
+    if args.list or not epocas:
+        conn = collector._connect()
+        try:
+            arquivos = list_archives(conn, args.db)
+        finally:
+            conn.close()
+        for arquivo in arquivos:
+            print(f"{arquivo['epoca']}: {arquivo['jogos']} jogos | {arquivo['caminho']} | {arquivo['arquivado_em']}")
+        if not arquivos:
+            print("Nenhuma época arquivada")
+
+
+def cmd_publish(args):
+    from dashboard_snapshots import publish_dashboard
+
+    data_inicio, data_fim = _date_range(args)
+    manifest = publish_dashboard(_engine(args), args.output, data_inicio, data_fim, guardadas=args.stored,
+                                 workers=args.workers, keep=args.keep)
+    total_gzip = sum(f['bytes_gzip'] for f in manifest['ficheiros'].values())
+    print(f"Versão {manifest['versao']} publicada em {args.output}: {manifest['previsoes']} previsões, "
+          f"{len(manifest['ficheiros'])} documentos ({total_gzip / 1024:.1f} KB comprimidos)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='football_cli',
+        description='Sistema de Análise Profissional de Apostas Desportivas para Futebol'
+    )
+    parser.add_argument('--db', default='football_data.db',
+                        help='caminho da base de dados SQLite ou URL postgresql:// (PostgreSQL experimental)')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='ler de uma cópia consistente da base (o ingest publica uma nova cópia)')
+    parser.add_argument('--history', action='store_true',
+                        help='incluir nas leituras as épocas arquivadas (archive), só de leitura')
+    parser.add_argument('--feature-store', default=None, help='armazém de features (mmap) a usar nas previsões')
+    parser.add_argument('--xg', action='store_true', help='usar o xG/xGA dos remates na força das equipas')
+    parser.add_argument('--half-life', type=float, metavar='DIAS',
+                        help='forma com decaimento temporal (meia-vida em dias) em vez dos últimos N jogos')
+    parser.add_argument('--calibration', metavar='FICHEIRO', help='calibrador de probabilidades (backtest --fit-calibration)')
+    parser.add_argument('--model', metavar='FICHEIRO', help='modelo treinado (train) em vez das ponderações fixas')
+    parser.add_argument('--workers', type=int, default=1, help='número de processos para as previsões')
+    parser.add_argument('--metrics', dest='metrics_format', choices=['json', 'prometheus'], help='imprimir métricas por componente em stderr')
+    parser.add_argument('--profile', metavar='FICHEIRO',
+                        help='gravar profiling do comando (.prof com cProfile, .html com pyinstrument)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='mostrar mensagens de log')
+
+    sub = parser.add_subparsers(dest='command', metavar='COMANDO')
+    sub.required = True
+
+    p = sub.add_parser('init-db', help='criar as tabelas da base de dados')
+    p.set_defaults(func=cmd_init_db)
+
+    p = sub.add_parser('ingest', help='carregar linhas CSV/NDJSON numa tabela')
+    p.add_argument('file', help="ficheiro de entrada ('-' para stdin)")
+    p.add_argument('--table', required=True, help='tabela de destino (ex.: jogo, desempenho_equipa_jogo)')
+    p.add_argument('--format', choices=['csv', 'ndjson'], help='formato do ficheiro (deduzido da extensão)')
+    p.add_argument('--batch-size', type=int, default=5000, help='linhas por bloco de inserção')
+    p.add_argument('--resolve-names', action='store_true',
+                   help='aceitar nomes de equipas/jogadores (ex.: equipa_casa, jogador) em vez dos ids')
+    p.add_argument('--create-teams', action='store_true',
+                   help='com --resolve-names, criar as equipas desconhecidas (nomes só semelhantes são recusados)')
+    p.add_argument('--no-validate', action='store_true',
+                   help='inserir sem validar (as linhas inválidas não vão para a quarentena)')
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser('alias', help='registar um nome alternativo de uma equipa ou jogador')
+    p.add_argument('name', help='nome usado pelo fornecedor (ex.: "S.L. Benfica")')
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument('--team', type=int, help='id da equipa')
+    group.add_argument('--player', type=int, help='id do jogador')
+    p.add_argument('--source', help='fornecedor de dados')
+    p.set_defaults(func=cmd_alias)
+
+    p = sub.add_parser('result', help='registar o resultado ou o estado de um jogo (atualiza xG e forma)')
+    p.add_argument('match', type=int, help='id do jogo')
+    p.add_argument('home_goals', type=int, nargs='?', help='golos da equipa da casa')
+    p.add_argument('away_goals', type=int, nargs='?', help='golos da equipa de fora')
+    p.add_argument('--status', default='finalizado', help='estado do jogo (predefinição: finalizado)')
+    p.set_defaults(func=cmd_result)
+
+    def add_dates(p):
+        group = p.add_mutually_exclusive_group()
+        group.add_argument('--date', help='data dos jogos (AAAA-MM-DD, por omissão hoje)')
+        group.add_argument('--range', nargs=2, metavar=('INICIO', 'FIM'), help='intervalo de datas')
+        p.add_argument('--league', help='limitar a uma competição')
+        p.add_argument('--season', help="limitar a uma época (ex.: '2024/25')")
+
+    p = sub.add_parser('predict', help='prever os jogos agendados')
+    add_dates(p)
+    p.add_argument('--json', action='store_true', help='uma previsão JSON por linha')
+    p.set_defaults(func=cmd_predict)
+
+    p = sub.add_parser('accumulator', help='melhores apostas múltiplas por valor esperado face às odds')
+    add_dates(p)
+    p.add_argument('--odds', metavar='FICHEIRO',
+                   help='odds em JSON: {"id_jogo": {"casa": 2.1, "empate": 3.4, "fora": 3.6}} '
+                        '(por omissão, as da tabela odds)')
+    p.add_argument('--bookmaker', help='casa de apostas da tabela odds (por omissão, a melhor odd)')
+    p.add_argument('--legs', type=int, default=10, help='número máximo de pernas')
+    p.add_argument('--min-legs', type=int, default=2, help='número mínimo de pernas')
+    p.add_argument('--min-prob', type=float, default=0.0, help='probabilidade mínima da combinação (0-1)')
+    p.add_argument('--top', type=int, default=20, help='número de combinações a mostrar')
+    p.add_argument('--beam', type=int, default=2000, help='largura do feixe da pesquisa')
+    p.add_argument('--json', action='store_true', help='uma combinação JSON por linha')
+    p.set_defaults(func=cmd_accumulator)
+
+    p = sub.add_parser('bankroll', help='simular a banca com as previsões guardadas e as odds')
+    p.add_argument('--range', nargs=2, metavar=('INICIO', 'FIM'), help='intervalo de datas')
+    p.add_argument('--bookmaker', help='casa de apostas (por omissão, a melhor odd)')
+    p.add_argument('--bankroll', type=float, default=100.0, help='banca inicial')
+    p.add_argument('--resamples', type=int, default=1000, help='reamostragens bootstrap')
+    p.add_argument('--min-edge', type=float, default=0.0, help='valor esperado mínimo para apostar (ex.: 0.05)')
+    p.add_argument('--seed', type=int, default=42, help='semente aleatória')
+    p.add_argument('--json', action='store_true', help='uma estratégia JSON por linha')
+    p.set_defaults(func=cmd_bankroll)
+
+    p = sub.add_parser('backtest', help='avaliar o modelo em jogos finalizados')
+    p.add_argument('--range', nargs=2, metavar=('INICIO', 'FIM'), help='intervalo de datas')
+    p.add_argument('--league', help='limitar a uma competição')
+    p.add_argument('--season', help="limitar a uma época (ex.: '2024/25')")
+    p.add_argument('--json', action='store_true', help='resumo em JSON')
+    p.add_argument('--reliability', action='store_true', help='mostrar o diagrama de fiabilidade')
+    p.add_argument('--point-in-time', action='store_true',
+                   help='prever cada jogo só com os dados anteriores à sua data')
+    p.add_argument('--fit-calibration', metavar='FICHEIRO',
+                   help='ajustar e guardar um calibrador (JSON); implica --point-in-time')
+    p.add_argument('--method', choices=['isotonica', 'logistica'], default='isotonica',
+                   help='método de calibração a ajustar')
+    p.set_defaults(func=cmd_backtest)
+
+    p = sub.add_parser('train', help='treinar o modelo de aprendizagem automática nos jogos finalizados')
+    p.add_argument('--range', nargs=2, metavar=('INICIO', 'FIM'), help='intervalo de datas')
+    p.add_argument('--output', required=True, help='ficheiro do modelo')
+    p.add_argument('--backend', choices=['auto', 'lightgbm', 'sklearn', 'numpy'], default='auto',
+                   help='biblioteca de treino (auto: LightGBM, scikit-learn ou numpy)')
+    p.add_argument('--window', type=int, default=10, help='jogos anteriores usados nas médias')
+    p.add_argument('--validation', type=float, default=0.2, help='fração final dos jogos usada na validação')
+    p.add_argument('--json', action='store_true', help='resumo em JSON')
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser('export', help='exportar previsões em streaming')
+    add_dates(p)
+    p.add_argument('--format', choices=['ndjson', 'csv', 'parquet'], default='ndjson', help='formato de saída')
+    p.add_argument('--output', default='-', help="ficheiro de saída ('-' para stdout)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('bench', help='medir ingestão, latência de predict_match e análise diária')
+    p.add_argument('--matches', type=int, default=100, help='número de previsões a medir')
+    p.add_argument('--seed', type=int, default=42, help='semente aleatória')
+    p.add_argument('--synthetic', choices=['small', 'medium', 'production'],
+                   help='gerar dados sintéticos nesta escala num novo --db antes de medir')
+    p.add_argument('--history-file', help='ficheiro JSON Lines onde acrescentar os resultados')
+    p.add_argument('--json', action='store_true', help='resultado em JSON')
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser('repredict', help='re-prever só os jogos cujos dados mudaram')
+    p.add_argument('--all', action='store_true', help='recalcular primeiro todos os jogos agendados')
+    p.add_argument('--watch', action='store_true', help='continuar a verificar o registo de alterações')
+    p.add_argument('--interval', type=float, default=1.0, help='segundos entre verificações com --watch')
+    p.add_argument('--publish', metavar='PASTA', help='publicar os documentos do dashboard após cada atualização')
+    p.add_argument('--publish-days', type=int, default=7, help='dias (a partir de hoje) publicados com --publish')
+    p.add_argument('--remove-tracking', action='store_true',
+                   help='remover os triggers e o registo de alterações (sem re-prever)')
+    p.set_defaults(func=cmd_repredict)
+
+    p = sub.add_parser('serve', help='serviço TCP de previsões com agrupamento de pedidos')
+    p.add_argument('--host', default='127.0.0.1', help='endereço de escuta')
+    p.add_argument('--port', type=int, default=8766, help='porta de escuta')
+    p.add_argument('--threads', type=int, default=4, help='threads para o trabalho na base de dados')
+    p.add_argument('--max-pending', type=int, default=64, help='cálculos distintos em curso antes de recusar pedidos')
+    p.add_argument('--timeout', type=float, default=10.0, help='tempo limite de cada pedido em segundos')
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser('archive', help='mover épocas terminadas para arquivos próprios (ATTACH)')
+    group = p.add_mutually_exclusive_group()
+    group.add_argument('--season', action='append', help="época a arquivar (ex.: '2023/24'; pode repetir)")
+    group.add_argument('--closed', action='store_true', help='arquivar todas as épocas já terminadas')
+    p.add_argument('--no-vacuum', action='store_true', help='não compactar a base viva no fim')
+    p.add_argument('--list', action='store_true', help='listar as épocas arquivadas')
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser('publish', help='publicar os documentos JSON estáticos (gzip) do dashboard')
+    group = p.add_mutually_exclusive_group()
+    group.add_argument('--date', help='data dos jogos (AAAA-MM-DD, por omissão hoje)')
+    group.add_argument('--range', nargs=2, metavar=('INICIO', 'FIM'), help='intervalo de datas')
+    p.add_argument('--output', required=True, help='pasta de publicação (servir PASTA/current)')
+    p.add_argument('--stored', action='store_true', help='usar as previsões guardadas (repredict) sem recalcular')
+    p.add_argument('--keep', type=int, default=3, help='versões anteriores a manter')
+    p.set_defaults(func=cmd_publish)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    import logging
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+
+    args.metrics = None
+    if args.metrics_format:
+        from instrumentation import Metrics
+        args.metrics = Metrics(enabled=True)
+
+    try:
+        if args.profile:
+            from instrumentation import profile
+            tool = 'pyinstrument' if args.profile.endswith('.html') else 'cprofile'
+            with profile(args.profile, tool):
+                args.func(args)
+        else:
+            args.func(args)
+    except (ValueError, ImportError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Saída encaminhada para um processo que terminou (ex.: head)
+        sys.stdout = None
+
+    if args.metrics is not None:
+        report = args.metrics.to_json() if args.metrics_format == 'json' else args.metrics.to_prometheus()
+        print(report, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
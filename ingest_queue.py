@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Fila de Ingestão com um Único Escritor
+Autor: Manus AI
+Data: 19/10/2026
+
+Vários recolectores a chamar add_match/add_player em simultâneo disputam o
+bloqueio de escrita do SQLite ("database is locked") e fazem um commit por
+linha. IngestQueue concentra as escritas numa thread escritora com uma só
+ligação, alimentada por uma fila limitada:
+
+- os produtores (qualquer número de threads) chamam add_team, add_player,
+  add_match ou submit e recebem logo um Future com o id da linha inserida
+- com a fila cheia (max_pendentes), os produtores esperam (contrapressão)
+- o escritor junta até flush_size pedidos, ou os que chegarem em
+  flush_interval segundos, numa única transação (um commit por lote)
+- cada pedido corre num SAVEPOINT: um pedido inválido só falha o seu Future,
+  não o lote
+- as linhas de submit passam pela validação de bulk_insert (validate_batch,
+  por tabela e colunas do lote); as rejeitadas vão para a quarentena na mesma
+  transação e o seu Future falha com os motivos
+- os Futures só são resolvidos depois do commit (a escrita é durável)
+
+A escritora é uma thread (e não um processo): o trabalho é quase todo no
+SQLite, que liberta o GIL, e os Futures ficam no mesmo processo dos produtores.
+
+Exemplo:
+    with IngestQueue(collector) as fila:
+        futures = [fila.add_match('2026-10-19', casa, fora) for casa, fora in jogos]
+    ids = [f.result() for f in futures]
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+import logging
+
+from decayed_form import DECAYED_TRIGGERS, update_decayed_forms
+from ingest_validation import quarantine, validate_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_FLUSH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.05
+# Espera máxima de cada tentativa de put com a fila cheia (segundos)
+PUT_TIMEOUT = 0.05
+
+# Tipos de pedido: métodos do recolector que inserem na transação de um cursor
+_HANDLERS = {
+    'equipa': '_insert_team',
+    'jogador': '_insert_player',
+    'jogo': '_insert_match'
+}
+# Marcadores internos da fila (sem linha a escrever)
+_FLUSH = 'flush'
+_CLOSE = 'close'
+
+
+class IngestQueue:
+    """Escritor único, em lotes transacionais, para as inserções de vários produtores."""
+
+    def __init__(self, collector, max_pendentes: int = DEFAULT_MAX_PENDING,
+                 flush_size: int = DEFAULT_FLUSH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 validar: bool = True):
+        if flush_size < 1:
+            raise ValueError("flush_size tem de ser pelo menos 1")
+        self.collector = collector
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.validar = validar
+        self.escritas = 0
+        self.falhas = 0
+        self.quarentena = 0
+        self.lotes = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pendentes)
+        self._columns: Dict[str, List[str]] = {}
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='ingest-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'IngestQueue':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_team(self, nome_equipa: str, pais: str = None, liga: str = None) -> Future:
+        """Como FootballDataCollector.add_team; o Future devolve o id da equipa."""
+        return self._put('equipa', (nome_equipa, pais, liga))
+
+    def add_player(self, nome_jogador: str, posicao: str, id_equipa: int, idade: int = None) -> Future:
+        """Como FootballDataCollector.add_player; o Future devolve o id do jogador."""
+        return self._put('jogador', (nome_jogador, posicao, id_equipa, idade))
+
+    def add_match(self, data_jogo: str, id_equipa_casa: int, id_equipa_fora: int,
+                  golos_casa: int = None, golos_fora: int = None, status: str = 'agendado',
+                  id_competicao: int = None) -> Future:
+        """Como FootballDataCollector.add_match; o Future devolve o id do jogo."""
+        return self._put('jogo', (data_jogo, id_equipa_casa, id_equipa_fora, golos_casa, golos_fora,
+                                  status, id_competicao))
+
+    def submit(self, tabela: str, linha: Dict) -> Future:
+        """Insere uma linha (colunas = chaves) em qualquer tabela, como bulk_insert.
+
+        O Future devolve o rowid da linha inserida; com validar, uma linha
+        rejeitada fica na quarentena e o Future falha com ValueError.
+        """
+        return self._put('linha', (tabela, dict(linha)))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Espera que tudo o que já foi submetido esteja gravado."""
+        self._put(_FLUSH, ()).result(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Grava os pedidos pendentes e termina o escritor."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_CLOSE, (), Future()))
+        self._thread.join(timeout)
+        logger.info(f"Fila de ingestão fechada: {self.escritas} linhas em {self.lotes} lotes "
+                    f"({self.falhas} falhadas)")
+
+    def _put(self, tipo: str, args) -> Future:
+        future = Future()
+        while True:
+            # A verificação e o put com o bloqueio: nenhum pedido entra na fila depois do _CLOSE
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("A fila de ingestão já foi fechada")
+                try:
+                    self._queue.put((tipo, args, future), timeout=PUT_TIMEOUT)
+                    return future
+                except queue.Full:
+                    pass
+            # Fila cheia (contrapressão): liberta o bloqueio entre tentativas para close() não esperar
+
+    def _next_batch(self) -> List:
+        """Primeiro pedido (à espera) e os seguintes até flush_size ou flush_interval."""
+        batch = [self._queue.get()]
+        limite = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size and batch[-1][0] not in (_FLUSH, _CLOSE):
+            restante = limite - time.monotonic()
+            try:
+                # Depois do prazo, só os pedidos que já estão na fila
+                item = self._queue.get(timeout=restante) if restante > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        conn = None
+        try:
+            conn = self.collector._connect()
+            while True:
+                batch = self._next_batch()
+                self._write(conn, batch)
+                if batch[-1][0] == _CLOSE:
+                    break
+        except Exception as exc:
+            logger.error(f"Escritor da fila de ingestão terminou com erro: {exc}")
+            self._closed = True
+            # Nenhum produtor fica à espera de um pedido que já não será escrito
+            while True:
+                try:
+                    _, _, future = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(exc)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _write(self, conn, batch: List):
+        """Escreve um lote numa transação e resolve os Futures depois do commit."""
+        pedidos = [item for item in batch if item[0] not in (_FLUSH, _CLOSE)
+                   and item[2].set_running_or_notify_cancel()]
+        gravados = []
+        rejeitados: Dict[Future, str] = {}
+        tabelas = set()
+        with self.collector.metrics.timer('ingest_queue'):
+            try:
+                cursor = conn.cursor()
+                if not getattr(conn, 'in_transaction', True):
+                    # Sem BEGIN explícito, o primeiro SAVEPOINT abriria (e o RELEASE fecharia) a transação
+                    cursor.execute('BEGIN IMMEDIATE')
+                if self.validar:
+                    rejeitados = self._validate_rows(conn, pedidos)
+                for tipo, args, future in pedidos:
+                    if future in rejeitados:
+                        continue
+                    cursor.execute('SAVEPOINT ingestao')
+                    try:
+                        resultado, tabela = self._insert(conn, cursor, tipo, args)
+                    except Exception as exc:
+                        cursor.execute('ROLLBACK TO SAVEPOINT ingestao')
+                        cursor.execute('RELEASE SAVEPOINT ingestao')
+                        self.falhas += 1
+                        future.set_exception(exc)
+                        continue
+                    cursor.execute('RELEASE SAVEPOINT ingestao')
+                    gravados.append((tipo, args, future, resultado))
+                    tabelas.add(tabela)
+
+                if any(g[0] == 'linha' for g in gravados) and tabelas & {'equipa', 'jogo'}:
+                    # Linhas genéricas podem vir sem competição/época (como em bulk_insert)
+                    self.collector.sync_competitions(conn)
+                if tabelas & set(DECAYED_TRIGGERS):
+                    update_decayed_forms(conn)
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                logger.error(f"Falha ao gravar lote de {len(pedidos)} pedidos: {exc}")
+                for _, _, future in pedidos:
+                    if not future.done():
+                        self.falhas += 1
+                        future.set_exception(exc)
+                gravados = []
+                rejeitados = {}
+
+        self._after_commit(gravados, tabelas)
+        self.escritas += len(gravados)
+        self.falhas += len(rejeitados)
+        self.quarentena += len(rejeitados)
+        self.lotes += 1
+        self.collector.metrics.count('ingest_queue_linhas', len(gravados))
+        if rejeitados:
+            self.collector.metrics.count('linhas_quarentena', len(rejeitados))
+        for tipo, _, future, resultado in gravados:
+            future.set_result(resultado[0] if tipo == 'equipa' else resultado)
+        for future, motivo in rejeitados.items():
+            future.set_exception(ValueError(motivo))
+        for tipo, _, future in batch:
+            if tipo in (_FLUSH, _CLOSE) and future.set_running_or_notify_cancel():
+                future.set_result(None)
+
+    def _validate_rows(self, conn, pedidos: List) -> Dict[Future, str]:
+        """Valida as linhas de submit do lote, agrupadas por tabela e colunas.
+
+        As rejeitadas são gravadas na quarentena (na transação do lote);
+        devolve {Future: motivo} dos pedidos rejeitados.
+        """
+        grupos: Dict[tuple, List] = {}
+        for tipo, args, future in pedidos:
+            if tipo == 'linha':
+                tabela, linha = args
+                grupos.setdefault((tabela, tuple(linha)), []).append((linha, future))
+
+        rejeitados = {}
+        for (tabela, colunas), grupo in grupos.items():
+            linhas = [tuple(linha[c] for c in colunas) for linha, _ in grupo]
+            with self.collector.metrics.timer('validacao_ingestao'):
+                _, rejeitadas = validate_batch(conn, tabela, colunas, linhas)
+            if not rejeitadas:
+                continue
+            quarantine(self.collector.storage, conn, tabela, colunas, rejeitadas)
+            # validate_batch devolve as próprias tuplas do lote
+            posicoes = {id(linha): i for i, linha in enumerate(linhas)}
+            for linha, motivos in rejeitadas:
+                future = grupo[posicoes[id(linha)]][1]
+                rejeitados[future] = f"Linha rejeitada em '{tabela}' (ver tabela quarentena): {motivos}"
+        return rejeitados
+
+    def _insert(self, conn, cursor, tipo: str, args):
+        """Executa um pedido no cursor; devolve (resultado, tabela)."""
+        if tipo == 'linha':
+            tabela, linha = args
+            colunas = self._table_columns(conn, tabela)
+            desconhecidas = [c for c in linha if c not in colunas]
+            if desconhecidas:
+                raise ValueError(f"Colunas desconhecidas em '{tabela}': {', '.join(desconhecidas)}")
+            nomes = list(linha)
+            cursor.execute(f"INSERT INTO {tabela} ({', '.join(nomes)}) VALUES ({', '.join('?' for _ in nomes)})",
+                           [linha[c] for c in nomes])
+            return cursor.lastrowid, tabela
+        return getattr(self.collector, _HANDLERS[tipo])(cursor, *args), tipo
+
+    def _table_columns(self, conn, tabela: str) -> List[str]:
+        colunas = self._columns.get(tabela)
+        if colunas is None:
+            colunas = self.collector.storage.table_columns(conn, tabela)
+            if not colunas:
+                raise ValueError(f"Tabela '{tabela}' não existe")
+            self._columns[tabela] = colunas
+        return colunas
+
+    def _after_commit(self, gravados: List, tabelas: set):
+        """Atualiza o índice de entidades do recolector com o que foi gravado."""
+        collector = self.collector
+        if tabelas & {'alias_equipa', 'alias_jogador'} or any(
+                g[0] == 'linha' and g[1][0] in ('equipa', 'jogador') for g in gravados):
+            # Recarregado no próximo uso, como em bulk_insert
+            collector._entities = None
+            return
+        for tipo, args, _, resultado in gravados:
+            if tipo == 'equipa':
+                id_equipa, id_competicao = resultado
+                collector._team_added(id_equipa, args[0], id_competicao)
+            elif tipo == 'jogador':
+                collector._player_added(resultado, args[0], args[2])
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Validação dos Lotes de Ingestão
+Autor: Manus AI
+Data: 19/10/2026
+
+As linhas de fornecedores com erros (posse de bola acima de 100, clean_sheet
+contrário aos golos sofridos, o mesmo jogo enviado duas vezes) entram nas
+médias sem aviso. validate_batch verifica cada lote de bulk_insert antes da
+inserção, com as colunas em arrays numpy (uma operação por regra, não por
+linha):
+
+- campos obrigatórios: chaves que não podem ficar a NULL
+- intervalos: mínimo e máximo de cada coluna numérica (NULL não é verificado)
+- consistência entre campos: ex. clean_sheet = (golos_sofridos == 0)
+- duplicados: a mesma chave natural repetida no lote ou já gravada na base
+  (procurada pelos índices existentes, só para as chaves do lote)
+
+As linhas rejeitadas ficam na tabela quarentena (linha original em JSON e
+motivos), para correção e nova ingestão; as restantes seguem para a tabela.
+Sem numpy, a validação é ignorada (com um aviso).
+"""
+
+import json
+import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+from xg_pipeline import PITCH_LENGTH, PITCH_WIDTH
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_TABLE = 'quarentena'
+# Parâmetros por consulta de chaves existentes (limite antigo do SQLite: 999)
+LOOKUP_CHUNK = 500
+
+REQUIRED_COLUMNS = {
+    'jogo': ('data_jogo', 'id_equipa_casa', 'id_equipa_fora'),
+    'desempenho_equipa_jogo': ('id_jogo', 'id_equipa'),
+    'desempenho_jogador_jogo': ('id_jogo', 'id_jogador'),
+    'remate': ('id_jogo', 'id_equipa', 'xg'),
+    'xg_jogo': ('id_jogo', 'id_equipa'),
+    'lesoes': ('id_jogador', 'data_inicio'),
+    'odds': ('id_jogo',)
+}
+
+# Colunas de datas (AAAA-MM-DD, com ou sem hora)
+DATE_COLUMNS = {
+    'jogo': ('data_jogo',),
+    'lesoes': ('data_inicio', 'data_fim_estimada')
+}
+
+# {tabela: {coluna: (mínimo, máximo)}}
+RANGE_RULES = {
+    'jogo': {'golos_casa': (0, 30), 'golos_fora': (0, 30)},
+    'desempenho_equipa_jogo': {
+        'golos_marcados': (0, 30), 'golos_sofridos': (0, 30), 'remates_baliza': (0, 60),
+        'remates_sofridos': (0, 60), 'posse_bola': (0, 100), 'cantos': (0, 40),
+        'cartoes_amarelos': (0, 15), 'cartoes_vermelhos': (0, 5), 'clean_sheet': (0, 1),
+        'falhas_penalti': (0, 10), 'penaltis_sofridos': (0, 10)
+    },
+    'desempenho_jogador_jogo': {
+        'golos': (0, 10), 'assistencias': (0, 10), 'minutos_jogados': (0, 130),
+        'cartoes_amarelos': (0, 2), 'cartoes_vermelhos': (0, 1), 'remates': (0, 30),
+        'remates_baliza': (0, 30), 'passes_completos': (0, 100), 'desarmes': (0, 40),
+        'intercecoes': (0, 40), 'faltas_cometidas': (0, 20), 'faltas_sofridas': (0, 20),
+        'penaltis_marcados': (0, 10), 'penaltis_sofridos': (0, 10)
+    },
+    'remate': {'minuto': (0, 130), 'x': (0, PITCH_LENGTH), 'y': (0, PITCH_WIDTH), 'xg': (0, 1)},
+    'xg_jogo': {'xg': (0, 20), 'xga': (0, 20), 'remates': (0, 80), 'remates_contra': (0, 80)},
+    'lesoes': {'impacto_equipa': (1, 5)},
+    'odds': {'odd_casa': (1.01, 1000), 'odd_empate': (1.01, 1000), 'odd_fora': (1.01, 1000)}
+}
+
+
+def _clean_sheet(c, np):
+    return ((c['golos_sofridos'] == 0) != (c['clean_sheet'] == 1)) & ~np.isnan(c['golos_sofridos']) \
+        & ~np.isnan(c['clean_sheet'])
+
+
+def _same_teams(c, np):
+    return c['id_equipa_casa'] == c['id_equipa_fora']
+
+
+def _on_target_over_shots(c, np):
+    return c['remates_baliza'] > c['remates']
+
+
+def _finished_without_score(c, np):
+    return (c['status'] == 'finalizado') & (np.isnan(c['golos_casa']) | np.isnan(c['golos_fora']))
+
+
+def _injury_ends_before_start(c, np):
+    return (c['data_fim_estimada'] != '') & (c['data_fim_estimada'] < c['data_inicio'])
+
+
+# {tabela: [(colunas numéricas, colunas de texto, regra -> máscara das linhas inválidas, motivo)]}
+# As comparações com NaN (NULL) são falsas: uma regra só falha com os valores presentes.
+CONSISTENCY_RULES = {
+    'jogo': [
+        (('id_equipa_casa', 'id_equipa_fora'), (), _same_teams, 'equipa da casa igual à de fora'),
+        (('golos_casa', 'golos_fora'), ('status',), _finished_without_score, 'jogo finalizado sem resultado')
+    ],
+    'desempenho_equipa_jogo': [
+        (('golos_sofridos', 'clean_sheet'), (), _clean_sheet, 'clean_sheet inconsistente com golos_sofridos')
+    ],
+    'desempenho_jogador_jogo': [
+        (('remates_baliza', 'remates'), (), _on_target_over_shots, 'remates_baliza acima de remates')
+    ],
+    'lesoes': [
+        ((), ('data_inicio', 'data_fim_estimada'), _injury_ends_before_start,
+         'data_fim_estimada anterior a data_inicio')
+    ]
+}
+
+# Chave natural de cada tabela: {tabela: (colunas da chave, tipos, coluna de pesquisa, coluna de intervalo)}.
+# As chaves já gravadas são procuradas com `pesquisa IN (...)` (e o intervalo do lote), pelos índices
+# idx_jogo_casa, idx_dej_equipa, idx_dpj_jogador e pela chave primária de xg_jogo/odds.
+DUPLICATE_KEYS = {
+    'jogo': (('data_jogo', 'id_equipa_casa', 'id_equipa_fora'), ('data', 'int', 'int'),
+             'id_equipa_casa', 'data_jogo'),
+    'desempenho_equipa_jogo': (('id_jogo', 'id_equipa'), ('int', 'int'), 'id_equipa', 'id_jogo'),
+    'desempenho_jogador_jogo': (('id_jogo', 'id_jogador'), ('int', 'int'), 'id_jogador', 'id_jogo'),
+    'xg_jogo': (('id_jogo', 'id_equipa'), ('int', 'int'), 'id_jogo', None),
+    'odds': (('id_jogo', 'casa_apostas'), ('int', 'texto'), 'id_jogo', None)
+}
+
+VALIDATED_TABLES = (set(REQUIRED_COLUMNS) | set(DATE_COLUMNS) | set(RANGE_RULES) | set(CONSISTENCY_RULES)
+                    | set(DUPLICATE_KEYS))
+
+_numpy_warned = False
+
+
+def _numpy():
+    global _numpy_warned
+    try:
+        import numpy as np
+    except ImportError:
+        if not _numpy_warned:
+            logger.warning("numpy não está instalado: as linhas são inseridas sem validação")
+            _numpy_warned = True
+        return None
+    return np
+
+
+class _Columns:
+    """Colunas de um lote convertidas (uma vez) em arrays: numéricas com NaN para NULL, texto com ''."""
+
+    def __init__(self, colunas: Sequence[str], linhas: List[tuple], np):
+        self.np = np
+        self.linhas = linhas
+        self.index = {c: i for i, c in enumerate(colunas)}
+        self._transposed: Optional[List[tuple]] = None
+        self._numeric: Dict[str, object] = {}
+        self._text: Dict[Tuple[str, Optional[int]], object] = {}
+        self._invalid_dates: Dict[str, object] = {}
+        # Máscaras de valores que não são números, por coluna
+        self.nao_numericos: Dict[str, object] = {}
+
+    def __contains__(self, coluna: str) -> bool:
+        return coluna in self.index
+
+    def values(self, coluna: str) -> tuple:
+        if self._transposed is None:
+            # Linhas -> colunas de uma só vez (zip em C, em vez de um ciclo por coluna)
+            self._transposed = list(zip(*self.linhas))
+        return self._transposed[self.index[coluna]]
+
+    def numeric(self, coluna: str):
+        array = self._numeric.get(coluna)
+        if array is None:
+            np = self.np
+            valores = self.values(coluna)
+            try:
+                array = np.array(valores, dtype=float)
+            except (TypeError, ValueError):
+                # Texto (ex.: CSV) ou valores inválidos: conversão valor a valor
+                array = np.empty(len(valores))
+                invalidos = np.zeros(len(valores), dtype=bool)
+                for i, valor in enumerate(valores):
+                    try:
+                        array[i] = float(valor) if valor is not None and valor != '' else np.nan
+                    except (TypeError, ValueError):
+                        array[i] = np.nan
+                        invalidos[i] = True
+                if invalidos.any():
+                    self.nao_numericos[coluna] = invalidos
+            self._numeric[coluna] = array
+        return array
+
+    def text(self, coluna: str, tamanho: Optional[int] = None):
+        array = self._text.get((coluna, tamanho))
+        if array is None:
+            array = self.np.array(['' if v is None else str(v)[:tamanho] for v in self.values(coluna)])
+            self._text[(coluna, tamanho)] = array
+        return array
+
+    def invalid_dates(self, coluna: str):
+        """Máscara das datas presentes que não são AAAA-MM-DD válidas."""
+        invalidas = self._invalid_dates.get(coluna)
+        if invalidas is None:
+            np = self.np
+            datas = self.text(coluna, 10)
+            # O numpy também aceita '2024' ou '2024-01': exige-se o formato completo
+            invalidas = (np.char.str_len(datas) != 10) & (datas != '')
+            try:
+                # '' passa a NaT; basta uma data inválida para a conversão do array falhar
+                np.array(datas[~invalidas], dtype='datetime64[D]')
+            except ValueError:
+                for i, data in enumerate(datas):
+                    try:
+                        if data:
+                            datetime.date.fromisoformat(data)
+                    except ValueError:
+                        invalidas[i] = True
+            self._invalid_dates[coluna] = invalidas
+        return invalidas
+
+    def missing(self, coluna: str):
+        return self.np.array([v is None or v == '' for v in self.values(coluna)], dtype=bool)
+
+
+def _next_day(data: str) -> str:
+    return (datetime.date.fromisoformat(data) + datetime.timedelta(days=1)).isoformat()
+
+
+def _existing_keys(conn, tabela: str, colunas: Sequence[str], pesquisa: str, valores: List,
+                   intervalo: Optional[Tuple[str, object, object]]) -> List[tuple]:
+    """Chaves já gravadas com `pesquisa` num dos valores do lote (e dentro do intervalo do lote)."""
+    cursor = conn.cursor()
+    existentes = []
+    for inicio in range(0, len(valores), LOOKUP_CHUNK):
+        chunk = valores[inicio:inicio + LOOKUP_CHUNK]
+        query = (f"SELECT {', '.join(colunas)} FROM {tabela} "
+                 f"WHERE {pesquisa} IN ({', '.join('?' for _ in chunk)})")
+        params = list(chunk)
+        if intervalo is not None:
+            coluna, minimo, maximo = intervalo
+            query += f" AND {coluna} >= ? AND {coluna} < ?"
+            params += [minimo, maximo]
+        cursor.execute(query, params)
+        existentes.extend(cursor.fetchall())
+    return existentes
+
+
+def _key_arrays(cols: _Columns, colunas: Sequence[str], tipos: Sequence[str]):
+    """Colunas da chave do lote (ids numéricos, datas AAAA-MM-DD, texto) e máscara das chaves completas."""
+    np = cols.np
+    arrays = []
+    completas = np.ones(len(cols.linhas), dtype=bool)
+    for coluna, tipo in zip(colunas, tipos):
+        if tipo == 'int':
+            array = cols.numeric(coluna)
+            completas &= ~np.isnan(array)
+        elif tipo == 'data':
+            array = cols.text(coluna, 10)
+            completas &= (array != '') & ~cols.invalid_dates(coluna)
+        else:
+            array = cols.text(coluna)
+        arrays.append(array)
+    return arrays, completas
+
+
+def _stored_key_arrays(existentes: List[tuple], tipos: Sequence[str], np):
+    arrays = []
+    for valores, tipo in zip(zip(*existentes), tipos):
+        if tipo == 'int':
+            arrays.append(np.array([np.nan if v is None else float(v) for v in valores]))
+        else:
+            arrays.append(np.array(['' if v is None else str(v)[:10 if tipo == 'data' else None]
+                                    for v in valores]))
+    return arrays
+
+
+def _duplicates(conn, tabela: str, cols: _Columns, np):
+    """Máscara das linhas cuja chave natural já apareceu antes no lote ou já está gravada."""
+    colunas, tipos, pesquisa, coluna_intervalo = DUPLICATE_KEYS[tabela]
+    if any(c not in cols for c in colunas):
+        return None
+    # Linhas com a chave incompleta ou inválida são tratadas pelas outras regras
+    lote, completas = _key_arrays(cols, colunas, tipos)
+    if not completas.any():
+        return None
+
+    posicao = colunas.index(pesquisa)
+    valores_pesquisa = lote[posicao][completas]
+    valores_pesquisa = [int(v) for v in np.unique(valores_pesquisa)] if tipos[posicao] == 'int' \
+        else list(np.unique(valores_pesquisa))
+    intervalo = None
+    if coluna_intervalo is not None:
+        array = lote[colunas.index(coluna_intervalo)][completas]
+        if tipos[colunas.index(coluna_intervalo)] == 'data':
+            datas = np.unique(array)
+            intervalo = (coluna_intervalo, str(datas[0]), _next_day(str(datas[-1])))
+        else:
+            intervalo = (coluna_intervalo, int(array.min()), int(array.max()) + 1)
+    existentes = _existing_keys(conn, tabela, colunas, pesquisa, valores_pesquisa, intervalo)
+    gravadas = _stored_key_arrays(existentes, tipos, np) if existentes else [a[:0] for a in lote]
+
+    # Chave composta num só inteiro: códigos de cada coluna (np.unique) em base mista
+    codigo = np.zeros(len(existentes) + int(completas.sum()), dtype=np.int64)
+    for anterior, atual in zip(gravadas, lote):
+        valores, inverso = np.unique(np.concatenate([anterior, atual[completas]]), return_inverse=True)
+        codigo = codigo * len(valores) + inverso.reshape(-1)
+    # return_index devolve a primeira ocorrência: as gravadas vêm antes das do lote
+    primeiras = np.zeros(len(codigo), dtype=bool)
+    primeiras[np.unique(codigo, return_index=True)[1]] = True
+    duplicadas = np.zeros(len(cols.linhas), dtype=bool)
+    duplicadas[completas] = ~primeiras[len(existentes):]
+    return duplicadas
+
+
+def validate_batch(conn, tabela: str, colunas: Sequence[str],
+                   linhas: List[tuple]) -> Tuple[List[tuple], List[Tuple[tuple, str]]]:
+    """Separa um lote em linhas válidas e rejeitadas [(linha, motivos)].
+
+    As linhas estão na ordem de `colunas`; a consulta de duplicados usa a
+    ligação (e vê as linhas já inseridas na mesma transação).
+    """
+    if tabela not in VALIDATED_TABLES or not linhas:
+        return linhas, []
+    np = _numpy()
+    if np is None:
+        return linhas, []
+
+    cols = _Columns(colunas, linhas, np)
+    falhas: List[Tuple[object, str]] = []
+
+    for coluna in REQUIRED_COLUMNS.get(tabela, ()):
+        if coluna in cols:
+            falhas.append((cols.missing(coluna), f"{coluna} em falta"))
+        else:
+            falhas.append((np.ones(len(linhas), dtype=bool), f"{coluna} em falta"))
+
+    for coluna in DATE_COLUMNS.get(tabela, ()):
+        if coluna in cols:
+            falhas.append((cols.invalid_dates(coluna), f"{coluna} não é uma data"))
+
+    for coluna, (minimo, maximo) in RANGE_RULES.get(tabela, {}).items():
+        if coluna in cols:
+            valores = cols.numeric(coluna)
+            falhas.append(((valores < minimo) | (valores > maximo), f"{coluna} fora de [{minimo}, {maximo}]"))
+
+    for numericas, textos, regra, motivo in CONSISTENCY_RULES.get(tabela, ()):
+        if all(c in cols for c in numericas + textos):
+            valores = {c: cols.numeric(c) for c in numericas}
+            valores.update({c: cols.text(c, 10) for c in textos})
+            falhas.append((regra(valores, np), motivo))
+
+    if tabela in DUPLICATE_KEYS:
+        duplicadas = _duplicates(conn, tabela, cols, np)
+        if duplicadas is not None:
+            falhas.append((duplicadas, 'duplicado'))
+
+    for coluna, invalidos in cols.nao_numericos.items():
+        falhas.append((invalidos, f"{coluna} não numérico"))
+
+    if not falhas:
+        return linhas, []
+    invalidas = np.logical_or.reduce([mascara for mascara, _ in falhas])
+    if not invalidas.any():
+        return linhas, []
+
+    # Só as (poucas) linhas rejeitadas são percorridas uma a uma
+    rejeitadas = [(linhas[i], '; '.join(motivo for mascara, motivo in falhas if mascara[i]))
+                  for i in np.flatnonzero(invalidas)]
+    validas = [linhas[i] for i in np.flatnonzero(~invalidas)]
+    return validas, rejeitadas
+
+
+def quarantine(storage, conn, tabela: str, colunas: Sequence[str], rejeitadas: List[Tuple[tuple, str]]) -> int:
+    """Grava as linhas rejeitadas na tabela quarentena (na transação da ingestão)."""
+    linhas = [(tabela, json.dumps(dict(zip(colunas, linha)), ensure_ascii=False, default=str), motivos)
+              for linha, motivos in rejeitadas]
+    return storage.bulk_insert(conn, QUARANTINE_TABLE, ['tabela', 'dados', 'motivos'], linhas)
+
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Instrumentação do Motor de Previsão
+Autor: Manus AI
+Data: 19/10/2026
+
+Temporizadores e contadores por componente da previsão (força da equipa,
+jogadores, lesões, confrontos diretos, casa/fora, nomes), contagem e duração das
+consultas SQL atribuídas ao componente ativo, e um gancho opcional de profiling
+(cProfile ou pyinstrument). Os resultados exportam-se em JSON ou no formato de
+texto do Prometheus.
+
+Quando desativada, a instrumentação devolve um temporizador nulo partilhado e
+ligações SQLite normais, pelo que o custo é de uma verificação por chamada.
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+NO_COMPONENT = 'outros'
+
+
+class _NullTimer:
+    """Temporizador sem efeito, usado quando a instrumentação está desativada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Mede a duração de um componente e torna-o o componente ativo da thread."""
+
+    def __init__(self, metrics: 'Metrics', component: str):
+        self.metrics = metrics
+        self.component = component
+
+    def __enter__(self):
+        self.metrics._stack().append(self.component)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.metrics._stack().pop()
+        self.metrics._record_component(self.component, elapsed)
+        return False
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor SQLite que regista a duração de cada consulta."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.connection.metrics.record_query(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.connection.metrics.record_query(sql, time.perf_counter() - start)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Ligação SQLite cujos cursores são instrumentados."""
+
+    metrics = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class Metrics:
+    """Recolha de tempos, contadores e estatísticas SQL por componente."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Limpa todos os valores recolhidos."""
+        with self._lock:
+            self.components: Dict[str, Dict] = {}
+            self.counters: Dict[str, int] = {}
+            self.queries: Dict[str, Dict] = {}
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def timer(self, component: str):
+        """Context manager que mede a duração de um componente."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, component)
+
+    def count(self, name: str, value: int = 1):
+        """Incrementa um contador."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def connect(self, db_path: str, **kwargs) -> sqlite3.Connection:
+        """Abre uma ligação SQLite, instrumentada se a recolha estiver ativa."""
+        if not self.enabled:
+            return sqlite3.connect(db_path, **kwargs)
+        conn = sqlite3.connect(db_path, factory=InstrumentedConnection, **kwargs)
+        conn.metrics = self
+        return conn
+
+    def _record_component(self, component: str, elapsed: float):
+        with self._lock:
+            stats = self.components.setdefault(component, {
+                'chamadas': 0, 'segundos': 0.0, 'max_segundos': 0.0,
+                'consultas_sql': 0, 'segundos_sql': 0.0
+            })
+            stats['chamadas'] += 1
+            stats['segundos'] += elapsed
+            stats['max_segundos'] = max(stats['max_segundos'], elapsed)
+
+    def record_query(self, sql: str, elapsed: float):
+        """Regista uma consulta SQL e atribui-a ao componente ativo."""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        component = stack[-1] if stack else NO_COMPONENT
+        statement = ' '.join(sql.split())[:80]
+
+        with self._lock:
+            stats = self.components.setdefault(component, {
+                'chamadas': 0, 'segundos': 0.0, 'max_segundos': 0.0,
+                'consultas_sql': 0, 'segundos_sql': 0.0
+            })
+            stats['consultas_sql'] += 1
+            stats['segundos_sql'] += elapsed
+
+            query = self.queries.setdefault(statement, {'chamadas': 0, 'segundos': 0.0})
+            query['chamadas'] += 1
+            query['segundos'] += elapsed
+
+    def report(self) -> Dict:
+        """Devolve um relatório com os valores recolhidos."""
+        with self._lock:
+            components = {}
+            for name, stats in self.components.items():
+                calls = stats['chamadas'] or 1
+                components[name] = {
+                    'chamadas': stats['chamadas'],
+                    'segundos_total': round(stats['segundos'], 6),
+                    'media_ms': round(stats['segundos'] * 1000 / calls, 4),
+                    'max_ms': round(stats['max_segundos'] * 1000, 4),
+                    'consultas_sql': stats['consultas_sql'],
+                    'consultas_por_chamada': round(stats['consultas_sql'] / calls, 2),
+                    'segundos_sql': round(stats['segundos_sql'], 6)
+                }
+            queries = {
+                sql: {'chamadas': q['chamadas'], 'segundos_total': round(q['segundos'], 6)}
+                for sql, q in sorted(self.queries.items(), key=lambda item: -item[1]['segundos'])
+            }
+            return {
+                'componentes': components,
+                'contadores': dict(self.counters),
+                'consultas_sql': queries
+            }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Exporta o relatório em JSON."""
+        return json.dumps(self.report(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = 'football') -> str:
+        """Exporta o relatório no formato de texto do Prometheus."""
+        report = self.report()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+
+        components = report['componentes']
+        metric('component_calls_total', 'counter', 'Chamadas por componente da previsão.',
+               [(f'component="{c}"', s['chamadas']) for c, s in components.items()])
+        metric('component_seconds_total', 'counter', 'Tempo total por componente da previsão.',
+               [(f'component="{c}"', s['segundos_total']) for c, s in components.items()])
+        metric('sql_queries_total', 'counter', 'Consultas SQL por componente.',
+               [(f'component="{c}"', s['consultas_sql']) for c, s in components.items()])
+        metric('sql_seconds_total', 'counter', 'Tempo em consultas SQL por componente.',
+               [(f'component="{c}"', s['segundos_sql']) for c, s in components.items()])
+        if report['contadores']:
+            metric('events_total', 'counter', 'Contadores de eventos.',
+                   [(f'name="{n}"', v) for n, v in report['contadores'].items()])
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def profile(output: Optional[str] = None, tool: str = 'cprofile'):
+    """Faz o profiling do bloco com cProfile ou pyinstrument.
+
+    Com output, grava as estatísticas (.prof para cProfile, .html para
+    pyinstrument); sem output, imprime o resumo em stderr.
+    """
+    if tool == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("O profiling com pyinstrument requer o pacote 'pyinstrument' (pip install pyinstrument)")
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            if output:
+                with open(output, 'w', encoding='utf-8') as f:
+                    f.write(profiler.output_html())
+            else:
+                sys.stderr.write(profiler.output_text())
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if output:
+            profiler.dump_stats(output)
+            logger.info(f"Estatísticas de profiling gravadas em {output}")
+        else:
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Previsões ao Vivo (In-Play)
+Autor: Manus AI
+Data: 19/10/2026
+
+Atualiza as probabilidades de vitória/empate/derrota durante o jogo a partir da
+previsão pré-jogo e do estado atual (resultado, minuto, expulsões), consumindo
+um fluxo de eventos (golos, cartões vermelhos, substituições, minutos) de uma
+asyncio.Queue ou de um socket TCP com um evento JSON por linha.
+
+Modelo: a previsão pré-jogo é convertida em taxas de golos de Poisson para cada
+equipa (total e superioridade ajustados para reproduzir as três probabilidades
+pré-jogo ao minuto 0); em cada evento, os golos que faltam seguem Poisson com a taxa
+proporcional ao tempo restante (ajustada pelas expulsões) e as probabilidades
+finais obtêm-se somando sobre os resultados possíveis. Cada atualização custa
+algumas dezenas de microssegundos, pelo que um único processo asyncio acompanha
+centenas de jogos em simultâneo.
+
+Formato dos eventos:
+    {"id_jogo": 31, "tipo": "golo", "equipa": "casa", "minuto": 23}
+    tipos: inicio, minuto, golo, vermelho, substituicao, fim
+"""
+
+import json
+import math
+import time
+import asyncio
+from typing import Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+MATCH_MINUTES = 90
+MAX_GOALS = 10
+# Intervalo do total de golos esperado no ajuste pré-jogo: probabilidades de empate
+# fora do que estes totais permitem ficam com o total do extremo mais próximo
+MIN_TOTAL_GOALS = 0.05
+MAX_TOTAL_GOALS = 30.0
+FIT_ITERATIONS = 30
+
+# Efeito de cada expulsão nas taxas de golos (equipa com menos um / adversário)
+RED_CARD_OWN_FACTOR = 0.70
+RED_CARD_OPPONENT_FACTOR = 1.25
+
+# As substituições só avançam o minuto (não mudam as taxas de golos)
+EVENT_TYPES = ('inicio', 'minuto', 'golo', 'vermelho', 'substituicao', 'fim')
+
+
+def _poisson_pmf(lam: float, max_goals: int = MAX_GOALS) -> List[float]:
+    """Probabilidades de Poisson para 0..n golos (n cobre a cauda de taxas altas)."""
+    max_goals = max(max_goals, int(lam + 10 * math.sqrt(lam)) + 1)
+    pmf = [math.exp(-lam)]
+    for k in range(1, max_goals + 1):
+        pmf.append(pmf[-1] * lam / k)
+    return pmf
+
+
+def outcome_probabilities(lam_casa: float, lam_fora: float, diferenca: int = 0) -> Tuple[float, float, float]:
+    """Probabilidades (casa, empate, fora) dados os golos que faltam e a diferença atual."""
+    pmf_casa = _poisson_pmf(lam_casa)
+    pmf_fora = _poisson_pmf(lam_fora)
+
+    # Acumulada dos golos de fora: P(fora <= k)
+    cdf_fora = []
+    acumulado = 0.0
+    for p in pmf_fora:
+        acumulado += p
+        cdf_fora.append(acumulado)
+    n_fora = len(pmf_fora)
+    total_fora = cdf_fora[-1]
+
+    prob_casa = prob_empate = 0.0
+    for i, p_i in enumerate(pmf_casa):
+        # Empate com j = diferenca + i; vitória da casa com j < diferenca + i
+        k = diferenca + i
+        if k >= n_fora:
+            prob_casa += p_i * total_fora
+            continue
+        if k >= 0:
+            prob_empate += p_i * pmf_fora[k]
+        if k >= 1:
+            prob_casa += p_i * cdf_fora[k - 1]
+
+    total = sum(pmf_casa) * total_fora
+    prob_fora = total - prob_casa - prob_empate
+    return prob_casa / total, prob_empate / total, prob_fora / total
+
+
+def _fit_share(prob_casa: float, prob_fora: float, total_golos: float) -> Tuple[float, float]:
+    """Taxas (casa, fora) com o total dado e P(casa) - P(fora) igual à previsão (bisseção)."""
+    target = prob_casa - prob_fora
+    low, high = 0.0, 1.0
+    for _ in range(FIT_ITERATIONS):
+        mid = (low + high) / 2
+        p_casa, _, p_fora = outcome_probabilities(total_golos * mid, total_golos * (1 - mid))
+        if p_casa - p_fora < target:
+            low = mid
+        else:
+            high = mid
+    share = (low + high) / 2
+    return total_golos * share, total_golos * (1 - share)
+
+
+def prematch_goal_rates(prob_casa: float, prob_empate: float, prob_fora: float) -> Tuple[float, float]:
+    """Converte probabilidades pré-jogo em taxas de golos de Poisson (casa, fora).
+
+    O total esperado de golos é ajustado por bisseção para que P(empate)
+    coincida com a previsão (o empate diminui com o total) e, para cada total,
+    a superioridade é ajustada para que P(casa) - P(fora) coincida. Ao minuto
+    0, o estado reproduz assim as três probabilidades pré-jogo.
+    """
+    total = prob_casa + prob_empate + prob_fora
+    prob_casa, prob_empate, prob_fora = prob_casa / total, prob_empate / total, prob_fora / total
+
+    # Bisseção em escala logarítmica: o total varia em várias ordens de grandeza
+    low, high = math.log(MIN_TOTAL_GOALS), math.log(MAX_TOTAL_GOALS)
+    for _ in range(FIT_ITERATIONS):
+        mid = (low + high) / 2
+        lam_casa, lam_fora = _fit_share(prob_casa, prob_fora, math.exp(mid))
+        if outcome_probabilities(lam_casa, lam_fora)[1] > prob_empate:
+            low = mid
+        else:
+            high = mid
+    return _fit_share(prob_casa, prob_fora, math.exp((low + high) / 2))
+
+
+class LiveMatch:
+    """Estado de um jogo em curso."""
+
+    __slots__ = ('id_jogo', 'lam_casa', 'lam_fora', 'minuto', 'golos_casa', 'golos_fora',
+                 'vermelhos_casa', 'vermelhos_fora', 'terminado', 'eventos')
+
+    def __init__(self, id_jogo: int, lam_casa: float, lam_fora: float):
+        self.id_jogo = id_jogo
+        self.lam_casa = lam_casa
+        self.lam_fora = lam_fora
+        self.minuto = 0
+        self.golos_casa = 0
+        self.golos_fora = 0
+        self.vermelhos_casa = 0
+        self.vermelhos_fora = 0
+        self.terminado = False
+        self.eventos = 0
+
+    def apply(self, event: Dict):
+        """Aplica um evento ao estado do jogo."""
+        tipo = event.get('tipo')
+        if tipo not in EVENT_TYPES:
+            raise ValueError(f"Tipo de evento desconhecido: {tipo}")
+
+        if 'minuto' in event:
+            self.minuto = max(self.minuto, min(int(event['minuto']), MATCH_MINUTES))
+        equipa = event.get('equipa')
+
+        if tipo == 'golo':
+            if equipa == 'casa':
+                self.golos_casa += 1
+            elif equipa == 'fora':
+                self.golos_fora += 1
+            else:
+                raise ValueError("Evento de golo sem equipa ('casa' ou 'fora')")
+        elif tipo == 'vermelho':
+            if equipa == 'casa':
+                self.vermelhos_casa += 1
+            elif equipa == 'fora':
+                self.vermelhos_fora += 1
+            else:
+                raise ValueError("Evento de cartão vermelho sem equipa ('casa' ou 'fora')")
+        elif tipo == 'fim':
+            self.minuto = MATCH_MINUTES
+            self.terminado = True
+
+        self.eventos += 1
+
+    def probabilities(self) -> Tuple[float, float, float]:
+        """Probabilidades (casa, empate, fora) para o estado atual."""
+        diferenca = self.golos_casa - self.golos_fora
+        if self.terminado:
+            return (1.0, 0.0, 0.0) if diferenca > 0 else ((0.0, 0.0, 1.0) if diferenca < 0 else (0.0, 1.0, 0.0))
+
+        restante = (MATCH_MINUTES - self.minuto) / MATCH_MINUTES
+        lam_casa = (self.lam_casa * restante *
+                    RED_CARD_OWN_FACTOR ** self.vermelhos_casa * RED_CARD_OPPONENT_FACTOR ** self.vermelhos_fora)
+        lam_fora = (self.lam_fora * restante *
+                    RED_CARD_OWN_FACTOR ** self.vermelhos_fora * RED_CARD_OPPONENT_FACTOR ** self.vermelhos_casa)
+        return outcome_probabilities(lam_casa, lam_fora, diferenca)
+
+    def snapshot(self) -> Dict:
+        prob_casa, prob_empate, prob_fora = self.probabilities()
+        return {
+            'id_jogo': self.id_jogo,
+            'minuto': self.minuto,
+            'resultado': f"{self.golos_casa}-{self.golos_fora}",
+            'vermelhos': {'casa': self.vermelhos_casa, 'fora': self.vermelhos_fora},
+            'terminado': self.terminado,
+            'probabilidades': {
+                'vitoria_casa': round(prob_casa * 100, 1),
+                'empate': round(prob_empate * 100, 1),
+                'vitoria_fora': round(prob_fora * 100, 1)
+            }
+        }
+
+
+class LivePredictionManager:
+    """Acompanha vários jogos ao vivo e publica as probabilidades atualizadas."""
+
+    def __init__(self):
+        self.matches: Dict[int, LiveMatch] = {}
+        self._subscribers: List[asyncio.Queue] = []
+
+    def register_match(self, id_jogo: int, prob_casa: float, prob_empate: float, prob_fora: float):
+        """Regista um jogo a partir das probabilidades pré-jogo (0-1 ou percentagens)."""
+        lam_casa, lam_fora = prematch_goal_rates(prob_casa, prob_empate, prob_fora)
+        self.matches[id_jogo] = LiveMatch(id_jogo, lam_casa, lam_fora)
+
+    def register_prediction(self, prediction):
+        """Regista um jogo a partir de uma MatchPrediction ou do dicionário de iter_daily_analysis."""
+        if hasattr(prediction, 'prob_casa'):
+            self.register_match(prediction.id_jogo, prediction.prob_casa, prediction.prob_empate, prediction.prob_fora)
+            return
+        probabilidades = prediction['probabilidades']
+        self.register_match(prediction['id_jogo'], probabilidades['vitoria_casa'],
+                            probabilidades['empate'], probabilidades['vitoria_fora'])
+
+    def load_prematch(self, engine, data_analise: str) -> int:
+        """Regista todos os jogos agendados numa data com as previsões do motor."""
+        total = 0
+        for prediction in engine.iter_predictions(data_analise):
+            self.register_prediction(prediction)
+            total += 1
+        logger.info(f"{total} jogos registados para acompanhamento ao vivo")
+        return total
+
+    def subscribe(self, maxsize: int = 1000) -> asyncio.Queue:
+        """Devolve uma fila que recebe cada atualização publicada."""
+        queue = asyncio.Queue(maxsize)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def process_event(self, event: Dict) -> Dict:
+        """Aplica um evento, publica e devolve a atualização do jogo."""
+        start = time.perf_counter()
+        match = self.matches.get(event.get('id_jogo'))
+        if match is None:
+            raise ValueError(f"Jogo {event.get('id_jogo')} não está registado")
+
+        match.apply(event)
+        update = match.snapshot()
+        update['evento'] = event.get('tipo')
+        update['latencia_ms'] = round((time.perf_counter() - start) * 1000, 3)
+
+        for queue in self._subscribers:
+            if queue.full():
+                # Subscritores lentos perdem a atualização mais antiga, não bloqueiam o fluxo
+                queue.get_nowait()
+            queue.put_nowait(update)
+
+        if match.terminado:
+            del self.matches[match.id_jogo]
+        return update
+
+    async def consume(self, events: asyncio.Queue):
+        """Consome eventos de uma fila até receber None."""
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            try:
+                self.process_event(event)
+            except (ValueError, TypeError, KeyError) as e:
+                # Um evento malformado (ex.: minuto em falta ou não numérico) não pára o consumidor
+                logger.warning(f"Evento ignorado: {e!r}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Lê eventos JSON (um por linha) e responde com a atualização correspondente."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    update = self.process_event(json.loads(line))
+                except (ValueError, TypeError, KeyError) as e:
+                    update = {'erro': str(e)}
+                writer.write(json.dumps(update, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765):
+        """Aceita eventos por socket TCP (um evento JSON por linha)."""
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info(f"Servidor de eventos ao vivo em {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import sys
+    import datetime
+    from prediction_engine import FootballPredictionEngine
+
+    data_analise = sys.argv[1] if len(sys.argv) > 1 else datetime.date.today().isoformat()
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+
+    manager = LivePredictionManager()
+    manager.load_prematch(FootballPredictionEngine(), data_analise)
+    print(f"{len(manager.matches)} jogos ao vivo | eventos JSON em 127.0.0.1:{port}")
+    asyncio.run(manager.serve(port=port))
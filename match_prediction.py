@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Resultado Compacto de uma Previsão
+Autor: Manus AI
+Data: 19/10/2026
+
+MatchPrediction guarda as probabilidades e os componentes da análise como
+floats sem arredondar, num objeto com __slots__. O dicionário aninhado de
+predict_match (valores arredondados e previsão principal em texto) e o JSON só
+são gerados quando pedidos, pelo que lotes e backtests que apenas leem as
+probabilidades não criam dicionários nem strings por jogo.
+"""
+
+import json
+from typing import Dict, Optional, Sequence, Tuple
+
+# Ordem dos componentes em MatchPrediction.componentes (chaves de analise_detalhada)
+COMPONENT_KEYS = (
+    'forca_equipa_casa', 'forca_equipa_fora',
+    'impacto_jogadores_casa', 'impacto_jogadores_fora',
+    'impacto_lesoes_casa', 'impacto_lesoes_fora',
+    'fator_confrontos_diretos_casa', 'fator_confrontos_diretos_fora',
+    'fator_casa', 'fator_fora',
+    'descanso_casa', 'descanso_fora',
+    'congestao_casa', 'congestao_fora',
+    'viagem_casa', 'viagem_fora'
+)
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+class MatchPrediction:
+    """Previsão de um jogo: probabilidades 0-1, componentes e pontuações (opcionais)."""
+
+    __slots__ = ('equipa_casa', 'equipa_fora', 'prob_casa', 'prob_empate', 'prob_fora',
+                 'componentes', 'pontuacao', 'modelo', 'id_jogo', 'data_jogo')
+
+    def __init__(self, equipa_casa: str, equipa_fora: str, prob_casa: float, prob_empate: float,
+                 prob_fora: float, componentes: Optional[Sequence[float]] = None,
+                 pontuacao: Optional[Tuple[float, float]] = None, modelo: Optional[str] = None,
+                 id_jogo: Optional[int] = None, data_jogo: Optional[str] = None):
+        self.equipa_casa = equipa_casa
+        self.equipa_fora = equipa_fora
+        self.prob_casa = prob_casa
+        self.prob_empate = prob_empate
+        self.prob_fora = prob_fora
+        self.componentes = componentes
+        self.pontuacao = pontuacao
+        self.modelo = modelo
+        self.id_jogo = id_jogo
+        self.data_jogo = data_jogo
+
+    @property
+    def resultado_previsto(self) -> str:
+        """'casa', 'empate' ou 'fora' (o empate ganha as igualdades com a vitória de fora)."""
+        if self.prob_casa > self.prob_fora and self.prob_casa > self.prob_empate:
+            return 'casa'
+        if self.prob_fora > self.prob_empate:
+            return 'fora'
+        return 'empate'
+
+    @property
+    def confianca(self) -> float:
+        """Probabilidade (0-1) do resultado previsto."""
+        return {'casa': self.prob_casa, 'empate': self.prob_empate, 'fora': self.prob_fora}[self.resultado_previsto]
+
+    @property
+    def previsao_principal(self) -> str:
+        resultado = self.resultado_previsto
+        if resultado == 'casa':
+            return f"Vitória {self.equipa_casa}"
+        if resultado == 'fora':
+            return f"Vitória {self.equipa_fora}"
+        return "Empate"
+
+    def to_dict(self) -> Dict:
+        """Dicionário no formato de predict_match (percentagens com uma casa decimal)."""
+        result = {
+            'equipa_casa': self.equipa_casa,
+            'equipa_fora': self.equipa_fora,
+            'previsao_principal': self.previsao_principal,
+            'confianca': round(self.confianca * 100, 1),
+            'probabilidades': {
+                'vitoria_casa': round(self.prob_casa * 100, 1),
+                'empate': round(self.prob_empate * 100, 1),
+                'vitoria_fora': round(self.prob_fora * 100, 1)
+            }
+        }
+        if self.componentes is not None:
+            result['analise_detalhada'] = {
+                key: round(value, 3) for key, value in zip(COMPONENT_KEYS, self.componentes)
+            }
+        if self.pontuacao is not None:
+            result['pontuacao_final'] = {'casa': round(self.pontuacao[0], 3), 'fora': round(self.pontuacao[1], 3)}
+        if self.modelo is not None:
+            result['modelo'] = self.modelo
+        if self.id_jogo is not None:
+            result['id_jogo'] = self.id_jogo
+            result['data_jogo'] = self.data_jogo
+        return result
+
+    def to_json(self) -> str:
+        """O mesmo que json.dumps(to_dict(), ensure_ascii=False), sem criar os dicionários."""
+        parts = [
+            f'{{"equipa_casa": {_encode(self.equipa_casa)}, "equipa_fora": {_encode(self.equipa_fora)}, '
+            f'"previsao_principal": {_encode(self.previsao_principal)}, '
+            f'"confianca": {round(self.confianca * 100, 1)!r}, '
+            f'"probabilidades": {{"vitoria_casa": {round(self.prob_casa * 100, 1)!r}, '
+            f'"empate": {round(self.prob_empate * 100, 1)!r}, '
+            f'"vitoria_fora": {round(self.prob_fora * 100, 1)!r}}}'
+        ]
+        if self.componentes is not None:
+            parts.append(', "analise_detalhada": {' + ', '.join(
+                f'"{key}": {round(value, 3)!r}' for key, value in zip(COMPONENT_KEYS, self.componentes)
+            ) + '}')
+        if self.pontuacao is not None:
+            parts.append(f', "pontuacao_final": {{"casa": {round(self.pontuacao[0], 3)!r}, '
+                         f'"fora": {round(self.pontuacao[1], 3)!r}}}')
+        if self.modelo is not None:
+            parts.append(f', "modelo": {_encode(self.modelo)}')
+        if self.id_jogo is not None:
+            parts.append(f', "id_jogo": {_encode(self.id_jogo)}, "data_jogo": {_encode(self.data_jogo)}')
+        parts.append('}')
+        return ''.join(parts)
+
+    def __repr__(self) -> str:
+        return (f"MatchPrediction({self.equipa_casa!r} vs {self.equipa_fora!r}: "
+                f"{self.prob_casa:.3f}/{self.prob_empate:.3f}/{self.prob_fora:.3f})")
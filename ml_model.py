@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Modelo de Aprendizagem Automática (1X2)
+Autor: Manus AI
+Data: 19/10/2026
+
+Alternativa às ponderações fixas do motor: um classificador multinomial
+(vitória da casa, empate, vitória de fora) treinado sobre os jogos finalizados.
+
+Features de cada equipa (sem fuga de informação: só jogos anteriores ao jogo):
+- médias dos últimos `janela` jogos (golos, remates, posse, cartões, clean sheets,
+  pontos) e o número desses jogos
+- pontos por jogo nos últimos `janela` jogos em casa (equipa da casa) ou fora
+- lesionados ativos na data do jogo
+- força da equipa, com a fórmula de calculate_team_strength
+mais a diferença média de golos nos últimos confrontos diretos.
+
+A matriz de treino é construída numa única consulta com funções de janela, pelo
+que o custo é o de uma passagem ordenada pela tabela de desempenhos. Nas
+previsões, as features são as atuais (últimos jogos finalizados) e são lidas
+por blocos de jogos.
+
+Backends, por ordem de preferência com 'auto': LightGBM e scikit-learn
+(gradient boosting), se instalados, ou regressão logística multinomial em numpy.
+O modelo numpy é guardado em JSON; os restantes com pickle (carregar apenas
+ficheiros de confiança).
+"""
+
+import json
+import time
+import pickle
+import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('auto', 'lightgbm', 'sklearn', 'numpy')
+OUTCOMES = ('casa', 'empate', 'fora')
+
+TEAM_WINDOW = 10  # a mesma janela de get_team_performance
+H2H_WINDOW = 5
+
+# Médias dos desempenhos por jogo (desempenho_equipa_jogo)
+PERFORMANCE_COLUMNS = [
+    'golos_marcados', 'golos_sofridos', 'remates_baliza', 'posse_bola',
+    'cartoes_amarelos', 'cartoes_vermelhos', 'clean_sheet'
+]
+SIDE_FEATURES = PERFORMANCE_COLUMNS + ['pontos', 'jogos', 'pontos_local', 'lesionados', 'forca']
+FEATURES = [f'{lado}_{nome}' for lado in ('casa', 'fora') for nome in SIDE_FEATURES] + ['confrontos']
+
+# Equipas por consulta nas previsões (limite de parâmetros do SQLite)
+TEAM_CHUNK = 400
+
+_POINTS = '''CASE WHEN {marcados} > {sofridos} THEN 3
+                   WHEN {marcados} = {sofridos} THEN 1 ELSE 0 END'''
+_PAIR = '''CASE WHEN id_equipa_casa < id_equipa_fora THEN id_equipa_casa ELSE id_equipa_fora END AS equipa_a,
+           CASE WHEN id_equipa_casa < id_equipa_fora THEN id_equipa_fora ELSE id_equipa_casa END AS equipa_b,
+           CASE WHEN id_equipa_casa < id_equipa_fora THEN golos_casa - golos_fora
+                ELSE golos_fora - golos_casa END AS diferenca_par'''
+_INJURED = '''(SELECT COUNT(*) FROM lesoes le JOIN jogador p ON le.id_jogador = p.id_jogador
+               WHERE p.id_equipa = {equipa} AND le.data_inicio <= l.data_jogo
+                 AND (le.data_fim_estimada IS NULL OR le.data_fim_estimada >= l.data_jogo))'''
+
+
+def _team_strength(forma: np.ndarray) -> np.ndarray:
+    """Fórmula de calculate_team_strength aplicada a médias (n, PERFORMANCE_COLUMNS)."""
+    marcados, sofridos, remates, posse, amarelos, vermelhos, clean_sheet = forma.T
+    forca = (
+        np.clip((marcados - sofridos + 3) / 6, 0, 1) * 0.4 +
+        np.minimum(remates / 10, 1) * 0.2 +
+        posse / 100 * 0.2 +
+        clean_sheet * 0.2 -
+        np.minimum((amarelos + vermelhos * 3) / 10, 0.3)
+    )
+    return np.clip(forca, 0, 1)
+
+
+def _assemble(casa: np.ndarray, fora: np.ndarray, confrontos: np.ndarray) -> np.ndarray:
+    """Junta as features de cada lado (sem a força) e acrescenta a força e os confrontos."""
+    n = len(PERFORMANCE_COLUMNS)
+    blocks = []
+    for lado in (casa, fora):
+        blocks.append(lado)
+        blocks.append(_team_strength(lado[:, :n])[:, None])
+    blocks.append(confrontos[:, None])
+    return np.hstack(blocks)
+
+
+def build_training_matrix(conn, data_inicio: str = '1900-01-01', data_fim: str = '2999-12-31',
+                          janela: int = TEAM_WINDOW) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Devolve (id_jogos, X, y) dos jogos finalizados no intervalo, por ordem cronológica.
+
+    Cada linha usa apenas os jogos anteriores (janelas ROWS ... 1 PRECEDING); os
+    jogos antes de data_inicio contam como histórico. Os lesionados usam a equipa
+    atual dos jogadores. Valores sem histórico ficam NaN (imputados pelo modelo).
+    y: 0 vitória da casa, 1 empate, 2 vitória de fora.
+    """
+    janela = int(janela)
+    frame = f'ROWS BETWEEN {janela} PRECEDING AND 1 PRECEDING'
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        WITH forma AS (
+            SELECT dej.id_jogo, dej.id_equipa,
+                {', '.join(f'AVG(dej.{c}) OVER w' for c in PERFORMANCE_COLUMNS)},
+                AVG({_POINTS.format(marcados='dej.golos_marcados', sofridos='dej.golos_sofridos')}) OVER w,
+                COUNT(*) OVER w
+            FROM desempenho_equipa_jogo dej
+            JOIN jogo j ON dej.id_jogo = j.id_jogo
+            WHERE j.status = 'finalizado'
+            WINDOW w AS (PARTITION BY dej.id_equipa ORDER BY j.data_jogo, j.id_jogo {frame})
+        ),
+        local AS (
+            SELECT id_jogo, data_jogo, id_equipa_casa, id_equipa_fora, golos_casa, golos_fora,
+                AVG(pontos_casa) OVER (PARTITION BY id_equipa_casa ORDER BY data_jogo, id_jogo {frame}) AS casa_local,
+                AVG(pontos_fora) OVER (PARTITION BY id_equipa_fora ORDER BY data_jogo, id_jogo {frame}) AS fora_local,
+                AVG(diferenca_par) OVER (
+                    PARTITION BY equipa_a, equipa_b ORDER BY data_jogo, id_jogo
+                    ROWS BETWEEN {H2H_WINDOW} PRECEDING AND 1 PRECEDING
+                ) AS confrontos_par
+            FROM (
+                SELECT id_jogo, data_jogo, id_equipa_casa, id_equipa_fora, golos_casa, golos_fora,
+                    {_POINTS.format(marcados='golos_casa', sofridos='golos_fora')} AS pontos_casa,
+                    {_POINTS.format(marcados='golos_fora', sofridos='golos_casa')} AS pontos_fora,
+                    {_PAIR}
+                FROM jogo
+                WHERE status = 'finalizado' AND golos_casa IS NOT NULL AND golos_fora IS NOT NULL
+            ) resultados
+        )
+        SELECT l.id_jogo, l.golos_casa, l.golos_fora, fc.*, l.casa_local, {_INJURED.format(equipa='l.id_equipa_casa')},
+               ff.*, l.fora_local, {_INJURED.format(equipa='l.id_equipa_fora')},
+               CASE WHEN l.id_equipa_casa < l.id_equipa_fora THEN l.confrontos_par ELSE -l.confrontos_par END
+        FROM local l
+        LEFT JOIN forma fc ON fc.id_jogo = l.id_jogo AND fc.id_equipa = l.id_equipa_casa
+        LEFT JOIN forma ff ON ff.id_jogo = l.id_jogo AND ff.id_equipa = l.id_equipa_fora
+        WHERE l.data_jogo BETWEEN ? AND ?
+        ORDER BY l.data_jogo, l.id_jogo
+    ''', (data_inicio, data_fim))
+
+    n = len(PERFORMANCE_COLUMNS) + 2  # médias, pontos e jogos
+    rows = np.array(cursor.fetchall(), dtype=float)
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(FEATURES))), np.zeros(0, dtype=np.int64)
+
+    # Colunas: id, golos, golos, [id_jogo, id_equipa, n médias/pontos/jogos, local, lesionados] x 2, confrontos
+    casa = rows[:, 5:5 + n + 2]
+    start = 5 + n + 2 + 2
+    fora = rows[:, start:start + n + 2]
+    X = _assemble(casa, fora, rows[:, -1])
+    # Sem histórico, o número de jogos é 0 e não desconhecido
+    for lado in ('casa', 'fora'):
+        col = X[:, FEATURES.index(f'{lado}_jogos')]
+        col[np.isnan(col)] = 0
+
+    diferenca = rows[:, 1] - rows[:, 2]
+    y = np.where(diferenca > 0, 0, np.where(diferenca == 0, 1, 2))
+    return rows[:, 0].astype(np.int64), X, y
+
+
+def _chunks(values: List, size: int) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _current_team_features(cursor, equipas: List[int], janela: int) -> Dict[int, List[float]]:
+    """Médias, pontos e jogos atuais (últimos `janela` jogos finalizados) de cada equipa."""
+    placeholders = ', '.join('?' for _ in equipas)
+    cursor.execute(f'''
+        SELECT id_equipa, {', '.join(f'AVG({c})' for c in PERFORMANCE_COLUMNS)}, AVG(pontos), COUNT(*)
+        FROM (
+            SELECT dej.*, {_POINTS.format(marcados='dej.golos_marcados', sofridos='dej.golos_sofridos')} AS pontos,
+                ROW_NUMBER() OVER (PARTITION BY dej.id_equipa ORDER BY j.data_jogo DESC, j.id_jogo DESC) AS ordem
+            FROM desempenho_equipa_jogo dej
+            JOIN jogo j ON dej.id_jogo = j.id_jogo
+            WHERE j.status = 'finalizado' AND dej.id_equipa IN ({placeholders})
+        ) recentes
+        WHERE ordem <= ?
+        GROUP BY id_equipa
+    ''', list(equipas) + [janela])
+    return {row[0]: list(row[1:]) for row in cursor.fetchall()}
+
+
+def _current_venue_points(cursor, equipas: List[int], janela: int, em_casa: bool) -> Dict[int, float]:
+    """Pontos por jogo nos últimos `janela` jogos em casa (ou fora) de cada equipa."""
+    equipa, marcados, sofridos = (('id_equipa_casa', 'golos_casa', 'golos_fora') if em_casa
+                                  else ('id_equipa_fora', 'golos_fora', 'golos_casa'))
+    placeholders = ', '.join('?' for _ in equipas)
+    cursor.execute(f'''
+        SELECT {equipa}, AVG(pontos)
+        FROM (
+            SELECT {equipa}, {_POINTS.format(marcados=marcados, sofridos=sofridos)} AS pontos,
+                ROW_NUMBER() OVER (PARTITION BY {equipa} ORDER BY data_jogo DESC, id_jogo DESC) AS ordem
+            FROM jogo
+            WHERE status = 'finalizado' AND golos_casa IS NOT NULL AND {equipa} IN ({placeholders})
+        ) recentes
+        WHERE ordem <= ?
+        GROUP BY {equipa}
+    ''', list(equipas) + [janela])
+    return dict(cursor.fetchall())
+
+
+def _current_head_to_head(cursor, pares: List[Tuple[int, int]]) -> Dict[Tuple[int, int], float]:
+    """Diferença média de golos (do ponto de vista da equipa de menor id) por par (a < b)."""
+    values = ', '.join('(?, ?), (?, ?)' for _ in pares)
+    cursor.execute(f'''
+        SELECT equipa_a, equipa_b, AVG(diferenca_par)
+        FROM (
+            SELECT equipa_a, equipa_b, diferenca_par,
+                ROW_NUMBER() OVER (PARTITION BY equipa_a, equipa_b ORDER BY data_jogo DESC, id_jogo DESC) AS ordem
+            FROM (
+                SELECT data_jogo, id_jogo, {_PAIR}
+                FROM jogo
+                WHERE status = 'finalizado' AND golos_casa IS NOT NULL
+                  AND (id_equipa_casa, id_equipa_fora) IN (VALUES {values})
+            ) pares
+        ) recentes
+        WHERE ordem <= ?
+        GROUP BY equipa_a, equipa_b
+    ''', [v for a, b in pares for v in (a, b, b, a)] + [H2H_WINDOW])
+    return {(a, b): diferenca for a, b, diferenca in cursor.fetchall()}
+
+
+def _injury_intervals(cursor, equipas: List[int], desde: str) -> Dict[int, List[Tuple[str, Optional[str]]]]:
+    placeholders = ', '.join('?' for _ in equipas)
+    cursor.execute(f'''
+        SELECT p.id_equipa, le.data_inicio, le.data_fim_estimada
+        FROM lesoes le
+        JOIN jogador p ON le.id_jogador = p.id_jogador
+        WHERE p.id_equipa IN ({placeholders}) AND (le.data_fim_estimada IS NULL OR le.data_fim_estimada >= ?)
+    ''', list(equipas) + [desde])
+    intervals: Dict[int, List[Tuple[str, Optional[str]]]] = {}
+    for id_equipa, inicio, fim in cursor.fetchall():
+        intervals.setdefault(id_equipa, []).append((str(inicio), str(fim) if fim is not None else None))
+    return intervals
+
+
+def build_fixture_matrix(conn, fixtures: Sequence[Tuple], janela: int = TEAM_WINDOW) -> np.ndarray:
+    """Features atuais de jogos (id_jogo, data_jogo, id_casa, id_fora, ...), pela ordem dada.
+
+    As médias são as dos últimos jogos finalizados; os lesionados são os ativos na
+    data de cada jogo (hoje, se data_jogo for None). O histórico de cada equipa é
+    lido uma vez por chamada, pelo que os jogos devem ser passados em blocos grandes.
+    """
+    fixtures = list(fixtures)
+    if not fixtures:
+        return np.zeros((0, len(FEATURES)))
+
+    cursor = conn.cursor()
+    hoje = datetime.date.today().isoformat()
+    datas = [str(f[1])[:10] if f[1] is not None else hoje for f in fixtures]
+    equipas = sorted({f[2] for f in fixtures} | {f[3] for f in fixtures})
+    pares = sorted({(min(f[2], f[3]), max(f[2], f[3])) for f in fixtures})
+
+    forma, em_casa, fora_casa, lesoes, confrontos = {}, {}, {}, {}, {}
+    for chunk in _chunks(equipas, TEAM_CHUNK):
+        forma.update(_current_team_features(cursor, chunk, janela))
+        em_casa.update(_current_venue_points(cursor, chunk, janela, True))
+        fora_casa.update(_current_venue_points(cursor, chunk, janela, False))
+        lesoes.update(_injury_intervals(cursor, chunk, min(datas)))
+    for chunk in _chunks(pares, TEAM_CHUNK // 2):
+        confrontos.update(_current_head_to_head(cursor, chunk))
+
+    def lesionados(id_equipa: int, data: str) -> int:
+        return sum(1 for inicio, fim in lesoes.get(id_equipa, ())
+                   if inicio[:10] <= data and (fim is None or fim[:10] >= data))
+
+    vazio = [np.nan] * (len(PERFORMANCE_COLUMNS) + 1) + [0.0]
+    casa, fora, h2h = [], [], []
+    for fixture, data in zip(fixtures, datas):
+        id_casa, id_fora = fixture[2], fixture[3]
+        casa.append(forma.get(id_casa, vazio) + [em_casa.get(id_casa), lesionados(id_casa, data)])
+        fora.append(forma.get(id_fora, vazio) + [fora_casa.get(id_fora), lesionados(id_fora, data)])
+        diferenca = confrontos.get((min(id_casa, id_fora), max(id_casa, id_fora)))
+        h2h.append(None if diferenca is None else (diferenca if id_casa < id_fora else -diferenca))
+
+    return _assemble(np.array(casa, dtype=float), np.array(fora, dtype=float), np.array(h2h, dtype=float))
+
+
+def _resolve_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend} (use: {', '.join(BACKENDS)})")
+    if backend != 'auto':
+        return backend
+    for candidate, module in (('lightgbm', 'lightgbm'), ('sklearn', 'sklearn')):
+        try:
+            __import__(module)
+            return candidate
+        except ImportError:
+            continue
+    return 'numpy'
+
+
+def _fit_softmax(X: np.ndarray, y: np.ndarray, iterations: int = 300, learning_rate: float = 0.5,
+                 l2: float = 1e-3) -> np.ndarray:
+    """Regressão logística multinomial por descida de gradiente (X já normalizado)."""
+    X = np.hstack([X, np.ones((len(X), 1))])
+    Y = np.zeros((len(y), len(OUTCOMES)))
+    Y[np.arange(len(y)), y] = 1.0
+
+    w = np.zeros((len(OUTCOMES), X.shape[1]))
+    for _ in range(iterations):
+        logits = X @ w.T
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        p /= p.sum(axis=1, keepdims=True)
+        w -= learning_rate * ((p - Y).T @ X / len(y) + l2 * w)
+    return w
+
+
+class MatchOutcomeModel:
+    """Classificador 1X2 treinado sobre as features de FEATURES."""
+
+    def __init__(self, backend: str, medias: List[float], escalas: List[float], janela: int = TEAM_WINDOW,
+                 jogos: int = 0, coeficientes: Optional[List[List[float]]] = None, estimator=None):
+        self.backend = backend
+        self.medias = np.asarray(medias, dtype=float)
+        self.escalas = np.asarray(escalas, dtype=float)
+        self.janela = janela
+        self.jogos = jogos
+        self.coeficientes = np.asarray(coeficientes, dtype=float) if coeficientes is not None else None
+        self.estimator = estimator
+
+    def _prepare(self, X: np.ndarray) -> np.ndarray:
+        """Imputa os valores em falta com a média de treino e normaliza."""
+        X = np.where(np.isnan(X), self.medias, X)
+        return (X - self.medias) / self.escalas
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray, backend: str = 'auto',
+            janela: int = TEAM_WINDOW) -> 'MatchOutcomeModel':
+        if len(y) == 0:
+            raise ValueError("Sem jogos para treinar o modelo")
+        backend = _resolve_backend(backend)
+
+        medias = np.nanmean(X, axis=0)
+        medias = np.where(np.isnan(medias), 0.0, medias)
+        escalas = np.nanstd(X, axis=0)
+        escalas = np.where(np.isnan(escalas) | (escalas == 0), 1.0, escalas)
+        model = cls(backend, medias, escalas, janela, len(y))
+        Z = model._prepare(X)
+
+        if backend == 'numpy':
+            model.coeficientes = _fit_softmax(Z, y)
+        elif backend == 'lightgbm':
+            import lightgbm
+            model.estimator = lightgbm.LGBMClassifier(objective='multiclass', n_estimators=300,
+                                                      learning_rate=0.05, num_leaves=31, verbose=-1)
+            model.estimator.fit(Z, y)
+        else:
+            from sklearn.ensemble import HistGradientBoostingClassifier
+            model.estimator = HistGradientBoostingClassifier(max_iter=300, learning_rate=0.05,
+                                                             early_stopping=False)
+            model.estimator.fit(Z, y)
+
+        logger.info(f"Modelo {backend} treinado com {len(y)} jogos")
+        return model
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilidades (n, 3) de vitória da casa, empate e vitória de fora."""
+        Z = self._prepare(np.asarray(X, dtype=float))
+        if self.backend == 'numpy':
+            logits = np.hstack([Z, np.ones((len(Z), 1))]) @ self.coeficientes.T
+            p = np.exp(logits - logits.max(axis=1, keepdims=True))
+            return p / p.sum(axis=1, keepdims=True)
+
+        # Classes ausentes no treino ficam com probabilidade 0
+        probs = np.zeros((len(Z), len(OUTCOMES)))
+        probs[:, self.estimator.classes_] = self.estimator.predict_proba(Z)
+        return probs
+
+    def evaluate(self, X: np.ndarray, y: np.ndarray) -> Dict:
+        """Log loss e taxa de acerto num conjunto de jogos."""
+        probs = self.predict_proba(X)
+        log_loss = -np.mean(np.log(np.clip(probs[np.arange(len(y)), y], 1e-12, 1.0)))
+        return {
+            'jogos': int(len(y)),
+            'log_loss': round(float(log_loss), 4),
+            'taxa_acerto': round(float(np.mean(probs.argmax(axis=1) == y)) * 100, 2)
+        }
+
+    def save(self, path: str):
+        if self.backend != 'numpy':
+            with open(path, 'wb') as f:
+                pickle.dump(self, f)
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'backend': self.backend,
+                'features': FEATURES,
+                'janela': self.janela,
+                'jogos': self.jogos,
+                'medias': [round(float(v), 8) for v in self.medias],
+                'escalas': [round(float(v), 8) for v in self.escalas],
+                'coeficientes': [[round(float(v), 8) for v in row] for row in self.coeficientes]
+            }, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str) -> 'MatchOutcomeModel':
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:1] != b'{':
+            return pickle.loads(data)
+
+        data = json.loads(data)
+        if data.get('features') != FEATURES:
+            raise ValueError(f"O modelo '{path}' foi treinado com outras features; treine-o de novo")
+        return cls(data['backend'], data['medias'], data['escalas'], data['janela'],
+                   data.get('jogos', 0), coeficientes=data['coeficientes'])
+
+
+def train_model(collector, output_path: str, data_inicio: str = '1900-01-01', data_fim: str = '2999-12-31',
+                backend: str = 'auto', janela: int = TEAM_WINDOW, validacao: float = 0.2) -> Dict:
+    """Treina e guarda o modelo com os jogos finalizados do intervalo.
+
+    Os últimos `validacao` (fração) jogos, por ordem cronológica, são avaliados
+    com um modelo treinado nos anteriores; o modelo guardado usa todos os jogos.
+    """
+    start = time.perf_counter()
+    conn = collector._connect()
+    try:
+        _, X, y = build_training_matrix(conn, data_inicio, data_fim, janela)
+    finally:
+        conn.close()
+    segundos_matriz = time.perf_counter() - start
+
+    resumo = {'jogos': int(len(y)), 'segundos_matriz': round(segundos_matriz, 3)}
+    n_validacao = int(len(y) * validacao)
+    if n_validacao > 0 and len(y) - n_validacao > 0:
+        treino = slice(0, len(y) - n_validacao)
+        teste = slice(len(y) - n_validacao, len(y))
+        avaliacao = MatchOutcomeModel.fit(X[treino], y[treino], backend, janela).evaluate(X[teste], y[teste])
+        # Referência: as frequências dos resultados no treino
+        frequencias = np.bincount(y[treino], minlength=len(OUTCOMES)) / (len(y) - n_validacao)
+        avaliacao['log_loss_referencia'] = round(float(-np.mean(np.log(np.clip(frequencias[y[teste]], 1e-12, 1.0)))), 4)
+        resumo['validacao'] = avaliacao
+
+    start = time.perf_counter()
+    model = MatchOutcomeModel.fit(X, y, backend, janela)
+    model.save(output_path)
+    resumo['backend'] = model.backend
+    resumo['segundos_treino'] = round(time.perf_counter() - start, 3)
+
+    logger.info(f"Modelo {model.backend} guardado em {output_path} ({len(y)} jogos)")
+    return resumo
+
+
+if __name__ == "__main__":
+    import sys
+    from football_betting_analyzer import FootballDataCollector
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 ml_model.py DESTINO [BASE_DE_DADOS] [auto|lightgbm|sklearn|numpy]")
+        sys.exit(1)
+
+    db_path = sys.argv[2] if len(sys.argv) > 2 else "football_data.db"
+    resumo = train_model(FootballDataCollector(db_path), sys.argv[1],
+                         backend=sys.argv[3] if len(sys.argv) > 3 else 'auto')
+    print(f"Modelo {resumo['backend']} guardado em {sys.argv[1]}: {resumo}")
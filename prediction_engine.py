@@ -10,22 +10,84 @@ Este módulo implementa o algoritmo de análise e previsão baseado em:
 - Lesões (15%)
 - Histórico de confrontos diretos (10%)
 - Fator casa/fora (10%)
+- Descanso, congestão de jogos e viagens (schedule_index.py, peso 0 por omissão)
 """
 
+import datetime
+import json
 import math
-import sqlite3
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple, Optional
 from football_betting_analyzer import FootballDataCollector
+from feature_store import FeatureStore, position_group
+from instrumentation import Metrics
+from storage import StorageBackend
+from decayed_form import update_decayed_form, decayed_team_performance, decayed_team_players
+from calibration import Calibrator
+from match_prediction import MatchPrediction
+from entity_resolution import EntityIndex
+from schedule_index import ScheduleIndex
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Jogos por avaliação do modelo treinado em iter_daily_analysis
+MODEL_BATCH_SIZE = 5000
+
+# Peso de cada gravidade de lesão no impacto na equipa
+INJURY_SEVERITY = {
+    'Ligeira': 0.1,
+    'Moderada': 0.3,
+    'Grave': 0.6,
+    'Muito Grave': 0.9
+}
+
 class FootballPredictionEngine:
     """Motor de previsão para jogos de futebol."""
     
-    def __init__(self, db_path: str = "football_data.db"):
+    def __init__(self, db_path: str = "football_data.db", feature_store_path: Optional[str] = None,
+                 metrics: Optional[Metrics] = None, storage: Optional[StorageBackend] = None,
+                 use_xg: bool = False, half_life: Optional[float] = None,
+                 calibration_path: Optional[str] = None, model_path: Optional[str] = None):
         self.db_path = db_path
-        self.collector = FootballDataCollector(db_path)
+        # Usar o xG/xGA (xg_pipeline.py) em vez dos remates à baliza na força das equipas
+        self.use_xg = use_xg
+        # Meia-vida (dias) da forma com decaimento; None usa as médias dos últimos N jogos
+        self.half_life = half_life
+        self.metrics = metrics or Metrics()
+        self.collector = FootballDataCollector(db_path, self.metrics, storage)
+        
+        # Armazém de features partilhado entre processos (opcional)
+        self.feature_store = FeatureStore(feature_store_path) if feature_store_path else None
+        if (self.feature_store is not None and self.collector.storage.name in ('sqlite', 'sqlite-snapshot')
+                and self.feature_store.is_stale(db_path)):
+            logger.warning(f"Armazém de features {feature_store_path} é anterior à última alteração de "
+                           f"{db_path}; reconstrua-o com build_feature_store")
+        
+        # Calibração das probabilidades ajustada num backtest (calibration.py, opcional)
+        self.calibration_path = calibration_path
+        self.calibrator = Calibrator.load(calibration_path) if calibration_path else None
+        
+        # Modelo treinado (ml_model.py, opcional): substitui as ponderações fixas
+        self.model_path = model_path
+        self.model = None
+        if model_path:
+            from ml_model import MatchOutcomeModel
+            self.model = MatchOutcomeModel.load(model_path)
+        
+        if half_life is not None and not self.collector.storage.read_only:
+            # Regista a meia-vida (primeira vez) e aplica os desempenhos ainda em falta
+            conn = self.collector._connect()
+            update_decayed_form(conn, half_life)
+            conn.commit()
+            conn.close()
+        
+        # Nomes e competições das equipas em memória (entity_resolution.py)
+        self.entities = self._load_entities()
+        
+        # Calendário por equipa (schedule_index.py), carregado na primeira previsão
+        self._schedule = None
         
         # Ponderações para cada componente da análise
         self.weights = {
@@ -33,12 +95,87 @@ class FootballPredictionEngine:
             'player_performance': 0.25,
             'injuries': 0.15,
             'head_to_head': 0.10,
-            'home_away': 0.10
+            'home_away': 0.10,
+            # Fadiga: sem peso até serem ajustados (set_league_weights)
+            'rest_days': 0.0,
+            'fixture_congestion': 0.0,
+            'travel': 0.0
         }
+        # Ponderações próprias de cada competição (tabela parametros_liga)
+        self.league_weights = self._load_league_weights()
+    
+    def _load_entities(self) -> EntityIndex:
+        conn = self.collector._connect()
+        try:
+            # Só os nomes e competições das equipas (sem procura por nome)
+            return EntityIndex.load(conn, jogadores=False, aliases=False)
+        finally:
+            conn.close()
+    
+    def _team_info(self, id_equipa: int) -> Tuple[str, Optional[int]]:
+        """Nome e competição da equipa; o índice é recarregado quando a equipa é nova."""
+        nome = self.entities.team_names.get(id_equipa)
+        if nome is None:
+            self.entities = self._load_entities()
+            nome = self.entities.team_names.get(id_equipa)
+            if nome is None:
+                raise ValueError(f"Equipa {id_equipa} não existe")
+        return nome, self.entities.team_competitions.get(id_equipa)
+    
+    @property
+    def schedule(self) -> ScheduleIndex:
+        """Índice do calendário das equipas (carregado uma vez; ver refresh_schedule)."""
+        if self._schedule is None:
+            conn = self.collector._connect()
+            try:
+                # Bases só de leitura anteriores às coordenadas não têm as colunas
+                coordenadas = 'latitude' in self.collector.storage.table_columns(conn, 'equipa')
+                self._schedule = ScheduleIndex.load(conn, coordenadas)
+            finally:
+                conn.close()
+        return self._schedule
+    
+    def refresh_schedule(self):
+        """Volta a ler o calendário na próxima previsão (depois de inserir ou mudar jogos)."""
+        self._schedule = None
+    
+    def _load_league_weights(self) -> Dict[int, Dict[str, float]]:
+        conn = self.collector._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id_competicao, pesos FROM parametros_liga')
+        rows = cursor.fetchall()
+        conn.close()
+        return {id_competicao: {**self.weights, **json.loads(pesos)} for id_competicao, pesos in rows}
+    
+    def weights_for(self, id_competicao: Optional[int]) -> Dict[str, float]:
+        """Ponderações a usar nos jogos de uma competição (as globais por omissão)."""
+        return self.league_weights.get(id_competicao, self.weights)
+    
+    def set_league_weights(self, id_competicao: int, pesos: Dict[str, float]):
+        """Guarda ponderações próprias de uma competição (as omitidas ficam as globais)."""
+        desconhecidas = set(pesos) - set(self.weights)
+        if desconhecidas:
+            raise ValueError(f"Componentes desconhecidos: {', '.join(sorted(desconhecidas))}")
+        
+        conn = self.collector._connect()
+        conn.cursor().execute('''
+            INSERT INTO parametros_liga (id_competicao, pesos, atualizado_em) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (id_competicao) DO UPDATE SET pesos = excluded.pesos, atualizado_em = excluded.atualizado_em
+        ''', (id_competicao, json.dumps(pesos)))
+        conn.commit()
+        conn.close()
+        self.league_weights[id_competicao] = {**self.weights, **pesos}
     
     def calculate_team_strength(self, id_equipa: int, num_jogos: int = 10) -> float:
         """Calcula a força da equipa baseada no desempenho recente."""
-        performance = self.collector.get_team_performance(id_equipa, num_jogos)
+        if self.half_life is not None:
+            conn = self.collector._connect()
+            performance = decayed_team_performance(conn, id_equipa, self.half_life)
+            conn.close()
+        elif self.feature_store is not None:
+            performance = self.feature_store.team_performance(id_equipa)
+        else:
+            performance = self.collector.get_team_performance(id_equipa, num_jogos)
         
         if not performance or performance.get('total_jogos', 0) == 0:
             return 0.5  # Valor neutro se não há dados
@@ -46,6 +183,11 @@ class FootballPredictionEngine:
         # Normalizar métricas (0-1)
         goal_diff_score = min(max((performance['diferenca_golos'] + 3) / 6, 0), 1)
         shots_score = min(performance['media_remates_baliza'] / 10, 1)
+        if self.use_xg:
+            xg = self.collector.get_team_xg(id_equipa)
+            if xg:
+                # Diferença de xG por jogo entre -1.5 e +1.5 mapeada para 0-1
+                shots_score = min(max((xg['diferenca_xg'] + 1.5) / 3, 0), 1)
         possession_score = performance['media_posse_bola'] / 100
         clean_sheets_score = performance['percentagem_clean_sheets'] / 100
         
@@ -66,7 +208,24 @@ class FootballPredictionEngine:
     
     def calculate_player_impact(self, id_equipa: int, num_jogos: int = 20) -> float:
         """Calcula o impacto dos jogadores chave da equipa."""
-        conn = sqlite3.connect(self.db_path)
+        impacts = self.player_impacts(id_equipa, num_jogos)
+        return sum(impacts.values()) / len(impacts) if impacts else 0.5  # Valor neutro sem jogadores
+    
+    def player_impacts(self, id_equipa: int, num_jogos: int = 20) -> Dict[int, float]:
+        """Impacto normalizado (0-1) de cada jogador da equipa com jogos, por id_jogador."""
+        if self.half_life is not None:
+            conn = self.collector._connect()
+            players = decayed_team_players(conn, id_equipa, self.half_life)
+            conn.close()
+            return {p['id_jogador']: self._player_impact(position_group(p['posicao']), p) for p in players}
+        
+        if self.feature_store is not None:
+            return {
+                performance['id_jogador']: self._player_impact(performance['grupo_posicao'], performance)
+                for performance in self.feature_store.team_players(id_equipa)
+            }
+        
+        conn = self.collector._connect()
         cursor = conn.cursor()
         
         # Obter jogadores da equipa
@@ -79,71 +238,47 @@ class FootballPredictionEngine:
         players = cursor.fetchall()
         conn.close()
         
-        if not players:
-            return 0.5  # Valor neutro se não há jogadores
-        
-        total_impact = 0
-        player_count = 0
-        
+        impacts = {}
         for player_id, nome, posicao in players:
             performance = self.collector.get_player_performance(player_id, num_jogos)
             
             if performance and performance.get('total_jogos', 0) > 0:
-                # Calcular impacto baseado na posição
-                if posicao in ['Avançado', 'Extremo']:
-                    # Atacantes: golos e assistências são mais importantes
-                    impact = (
-                        performance['total_golos'] * 0.6 +
-                        performance['total_assistencias'] * 0.4
-                    ) / performance['total_jogos']
-                elif posicao in ['Médio', 'Médio Defensivo', 'Médio Ofensivo']:
-                    # Médios: assistências, passes e desarmes
-                    impact = (
-                        performance['total_assistencias'] * 0.4 +
-                        performance['media_passes_completos'] / 100 * 0.3 +
-                        performance['media_desarmes'] * 0.3
-                    )
-                else:  # Defesas e Guarda-redes
-                    # Defesas: desarmes, interceções, menos cartões
-                    impact = (
-                        performance['media_desarmes'] * 0.4 +
-                        performance['media_intercecoes'] * 0.4 -
-                        performance['total_cartoes_amarelos'] * 0.1 -
-                        performance['total_cartoes_vermelhos'] * 0.3
-                    ) / performance['total_jogos']
-                
-                # Normalizar impacto (0-1)
-                impact = max(min(impact / 2, 1.0), 0.0)
-                total_impact += impact
-                player_count += 1
-        
-        return total_impact / player_count if player_count > 0 else 0.5
+                impacts[player_id] = self._player_impact(position_group(posicao), performance)
+        
+        return impacts
+    
+    def _player_impact(self, grupo_posicao: int, performance: Dict) -> float:
+        """Calcula o impacto normalizado (0-1) de um jogador a partir do seu desempenho."""
+        # Calcular impacto baseado na posição
+        if grupo_posicao == 0:
+            # Atacantes: golos e assistências são mais importantes
+            impact = (
+                performance['total_golos'] * 0.6 +
+                performance['total_assistencias'] * 0.4
+            ) / performance['total_jogos']
+        elif grupo_posicao == 1:
+            # Médios: assistências, passes e desarmes
+            impact = (
+                performance['total_assistencias'] * 0.4 +
+                performance['media_passes_completos'] / 100 * 0.3 +
+                performance['media_desarmes'] * 0.3
+            )
+        else:  # Defesas e Guarda-redes
+            # Defesas: desarmes, interceções, menos cartões
+            impact = (
+                performance['media_desarmes'] * 0.4 +
+                performance['media_intercecoes'] * 0.4 -
+                performance['total_cartoes_amarelos'] * 0.1 -
+                performance['total_cartoes_vermelhos'] * 0.3
+            ) / performance['total_jogos']
+        
+        # Normalizar impacto (0-1)
+        return max(min(impact / 2, 1.0), 0.0)
     
     def calculate_injury_impact(self, id_equipa: int) -> float:
         """Calcula o impacto das lesões na equipa."""
         injuries = self.collector.get_team_injuries(id_equipa)
-        
-        if not injuries:
-            return 1.0  # Sem lesões = impacto máximo
-        
-        total_impact = 0
-        for injury in injuries:
-            # Impacto baseado na gravidade e importância do jogador
-            gravidade_multiplier = {
-                'Ligeira': 0.1,
-                'Moderada': 0.3,
-                'Grave': 0.6,
-                'Muito Grave': 0.9
-            }.get(injury['gravidade'], 0.3)
-            
-            # Impacto baseado na importância do jogador (1-5)
-            player_importance = injury['impacto_equipa'] / 5
-            
-            total_impact += gravidade_multiplier * player_importance
-        
-        # Converter para fator positivo (menos lesões = melhor)
-        injury_factor = max(1.0 - (total_impact / len(injuries)), 0.1)
-        return injury_factor
+        return injury_factor([injury_contribution(i['gravidade'], i['impacto_equipa']) for i in injuries])
     
     def calculate_head_to_head_factor(self, id_equipa1: int, id_equipa2: int) -> float:
         """Calcula o fator de confrontos diretos."""
@@ -166,7 +301,7 @@ class FootballPredictionEngine:
     
     def calculate_home_away_factor(self, is_home: bool, id_equipa: int) -> float:
         """Calcula o fator casa/fora."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.collector._connect()
         cursor = conn.cursor()
         
         if is_home:
@@ -176,10 +311,13 @@ class FootballPredictionEngine:
                     AVG(CASE WHEN j.golos_casa > j.golos_fora THEN 1 ELSE 0 END) as win_rate,
                     AVG(j.golos_casa) as avg_goals_scored,
                     AVG(j.golos_fora) as avg_goals_conceded
-                FROM jogo j
-                WHERE j.id_equipa_casa = ? AND j.status = 'finalizado'
-                ORDER BY j.data_jogo DESC
-                LIMIT 10
+                FROM (
+                    SELECT golos_casa, golos_fora
+                    FROM jogo
+                    WHERE id_equipa_casa = ? AND status = 'finalizado'
+                    ORDER BY data_jogo DESC, id_jogo DESC
+                    LIMIT 10
+                ) j
             ''', (id_equipa,))
         else:
             # Desempenho fora
@@ -188,10 +326,13 @@ class FootballPredictionEngine:
                     AVG(CASE WHEN j.golos_fora > j.golos_casa THEN 1 ELSE 0 END) as win_rate,
                     AVG(j.golos_fora) as avg_goals_scored,
                     AVG(j.golos_casa) as avg_goals_conceded
-                FROM jogo j
-                WHERE j.id_equipa_fora = ? AND j.status = 'finalizado'
-                ORDER BY j.data_jogo DESC
-                LIMIT 10
+                FROM (
+                    SELECT golos_casa, golos_fora
+                    FROM jogo
+                    WHERE id_equipa_fora = ? AND status = 'finalizado'
+                    ORDER BY data_jogo DESC, id_jogo DESC
+                    LIMIT 10
+                ) j
             ''', (id_equipa,))
         
         result = cursor.fetchone()
@@ -213,136 +354,283 @@ class FootballPredictionEngine:
         
         return home_away_factor
     
-    def predict_match(self, id_equipa_casa: int, id_equipa_fora: int) -> Dict:
-        """Faz a previsão completa de um jogo."""
+    def predict_match(self, id_equipa_casa: int, id_equipa_fora: int, id_competicao: Optional[int] = None,
+                      data_jogo: Optional[str] = None) -> Dict:
+        """Faz a previsão completa de um jogo.
+        
+        As ponderações são as da competição do jogo (por omissão, a da equipa da casa).
+        O descanso e a congestão são calculados para data_jogo (por omissão, hoje).
+        """
+        return self.predict_match_compact(id_equipa_casa, id_equipa_fora, id_competicao, data_jogo).to_dict()
+    
+    def predict_match_compact(self, id_equipa_casa: int, id_equipa_fora: int,
+                              id_competicao: Optional[int] = None, data_jogo: Optional[str] = None,
+                              agenda: Optional[Tuple[float, ...]] = None) -> MatchPrediction:
+        """Como predict_match, mas devolve o resultado compacto (probabilidades 0-1 sem arredondar).
+        
+        agenda são os fatores de calendário já calculados (ScheduleIndex.factors_many).
+        """
+        with self.metrics.timer('predict_match'), self.collector.storage.pinned():
+            if self.model is not None:
+                return self._predict_fixtures_model([(None, None, id_equipa_casa, id_equipa_fora, id_competicao)])[0]
+            return self._predict_match(id_equipa_casa, id_equipa_fora, id_competicao, data_jogo, agenda)
+    
+    def _predict_match(self, id_equipa_casa: int, id_equipa_fora: int, id_competicao: Optional[int] = None,
+                       data_jogo: Optional[str] = None,
+                       agenda: Optional[Tuple[float, ...]] = None) -> MatchPrediction:
+        metrics = self.metrics
+        
+        # Obter nomes das equipas e a competição (em memória)
+        with metrics.timer('name_lookup'):
+            nome_casa, competicao_casa = self._team_info(id_equipa_casa)
+            nome_fora, _ = self._team_info(id_equipa_fora)
+        weights = self.weights_for(id_competicao if id_competicao is not None else competicao_casa)
         
         # 1. Calcular força das equipas (40%)
-        team_strength_home = self.calculate_team_strength(id_equipa_casa)
-        team_strength_away = self.calculate_team_strength(id_equipa_fora)
+        with metrics.timer('team_strength'):
+            team_strength_home = self.calculate_team_strength(id_equipa_casa)
+            team_strength_away = self.calculate_team_strength(id_equipa_fora)
         
         # 2. Calcular impacto dos jogadores (25%)
-        player_impact_home = self.calculate_player_impact(id_equipa_casa)
-        player_impact_away = self.calculate_player_impact(id_equipa_fora)
+        with metrics.timer('player_impact'):
+            player_impact_home = self.calculate_player_impact(id_equipa_casa)
+            player_impact_away = self.calculate_player_impact(id_equipa_fora)
         
         # 3. Calcular impacto das lesões (15%)
-        injury_impact_home = self.calculate_injury_impact(id_equipa_casa)
-        injury_impact_away = self.calculate_injury_impact(id_equipa_fora)
+        with metrics.timer('injuries'):
+            injury_impact_home = self.calculate_injury_impact(id_equipa_casa)
+            injury_impact_away = self.calculate_injury_impact(id_equipa_fora)
         
         # 4. Calcular fator de confrontos diretos (10%)
-        h2h_factor_home = self.calculate_head_to_head_factor(id_equipa_casa, id_equipa_fora)
-        h2h_factor_away = 1.0 - h2h_factor_home
+        with metrics.timer('head_to_head'):
+            h2h_factor_home = self.calculate_head_to_head_factor(id_equipa_casa, id_equipa_fora)
+            h2h_factor_away = 1.0 - h2h_factor_home
         
         # 5. Calcular fator casa/fora (10%)
-        home_factor = self.calculate_home_away_factor(True, id_equipa_casa)
-        away_factor = self.calculate_home_away_factor(False, id_equipa_fora)
+        with metrics.timer('home_away'):
+            home_factor = self.calculate_home_away_factor(True, id_equipa_casa)
+            away_factor = self.calculate_home_away_factor(False, id_equipa_fora)
+        
+        # 6. Descanso, congestão e viagens (calendário em memória)
+        if agenda is None:
+            with metrics.timer('schedule'):
+                agenda = self.schedule.fixture_factors(id_equipa_casa, id_equipa_fora,
+                                                       data_jogo or datetime.date.today().isoformat())
+        rest_home, rest_away, congestion_home, congestion_away, travel_home, travel_away = agenda
         
         # Calcular pontuação final ponderada
         score_home = (
-            team_strength_home * self.weights['team_performance'] +
-            player_impact_home * self.weights['player_performance'] +
-            injury_impact_home * self.weights['injuries'] +
-            h2h_factor_home * self.weights['head_to_head'] +
-            home_factor * self.weights['home_away']
+            team_strength_home * weights['team_performance'] +
+            player_impact_home * weights['player_performance'] +
+            injury_impact_home * weights['injuries'] +
+            h2h_factor_home * weights['head_to_head'] +
+            home_factor * weights['home_away'] +
+            rest_home * weights['rest_days'] +
+            congestion_home * weights['fixture_congestion'] +
+            travel_home * weights['travel']
         )
         
         score_away = (
-            team_strength_away * self.weights['team_performance'] +
-            player_impact_away * self.weights['player_performance'] +
-            injury_impact_away * self.weights['injuries'] +
-            h2h_factor_away * self.weights['head_to_head'] +
-            away_factor * self.weights['home_away']
+            team_strength_away * weights['team_performance'] +
+            player_impact_away * weights['player_performance'] +
+            injury_impact_away * weights['injuries'] +
+            h2h_factor_away * weights['head_to_head'] +
+            away_factor * weights['home_away'] +
+            rest_away * weights['rest_days'] +
+            congestion_away * weights['fixture_congestion'] +
+            travel_away * weights['travel']
         )
         
-        # Normalizar pontuações para probabilidades
-        total_score = score_home + score_away
-        if total_score > 0:
-            prob_home_win = score_home / total_score
-            prob_away_win = score_away / total_score
-        else:
-            prob_home_win = prob_away_win = 0.5
-        
-        # Calcular probabilidade de empate (baseada na proximidade das pontuações)
-        score_diff = abs(score_home - score_away)
-        prob_draw = max(0.1, 0.3 - score_diff)
-        
-        # Normalizar todas as probabilidades
-        total_prob = prob_home_win + prob_away_win + prob_draw
-        prob_home_win /= total_prob
-        prob_away_win /= total_prob
-        prob_draw /= total_prob
-        
-        # Obter nomes das equipas
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT nome_equipa FROM equipa WHERE id_equipa = ?', (id_equipa_casa,))
-        nome_casa = cursor.fetchone()[0]
+        prob_home_win, prob_draw, prob_away_win = scores_to_probabilities(score_home, score_away)
+        if self.calibrator is not None:
+            prob_home_win, prob_draw, prob_away_win = self.calibrator.apply(prob_home_win, prob_draw, prob_away_win)
         
-        cursor.execute('SELECT nome_equipa FROM equipa WHERE id_equipa = ?', (id_equipa_fora,))
-        nome_fora = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        # Determinar previsão principal
-        if prob_home_win > prob_away_win and prob_home_win > prob_draw:
-            prediction = f"Vitória {nome_casa}"
-            confidence = prob_home_win
-        elif prob_away_win > prob_draw:
-            prediction = f"Vitória {nome_fora}"
-            confidence = prob_away_win
-        else:
-            prediction = "Empate"
-            confidence = prob_draw
-        
-        return {
-            'equipa_casa': nome_casa,
-            'equipa_fora': nome_fora,
-            'previsao_principal': prediction,
-            'confianca': round(confidence * 100, 1),
-            'probabilidades': {
-                'vitoria_casa': round(prob_home_win * 100, 1),
-                'empate': round(prob_draw * 100, 1),
-                'vitoria_fora': round(prob_away_win * 100, 1)
-            },
-            'analise_detalhada': {
-                'forca_equipa_casa': round(team_strength_home, 3),
-                'forca_equipa_fora': round(team_strength_away, 3),
-                'impacto_jogadores_casa': round(player_impact_home, 3),
-                'impacto_jogadores_fora': round(player_impact_away, 3),
-                'impacto_lesoes_casa': round(injury_impact_home, 3),
-                'impacto_lesoes_fora': round(injury_impact_away, 3),
-                'fator_confrontos_diretos_casa': round(h2h_factor_home, 3),
-                'fator_confrontos_diretos_fora': round(h2h_factor_away, 3),
-                'fator_casa': round(home_factor, 3),
-                'fator_fora': round(away_factor, 3)
-            },
-            'pontuacao_final': {
-                'casa': round(score_home, 3),
-                'fora': round(score_away, 3)
-            }
-        }
+        return MatchPrediction(
+            nome_casa, nome_fora, prob_home_win, prob_draw, prob_away_win,
+            componentes=(team_strength_home, team_strength_away, player_impact_home, player_impact_away,
+                         injury_impact_home, injury_impact_away, h2h_factor_home, h2h_factor_away,
+                         home_factor, away_factor, *agenda),
+            pontuacao=(score_home, score_away)
+        )
+    
+    def _predict_fixtures_model(self, fixtures: List[Tuple]) -> List[MatchPrediction]:
+        """Previsões do modelo treinado para um bloco de jogos, numa só avaliação vetorizada."""
+        from ml_model import build_fixture_matrix
+        
+        with self.metrics.timer('ml_model'):
+            conn = self.collector._connect()
+            try:
+                X = build_fixture_matrix(conn, fixtures, self.model.janela)
+            finally:
+                conn.close()
+            nomes = {id_equipa: self._team_info(id_equipa)[0]
+                     for id_equipa in {f[2] for f in fixtures} | {f[3] for f in fixtures}}
+            
+            probs = self.model.predict_proba(X)
+            if self.calibrator is not None:
+                probs = self.calibrator.apply_many(probs)
+        
+        backend = self.model.backend
+        return [
+            MatchPrediction(nomes[f[2]], nomes[f[3]], *p.tolist(), modelo=backend, id_jogo=f[0], data_jogo=f[1])
+            for f, p in zip(fixtures, probs)
+        ]
+    
+    def _worker_options(self) -> Dict:
+        """Opções do motor a replicar nos processos do pool."""
+        return {'use_xg': self.use_xg, 'half_life': self.half_life, 'calibration_path': self.calibration_path,
+                'model_path': self.model_path}
     
     def generate_daily_analysis(self, data_analise: str) -> List[Dict]:
         """Gera análise diária para todos os jogos agendados numa data específica."""
-        conn = sqlite3.connect(self.db_path)
+        return list(self.iter_daily_analysis(data_analise))
+    
+    def iter_fixtures(self, data_inicio: str, data_fim: Optional[str] = None,
+                      liga: Optional[str] = None, status: str = 'agendado',
+                      epoca: Optional[str] = None, com_resultado: bool = False) -> Iterator[Tuple]:
+        """Devolve (id_jogo, data_jogo, id_casa, id_fora, id_competicao) dos jogos num intervalo de datas.
+        
+        Com liga (nome da competição) e/ou epoca (ex.: '2024/25'), só são lidos os
+        jogos dessa competição, pelo índice (id_competicao, data_jogo). Com
+        com_resultado, cada tuplo acaba em (golos_casa, golos_fora), na mesma consulta.
+        """
+        conn = self.collector._connect()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT id_jogo, id_equipa_casa, id_equipa_fora
-            FROM jogo
-            WHERE data_jogo = ? AND status = 'agendado'
-        ''', (data_analise,))
-        
-        jogos = cursor.fetchall()
-        conn.close()
-        
-        analyses = []
-        for id_jogo, id_casa, id_fora in jogos:
-            analysis = self.predict_match(id_casa, id_fora)
-            analysis['id_jogo'] = id_jogo
-            analyses.append(analysis)
-        
-        return analyses
+        query = f'''
+            SELECT j.id_jogo, j.data_jogo, j.id_equipa_casa, j.id_equipa_fora, j.id_competicao
+                   {', j.golos_casa, j.golos_fora' if com_resultado else ''}
+            FROM jogo j
+        '''
+        conditions = ['j.data_jogo BETWEEN ? AND ?', 'j.status = ?']
+        params = [data_inicio, data_fim or data_inicio, status]
+        if liga is not None:
+            conditions.append('j.id_competicao = (SELECT id_competicao FROM competicao WHERE nome = ?)')
+            params.append(liga)
+        if epoca is not None:
+            conditions.append('j.id_epoca IN (SELECT id_epoca FROM epoca WHERE nome = ?)')
+            params.append(epoca)
+        query += ' WHERE ' + ' AND '.join(conditions) + ' ORDER BY j.data_jogo, j.id_jogo'
+        
+        try:
+            cursor.execute(query, params)
+            while True:
+                jogos = cursor.fetchmany(100)
+                if not jogos:
+                    break
+                yield from jogos
+        finally:
+            conn.close()
+    
+    def iter_daily_analysis(self, data_inicio: str, data_fim: Optional[str] = None,
+                            liga: Optional[str] = None, workers: int = 1,
+                            epoca: Optional[str] = None) -> Iterator[Dict]:
+        """Gera as análises (dicionários) dos jogos agendados num intervalo de datas, uma a uma."""
+        for prediction in self.iter_predictions(data_inicio, data_fim, liga, workers, epoca):
+            yield prediction.to_dict()
+    
+    def iter_predictions(self, data_inicio: str, data_fim: Optional[str] = None,
+                         liga: Optional[str] = None, workers: int = 1,
+                         epoca: Optional[str] = None) -> Iterator[MatchPrediction]:
+        """Gera as previsões compactas dos jogos agendados num intervalo de datas, uma a uma.
+        
+        Os jogos são lidos da base de dados em blocos e cada previsão é devolvida
+        assim que é calculada, pelo que a memória usada não depende do número de jogos.
+        Com workers > 1 as previsões são calculadas num pool de processos, mantendo a ordem.
+        Com um modelo treinado, os jogos são previstos em blocos vetorizados (sem pool).
+        """
+        fixtures = self.iter_fixtures(data_inicio, data_fim, liga, epoca=epoca)
+        
+        if self.model is not None:
+            while True:
+                window = list(islice(fixtures, MODEL_BATCH_SIZE))
+                if not window:
+                    break
+                with self.collector.storage.pinned():
+                    yield from self._predict_fixtures_model(window)
+            return
+        
+        # Os fatores de calendário de cada janela (jornadas) são calculados de uma vez
+        if workers <= 1:
+            while True:
+                window = list(islice(fixtures, 256))
+                if not window:
+                    break
+                for fixture, agenda in zip(window, self.schedule.factors_many(window)):
+                    yield _analyse_fixture(self, fixture, agenda)
+            return
+        
+        feature_store_path = self.feature_store.path if self.feature_store is not None else None
+        storage_factory = self.collector.storage.factory()
+        options = self._worker_options()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.db_path, feature_store_path, storage_factory, options)) as pool:
+            # Submeter por janelas para manter a memória limitada
+            while True:
+                window = list(islice(fixtures, workers * 64))
+                if not window:
+                    break
+                yield from pool.map(_predict_in_worker, window, self.schedule.factors_many(window), chunksize=16)
+
+
+def scores_to_probabilities(score_home: float, score_away: float) -> Tuple[float, float, float]:
+    """Converte as pontuações ponderadas em probabilidades (casa, empate, fora) que somam 1."""
+    # Normalizar pontuações para probabilidades
+    total_score = score_home + score_away
+    if total_score > 0:
+        prob_home_win = score_home / total_score
+        prob_away_win = score_away / total_score
+    else:
+        prob_home_win = prob_away_win = 0.5
+    
+    # Calcular probabilidade de empate (baseada na proximidade das pontuações)
+    score_diff = abs(score_home - score_away)
+    prob_draw = max(0.1, 0.3 - score_diff)
+    
+    # Normalizar todas as probabilidades
+    total_prob = prob_home_win + prob_away_win + prob_draw
+    return prob_home_win / total_prob, prob_draw / total_prob, prob_away_win / total_prob
+
+
+def injury_contribution(gravidade: str, impacto_equipa: float) -> float:
+    """Peso de uma lesão: gravidade vezes a importância do jogador (1-5) normalizada."""
+    return INJURY_SEVERITY.get(gravidade, 0.3) * (impacto_equipa / 5)
+
+
+def injury_factor(contribuicoes: List[float]) -> float:
+    """Fator de lesões (menos lesões = melhor); 1.0 sem lesões."""
+    if not contribuicoes:
+        return 1.0  # Sem lesões = impacto máximo
+    total_impact = 0
+    for contribuicao in contribuicoes:
+        total_impact += contribuicao
+    return max(1.0 - (total_impact / len(contribuicoes)), 0.1)
+
+
+def _analyse_fixture(engine: FootballPredictionEngine, fixture: Tuple,
+                     agenda: Optional[Tuple[float, ...]] = None) -> MatchPrediction:
+    """Calcula a previsão de um jogo (id_jogo, data_jogo, id_casa, id_fora, id_competicao)."""
+    id_jogo, data_jogo, id_casa, id_fora, id_competicao = fixture
+    prediction = engine.predict_match_compact(id_casa, id_fora, id_competicao, data_jogo, agenda)
+    prediction.id_jogo = id_jogo
+    prediction.data_jogo = data_jogo
+    return prediction
+
+
+_worker_engine = None
+
+
+def _init_worker(db_path: str, feature_store_path: Optional[str], storage_factory=None,
+                 options: Optional[Dict] = None):
+    """Cria o motor de previsão de cada processo do pool."""
+    global _worker_engine
+    logging.getLogger().setLevel(logging.WARNING)
+    storage = storage_factory() if storage_factory else None
+    _worker_engine = FootballPredictionEngine(db_path, feature_store_path, storage=storage, **(options or {}))
+
+
+def _predict_in_worker(fixture: Tuple, agenda: Optional[Tuple[float, ...]] = None) -> MatchPrediction:
+    return _analyse_fixture(_worker_engine, fixture, agenda)
 
 if __name__ == "__main__":
     # Teste do motor de previsão
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Exportação em Streaming das Previsões
+Autor: Manus AI
+Data: 19/10/2026
+
+Escreve as previsões geradas por FootballPredictionEngine.iter_predictions
+em NDJSON, CSV ou Parquet à medida que são calculadas. Cada escritor mantém em
+memória no máximo um bloco de linhas, pelo que exportações de vários dias e
+ligas não dependem do tamanho total do lote.
+"""
+
+import sys
+import csv
+import json
+from typing import Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('ndjson', 'csv', 'parquet')
+
+
+def _as_dict(prediction) -> Dict:
+    """Aceita dicionários de predict_match ou MatchPrediction (convertida só aqui)."""
+    return prediction.to_dict() if hasattr(prediction, 'to_dict') else prediction
+
+
+def flatten_prediction(prediction: Dict, prefix: str = '') -> Dict:
+    """Converte uma previsão aninhada num dicionário plano (ex.: probabilidades_empate)."""
+    flat = {}
+    for key, value in prediction.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_prediction(value, f"{name}_"))
+        else:
+            flat[name] = value
+    return flat
+
+
+class NDJSONWriter:
+    """Escreve uma previsão JSON por linha."""
+
+    binary = False
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, prediction):
+        if hasattr(prediction, 'to_json'):
+            self.stream.write(prediction.to_json())
+        else:
+            self.stream.write(json.dumps(prediction, ensure_ascii=False))
+        self.stream.write('\n')
+
+    def close(self):
+        self.stream.flush()
+
+
+class CSVWriter:
+    """Escreve previsões planas em CSV; o cabeçalho vem da primeira previsão."""
+
+    binary = False
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._writer = None
+
+    def write(self, prediction):
+        row = flatten_prediction(_as_dict(prediction))
+        if self._writer is None:
+            self._writer = csv.DictWriter(self.stream, fieldnames=list(row.keys()), extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(row)
+
+    def close(self):
+        self.stream.flush()
+
+
+class ParquetWriter:
+    """Escreve previsões planas em Parquet, um row group por bloco (requer pyarrow)."""
+
+    binary = True
+
+    def __init__(self, stream, batch_size: int = 1000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("A exportação Parquet requer o pacote 'pyarrow' (pip install pyarrow)")
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.stream = stream
+        self.batch_size = batch_size
+        self._rows: List[Dict] = []
+        self._writer = None
+
+    def write(self, prediction):
+        self._rows.append(flatten_prediction(_as_dict(prediction)))
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        table = self._pa.Table.from_pylist(self._rows)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.stream, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+WRITERS = {
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter
+}
+
+
+def write_predictions(predictions: Iterable, formato: str, destino: str = '-') -> int:
+    """Escreve as previsões (dicionários ou MatchPrediction) no destino indicado ('-' para stdout).
+
+    Devolve quantas foram escritas.
+    """
+    if formato not in WRITERS:
+        raise ValueError(f"Formato '{formato}' não suportado (use: {', '.join(EXPORT_FORMATS)})")
+
+    writer_class = WRITERS[formato]
+    if destino == '-':
+        stream = sys.stdout.buffer if writer_class.binary else sys.stdout
+        owns_stream = False
+    else:
+        mode = 'wb' if writer_class.binary else 'w'
+        stream = open(destino, mode, **({} if writer_class.binary else {'encoding': 'utf-8', 'newline': ''}))
+        owns_stream = True
+
+    total = 0
+    try:
+        writer = writer_class(stream)
+        for prediction in predictions:
+            writer.write(prediction)
+            total += 1
+        writer.close()
+    finally:
+        if owns_stream:
+            stream.close()
+
+    logger.info(f"{total} previsões exportadas em {formato} para {destino}")
+    return total
+
+
+def export_daily_analysis(engine, data_inicio: str, data_fim: Optional[str] = None,
+                          formato: str = 'ndjson', destino: str = '-', liga: Optional[str] = None,
+                          epoca: Optional[str] = None) -> int:
+    """Exporta em streaming as análises dos jogos agendados num intervalo de datas."""
+    predictions = engine.iter_predictions(data_inicio, data_fim, liga=liga, epoca=epoca)
+    return write_predictions(predictions, formato, destino)
+
+
+if __name__ == "__main__":
+    from prediction_engine import FootballPredictionEngine
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 prediction_export.py DATA_INICIO [DATA_FIM] [FORMATO] [DESTINO]")
+        sys.exit(1)
+
+    data_inicio = sys.argv[1]
+    data_fim = sys.argv[2] if len(sys.argv) > 2 else None
+    formato = sys.argv[3] if len(sys.argv) > 3 else 'ndjson'
+    destino = sys.argv[4] if len(sys.argv) > 4 else '-'
+
+    export_daily_analysis(FootballPredictionEngine(), data_inicio, data_fim, formato, destino)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Serviço Assíncrono de Previsões
+Autor: Manus AI
+Data: 19/10/2026
+
+Camada asyncio à volta do FootballPredictionEngine para picos de pedidos (ex.:
+centenas de utilizadores a pedir o mesmo jogo à hora do início):
+
+- Pedidos idênticos em curso são agrupados (single-flight): o primeiro executa
+  predict_match/iter_daily_analysis e os restantes aguardam o mesmo resultado.
+- O trabalho bloqueante (SQLite) corre num ThreadPoolExecutor limitado, fora do
+  ciclo de eventos.
+- Contrapressão: acima de max_pending cálculos distintos em curso, os pedidos
+  novos são recusados de imediato com ServiceOverloadedError em vez de crescerem
+  numa fila sem limite.
+- Cada pedido tem um tempo limite; expirar não cancela o cálculo partilhado,
+  que continua a servir os restantes pedidos agrupados.
+
+Os resultados são partilhados entre os pedidos agrupados e devem ser tratados
+como só de leitura.
+
+Protocolo TCP (um pedido JSON por linha, uma resposta JSON por linha):
+    {"tipo": "jogo", "casa": 1, "fora": 2}
+    {"tipo": "dia", "data": "2025-06-28", "liga": "Primeira Liga"}
+"""
+
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceOverloadedError(RuntimeError):
+    """O serviço atingiu o limite de cálculos em curso."""
+
+
+class PredictionService:
+    """Serviço de previsões com agrupamento de pedidos, contrapressão e tempos limite."""
+
+    def __init__(self, engine, max_workers: int = 4, max_pending: int = 64, timeout: float = 10.0):
+        self.engine = engine
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='previsao')
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {
+            'pedidos': 0,
+            'executados': 0,
+            'agrupados': 0,
+            'recusados': 0,
+            'expirados': 0
+        }
+
+    @property
+    def pending(self) -> int:
+        """Número de cálculos distintos em curso."""
+        return len(self._inflight)
+
+    async def _single_flight(self, key: Hashable, func: Callable, *args):
+        self.stats['pedidos'] += 1
+        future = self._inflight.get(key)
+
+        if future is None:
+            if len(self._inflight) >= self.max_pending:
+                self.stats['recusados'] += 1
+                raise ServiceOverloadedError(
+                    f"Serviço sobrecarregado ({self.max_pending} cálculos em curso)")
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, func, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.stats['executados'] += 1
+        else:
+            self.stats['agrupados'] += 1
+
+        try:
+            # shield: o tempo limite de um pedido não cancela o cálculo partilhado
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['expirados'] += 1
+            raise
+
+    async def predict_match(self, id_equipa_casa: int, id_equipa_fora: int) -> Dict:
+        """Previsão de um jogo (agrupada com pedidos idênticos em curso)."""
+        return await self._single_flight(('jogo', id_equipa_casa, id_equipa_fora),
+                                         self.engine.predict_match, id_equipa_casa, id_equipa_fora)
+
+    def _daily_analysis(self, data_inicio: str, data_fim: Optional[str], liga: Optional[str]) -> List[Dict]:
+        return list(self.engine.iter_daily_analysis(data_inicio, data_fim, liga=liga))
+
+    async def daily_analysis(self, data_inicio: str, data_fim: Optional[str] = None,
+                             liga: Optional[str] = None) -> List[Dict]:
+        """Análise dos jogos agendados numa data ou intervalo."""
+        return await self._single_flight(('dia', data_inicio, data_fim or data_inicio, liga),
+                                         self._daily_analysis, data_inicio, data_fim, liga)
+
+    async def handle_request(self, pedido: Dict):
+        """Responde a um pedido do protocolo JSON."""
+        tipo = pedido.get('tipo')
+        if tipo == 'jogo':
+            return await self.predict_match(int(pedido['casa']), int(pedido['fora']))
+        if tipo == 'dia':
+            return await self.daily_analysis(pedido['data'], pedido.get('data_fim'), pedido.get('liga'))
+        raise ValueError(f"Tipo de pedido desconhecido: {tipo}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    resposta = await self.handle_request(json.loads(line))
+                except ServiceOverloadedError as e:
+                    resposta = {'erro': str(e), 'codigo': 503}
+                except asyncio.TimeoutError:
+                    resposta = {'erro': f"Tempo limite de {self.timeout}s excedido", 'codigo': 504}
+                except (ValueError, TypeError, KeyError) as e:
+                    resposta = {'erro': str(e), 'codigo': 400}
+                writer.write(json.dumps(resposta, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8766):
+        """Aceita pedidos por socket TCP (um pedido JSON por linha)."""
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info(f"Serviço de previsões em {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        """Termina o pool de threads (aguarda os cálculos em curso)."""
+        self._executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from prediction_engine import FootballPredictionEngine
+
+    async def burst(service: PredictionService, n: int = 500):
+        start = time.perf_counter()
+        results = await asyncio.gather(*(service.predict_match(1, 2) for _ in range(n)),
+                                       return_exceptions=True)
+        erros = sum(isinstance(r, Exception) for r in results)
+        print(f"{n} pedidos em {time.perf_counter() - start:.3f}s | erros: {erros} | {service.stats}")
+
+    service = PredictionService(FootballPredictionEngine(sys.argv[1] if len(sys.argv) > 1 else "football_data.db"))
+    try:
+        asyncio.run(burst(service))
+    finally:
+        service.close()
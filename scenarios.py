@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Cenários Hipotéticos sobre uma Previsão
+Autor: Manus AI
+Data: 19/10/2026
+
+ScenarioBase.from_engine calcula uma vez os componentes de um jogo e guarda o
+que é preciso para os refazer sem voltar à base de dados: o impacto de cada
+jogador, o peso de cada lesão e os fatores casa/fora das duas equipas nos dois
+campos. Um cenário é um dicionário que só altera os componentes afetados:
+
+- 'ausentes_casa' / 'ausentes_fora': ids de jogadores que não jogam
+- 'onze_casa' / 'onze_fora': ids dos únicos jogadores que contam
+- 'lesoes_casa' / 'lesoes_fora': lesões adicionais ({'gravidade', 'impacto_equipa'})
+- 'recuperados_casa' / 'recuperados_fora': ids de jogadores cujas lesões deixam de contar
+- 'campo': 'casa' (por omissão), 'neutro' (média dos fatores em casa e fora de
+  cada equipa) ou 'invertido' (cada equipa com o fator do outro campo)
+- 'componentes': valores diretos de componentes (chaves de analise_detalhada)
+
+apply avalia um cenário em microssegundos; evaluate_many avalia muitos de uma
+só vez com numpy. Só se aplica ao modelo de ponderações (sem --model).
+
+Exemplo ("e se o jogador 12 ficar de fora, em campo neutro?"):
+    base = ScenarioBase.from_engine(engine, 1, 2)
+    base.apply({'ausentes_casa': [12], 'campo': 'neutro'})
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from match_prediction import COMPONENT_KEYS, MatchPrediction
+from prediction_engine import injury_contribution, injury_factor, scores_to_probabilities
+
+logger = logging.getLogger(__name__)
+
+# Ponderação de cada par (casa, fora) de COMPONENT_KEYS, pela mesma ordem
+COMPONENT_WEIGHTS = ('team_performance', 'player_performance', 'injuries', 'head_to_head',
+                     'home_away', 'rest_days', 'fixture_congestion', 'travel')
+VENUES = ('casa', 'neutro', 'invertido')
+SCENARIO_KEYS = frozenset({
+    'ausentes_casa', 'ausentes_fora', 'onze_casa', 'onze_fora', 'lesoes_casa', 'lesoes_fora',
+    'recuperados_casa', 'recuperados_fora', 'campo', 'componentes'
+})
+
+_INDEX = {key: i for i, key in enumerate(COMPONENT_KEYS)}
+_PLAYERS = (_INDEX['impacto_jogadores_casa'], _INDEX['impacto_jogadores_fora'])
+_INJURIES = (_INDEX['impacto_lesoes_casa'], _INDEX['impacto_lesoes_fora'])
+_VENUE = (_INDEX['fator_casa'], _INDEX['fator_fora'])
+
+
+class ScenarioBase:
+    """Componentes de um jogo em cache, reavaliados com alterações hipotéticas."""
+
+    def __init__(self, equipa_casa: str, equipa_fora: str, componentes: Sequence[float],
+                 pesos: Dict[str, float], jogadores: Tuple[Dict[int, float], Dict[int, float]],
+                 lesoes: Tuple[List[Tuple[int, float]], List[Tuple[int, float]]],
+                 fatores_campo: Tuple[Tuple[float, float], Tuple[float, float]], calibrator=None):
+        self.equipa_casa = equipa_casa
+        self.equipa_fora = equipa_fora
+        self.componentes = tuple(componentes)
+        self.pesos = [pesos[key] for key in COMPONENT_WEIGHTS]
+        # Por equipa: {id_jogador: impacto}, [(id_jogador, peso da lesão)] e (fator em casa, fator fora)
+        self.jogadores = jogadores
+        self.lesoes = lesoes
+        self.fatores_campo = fatores_campo
+        self.calibrator = calibrator
+
+    @classmethod
+    def from_engine(cls, engine, id_equipa_casa: int, id_equipa_fora: int,
+                    id_competicao: Optional[int] = None, data_jogo: Optional[str] = None) -> 'ScenarioBase':
+        """Calcula os componentes base do jogo com o motor (uma vez por jogo)."""
+        if engine.model is not None:
+            raise ValueError("Os cenários usam os componentes do modelo de ponderações (motor sem modelo treinado)")
+
+        with engine.metrics.timer('scenario_base'), engine.collector.storage.pinned():
+            # A previsão base fornece os componentes que os cenários não alteram
+            base = engine.predict_match_compact(id_equipa_casa, id_equipa_fora, id_competicao, data_jogo)
+            _, competicao_casa = engine._team_info(id_equipa_casa)
+            pesos = engine.weights_for(id_competicao if id_competicao is not None else competicao_casa)
+
+            jogadores = (engine.player_impacts(id_equipa_casa), engine.player_impacts(id_equipa_fora))
+            lesoes = tuple(
+                [(i['id_jogador'], injury_contribution(i['gravidade'], i['impacto_equipa']))
+                 for i in engine.collector.get_team_injuries(id_equipa)]
+                for id_equipa in (id_equipa_casa, id_equipa_fora)
+            )
+            fatores_campo = (
+                (base.componentes[_VENUE[0]], engine.calculate_home_away_factor(False, id_equipa_casa)),
+                (engine.calculate_home_away_factor(True, id_equipa_fora), base.componentes[_VENUE[1]])
+            )
+
+        return cls(base.equipa_casa, base.equipa_fora, base.componentes, pesos, jogadores, lesoes,
+                   fatores_campo, engine.calibrator)
+
+    def components(self, cenario: Dict) -> List[float]:
+        """Componentes (ordem de COMPONENT_KEYS) com as alterações do cenário."""
+        desconhecidas = set(cenario) - SCENARIO_KEYS
+        if desconhecidas:
+            raise ValueError(f"Alterações desconhecidas: {', '.join(sorted(desconhecidas))}")
+
+        componentes = list(self.componentes)
+        for lado, sufixo in enumerate(('casa', 'fora')):
+            ausentes = cenario.get(f'ausentes_{sufixo}')
+            onze = cenario.get(f'onze_{sufixo}')
+            if ausentes or onze is not None:
+                impacts = self.jogadores[lado]
+                ids = impacts.keys() if onze is None else [i for i in onze if i in impacts]
+                if ausentes:
+                    ausentes = set(ausentes)
+                    ids = [i for i in ids if i not in ausentes]
+                valores = [impacts[i] for i in ids]
+                componentes[_PLAYERS[lado]] = sum(valores) / len(valores) if valores else 0.5
+
+            extra = cenario.get(f'lesoes_{sufixo}')
+            recuperados = cenario.get(f'recuperados_{sufixo}')
+            if extra or recuperados:
+                recuperados = set(recuperados or ())
+                contribuicoes = [c for id_jogador, c in self.lesoes[lado] if id_jogador not in recuperados]
+                contribuicoes += [injury_contribution(l['gravidade'], l['impacto_equipa']) for l in extra or ()]
+                componentes[_INJURIES[lado]] = injury_factor(contribuicoes)
+
+        campo = cenario.get('campo', 'casa')
+        if campo not in VENUES:
+            raise ValueError(f"Campo desconhecido: {campo} (use {', '.join(VENUES)})")
+        if campo == 'neutro':
+            componentes[_VENUE[0]] = sum(self.fatores_campo[0]) / 2
+            componentes[_VENUE[1]] = sum(self.fatores_campo[1]) / 2
+        elif campo == 'invertido':
+            componentes[_VENUE[0]] = self.fatores_campo[0][1]
+            componentes[_VENUE[1]] = self.fatores_campo[1][0]
+
+        for key, value in (cenario.get('componentes') or {}).items():
+            if key not in _INDEX:
+                raise ValueError(f"Componente desconhecido: {key}")
+            componentes[_INDEX[key]] = value
+        return componentes
+
+    def scores(self, componentes: Sequence[float]) -> Tuple[float, float]:
+        """Pontuações ponderadas (casa, fora), somadas pela ordem do motor."""
+        score_home = score_away = 0
+        for i, peso in enumerate(self.pesos):
+            score_home += componentes[2 * i] * peso
+            score_away += componentes[2 * i + 1] * peso
+        return score_home, score_away
+
+    def apply(self, cenario: Optional[Dict] = None) -> MatchPrediction:
+        """Previsão do jogo com as alterações do cenário (sem cenário, a previsão base)."""
+        componentes = self.components(cenario or {})
+        score_home, score_away = self.scores(componentes)
+        probs = scores_to_probabilities(score_home, score_away)
+        if self.calibrator is not None:
+            probs = self.calibrator.apply(*probs)
+        return MatchPrediction(self.equipa_casa, self.equipa_fora, *probs,
+                               componentes=tuple(componentes), pontuacao=(score_home, score_away))
+
+    def evaluate_many(self, cenarios: Iterable[Dict]):
+        """Probabilidades (n, 3) de muitos cenários numa só avaliação vetorizada (requer numpy)."""
+        import numpy as np
+
+        matriz = np.array([self.components(cenario) for cenario in cenarios], dtype=float)
+        if not len(matriz):
+            return np.empty((0, 3))
+        pesos = np.array(self.pesos)
+        score_home = matriz[:, 0::2] @ pesos
+        score_away = matriz[:, 1::2] @ pesos
+
+        # scores_to_probabilities em vetor
+        total = score_home + score_away
+        positivo = total > 0
+        safe = np.where(positivo, total, 1.0)
+        prob_home = np.where(positivo, score_home / safe, 0.5)
+        prob_away = np.where(positivo, score_away / safe, 0.5)
+        prob_draw = np.maximum(0.1, 0.3 - np.abs(score_home - score_away))
+        probs = np.column_stack([prob_home, prob_draw, prob_away])
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        if self.calibrator is not None:
+            probs = self.calibrator.apply_many(probs)
+        return probs
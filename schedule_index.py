@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Calendário por Equipa: Descanso, Congestão e Viagens
+Autor: Manus AI
+Data: 19/10/2026
+
+ScheduleIndex lê uma vez as datas de todos os jogos (tabela jogo) e guarda, por
+equipa, a lista ordenada dos dias (ordinais) e, em paralelo, o local de cada
+jogo (a equipa da casa). Cada consulta é uma pesquisa binária (bisect), O(log n):
+
+- dias de descanso desde o último jogo anterior à data
+- jogos nos CONGESTION_WINDOW dias anteriores
+- distância (km) entre o local do jogo anterior e o do jogo seguinte, com as
+  coordenadas opcionais equipa.latitude/longitude; equipas sem coordenadas
+  contam como sem viagem
+
+Os valores são convertidos em fatores 0-1 (1 = sem fadiga), usados como
+componentes do motor de previsão; factors_many calcula-os para uma jornada
+inteira de uma só vez.
+"""
+
+import datetime
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dias de descanso a partir dos quais a equipa está totalmente recuperada
+REST_FULL_DAYS = 7
+# Janela (dias) e número de jogos que saturam o fator de congestão
+CONGESTION_WINDOW = 14
+CONGESTION_MAX = 4
+# Distância (km) que satura o fator de viagem
+TRAVEL_MAX_KM = 3000.0
+EARTH_RADIUS_KM = 6371.0
+
+
+def day_ordinal(data) -> int:
+    """Dia (ordinal) de uma data 'AAAA-MM-DD' (a hora, se existir, é ignorada)."""
+    return datetime.date.fromisoformat(str(data)[:10]).toordinal()
+
+
+def haversine_km(origem: Tuple[float, float], destino: Tuple[float, float]) -> float:
+    """Distância em km entre dois pontos (latitude, longitude) em graus."""
+    lat1, lon1 = map(math.radians, origem)
+    lat2, lon2 = map(math.radians, destino)
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(a), 1.0))
+
+
+class ScheduleIndex:
+    """Datas e locais dos jogos de cada equipa, ordenados, para consultas por bisect."""
+
+    def __init__(self):
+        self.dates: Dict[int, List[int]] = {}
+        self.venues: Dict[int, List[int]] = {}
+        self.locations: Dict[int, Tuple[float, float]] = {}
+        self._distances: Dict[Tuple[int, int], float] = {}
+
+    @classmethod
+    def load(cls, conn, coordenadas: bool = True) -> 'ScheduleIndex':
+        """Carrega os jogos (todos os estados) e, se existirem as colunas, as coordenadas das equipas."""
+        index = cls()
+        cursor = conn.cursor()
+        if coordenadas:
+            cursor.execute('''
+                SELECT id_equipa, latitude, longitude FROM equipa
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ''')
+            index.locations = {id_equipa: (lat, lon) for id_equipa, lat, lon in cursor.fetchall()}
+
+        # Por ordem de data: as listas ficam ordenadas sem ordenar no fim
+        cursor.execute('SELECT data_jogo, id_equipa_casa, id_equipa_fora FROM jogo ORDER BY data_jogo')
+        dates, venues = index.dates, index.venues
+        dias = {}
+        total = 0
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            for data, id_casa, id_fora in rows:
+                dia = dias.get(data)
+                if dia is None:
+                    dia = dias[data] = day_ordinal(data)
+                for id_equipa in (id_casa, id_fora):
+                    if id_equipa not in dates:
+                        dates[id_equipa] = []
+                        venues[id_equipa] = []
+                    dates[id_equipa].append(dia)
+                    venues[id_equipa].append(id_casa)
+            total += len(rows)
+
+        logger.info(f"Calendário carregado: {total} jogos de {len(dates)} equipas")
+        return index
+
+    def add_match(self, data_jogo: str, id_equipa_casa: int, id_equipa_fora: int):
+        """Acrescenta um jogo mantendo as listas ordenadas."""
+        dia = day_ordinal(data_jogo)
+        for id_equipa in (id_equipa_casa, id_equipa_fora):
+            dates = self.dates.setdefault(id_equipa, [])
+            pos = bisect_right(dates, dia)
+            dates.insert(pos, dia)
+            self.venues.setdefault(id_equipa, []).insert(pos, id_equipa_casa)
+
+    def set_location(self, id_equipa: int, latitude: float, longitude: float):
+        self.locations[id_equipa] = (latitude, longitude)
+        self._distances.clear()
+
+    def distance(self, local_a: int, local_b: int) -> float:
+        """Distância (km) entre os estádios de duas equipas; 0 sem coordenadas."""
+        if local_a == local_b:
+            return 0.0
+        key = (local_a, local_b) if local_a < local_b else (local_b, local_a)
+        km = self._distances.get(key)
+        if km is None:
+            a, b = self.locations.get(local_a), self.locations.get(local_b)
+            km = self._distances[key] = haversine_km(a, b) if a is not None and b is not None else 0.0
+        return km
+
+    def rest_days(self, id_equipa: int, data) -> Optional[int]:
+        """Dias desde o último jogo anterior à data (None se a equipa ainda não jogou)."""
+        dia = day_ordinal(data)
+        dates = self.dates.get(id_equipa, ())
+        pos = bisect_left(dates, dia)
+        return dia - dates[pos - 1] if pos else None
+
+    def matches_in_window(self, id_equipa: int, data, janela: int = CONGESTION_WINDOW) -> int:
+        """Jogos nos `janela` dias anteriores à data (o próprio dia excluído)."""
+        dia = day_ordinal(data)
+        dates = self.dates.get(id_equipa, ())
+        return bisect_left(dates, dia) - bisect_left(dates, dia - janela)
+
+    def travel_km(self, id_equipa: int, data, local: int) -> float:
+        """Distância do local do jogo anterior ao local (equipa da casa) do jogo na data."""
+        dates = self.dates.get(id_equipa, ())
+        pos = bisect_left(dates, day_ordinal(data))
+        return self.distance(self.venues[id_equipa][pos - 1], local) if pos else 0.0
+
+    def team_factors(self, id_equipa: int, dia: int, local: int) -> Tuple[float, float, float]:
+        """Fatores (descanso, congestão, viagem) de uma equipa num dia (ordinal), 1 = sem fadiga."""
+        dates = self.dates.get(id_equipa)
+        if not dates:
+            return 1.0, 1.0, 1.0
+        pos = bisect_left(dates, dia)
+        if not pos:
+            return 1.0, 1.0, 1.0
+        descanso = min(dia - dates[pos - 1], REST_FULL_DAYS) / REST_FULL_DAYS
+        jogos = pos - bisect_left(dates, dia - CONGESTION_WINDOW, 0, pos)
+        congestao = 1.0 - min(jogos, CONGESTION_MAX) / CONGESTION_MAX
+        viagem = 1.0 - min(self.distance(self.venues[id_equipa][pos - 1], local), TRAVEL_MAX_KM) / TRAVEL_MAX_KM
+        return descanso, congestao, viagem
+
+    def fixture_factors(self, id_equipa_casa: int, id_equipa_fora: int, data) -> Tuple[float, ...]:
+        """(descanso_casa, descanso_fora, congestao_casa, congestao_fora, viagem_casa, viagem_fora)."""
+        dia = day_ordinal(data)
+        casa = self.team_factors(id_equipa_casa, dia, id_equipa_casa)
+        fora = self.team_factors(id_equipa_fora, dia, id_equipa_casa)
+        return casa[0], fora[0], casa[1], fora[1], casa[2], fora[2]
+
+    def factors_many(self, fixtures: Iterable[Tuple]) -> List[Tuple[float, ...]]:
+        """fixture_factors de uma jornada (id_jogo, data_jogo, id_casa, id_fora, ...) de uma só vez.
+
+        Cada data é convertida uma vez e cada (equipa, dia, local) é consultado uma vez.
+        """
+        dias = {}
+        cache = {}
+        result = []
+        for fixture in fixtures:
+            data, id_casa, id_fora = fixture[1], fixture[2], fixture[3]
+            dia = dias.get(data)
+            if dia is None:
+                dia = dias[data] = day_ordinal(data)
+            pair = []
+            for id_equipa in (id_casa, id_fora):
+                key = (id_equipa, dia, id_casa)
+                factors = cache.get(key)
+                if factors is None:
+                    factors = cache[key] = self.team_factors(id_equipa, dia, id_casa)
+                pair.append(factors)
+            casa, fora = pair
+            result.append((casa[0], fora[0], casa[1], fora[1], casa[2], fora[2]))
+        return result
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Arquivo de Épocas Terminadas
+Autor: Manus AI
+Data: 19/10/2026
+
+As tabelas por jogo (jogo, desempenhos, remates, odds, previsões) crescem sem
+fim num só ficheiro e todas as consultas e VACUUM pagam todo o histórico.
+archive_season move os jogos finalizados de uma época terminada (e as linhas
+que deles dependem) para um ficheiro SQLite próprio ao lado da base, com os
+mesmos índices mais os de id_jogo, compactado (ANALYZE + VACUUM). Ficam na base
+viva os jogos não finalizados (adiados, anulados) e os que ainda estão nas
+janelas do motor (RETAINED_WINDOWS: os últimos jogos de cada equipa, em casa e
+fora, de cada jogador e de cada confronto), para que a forma, o fator casa/fora,
+o calendário e o xG de equipas sem jogos recentes não mudem. A base viva fica
+com a época em curso mais essas janelas, e as consultas do dia a dia não mudam.
+
+Os arquivos ficam registados na tabela arquivo_epoca. Para backtests e treino
+sobre o histórico, HistorySQLiteBackend (`football_cli.py --history`) anexa os
+arquivos só de leitura (ATTACH) e cria, em cada ligação, vistas TEMP com o nome
+das tabelas arquivadas: `SELECT ... FROM jogo` passa a ler a base viva e os
+arquivos (UNION ALL), sem alterar nenhuma consulta. O SQLite anexa no máximo
+SQLITE_LIMIT_ATTACHED bases (10 por omissão); com mais épocas arquivadas,
+escolha as épocas a incluir.
+
+Os ids continuam únicos (AUTOINCREMENT) e a forma com decaimento mantém as
+somas já calculadas; para a recalcular de raiz depois de arquivar, use o modo
+histórico. Requer SQLite.
+"""
+
+import os
+import re
+import sqlite3
+import datetime
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import quote
+import logging
+
+from football_betting_analyzer import SEASON_START_MONTH, season_for_date
+from instrumentation import Metrics
+from storage import SQLiteBackend, StorageBackend, _PinnedConnection
+from xg_pipeline import XG_WINDOW
+
+logger = logging.getLogger(__name__)
+
+# Tabelas com linhas por jogo, movidas com os jogos (jogo por último)
+ARCHIVED_TABLES = ('desempenho_equipa_jogo', 'desempenho_jogador_jogo', 'remate', 'xg_jogo',
+                   'odds', 'previsoes', 'jogo')
+
+# Janelas lidas pelo motor na base viva: (tabela com id_jogo, partição, jogos). Os
+# jogos finalizados mais recentes de cada partição não são arquivados.
+RETAINED_WINDOWS = [
+    ('desempenho_equipa_jogo', 'o.id_equipa', 10),       # get_team_performance, ml_model.TEAM_WINDOW
+    ('xg_jogo', 'o.id_equipa', XG_WINDOW),                # refresh_team_xg
+    ('desempenho_jogador_jogo', 'o.id_jogador', 20),     # get_player_performance
+    ('jogo', 'o.id_equipa_casa', 10),                     # fator casa
+    ('jogo', 'o.id_equipa_fora', 10),                     # fator fora
+    ('jogo', 'MIN(o.id_equipa_casa, o.id_equipa_fora), MAX(o.id_equipa_casa, o.id_equipa_fora)', 5)  # confrontos
+]
+
+# Índices acrescentados nos arquivos (além dos da base viva), para as junções por jogo
+ARCHIVE_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_arquivo_dej_jogo ON desempenho_equipa_jogo (id_jogo)',
+    'CREATE INDEX IF NOT EXISTS idx_arquivo_dpj_jogo ON desempenho_jogador_jogo (id_jogo)'
+]
+
+_CREATE_INDEX = re.compile(r'^CREATE\s+(UNIQUE\s+)?INDEX\s+(?!IF\s+NOT\s+EXISTS)', re.I)
+
+
+def season_bounds(epoca: str):
+    """(nome, primeiro dia, primeiro dia da época seguinte) de uma época como '2023/24'."""
+    try:
+        ano = int(epoca[:4])
+    except ValueError:
+        raise ValueError(f"Época inválida: {epoca} (use o formato '2023/24')")
+    nome, inicio, _ = season_for_date(f"{ano}-{SEASON_START_MONTH:02d}-01")
+    if nome != epoca:
+        raise ValueError(f"Época inválida: {epoca} (use o formato '{nome}')")
+    return nome, inicio, f"{ano + 1}-{SEASON_START_MONTH:02d}-01"
+
+
+def archive_path(db_path: str, epoca: str) -> str:
+    """Ficheiro do arquivo de uma época: football_data.db -> football_data.2023-24.db."""
+    raiz, extensao = os.path.splitext(db_path)
+    return f"{raiz}.{epoca.replace('/', '-')}{extensao or '.db'}"
+
+
+def _ensure_registry(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS arquivo_epoca (
+            nome TEXT PRIMARY KEY,
+            caminho TEXT NOT NULL,
+            jogos INTEGER DEFAULT 0,
+            arquivado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+
+def _columns(cursor, schema: str, tabela: str) -> List[Sequence]:
+    """(nome, tipo) das colunas de uma tabela num esquema (main, temp ou um anexo)."""
+    cursor.execute(f'PRAGMA {schema}.table_info({tabela})')
+    return [(row[1], row[2]) for row in cursor.fetchall()]
+
+
+def list_archives(conn, db_path: str) -> List[Dict]:
+    """Épocas arquivadas, com o caminho absoluto de cada arquivo."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'arquivo_epoca'")
+    if cursor.fetchone() is None:
+        return []
+    cursor.execute('SELECT nome, caminho, jogos, arquivado_em FROM arquivo_epoca ORDER BY nome')
+    directory = os.path.dirname(os.path.abspath(db_path))
+    return [{'epoca': nome, 'caminho': os.path.join(directory, caminho), 'jogos': jogos, 'arquivado_em': data}
+            for nome, caminho, jogos, data in cursor.fetchall()]
+
+
+def _retained_matches(conn, tabelas: List[str]):
+    """Tabela TEMP manter com os jogos das janelas do motor (RETAINED_WINDOWS)."""
+    cursor = conn.cursor()
+    cursor.execute('DROP TABLE IF EXISTS temp.manter')
+    cursor.execute('CREATE TEMP TABLE manter (id_jogo INTEGER PRIMARY KEY)')
+    for origem, particao, janela in RETAINED_WINDOWS:
+        if origem not in tabelas:
+            continue
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO temp.manter (id_jogo)
+            SELECT id_jogo FROM (
+                SELECT o.id_jogo, ROW_NUMBER() OVER (
+                    PARTITION BY {particao} ORDER BY j.data_jogo DESC, j.id_jogo DESC
+                ) AS ordem
+                FROM main.{origem} o
+                JOIN main.jogo j ON j.id_jogo = o.id_jogo
+                WHERE j.status = 'finalizado'
+            ) recentes
+            WHERE ordem <= ?
+        ''', (janela,))
+
+
+def _select_archivable(conn, inicio: str, seguinte: str, tabelas: List[str]):
+    """Tabela TEMP arquivar: jogos finalizados da época fora das janelas do motor."""
+    _retained_matches(conn, tabelas)
+    cursor = conn.cursor()
+    cursor.execute('DROP TABLE IF EXISTS temp.arquivar')
+    cursor.execute('''
+        CREATE TEMP TABLE arquivar AS
+        SELECT id_jogo FROM main.jogo
+        WHERE data_jogo >= ? AND data_jogo < ? AND status = 'finalizado'
+          AND id_jogo NOT IN (SELECT id_jogo FROM temp.manter)
+    ''', (inicio, seguinte))
+    cursor.execute('DROP TABLE temp.manter')
+
+
+def closed_seasons(collector, hoje: Optional[str] = None) -> List[str]:
+    """Épocas já terminadas que ainda têm jogos finalizados por arquivar na base viva."""
+    hoje = hoje or datetime.date.today().isoformat()
+    conn = collector._connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(data_jogo) FROM jogo WHERE status = 'finalizado'")
+        primeiro = cursor.fetchone()[0]
+        epocas = []
+        if primeiro is None:
+            return epocas
+        tabelas = [t for t in ARCHIVED_TABLES if collector.storage.table_columns(conn, t)]
+        ano = int(season_for_date(primeiro[:10])[0][:4])
+        while True:
+            nome, inicio, seguinte = season_bounds(season_for_date(f"{ano}-{SEASON_START_MONTH:02d}-01")[0])
+            if seguinte > hoje:
+                break
+            _select_archivable(conn, inicio, seguinte, tabelas)
+            cursor.execute('SELECT 1 FROM temp.arquivar LIMIT 1')
+            if cursor.fetchone():
+                epocas.append(nome)
+            cursor.execute('DROP TABLE temp.arquivar')
+            ano += 1
+        return epocas
+    finally:
+        conn.close()
+
+
+def _prepare_archive(conn, caminho: str, tabelas: List[str]):
+    """Cria (ou acerta as colunas de) as tabelas do arquivo com o esquema da base viva."""
+    cursor = conn.cursor()
+    arquivo = sqlite3.connect(caminho)
+    try:
+        for tabela in tabelas:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,))
+            existentes = {nome for nome, _ in _columns(arquivo.cursor(), 'main', tabela)}
+            if not existentes:
+                arquivo.execute(cursor.fetchone()[0])
+                continue
+            # Colunas acrescentadas à base viva depois do primeiro arquivo desta época
+            for nome, tipo in _columns(cursor, 'main', tabela):
+                if nome not in existentes:
+                    arquivo.execute(f'ALTER TABLE {tabela} ADD COLUMN {nome} {tipo}')
+        arquivo.commit()
+    finally:
+        arquivo.close()
+
+
+def _compact_archive(conn, caminho: str, tabelas: List[str]):
+    """Índices da base viva e de ARCHIVE_INDEXES, estatísticas e VACUUM do arquivo."""
+    cursor = conn.cursor()
+    marcadores = ', '.join('?' for _ in tabelas)
+    cursor.execute(f'''
+        SELECT sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({marcadores})
+    ''', tabelas)
+    indices = [_CREATE_INDEX.sub(lambda m: f"CREATE {m.group(1) or ''}INDEX IF NOT EXISTS ", sql)
+               for (sql,) in cursor.fetchall()]
+
+    arquivo = sqlite3.connect(caminho)
+    try:
+        existentes = {row[0] for row in arquivo.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for sql in indices + ARCHIVE_INDEXES:
+            if re.search(r'\bON\s+(\w+)', sql).group(1) in existentes:
+                arquivo.execute(sql)
+        arquivo.commit()
+        arquivo.execute('ANALYZE')
+        arquivo.commit()
+        arquivo.execute('VACUUM')
+    finally:
+        arquivo.close()
+
+
+def archive_season(collector, epoca: str, vacuum: bool = True, hoje: Optional[str] = None) -> Dict:
+    """Move os jogos finalizados de uma época terminada, e as linhas por jogo, para o arquivo da época.
+
+    Os jogos não finalizados e os das janelas do motor (RETAINED_WINDOWS) ficam
+    na base viva. Pode ser repetido (ex.: correções tardias, ou quando novos
+    jogos empurram os antigos para fora das janelas): as linhas arquiváveis
+    são acrescentadas ao mesmo arquivo. Com vacuum, a base viva é compactada
+    no fim. Devolve o caminho e as linhas movidas por tabela.
+    """
+    if collector.storage.name != 'sqlite':
+        raise ValueError("O arquivo de épocas requer a base SQLite viva")
+    nome, inicio, seguinte = season_bounds(epoca)
+    hoje = hoje or datetime.date.today().isoformat()
+    if seguinte > hoje:
+        raise ValueError(f"A época {nome} ainda não terminou")
+
+    caminho = archive_path(collector.db_path, nome)
+    conn = collector._connect()
+    try:
+        _ensure_registry(conn)
+        cursor = conn.cursor()
+        tabelas = [t for t in ARCHIVED_TABLES if collector.storage.table_columns(conn, t)]
+        _prepare_archive(conn, caminho, tabelas)
+
+        cursor.execute('ATTACH DATABASE ? AS arquivo', (caminho,))
+        linhas = {}
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            _select_archivable(conn, inicio, seguinte, tabelas)
+            # Os triggers do registo de alterações não devem tratar o arquivo como alterações
+            registo = None
+            if collector.storage.table_columns(conn, 'registo_alteracoes'):
+                cursor.execute('SELECT COALESCE(MAX(id), 0) FROM main.registo_alteracoes')
+                registo = cursor.fetchone()[0]
+
+            for tabela in tabelas:
+                colunas = ', '.join(nome_coluna for nome_coluna, _ in _columns(cursor, 'main', tabela))
+                filtro = 'WHERE id_jogo IN (SELECT id_jogo FROM temp.arquivar)'
+                cursor.execute(f'INSERT INTO arquivo.{tabela} ({colunas}) SELECT {colunas} FROM main.{tabela} {filtro}')
+                linhas[tabela] = cursor.rowcount
+                cursor.execute(f'DELETE FROM main.{tabela} {filtro}')
+
+            if registo is not None:
+                cursor.execute('DELETE FROM main.registo_alteracoes WHERE id > ?', (registo,))
+            cursor.execute('''
+                INSERT INTO main.arquivo_epoca (nome, caminho, jogos) VALUES (?, ?, ?)
+                ON CONFLICT (nome) DO UPDATE SET jogos = jogos + excluded.jogos, arquivado_em = CURRENT_TIMESTAMP
+            ''', (nome, os.path.basename(caminho), linhas.get('jogo', 0)))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute('DROP TABLE IF EXISTS temp.arquivar')
+            cursor.execute('DETACH DATABASE arquivo')
+
+        _compact_archive(conn, caminho, tabelas)
+    finally:
+        conn.close()
+
+    if vacuum:
+        conn = sqlite3.connect(collector.db_path)
+        try:
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+    logger.info(f"Época {nome} arquivada em {caminho}: {linhas.get('jogo', 0)} jogos")
+    return {'epoca': nome, 'caminho': caminho, 'linhas': linhas}
+
+
+class HistorySQLiteBackend(StorageBackend):
+    """Base viva mais as épocas arquivadas, só de leitura (vistas TEMP sobre ATTACH).
+
+    Cada ligação anexa os arquivos com mode=ro e cria uma vista TEMP por
+    tabela arquivada, que se sobrepõe à tabela da base viva nas consultas sem
+    esquema. Dentro de pinned(), a thread reutiliza a mesma ligação.
+    """
+
+    name = 'sqlite-history'
+    read_only = True
+
+    def __init__(self, db_path: str = "football_data.db", metrics: Optional[Metrics] = None,
+                 epocas: Optional[Sequence[str]] = None):
+        self.db_path = db_path
+        self.metrics = metrics or Metrics()
+        self.epocas = list(epocas) if epocas is not None else None
+        self._local = threading.local()
+
+        conn = sqlite3.connect(db_path)
+        try:
+            arquivos = list_archives(conn, db_path)
+        finally:
+            conn.close()
+        if self.epocas is not None:
+            desconhecidas = set(self.epocas) - {a['epoca'] for a in arquivos}
+            if desconhecidas:
+                raise ValueError(f"Épocas não arquivadas: {', '.join(sorted(desconhecidas))}")
+            arquivos = [a for a in arquivos if a['epoca'] in self.epocas]
+        memoria = sqlite3.connect(':memory:')
+        limite = memoria.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        memoria.close()
+        if len(arquivos) > limite:
+            raise ValueError(f"{len(arquivos)} épocas arquivadas excedem o limite de {limite} bases anexas; "
+                             f"indique as épocas a incluir")
+        self.arquivos = [a['caminho'] for a in arquivos]
+        self._views = None
+
+    def _open(self) -> sqlite3.Connection:
+        conn = self.metrics.connect(self.db_path, uri=True)
+        cursor = conn.cursor()
+        for i, caminho in enumerate(self.arquivos):
+            cursor.execute(f'ATTACH DATABASE ? AS arquivo_{i}', (f"file:{quote(caminho)}?mode=ro",))
+        if self._views is None:
+            self._views = self._view_sql(cursor)
+        for sql in self._views:
+            cursor.execute(sql)
+        return conn
+
+    def _view_sql(self, cursor) -> List[str]:
+        """CREATE TEMP VIEW de cada tabela arquivada (colunas em falta num arquivo como NULL)."""
+        views = []
+        for tabela in ARCHIVED_TABLES:
+            colunas = [nome for nome, _ in _columns(cursor, 'main', tabela)]
+            if not colunas:
+                continue
+            partes = [f"SELECT {', '.join(colunas)} FROM main.{tabela}"]
+            for i in range(len(self.arquivos)):
+                existentes = {nome for nome, _ in _columns(cursor, f'arquivo_{i}', tabela)}
+                if existentes:
+                    lista = ', '.join(c if c in existentes else f'NULL AS {c}' for c in colunas)
+                    partes.append(f"SELECT {lista} FROM arquivo_{i}.{tabela}")
+            if len(partes) > 1:
+                views.append(f"CREATE TEMP VIEW {tabela} AS {' UNION ALL '.join(partes)}")
+        return views
+
+    def connect(self):
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            return _PinnedConnection(pinned)
+        return self._open()
+
+    @contextmanager
+    def pinned(self):
+        """Uma só ligação (anexos e vistas criados uma vez) para a thread."""
+        if getattr(self._local, 'conn', None) is not None:
+            yield
+            return
+        self._local.conn = self._open()
+        try:
+            yield
+        finally:
+            self._local.conn.close()
+            self._local.conn = None
+
+    def table_columns(self, conn, tabela: str) -> List[str]:
+        return SQLiteBackend.table_columns(self, conn, tabela)
+
+    def bulk_insert(self, conn, tabela: str, colunas: Sequence[str], linhas) -> int:
+        raise ValueError("O modo histórico é só de leitura; use a base viva")
+
+    def factory(self) -> Callable[[], StorageBackend]:
+        return partial(HistorySQLiteBackend, self.db_path, epocas=self.epocas)
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Backends de Armazenamento
+Autor: Manus AI
+Data: 19/10/2026
+
+Abstração sobre a base de dados usada pelo FootballDataCollector e pelo
+FootballPredictionEngine:
+
+- SQLiteBackend: comportamento original (um ficheiro SQLite), por omissão.
+- SnapshotSQLiteBackend: leituras sobre uma cópia consistente e só de leitura
+  da base SQLite, publicada com publish_snapshot; as escritas continuam na base
+  viva e uma ingestão longa não bloqueia nem atrasa as previsões.
+- PostgresBackend: PostgreSQL com pool de ligações (psycopg2), carregamento em
+  bloco com COPY e as agregações executadas no servidor. As consultas do sistema
+  continuam escritas com marcadores '?' e são traduzidas na ligação.
+
+Os módulos que usam funcionalidades próprias do SQLite (triggers do registo de
+alterações, armazém de features, dados sintéticos) continuam a exigir SQLite.
+"""
+
+import io
+import os
+import re
+import csv
+import time
+import sqlite3
+import datetime
+import threading
+from contextlib import contextmanager, nullcontext
+from decimal import Decimal
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote
+from instrumentation import Metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend:
+    """Interface comum dos backends de armazenamento."""
+
+    name = 'base'
+    read_only = False
+
+    def connect(self):
+        """Devolve uma ligação DB-API com cursor(), commit() e close()."""
+        raise NotImplementedError
+
+    def table_columns(self, conn, tabela: str) -> List[str]:
+        """Devolve as colunas de uma tabela (lista vazia se a tabela não existir)."""
+        raise NotImplementedError
+
+    def bulk_insert(self, conn, tabela: str, colunas: Sequence[str], linhas: Iterable[Sequence]) -> int:
+        """Insere um bloco de linhas (tuplos) na tabela, sem fazer commit."""
+        raise NotImplementedError
+
+    def pinned(self):
+        """Contexto em que todas as leituras veem o mesmo estado da base de dados."""
+        return nullcontext()
+
+    def factory(self) -> Callable[[], 'StorageBackend']:
+        """Devolve um callable serializável que recria o backend noutro processo."""
+        raise NotImplementedError
+
+    def close(self):
+        """Liberta os recursos do backend."""
+
+
+class SQLiteBackend(StorageBackend):
+    """Backend SQLite (um ficheiro local, uma ligação por operação)."""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path: str = "football_data.db", metrics: Optional[Metrics] = None):
+        self.db_path = db_path
+        self.metrics = metrics or Metrics()
+
+    def connect(self) -> sqlite3.Connection:
+        return self.metrics.connect(self.db_path)
+
+    def table_columns(self, conn, tabela: str) -> List[str]:
+        cursor = conn.cursor()
+        cursor.execute('SELECT name FROM sqlite_master WHERE type = ? AND name = ?', ('table', tabela))
+        if cursor.fetchone() is None:
+            return []
+        cursor.execute(f'PRAGMA table_info({tabela})')
+        return [row[1] for row in cursor.fetchall()]
+
+    def bulk_insert(self, conn, tabela: str, colunas: Sequence[str], linhas: Iterable[Sequence]) -> int:
+        linhas = list(linhas)
+        sql = f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' for _ in colunas)})"
+        conn.cursor().executemany(sql, linhas)
+        return len(linhas)
+
+    def factory(self) -> Callable[[], StorageBackend]:
+        return partial(SQLiteBackend, self.db_path)
+
+
+def default_snapshot_path(db_path: str) -> str:
+    """Caminho do ponteiro para a cópia de leitura de uma base de dados."""
+    return f"{db_path}.snapshot"
+
+
+def publish_snapshot(db_path: str, snapshot_path: Optional[str] = None, keep: int = 2) -> str:
+    """Publica uma cópia consistente da base viva para as leituras.
+
+    A cópia é feita com a API de backup do SQLite numa única transação de
+    leitura: contém cada ingestão por inteiro ou não a contém. A base viva passa
+    a modo WAL, pelo que a cópia não bloqueia as escritas em curso. Cada cópia é
+    um ficheiro novo e o ponteiro (uma ligação simbólica) é trocado de forma
+    atómica; as ligações abertas sobre cópias antigas continuam válidas.
+    Devolve o caminho da nova cópia.
+    """
+    snapshot_path = snapshot_path or default_snapshot_path(db_path)
+    start = time.perf_counter()
+
+    version_path = f"{snapshot_path}.{time.time_ns()}"
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(version_path)
+    try:
+        source.execute('PRAGMA journal_mode=WAL')
+        source.backup(target)
+        target.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        target.close()
+        source.close()
+
+    link_tmp = f"{snapshot_path}.tmp"
+    if os.path.lexists(link_tmp):
+        os.remove(link_tmp)
+    os.symlink(os.path.basename(version_path), link_tmp)
+    os.replace(link_tmp, snapshot_path)
+
+    # Remover versões antigas (leitores com a cópia aberta mantêm o acesso)
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    prefix = os.path.basename(snapshot_path) + '.'
+    versions = sorted(name for name in os.listdir(directory)
+                      if name.startswith(prefix) and name[len(prefix):].isdigit())
+    for name in versions[:-keep]:
+        os.remove(os.path.join(directory, name))
+
+    logger.info(f"Cópia de leitura publicada em {version_path} "
+                f"({time.perf_counter() - start:.2f}s)")
+    return version_path
+
+
+class _PinnedConnection:
+    """Ligação partilhada durante pinned(); close() não a fecha."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class SnapshotSQLiteBackend(StorageBackend):
+    """Leituras sobre a última cópia publicada da base SQLite (só de leitura).
+
+    As cópias são imutáveis, pelo que as ligações não usam locks nem esperam
+    pelas escritas da base viva. Com refresh_interval, uma thread em segundo
+    plano publica uma nova cópia periodicamente; caso contrário, as cópias são
+    publicadas por quem escreve (ex.: `football_cli.py --snapshot ingest`).
+    """
+
+    name = 'sqlite-snapshot'
+    read_only = True
+
+    def __init__(self, db_path: str = "football_data.db", snapshot_path: Optional[str] = None,
+                 metrics: Optional[Metrics] = None, refresh_interval: Optional[float] = None):
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path or default_snapshot_path(db_path)
+        self.metrics = metrics or Metrics()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread = None
+
+        if not os.path.exists(self.snapshot_path):
+            publish_snapshot(self.db_path, self.snapshot_path)
+        if refresh_interval:
+            self._thread = threading.Thread(target=self._refresh_loop, args=(refresh_interval,),
+                                            name='snapshot-refresh', daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                publish_snapshot(self.db_path, self.snapshot_path)
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao publicar a cópia de leitura: {e}")
+
+    def refresh(self) -> str:
+        """Publica já uma nova cópia; as próximas leituras passam a vê-la."""
+        return publish_snapshot(self.db_path, self.snapshot_path)
+
+    def _open(self) -> sqlite3.Connection:
+        path = os.path.realpath(self.snapshot_path)
+        return self.metrics.connect(f"file:{quote(path)}?mode=ro&immutable=1", uri=True)
+
+    def connect(self):
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            return _PinnedConnection(pinned)
+        return self._open()
+
+    @contextmanager
+    def pinned(self):
+        """Fixa a cópia atual na thread, para que uma previsão não misture cópias."""
+        if getattr(self._local, 'conn', None) is not None:
+            yield
+            return
+        self._local.conn = self._open()
+        try:
+            yield
+        finally:
+            self._local.conn.close()
+            self._local.conn = None
+
+    def table_columns(self, conn, tabela: str) -> List[str]:
+        return SQLiteBackend.table_columns(self, conn, tabela)
+
+    def bulk_insert(self, conn, tabela: str, colunas: Sequence[str], linhas: Iterable[Sequence]) -> int:
+        raise ValueError("A cópia de leitura não aceita escritas; use a base viva")
+
+    def factory(self) -> Callable[[], StorageBackend]:
+        return partial(SnapshotSQLiteBackend, self.db_path, self.snapshot_path)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# Traduções de SQL/DDL do dialeto SQLite para PostgreSQL
+_PG_TRANSLATIONS = [
+    (re.compile(r'INTEGER PRIMARY KEY AUTOINCREMENT', re.I), 'SERIAL PRIMARY KEY'),
+    (re.compile(r'\bREAL\b', re.I), 'DOUBLE PRECISION'),
+    (re.compile(r'\bBOOLEAN DEFAULT 0\b', re.I), 'INTEGER DEFAULT 0'),
+    (re.compile(r"date\('now'\)", re.I), 'CURRENT_DATE'),
+]
+
+
+def translate_sql(sql: str) -> str:
+    """Traduz uma instrução escrita para SQLite para o dialeto PostgreSQL."""
+    for pattern, replacement in _PG_TRANSLATIONS:
+        sql = pattern.sub(replacement, sql)
+    # O psycopg2 interpreta '%' em toda a instrução; '?' só passa a '%s' fora de literais
+    parts = sql.replace('%', '%%').split("'")
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i].replace('?', '%s')
+    return "'".join(parts)
+
+
+def _convert_value(value):
+    # O PostgreSQL devolve NUMERIC (AVG) como Decimal e DATE como datetime.date
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _convert_row(row):
+    return None if row is None else tuple(_convert_value(value) for value in row)
+
+
+class PostgresCursor:
+    """Cursor que aceita SQL no dialeto SQLite sobre uma ligação psycopg2."""
+
+    def __init__(self, cursor, metrics: Metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+        self._last_insert = False
+
+    def execute(self, sql: str, parameters: Sequence = ()):
+        start = time.perf_counter()
+        self._cursor.execute(translate_sql(sql), tuple(parameters))
+        self._last_insert = sql.lstrip().upper().startswith('INSERT')
+        self._metrics.record_query(sql, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters):
+        start = time.perf_counter()
+        self._cursor.executemany(translate_sql(sql), [tuple(p) for p in seq_of_parameters])
+        self._metrics.record_query(sql, time.perf_counter() - start)
+        return self
+
+    @property
+    def lastrowid(self):
+        if not self._last_insert:
+            return None
+        self._cursor.execute('SELECT lastval()')
+        return self._cursor.fetchone()[0]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return _convert_row(self._cursor.fetchone())
+
+    def fetchmany(self, size: int = 100):
+        return [_convert_row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [_convert_row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield _convert_row(row)
+
+    def close(self):
+        self._cursor.close()
+
+
+class PostgresConnection:
+    """Ligação emprestada do pool; close() devolve-a ao pool."""
+
+    def __init__(self, backend: 'PostgresBackend', conn):
+        self._backend = backend
+        self._conn = conn
+
+    @property
+    def raw(self):
+        """Ligação psycopg2 subjacente (para COPY e operações específicas)."""
+        return self._conn
+
+    def cursor(self) -> PostgresCursor:
+        return PostgresCursor(self._conn.cursor(), self._backend.metrics)
+
+    def execute(self, sql: str, parameters: Sequence = ()) -> PostgresCursor:
+        return self.cursor().execute(sql, parameters)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        if self._conn is not None:
+            # Transações por terminar são descartadas, como no sqlite3
+            self._conn.rollback()
+            self._backend._pool.putconn(self._conn)
+            self._conn = None
+
+
+class PostgresBackend(StorageBackend):
+    """Backend PostgreSQL com pool de ligações e COPY para cargas em bloco (requer psycopg2)."""
+
+    name = 'postgres'
+
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 10, metrics: Optional[Metrics] = None):
+        try:
+            from psycopg2.pool import ThreadedConnectionPool
+        except ImportError:
+            raise ImportError("O backend PostgreSQL requer o pacote 'psycopg2' (pip install psycopg2-binary)")
+
+        self.dsn = dsn
+        self.metrics = metrics or Metrics()
+        self._minconn = minconn
+        self._maxconn = maxconn
+        self._pool = ThreadedConnectionPool(minconn, maxconn, dsn)
+        # {tabela: colunas SERIAL}, para acertar as sequências depois de cargas com ids explícitos
+        self._serial_columns: Dict[str, List[str]] = {}
+        logger.info(f"Pool PostgreSQL criado ({minconn}-{maxconn} ligações)")
+
+    def connect(self) -> PostgresConnection:
+        return PostgresConnection(self, self._pool.getconn())
+
+    def table_columns(self, conn, tabela: str) -> List[str]:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = ?
+            ORDER BY ordinal_position
+        ''', (tabela,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def bulk_insert(self, conn, tabela: str, colunas: Sequence[str], linhas: Iterable[Sequence]) -> int:
+        """Carrega as linhas com COPY ... FROM STDIN (CSV), muito mais rápido que INSERT."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        total = 0
+        for linha in linhas:
+            writer.writerow(['' if value is None else value for value in linha])
+            total += 1
+        buffer.seek(0)
+
+        start = time.perf_counter()
+        cursor = conn.raw.cursor()
+        cursor.copy_expert(f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.close()
+        self.metrics.record_query(f"COPY {tabela}", time.perf_counter() - start)
+        if total:
+            self._sync_sequences(conn, tabela, colunas)
+        return total
+
+    def _sync_sequences(self, conn, tabela: str, colunas: Sequence[str]):
+        """Avança as sequências SERIAL carregadas com ids explícitos (o COPY não as usa).
+
+        Sem isto, o próximo INSERT sem id (add_team, add_match) repetiria um id já gravado.
+        """
+        if tabela not in self._serial_columns:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = ? AND column_default LIKE 'nextval(%'
+            ''', (tabela,))
+            self._serial_columns[tabela] = [row[0] for row in cursor.fetchall()]
+
+        cursor = conn.cursor()
+        for coluna in self._serial_columns[tabela]:
+            if coluna in colunas:
+                cursor.execute(f'''
+                    SELECT setval(pg_get_serial_sequence(?, ?), MAX({coluna})) FROM {tabela}
+                ''', (tabela, coluna))
+
+    def factory(self) -> Callable[[], StorageBackend]:
+        return partial(PostgresBackend, self.dsn, self._minconn, self._maxconn)
+
+    def close(self):
+        self._pool.closeall()
+
+
+def backend_from_url(url: str, metrics: Optional[Metrics] = None, snapshot: bool = False,
+                     history: bool = False, point_in_time: bool = False) -> StorageBackend:
+    """Cria o backend a partir de um caminho SQLite ou de um URL postgresql://.
+
+    Com snapshot=True, as leituras SQLite usam a cópia publicada (ver
+    SnapshotSQLiteBackend); no PostgreSQL o isolamento já é dado pelo servidor.
+    Com history=True, as leituras incluem as épocas arquivadas (ver
+    season_archive.HistorySQLiteBackend). Com point_in_time=True, a base viva é
+    vista como estava antes de uma data de corte (ver
+    backtest.PointInTimeSQLiteBackend).
+    """
+    if url.startswith(('postgresql://', 'postgres://')):
+        if history:
+            raise ValueError("O arquivo de épocas requer SQLite")
+        if point_in_time:
+            raise ValueError("O backtest em ponto no tempo requer SQLite")
+        return PostgresBackend(url, metrics=metrics)
+    if url.startswith('sqlite:///'):
+        url = url[len('sqlite:///'):]
+    if point_in_time:
+        if history or snapshot:
+            raise ValueError("O backtest em ponto no tempo usa a base viva (sem cópia de leitura nem arquivo)")
+        from backtest import PointInTimeSQLiteBackend
+        return PointInTimeSQLiteBackend(url, metrics)
+    if history:
+        from season_archive import HistorySQLiteBackend
+        return HistorySQLiteBackend(url, metrics)
+    if snapshot:
+        return SnapshotSQLiteBackend(url, metrics=metrics)
+    return SQLiteBackend(url, metrics)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Testes do Preço de Acumuladores (accumulators.py): pesquisa em feixe contra a enumeração completa
+"""
+
+import itertools
+import math
+import random
+
+import pytest
+
+from accumulators import OUTCOMES, AccumulatorPricer
+
+pytest.importorskip('numpy')
+
+
+def _legs(n_jogos, seed=7):
+    rng = random.Random(seed)
+    legs = []
+    for id_jogo in range(1, n_jogos + 1):
+        probs = [rng.uniform(0.15, 0.6) for _ in OUTCOMES]
+        total = sum(probs)
+        for selecao, prob in zip(OUTCOMES, probs):
+            prob /= total
+            # Margem da casa de apostas com algum ruído: umas pernas com valor, outras sem
+            legs.append({'id_jogo': id_jogo, 'mercado': '1x2', 'selecao': selecao, 'prob': prob,
+                         'odd': round(rng.uniform(0.85, 1.15) / prob, 2)})
+    return legs
+
+
+def _brute_force(legs, pernas, min_pernas, min_prob):
+    """Valor esperado de todas as combinações com no máximo uma perna por jogo."""
+    por_jogo = {}
+    for i, leg in enumerate(legs):
+        por_jogo.setdefault(leg['id_jogo'], []).append(i)
+    valores = []
+    for tamanho in range(min_pernas, pernas + 1):
+        for jogos in itertools.combinations(por_jogo, tamanho):
+            for combinacao in itertools.product(*(por_jogo[j] for j in jogos)):
+                prob = math.prod(legs[i]['prob'] for i in combinacao)
+                if prob >= min_prob:
+                    valores.append(prob * math.prod(legs[i]['odd'] for i in combinacao) - 1)
+    return sorted(valores, reverse=True)
+
+
+@pytest.mark.parametrize('min_prob', [0.0, 0.02])
+def test_feixe_largo_igual_a_enumeracao(min_prob):
+    legs = _legs(7)
+    top = AccumulatorPricer(legs).top_k(pernas=4, k=15, min_pernas=2, min_prob=min_prob, beam=100000)
+
+    esperado = _brute_force(legs, 4, 2, min_prob)[:15]
+    assert [r['valor_esperado'] for r in top] == pytest.approx(esperado)
+    for resultado in top:
+        jogos = [leg['id_jogo'] for leg in resultado['pernas']]
+        assert len(set(jogos)) == len(jogos)
+        assert 2 <= len(jogos) <= 4
+        assert resultado['probabilidade'] >= min_prob
+
+
+def test_feixe_estreito_devolve_combinacoes_validas():
+    legs = _legs(12)
+    pricer = AccumulatorPricer(legs)
+    top = pricer.top_k(pernas=5, k=10, min_pernas=3, min_prob=0.01, beam=50)
+
+    assert top
+    valores = [r['valor_esperado'] for r in top]
+    assert valores == sorted(valores, reverse=True)
+    # Aproximada: nunca melhor do que a enumeração completa
+    esperado = _brute_force(legs, 5, 3, 0.01)
+    assert valores[0] <= esperado[0] + 1e-12
+    for resultado in top:
+        assert len({leg['id_jogo'] for leg in resultado['pernas']}) == len(resultado['pernas'])
+        assert resultado['probabilidade'] >= 0.01
+
+    indices = [[legs.index(leg) for leg in resultado['pernas']] for resultado in top]
+    assert list(pricer.price(indices)['valor_esperado']) == pytest.approx(valores)
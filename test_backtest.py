@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Testes do Backtest em Ponto no Tempo (backtest.py) e da recusa da calibração dentro da amostra
+"""
+
+import shutil
+import sqlite3
+
+import pytest
+
+from backtest import PointInTimeSQLiteBackend, run_backtest
+from benchmark import SyntheticDataGenerator
+from calibration import Calibrator
+from prediction_engine import FootballPredictionEngine
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'backtest.db')
+    SyntheticDataGenerator(n_teams=6, n_seasons=1, players_per_team=6, first_season=2023).load(path)
+    return path
+
+
+def _truncated_copy(db_path, destino, data_corte):
+    """Cópia da base com o que se sabia antes de data_corte (o que as vistas devem reproduzir)."""
+    shutil.copy(db_path, destino)
+    conn = sqlite3.connect(destino)
+    conn.execute('''
+        UPDATE jogo SET golos_casa = NULL, golos_fora = NULL, status = 'agendado'
+        WHERE substr(data_jogo, 1, 10) >= ?
+    ''', (data_corte,))
+    conn.execute('DELETE FROM confrontos_diretos WHERE substr(data_confronto, 1, 10) >= ?', (data_corte,))
+    conn.execute('''
+        DELETE FROM lesoes WHERE substr(data_inicio, 1, 10) >= ?
+            OR (data_fim_estimada IS NOT NULL AND substr(data_fim_estimada, 1, 10) < ?)
+    ''', (data_corte, data_corte))
+    conn.execute('UPDATE lesoes SET data_fim_estimada = NULL')
+    conn.commit()
+    conn.close()
+
+
+def test_ponto_no_tempo_igual_a_base_truncada(db_path, tmp_path):
+    engine = FootballPredictionEngine(db_path, storage=PointInTimeSQLiteBackend(db_path))
+    results = list(run_backtest(engine, '1900-01-01', '2999-12-31'))
+    assert results and all(r['ponto_no_tempo'] for r in results)
+
+    # Um jogo a meio da época: previsto como se a base terminasse na véspera
+    result = results[len(results) // 2]
+    data_corte = str(result['data_jogo'])[:10]
+    truncada = str(tmp_path / 'truncada.db')
+    _truncated_copy(db_path, truncada, data_corte)
+
+    conn = sqlite3.connect(db_path)
+    casa, fora, competicao = conn.execute(
+        'SELECT id_equipa_casa, id_equipa_fora, id_competicao FROM jogo WHERE id_jogo = ?',
+        (result['id_jogo'],)).fetchone()
+    conn.close()
+    esperado = FootballPredictionEngine(truncada).predict_match_compact(casa, fora, competicao,
+                                                                        result['data_jogo'])
+    assert (result['prob_casa'], result['prob_empate'], result['prob_fora']) == pytest.approx(
+        (esperado.prob_casa, esperado.prob_empate, esperado.prob_fora))
+
+    # Dentro da amostra o mesmo jogo vê o próprio resultado
+    dentro = {r['id_jogo']: r for r in run_backtest(FootballPredictionEngine(db_path), '1900-01-01', '2999-12-31')}
+    assert not dentro[result['id_jogo']]['ponto_no_tempo']
+
+
+def test_vistas_sem_corte_mostram_a_base_inteira(db_path):
+    storage = PointInTimeSQLiteBackend(db_path)
+    engine = FootballPredictionEngine(db_path, storage=storage)
+    list(run_backtest(engine, '1900-01-01', '2999-12-31'))
+
+    assert storage.data_corte is None
+    conn = storage.connect()
+    finalizados = conn.execute("SELECT COUNT(*) FROM jogo WHERE status = 'finalizado'").fetchone()[0]
+    conn.close()
+    direto = sqlite3.connect(db_path)
+    assert finalizados == direto.execute("SELECT COUNT(*) FROM jogo WHERE status = 'finalizado'").fetchone()[0]
+    direto.close()
+
+
+def test_calibracao_recusa_resultados_dentro_da_amostra(db_path):
+    results = list(run_backtest(FootballPredictionEngine(db_path), '1900-01-01', '2999-12-31'))
+    with pytest.raises(ValueError):
+        Calibrator.fit(results)
+
+    engine = FootballPredictionEngine(db_path, storage=PointInTimeSQLiteBackend(db_path))
+    calibrator = Calibrator.fit(run_backtest(engine, '1900-01-01', '2999-12-31'))
+    assert calibrator.jogos == len(results)
+
+
+def test_ponto_no_tempo_recusa_agregados_de_todo_o_historico(db_path):
+    engine = FootballPredictionEngine(db_path, storage=PointInTimeSQLiteBackend(db_path), use_xg=True)
+    with pytest.raises(ValueError):
+        list(run_backtest(engine, '1900-01-01', '2999-12-31'))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Testes da Simulação da Banca (bankroll.py)
+"""
+
+import numpy as np
+import pytest
+
+from bankroll import StakingStrategy, load_history, simulate
+from change_tracking import install_change_tracking
+from football_betting_analyzer import FootballDataCollector
+from match_prediction import MatchPrediction
+
+
+def _history(probs, odds, resultado):
+    return {'ids': list(range(1, len(resultado) + 1)), 'probs': np.array(probs, dtype=float),
+            'odds': np.array(odds, dtype=float), 'resultado': np.array(resultado, dtype=np.int64)}
+
+
+# 1: valor na vitória da casa (ganha); 2: valor no empate (perde); 3: sem valor (não aposta)
+HISTORY = _history(
+    probs=[(0.6, 0.2, 0.2), (0.5, 0.3, 0.2), (0.1, 0.1, 0.8)],
+    odds=[(2.0, 4.0, 4.0), (1.5, 4.0, 3.0), (5.0, 5.0, 1.1)],
+    resultado=[0, 0, 2]
+)
+
+
+def _real(strategy, history=HISTORY):
+    return simulate(history, [strategy], reamostragens=0)[0]
+
+
+def test_montante_fixo():
+    result = _real(StakingStrategy('fixa', 'fixa', stake=0.1))
+    assert result['apostas'] == 2
+    assert result['banca_final'] == 100.0 and result['lucro'] == 0.0 and result['roi'] == 0.0
+    assert result['drawdown_maximo'] == round((1 - 100 / 110) * 100, 2)
+    assert result['bootstrap'] == {}
+
+
+@pytest.mark.parametrize('fracao, maximo, banca_final', [
+    # Kelly: 0.2 / (2 - 1) = 20% da banca no jogo 1 e 0.2 / (4 - 1) no jogo 2
+    (1.0, 0.25, 100 * 1.2 * (1 - 0.2 / 3)),
+    (0.5, 0.25, 100 * 1.1 * (1 - 0.1 / 3)),
+    (1.0, 0.1, 100 * 1.1 * (1 - 0.2 / 3)),
+])
+def test_kelly_fracionado_e_limitado(fracao, maximo, banca_final):
+    result = _real(StakingStrategy('kelly', 'kelly', fracao=fracao, maximo=maximo))
+    assert result['banca_final'] == round(banca_final, 2)
+
+
+def test_valor_minimo_filtra_as_apostas():
+    assert _real(StakingStrategy('fixa', 'fixa', valor_minimo=0.3))['apostas'] == 0
+
+
+def test_stop_loss_para_de_apostar():
+    derrotas = _history([(0.6, 0.2, 0.2)] * 5, [(2.0, 4.0, 4.0)] * 5, [2] * 5)
+    result = _real(StakingStrategy('stop', 'fixa', stake=0.2, stop_loss=0.5), derrotas)
+    # 100 -> 80 -> 60 -> 40; abaixo de 50 deixa de apostar
+    assert result['apostas'] == 3 and result['banca_final'] == 40.0
+    sem_stop = _real(StakingStrategy('sem_stop', 'fixa', stake=0.2), derrotas)
+    assert sem_stop['apostas'] == 5 and sem_stop['banca_final'] == 0.0
+
+
+def test_reamostragens_reprodutiveis_e_iguais_com_processos():
+    estrategias = [StakingStrategy('fixa', 'fixa', stake=0.1), StakingStrategy('kelly', 'kelly')]
+    results = simulate(HISTORY, estrategias, reamostragens=200, seed=7)
+    assert results == simulate(HISTORY, estrategias, reamostragens=200, seed=7, workers=2)
+    assert results != simulate(HISTORY, estrategias, reamostragens=200, seed=8)
+
+    bootstrap = results[0]['bootstrap']
+    assert bootstrap['banca_final']['p5'] <= bootstrap['banca_final']['p50'] <= bootstrap['banca_final']['p95']
+    assert 0 <= bootstrap['prob_lucro'] <= 100
+
+
+def test_estrategia_desconhecida():
+    with pytest.raises(ValueError):
+        StakingStrategy('martingale', 'martingale')
+
+
+def test_historico_das_previsoes_guardadas(tmp_path):
+    collector = FootballDataCollector(str(tmp_path / 'banca.db'))
+    casa, fora = collector.add_team('Casa FC'), collector.add_team('Fora FC')
+    jogos = [collector.add_match(data, casa, fora, golos_casa, golos_fora, status)
+             for data, golos_casa, golos_fora, status in (('2025-01-10', 2, 0, 'finalizado'),
+                                                         ('2025-01-03', 1, 1, 'finalizado'),
+                                                         ('2025-01-17', None, None, 'agendado'))]
+    conn = collector._connect()
+    install_change_tracking(conn)
+    for id_jogo in jogos:
+        conn.execute('INSERT INTO previsoes (id_jogo, dados) VALUES (?, ?)',
+                     (id_jogo, MatchPrediction('Casa FC', 'Fora FC', 0.5, 0.25, 0.25).to_json()))
+    conn.commit()
+    conn.close()
+    for id_jogo in jogos:
+        collector.add_odds(id_jogo, 2.0, 3.5, 4.0, 'A')
+        collector.add_odds(id_jogo, 2.1, 3.4, 3.9, 'B')
+
+    history = load_history(collector, '2025-01-01', '2025-01-31')
+    assert history['ids'] == [jogos[1], jogos[0]]
+    np.testing.assert_allclose(history['probs'], [(0.5, 0.25, 0.25)] * 2)
+    np.testing.assert_allclose(history['odds'], [(2.1, 3.5, 4.0)] * 2)
+    assert history['resultado'].tolist() == [1, 0]
+    np.testing.assert_allclose(load_history(collector, '2025-01-01', '2025-01-31', 'B')['odds'],
+                               [(2.1, 3.4, 3.9)] * 2)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Testes do Gerador Sintético e dos Benchmarks (benchmark.py)
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from benchmark import SyntheticDataGenerator, run_benchmarks
+
+TABELAS = ('equipa', 'jogador', 'jogo', 'desempenho_equipa_jogo', 'desempenho_jogador_jogo', 'lesoes')
+
+
+def _dump(path):
+    conn = sqlite3.connect(path)
+    conteudo = {}
+    for tabela in TABELAS:
+        colunas = [c[1] for c in conn.execute(f'PRAGMA table_info({tabela})') if c[1] != 'created_at']
+        conteudo[tabela] = conn.execute(f"SELECT {', '.join(colunas)} FROM {tabela} ORDER BY 1").fetchall()
+    conn.close()
+    return conteudo
+
+
+def _generator(seed=42):
+    return SyntheticDataGenerator(seed=seed, n_teams=4, n_seasons=1, players_per_team=4, first_season=2023)
+
+
+def test_mesma_semente_mesmos_dados(tmp_path):
+    resumo = _generator().load(str(tmp_path / 'a.db'))
+    _generator().load(str(tmp_path / 'b.db'))
+    _generator(seed=7).load(str(tmp_path / 'c.db'))
+
+    a, b, c = (_dump(str(tmp_path / nome)) for nome in ('a.db', 'b.db', 'c.db'))
+    assert a == b
+    assert a['jogo'] != c['jogo']
+    # Dados coerentes: tudo passa a validação, nada fica em quarentena
+    assert {tabela: len(a[tabela]) for tabela in TABELAS} == {t: resumo['linhas'].get(t, 0) for t in TABELAS}
+    conn = sqlite3.connect(str(tmp_path / 'a.db'))
+    assert conn.execute('SELECT COUNT(*) FROM quarentena').fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM jogo WHERE status = 'agendado'").fetchone()[0] > 0
+    conn.close()
+
+
+def test_escala_desconhecida():
+    with pytest.raises(ValueError):
+        SyntheticDataGenerator.from_scale('gigante')
+
+
+def test_historico_compara_com_a_execucao_anterior(tmp_path):
+    db_path = str(tmp_path / 'bench.db')
+    _generator().load(db_path)
+    historico = str(tmp_path / 'historico.jsonl')
+
+    primeiro = run_benchmarks(db_path, n_calls=5, history_path=historico)
+    segundo = run_benchmarks(db_path, n_calls=5, history_path=historico)
+
+    assert primeiro['predict_match']['chamadas'] == 5
+    assert primeiro['generate_daily_analysis']['jogos'] > 0
+    assert 'variacao_p50_pct' not in primeiro
+    assert 'variacao_p50_pct' in segundo
+    with open(historico, encoding='utf-8') as f:
+        assert len([json.loads(linha) for linha in f]) == 2
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Testes da Re-previsão Seletiva (change_tracking.py): incremental contra o recálculo completo
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from change_tracking import RePredictionWorker, remove_change_tracking
+from prediction_engine import FootballPredictionEngine
+
+DESDE = '2000-01-01'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'alteracoes.db')
+    SyntheticDataGenerator(n_teams=6, n_seasons=1, players_per_team=4, first_season=2023).load(path)
+    return path
+
+
+def _stored(db_path):
+    """Previsões guardadas dos jogos agendados, por id_jogo."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+        SELECT p.id_jogo, p.dados FROM previsoes p JOIN jogo j ON p.id_jogo = j.id_jogo
+        WHERE j.status = 'agendado' ORDER BY p.id_jogo
+    ''').fetchall()
+    conn.close()
+    return {id_jogo: json.loads(dados) for id_jogo, dados in rows}
+
+
+def test_incremental_igual_a_refresh_all(db_path):
+    engine = FootballPredictionEngine(db_path)
+    worker = RePredictionWorker(engine)
+    total = worker.refresh_all(DESDE)
+    assert total > 0
+    worker.run_once(DESDE)
+
+    conn = sqlite3.connect(db_path)
+    agendados = conn.execute('''
+        SELECT id_jogo, id_equipa_casa, id_equipa_fora FROM jogo WHERE status = 'agendado' ORDER BY data_jogo, id_jogo
+    ''').fetchall()
+    jogador = conn.execute('SELECT id_jogador FROM jogador WHERE id_equipa = ?', (agendados[0][1],)).fetchone()[0]
+    conn.close()
+
+    # Alterações que só tocam algumas equipas: um resultado, uma lesão
+    engine.collector.set_match_result(agendados[0][0], 3, 0)
+    engine.collector.bulk_insert('lesoes', [{'id_jogador': jogador, 'data_inicio': '2025-01-01',
+                                             'tipo_lesao': 'muscular', 'gravidade': 'grave', 'impacto_equipa': 5}])
+    antes = _stored(db_path)
+    reprevistos = worker.run_once(DESDE)
+    incremental = _stored(db_path)
+    assert 0 < reprevistos < total
+    assert incremental != antes
+    assert worker.run_once(DESDE) == 0
+
+    completo = RePredictionWorker(FootballPredictionEngine(db_path), consumidor='completo')
+    completo.refresh_all(DESDE)
+    assert incremental == _stored(db_path)
+
+
+def test_registo_limpo_e_triggers_removidos(db_path):
+    worker = RePredictionWorker(FootballPredictionEngine(db_path))
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE jogo SET golos_casa = 1, golos_fora = 1, status = 'finalizado' WHERE id_jogo = 1")
+    conn.commit()
+    assert conn.execute('SELECT COUNT(*) FROM registo_alteracoes').fetchone()[0] > 0
+
+    worker.run_once(DESDE)
+    assert conn.execute('SELECT COUNT(*) FROM registo_alteracoes').fetchone()[0] == 0
+
+    # Remover descarta as alterações pendentes; as escritas seguintes não dependem dos triggers
+    conn.execute("UPDATE jogo SET golos_casa = 2 WHERE id_jogo = 1")
+    conn.commit()
+    assert remove_change_tracking(conn) > 0
+    conn.execute("UPDATE jogo SET golos_casa = 3 WHERE id_jogo = 1")
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name LIKE 'cdc_%'").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Testes das Competições, Épocas e Ponderações por Liga
+(football_betting_analyzer.py, prediction_engine.py)
+"""
+
+import sqlite3
+
+import pytest
+
+from football_betting_analyzer import FootballDataCollector, season_for_date
+from prediction_engine import FootballPredictionEngine
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'competicoes.db')
+    collector = FootballDataCollector(path)
+    for nome, liga in (('Porto', 'Liga A'), ('Braga', 'Liga A'), ('Madrid', 'Liga B'), ('Sevilha', 'Liga B')):
+        collector.add_team(nome, 'País', liga)
+    collector.add_match('2024-05-10', 1, 2, 2, 1, 'finalizado')
+    collector.add_match('2024-09-14', 2, 1, 0, 0, 'finalizado')
+    collector.add_match('2024-09-14', 3, 4, 1, 3, 'finalizado')
+    taca = collector.add_competition('Taça Europeia', tipo='taca')
+    collector.add_match('2024-10-02', 1, 3, status='agendado', id_competicao=taca)
+    collector.add_match('2024-10-05', 2, 1, status='agendado')
+    collector.add_match('2025-08-20', 1, 2, status='agendado')
+    return path
+
+
+def _jogos(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+        SELECT j.id_jogo, c.nome, e.nome FROM jogo j
+        JOIN competicao c ON c.id_competicao = j.id_competicao
+        JOIN epoca e ON e.id_epoca = j.id_epoca
+        ORDER BY j.id_jogo
+    ''').fetchall()
+    conn.close()
+    return {id_jogo: (competicao, epoca) for id_jogo, competicao, epoca in rows}
+
+
+def test_epoca_pela_data():
+    assert season_for_date('2024-09-14') == ('2024/25', '2024-07-01', '2025-06-30')
+    assert season_for_date('2025-05-31')[0] == '2024/25'
+    assert season_for_date('2025-07-01')[0] == '2025/26'
+
+
+def test_jogo_herda_a_competicao_da_casa_e_a_epoca_da_data(db_path):
+    assert _jogos(db_path) == {
+        1: ('Liga A', '2023/24'),
+        2: ('Liga A', '2024/25'),
+        3: ('Liga B', '2024/25'),
+        4: ('Taça Europeia', '2024/25'),
+        5: ('Liga A', '2024/25'),
+        6: ('Liga A', '2025/26'),
+    }
+
+
+def test_sync_preenche_bases_antigas(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO equipa (nome_equipa, pais, liga) VALUES ('Lisboa', 'País', 'Liga C')")
+    conn.execute('''
+        INSERT INTO jogo (data_jogo, id_equipa_casa, id_equipa_fora, status)
+        VALUES ('2024-11-01', 5, 1, 'agendado')
+    ''')
+    conn.commit()
+    conn.close()
+
+    # A inicialização da base sincroniza; uma segunda passagem não tem nada a fazer
+    collector = FootballDataCollector(db_path)
+    assert _jogos(db_path)[7] == ('Liga C', '2024/25')
+    assert collector.sync_competitions() == 0
+
+
+def test_filtros_por_liga_e_epoca(db_path):
+    engine = FootballPredictionEngine(db_path)
+    ids = lambda **filtros: [f[0] for f in engine.iter_fixtures('2024-01-01', '2025-12-31', **filtros)]
+
+    assert ids() == [4, 5, 6]
+    assert ids(liga='Liga A') == [5, 6]
+    assert ids(liga='Liga A', epoca='2025/26') == [6]
+    assert ids(epoca='2024/25') == [4, 5]
+    assert ids(liga='Liga Inexistente') == []
+    assert ids(status='finalizado', liga='Liga B') == [3]
+
+
+def test_ponderacoes_por_liga(db_path):
+    engine = FootballPredictionEngine(db_path)
+    liga_a, liga_b = 1, 2
+    assert engine.weights_for(liga_a) == engine.weights_for(None) == engine.weights
+
+    engine.set_league_weights(liga_b, {'home_away': 0.5})
+    assert engine.weights_for(liga_b) == {**engine.weights, 'home_away': 0.5}
+    with pytest.raises(ValueError):
+        engine.set_league_weights(liga_b, {'clima': 0.1})
+
+    # Persistidas na base e lidas por um motor novo
+    assert FootballPredictionEngine(db_path).weights_for(liga_b)['home_away'] == 0.5
+
+
+def test_previsao_usa_as_ponderacoes_da_competicao_do_jogo(db_path):
+    engine = FootballPredictionEngine(db_path)
+    global_ = engine.predict_match_compact(1, 2, data_jogo='2024-10-05')
+
+    taca = FootballDataCollector(db_path).add_competition('Taça Europeia')
+    engine.set_league_weights(taca, {name: 0.0 for name in engine.weights})
+    # A competição do jogo sobrepõe-se à da equipa da casa
+    neutra = engine.predict_match_compact(1, 2, taca, '2024-10-02')
+    assert neutra.pontuacao == (0.0, 0.0)
+    assert engine.predict_match_compact(1, 2, data_jogo='2024-10-05').pontuacao == global_.pontuacao
+
+    engine.set_league_weights(1, {name: 0.0 for name in engine.weights})
+    assert engine.predict_match_compact(1, 2, data_jogo='2024-10-05').pontuacao == (0.0, 0.0)
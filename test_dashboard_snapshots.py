@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Testes da Publicação Estática do Dashboard (dashboard_snapshots.py)
+"""
+
+import gzip
+import json
+import os
+
+from dashboard_snapshots import publish_dashboard
+from prediction_engine import FootballPredictionEngine
+
+
+def _read(destino, caminho):
+    with open(os.path.join(destino, 'current', caminho), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_datas_anteriores_passam_para_a_nova_versao(tmp_path):
+    engine = FootballPredictionEngine(str(tmp_path / 'dashboard.db'))
+    destino = str(tmp_path / 'publicado')
+
+    publish_dashboard(engine, destino, '2025-01-01', '2025-01-02')
+    anterior = os.stat(os.path.join(destino, 'current', 'api/predictions/2025-01-01.json'))
+
+    manifest = publish_dashboard(engine, destino, '2025-01-02', '2025-01-03')
+
+    assert _read(destino, 'api/predictions/index.json') == ['2025-01-01', '2025-01-02', '2025-01-03']
+    assert manifest['datas_mantidas'] == 1
+    assert 'api/predictions/2025-01-01.json' in manifest['ficheiros']
+    caminho = os.path.join(destino, 'current', 'api/predictions/2025-01-01.json')
+    assert _read(destino, 'api/predictions/2025-01-01.json') == []
+    with gzip.open(caminho + '.gz', 'rt', encoding='utf-8') as f:
+        assert json.load(f) == []
+    # Ligação física ao documento da versão anterior (sem reescrever)
+    assert os.stat(caminho).st_ino == anterior.st_ino
+
+
+def test_datas_mantidas_sobrevivem_a_versoes_removidas(tmp_path):
+    engine = FootballPredictionEngine(str(tmp_path / 'dashboard.db'))
+    destino = str(tmp_path / 'publicado')
+
+    publish_dashboard(engine, destino, '2025-01-01', keep=1)
+    for dia in ('2025-01-02', '2025-01-03', '2025-01-04'):
+        publish_dashboard(engine, destino, dia, keep=1)
+
+    assert len(os.listdir(os.path.join(destino, 'versions'))) == 1
+    assert _read(destino, 'api/predictions/index.json') == ['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-04']
+    assert _read(destino, 'api/predictions/2025-01-01.json') == []
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Testes da Forma com Decaimento (decayed_form.py)
+"""
+
+import pytest
+
+from decayed_form import rebuild_decayed_form, update_decayed_form
+from football_betting_analyzer import FootballDataCollector
+from ingest_queue import IngestQueue
+
+HALF_LIFE = 30.0
+
+
+def _sums(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id_equipa, data_referencia, peso, soma_golos_marcados, soma_golos_sofridos
+        FROM forma_equipa_decaida WHERE meia_vida = ? ORDER BY id_equipa
+    ''', (HALF_LIFE,))
+    equipas = cursor.fetchall()
+    cursor.execute('''
+        SELECT id_jogador, peso, soma_golos, soma_minutos_jogados
+        FROM forma_jogador_decaida WHERE meia_vida = ? ORDER BY id_jogador
+    ''', (HALF_LIFE,))
+    return equipas, cursor.fetchall()
+
+
+def _performances(id_jogo, casa, fora, jogador, golos_casa, golos_fora):
+    equipas = [
+        {'id_jogo': id_jogo, 'id_equipa': casa, 'golos_marcados': golos_casa, 'golos_sofridos': golos_fora,
+         'clean_sheet': int(golos_fora == 0)},
+        {'id_jogo': id_jogo, 'id_equipa': fora, 'golos_marcados': golos_fora, 'golos_sofridos': golos_casa,
+         'clean_sheet': int(golos_casa == 0)}
+    ]
+    jogadores = [{'id_jogo': id_jogo, 'id_jogador': jogador, 'golos': golos_casa, 'minutos_jogados': 90}]
+    return equipas, jogadores
+
+
+def test_incremental_igual_a_rebuild_com_jogos_finalizados_depois(tmp_path):
+    collector = FootballDataCollector(str(tmp_path / 'forma.db'))
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+    jogador = collector.add_player('Avançado', 'Avançado', casa)
+
+    conn = collector._connect()
+    update_decayed_form(conn, HALF_LIFE)
+    conn.commit()
+
+    resultados = [(3, 1), (0, 0), (2, 2), (1, 4)]
+    jogos = []
+    for dia, (golos_casa, golos_fora) in enumerate(resultados, start=1):
+        # Os dois primeiros chegam já finalizados; os outros recebem os desempenhos antes do resultado
+        finalizado = dia <= 2
+        jogos.append(collector.add_match(f'2025-03-{dia * 5:02d}', casa, fora,
+                                         golos_casa if finalizado else None,
+                                         golos_fora if finalizado else None,
+                                         'finalizado' if finalizado else 'agendado'))
+        equipas, jogadores = _performances(jogos[-1], casa, fora, jogador, golos_casa, golos_fora)
+        collector.bulk_insert('desempenho_equipa_jogo', equipas)
+        collector.bulk_insert('desempenho_jogador_jogo', jogadores)
+
+    # Fechados fora de ordem: o último jogo antes do terceiro
+    for indice in (3, 2):
+        collector.set_match_result(jogos[indice], *resultados[indice])
+
+    incremental = _sums(conn)
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) FROM forma_decaida_pendente')
+    assert cursor.fetchone()[0] == 0
+
+    rebuild_decayed_form(conn, HALF_LIFE)
+    reconstruido = _sums(conn)
+    conn.close()
+
+    assert [r[:2] for r in incremental[0]] == [r[:2] for r in reconstruido[0]]
+    for obtido, esperado in zip(incremental[0] + incremental[1], reconstruido[0] + reconstruido[1]):
+        assert obtido == pytest.approx(esperado)
+    # Os quatro jogos contam (peso > 1 em todas as equipas)
+    assert all(r[2] > 3 for r in incremental[0])
+
+
+def test_jogo_por_finalizar_fica_pendente(tmp_path):
+    collector = FootballDataCollector(str(tmp_path / 'forma.db'))
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+    jogador = collector.add_player('Avançado', 'Avançado', casa)
+
+    conn = collector._connect()
+    update_decayed_form(conn, HALF_LIFE)
+    conn.commit()
+
+    id_jogo = collector.add_match('2025-03-01', casa, fora)
+    equipas, jogadores = _performances(id_jogo, casa, fora, jogador, 1, 0)
+    collector.bulk_insert('desempenho_equipa_jogo', equipas)
+
+    assert _sums(conn)[0] == []
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) FROM forma_decaida_pendente')
+    assert cursor.fetchone()[0] == 2
+
+    collector.set_match_result(id_jogo, 1, 0)
+    equipas_forma, _ = _sums(conn)
+    conn.close()
+    assert [(r[0], r[2], r[3]) for r in equipas_forma] == [(casa, 1.0, 1.0), (fora, 1.0, 0.0)]
+
+
+@pytest.mark.parametrize('via_fila', [False, True])
+def test_desempenhos_antes_do_jogo_aplicados_na_carga_de_jogos(tmp_path, via_fila):
+    collector = FootballDataCollector(str(tmp_path / 'forma.db'))
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+    jogador = collector.add_player('Avançado', 'Avançado', casa)
+    conn = collector._connect()
+    update_decayed_form(conn, HALF_LIFE)
+    conn.commit()
+
+    # Os desempenhos chegam antes da linha do jogo (já finalizado) que os liga
+    equipas, jogadores = _performances(50, casa, fora, jogador, 2, 0)
+    collector.bulk_insert('desempenho_equipa_jogo', equipas, validar=False)
+    collector.bulk_insert('desempenho_jogador_jogo', jogadores, validar=False)
+    assert _sums(conn) == ([], [])
+
+    jogo = {'id_jogo': 50, 'data_jogo': '2025-03-01', 'id_equipa_casa': casa, 'id_equipa_fora': fora,
+            'golos_casa': 2, 'golos_fora': 0, 'status': 'finalizado'}
+    if via_fila:
+        with IngestQueue(collector) as fila:
+            fila.submit('jogo', jogo)
+    else:
+        collector.bulk_insert('jogo', [jogo])
+
+    equipas_forma, jogadores_forma = _sums(conn)
+    conn.close()
+    assert [(r[0], r[2], r[3]) for r in equipas_forma] == [(casa, 1.0, 2.0), (fora, 1.0, 0.0)]
+    assert [(r[0], r[2]) for r in jogadores_forma] == [(jogador, 2.0)]
+
+
+def test_atualizacao_so_le_as_somas_das_entidades_alteradas(tmp_path):
+    collector = FootballDataCollector(str(tmp_path / 'forma.db'))
+    equipas = [collector.add_team(f'Equipa {i}') for i in range(4)]
+    jogador = collector.add_player('Avançado', 'Avançado', equipas[0])
+    conn = collector._connect()
+    update_decayed_form(conn, HALF_LIFE)
+    conn.commit()
+    for dia, (casa, fora) in enumerate([(0, 1), (2, 3)], start=1):
+        id_jogo = collector.add_match(f'2025-03-0{dia}', equipas[casa], equipas[fora], 1, 0, 'finalizado')
+        collector.bulk_insert('desempenho_equipa_jogo', _performances(id_jogo, equipas[casa], equipas[fora],
+                                                                      jogador, 1, 0)[0])
+
+    consultas = []
+    conn.set_trace_callback(consultas.append)
+    id_jogo = collector.add_match('2025-03-08', equipas[0], equipas[1], 0, 0, 'finalizado')
+    cursor = conn.cursor()
+    cursor.execute('INSERT INTO desempenho_equipa_jogo (id_jogo, id_equipa, golos_marcados, golos_sofridos) '
+                   'VALUES (?, ?, 0, 0)', (id_jogo, equipas[0]))
+    update_decayed_form(conn, HALF_LIFE)
+    conn.close()
+
+    leituras = [c for c in consultas if 'FROM forma_equipa_decaida' in c]
+    assert leituras and all('id_equipa IN (' in c for c in leituras)
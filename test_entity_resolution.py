@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Testes da Resolução de Nomes (entity_resolution.py)
+"""
+
+import pytest
+
+from entity_resolution import EntityIndex, squad_signature, normalize_name
+from football_betting_analyzer import FootballDataCollector
+
+
+def _index():
+    index = EntityIndex()
+    index.add_team(1, 'SL Benfica')
+    index.add_team(2, 'Benfica U23')
+    index.add_team(3, 'Real Madrid')
+    return index
+
+
+@pytest.mark.parametrize('nome, designacoes', [
+    ('Benfica', set()),
+    ('Benfica B', {'b'}),
+    ('Benfica II', {'b'}),
+    ('Benfica Sub-23', {'u23'}),
+    ('Benfica U-19', {'u19'}),
+    ('Real Madrid Castilla', {'reservas'}),
+    ('Benfica Feminino', {'feminino'})
+])
+def test_designacoes_de_equipa_secundaria(nome, designacoes):
+    assert squad_signature(normalize_name(nome)) == designacoes
+
+
+def test_procura_aproximada_respeita_as_designacoes():
+    index = _index()
+
+    assert index.resolve_team('Benfiica') == 1
+    assert index.resolve_team('Benfiica U23') == 2
+    assert index.resolve_team('Benfica B') is None
+    assert index.resolve_team('Benfica U19') is None
+    assert index.resolve_team('Real Madrid Castilla') is None
+
+
+def test_cache_distingue_procura_exata_e_aproximada():
+    index = _index()
+
+    assert index.resolve_team('Benfiica', fuzzy=False) is None
+    assert index.resolve_team('Benfiica') == 1
+
+
+def test_criacao_nao_aceita_nomes_apenas_semelhantes(tmp_path):
+    collector = FootballDataCollector(str(tmp_path / 'nomes.db'))
+    benfica = collector.add_team('SL Benfica')
+
+    assert collector.get_or_create_team('Benfica') == benfica
+    with pytest.raises(ValueError):
+        collector.get_or_create_team('Benfiica')
+
+    reservas = collector.get_or_create_team('Benfica B')
+    assert reservas != benfica
+    assert collector.get_or_create_team('Benfica B') == reservas
+
+    collector.add_alias('Benfiica', id_equipa=benfica)
+    assert collector.get_or_create_team('Benfiica') == benfica
+
+
+def test_resolve_names_com_criacao_usa_so_nomes_exatos(tmp_path):
+    collector = FootballDataCollector(str(tmp_path / 'nomes.db'))
+    porto = collector.add_team('FC Porto')
+
+    linhas = list(collector.resolve_names('jogo', [
+        {'data_jogo': '2025-01-01', 'equipa_casa': 'Porto', 'equipa_fora': 'Porto B'}
+    ], criar_equipas=True))
+    assert linhas[0]['id_equipa_casa'] == porto
+    assert linhas[0]['id_equipa_fora'] not in (None, porto)
+
+    with pytest.raises(ValueError):
+        list(collector.resolve_names('jogo', [
+            {'data_jogo': '2025-01-02', 'equipa_casa': 'Portto', 'equipa_fora': 'Porto B'}
+        ], criar_equipas=True))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Testes do Armazém de Features (feature_store.py)
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from feature_store import FeatureStore, PLAYER_WINDOW, TEAM_WINDOW, build_feature_store
+from football_betting_analyzer import FootballDataCollector
+from prediction_engine import FootballPredictionEngine
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'features.db')
+    # Quatro épocas: mais jogos por equipa/jogador do que as janelas
+    SyntheticDataGenerator(n_teams=4, n_seasons=4, players_per_team=4, first_season=2020).load(path)
+    return path
+
+
+@pytest.fixture
+def store(db_path, tmp_path):
+    path = str(tmp_path / 'features.fbfs')
+    build_feature_store(db_path, path)
+    with FeatureStore(path) as store:
+        yield store
+
+
+def test_janelas_iguais_as_consultas_do_collector(db_path, store):
+    collector = FootballDataCollector(db_path)
+    conn = sqlite3.connect(db_path)
+    equipas = [row[0] for row in conn.execute('SELECT id_equipa FROM equipa ORDER BY id_equipa')]
+    conn.close()
+
+    assert store.n_teams == len(equipas)
+    for id_equipa in equipas:
+        esperado = collector.get_team_performance(id_equipa, TEAM_WINDOW)
+        assert esperado['total_jogos'] == TEAM_WINDOW
+        assert store.team_performance(id_equipa) == pytest.approx(esperado)
+
+        jogadores = store.team_players(id_equipa)
+        assert jogadores
+        for jogador in jogadores:
+            esperado = collector.get_player_performance(jogador['id_jogador'], PLAYER_WINDOW)
+            assert esperado['total_jogos'] == PLAYER_WINDOW
+            assert {k: jogador[k] for k in esperado} == pytest.approx(esperado)
+
+
+def test_motor_com_armazem_igual_ao_motor_sem(db_path, store):
+    sem = FootballPredictionEngine(db_path).predict_match_compact(1, 2)
+    com = FootballPredictionEngine(db_path, store.path).predict_match_compact(1, 2)
+    assert (com.prob_casa, com.prob_empate, com.prob_fora) == pytest.approx(
+        (sem.prob_casa, sem.prob_empate, sem.prob_fora))
+
+
+def test_equipa_desconhecida(store):
+    assert store.team_performance(999) == {}
+    assert store.team_players(999) == []
+
+
+def test_desatualizado_depois_de_escrever_na_base(db_path, store):
+    assert not store.is_stale(db_path)
+    # A base alterada depois da construção (mtime posterior à hora gravada no cabeçalho)
+    os.utime(db_path, (store.built_at + 5, store.built_at + 5))
+    assert store.is_stale(db_path)
+
+
+def test_ficheiro_invalido(tmp_path):
+    path = tmp_path / 'invalido.fbfs'
+    path.write_bytes(b'XXXX' + bytes(60))
+    with pytest.raises(ValueError):
+        FeatureStore(str(path))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Testes da Interface de Linha de Comandos (football_cli.py)
+"""
+
+import json
+
+from football_betting_analyzer import FootballDataCollector
+from football_cli import build_parser, main
+
+
+def test_history_global_e_ficheiro_do_bench_sao_independentes():
+    parser = build_parser()
+
+    args = parser.parse_args(['--history', 'bench'])
+    assert args.history is True
+    assert args.history_file is None
+
+    args = parser.parse_args(['bench', '--history-file', 'x.jsonl'])
+    assert args.history is False
+    assert args.history_file == 'x.jsonl'
+
+    args = parser.parse_args(['--history', 'bench', '--history-file', 'x.jsonl'])
+    assert (args.history, args.history_file) == (True, 'x.jsonl')
+
+
+def _main(capsys, *argv):
+    codigo = main(list(argv))
+    saida = capsys.readouterr()
+    return codigo, saida.out, saida.err
+
+
+def test_ingest_result_e_predict(tmp_path, capsys):
+    db = str(tmp_path / 'cli.db')
+    equipas = tmp_path / 'equipas.csv'
+    equipas.write_text('nome_equipa,pais\nCasa FC,Portugal\nFora FC,Portugal\n', encoding='utf-8')
+    jogos = tmp_path / 'jogos.ndjson'
+    jogos.write_text('\n'.join(json.dumps(j) for j in [
+        {'data_jogo': '2025-03-01', 'id_equipa_casa': 1, 'id_equipa_fora': 2},
+        {'data_jogo': '2025-03-08', 'id_equipa_casa': 2, 'id_equipa_fora': 1},
+        {'data_jogo': '2025-03-08', 'id_equipa_casa': 2, 'id_equipa_fora': 1}
+    ]) + '\n', encoding='utf-8')
+
+    assert _main(capsys, '--db', db, 'init-db')[0] == 0
+    assert _main(capsys, '--db', db, 'ingest', str(equipas), '--table', 'equipa')[1] == \
+        "2 linhas inseridas em 'equipa'\n"
+    # A linha repetida fica na quarentena
+    assert _main(capsys, '--db', db, 'ingest', str(jogos), '--table', 'jogo')[1] == \
+        "2 linhas inseridas em 'jogo'\n"
+    assert _main(capsys, '--db', db, 'result', '1', '2', '0')[1] == 'Jogo 1: finalizado\n'
+
+    codigo, saida, _ = _main(capsys, '--db', db, 'predict', '--date', '2025-03-08', '--json')
+    assert codigo == 0
+    [previsao] = [json.loads(linha) for linha in saida.splitlines()]
+    assert (previsao['id_jogo'], previsao['equipa_casa'], previsao['equipa_fora']) == (2, 'Fora FC', 'Casa FC')
+
+    _, saida, _ = _main(capsys, '--db', db, 'predict', '--date', '2025-03-01')
+    assert saida == 'Nenhum jogo agendado entre 2025-03-01 e 2025-03-01\n'
+
+
+def test_export_e_metricas(tmp_path, capsys):
+    db = str(tmp_path / 'cli.db')
+    collector = FootballDataCollector(db)
+    casa, fora = collector.add_team('Casa FC'), collector.add_team('Fora FC')
+    collector.add_match('2025-03-08', casa, fora)
+    destino = str(tmp_path / 'previsoes.csv')
+
+    codigo, saida, erros = _main(capsys, '--db', db, '--metrics', 'json', 'export',
+                                 '--range', '2025-03-01', '2025-03-31', '--format', 'csv', '--output', destino)
+    assert codigo == 0
+    assert saida == f"1 previsões exportadas para {destino}\n"
+    assert 'equipa_casa' in open(destino, encoding='utf-8').readline()
+    assert json.loads(erros)
+
+
+def test_erros_devolvem_codigo_1(tmp_path, capsys):
+    db = str(tmp_path / 'cli.db')
+    ficheiro = tmp_path / 'linhas.csv'
+    ficheiro.write_text('a\n1\n', encoding='utf-8')
+
+    codigo, _, erros = _main(capsys, '--db', db, 'ingest', str(ficheiro), '--table', 'inexistente')
+    assert codigo == 1
+    assert erros.startswith('Erro: ')
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Testes da Fila de Ingestão (ingest_queue.py)
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from football_betting_analyzer import FootballDataCollector
+from ingest_queue import IngestQueue
+
+
+@pytest.fixture
+def collector(tmp_path):
+    return FootballDataCollector(str(tmp_path / 'fila.db'))
+
+
+def _rows(collector, sql, params=()):
+    conn = collector._connect()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_linhas_rejeitadas_vao_para_a_quarentena(collector):
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+
+    with IngestQueue(collector, flush_interval=0.5) as fila:
+        valida = fila.submit('jogo', {'data_jogo': '2025-03-01', 'id_equipa_casa': casa, 'id_equipa_fora': fora})
+        repetida = fila.submit('jogo', {'data_jogo': '2025-03-01', 'id_equipa_casa': casa, 'id_equipa_fora': fora})
+        invalida = fila.submit('jogo', {'data_jogo': '2025-13-40', 'id_equipa_casa': casa, 'id_equipa_fora': casa})
+
+    assert valida.result() > 0
+    for future in (repetida, invalida):
+        with pytest.raises(ValueError, match='quarentena'):
+            future.result()
+    assert (fila.escritas, fila.falhas, fila.quarentena) == (1, 2, 2)
+
+    assert _rows(collector, 'SELECT COUNT(*) FROM jogo') == [(1,)]
+    quarentena = _rows(collector, 'SELECT tabela, dados FROM quarentena ORDER BY id')
+    assert [tabela for tabela, _ in quarentena] == ['jogo', 'jogo']
+    assert json.loads(quarentena[1][1])['data_jogo'] == '2025-13-40'
+
+
+def test_pedido_invalido_so_falha_o_seu_future(collector):
+    casa = collector.add_team('Casa FC')
+
+    with IngestQueue(collector, flush_interval=0.5) as fila:
+        antes = fila.add_team('Fora FC')
+        coluna = fila.submit('jogo', {'data_jogo': '2025-03-01', 'id_equipa_casa': casa,
+                                      'id_equipa_fora': casa + 1, 'inexistente': 1})
+        tabela = fila.submit('inexistente', {'valor': 1})
+        depois = fila.add_match('2025-03-08', casa, casa + 1)
+
+    with pytest.raises(ValueError):
+        coluna.result()
+    with pytest.raises(Exception):
+        tabela.result()
+    assert antes.result() == casa + 1
+    assert depois.result() > 0
+    assert (fila.lotes, fila.escritas, fila.falhas) == (1, 2, 2)
+    assert _rows(collector, 'SELECT COUNT(*) FROM equipa') == [(2,)]
+    assert _rows(collector, 'SELECT COUNT(*) FROM quarentena') == [(0,)]
+
+
+def test_sem_validacao_insere_sem_quarentena(collector):
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+
+    with IngestQueue(collector, validar=False) as fila:
+        futures = [fila.submit('jogo', {'data_jogo': '2025-03-01', 'id_equipa_casa': casa, 'id_equipa_fora': fora})
+                   for _ in range(2)]
+
+    assert all(future.result() > 0 for future in futures)
+    assert fila.quarentena == 0
+    assert _rows(collector, 'SELECT COUNT(*) FROM quarentena') == [(0,)]
+
+
+def test_fila_fechada_recusa_pedidos(collector):
+    fila = IngestQueue(collector)
+    fila.close()
+    with pytest.raises(RuntimeError):
+        fila.add_team('Tarde FC')
+
+
+def test_close_durante_um_pedido_nao_o_deixa_pendente(collector):
+    fila = IngestQueue(collector)
+    put = fila._queue.put
+    fechos = []
+
+    def put_lento(item, *args, **kwargs):
+        # close() noutra thread entre a verificação de _closed e a entrada na fila
+        if item[0] == 'equipa' and not fechos:
+            fechos.append(threading.Thread(target=fila.close))
+            fechos[0].start()
+            time.sleep(0.1)
+        return put(item, *args, **kwargs)
+
+    fila._queue.put = put_lento
+    future = fila.add_team('Última FC')
+    fechos[0].join(5)
+
+    assert future.result(timeout=5) > 0
+    assert _rows(collector, "SELECT COUNT(*) FROM equipa WHERE nome_equipa = 'Última FC'") == [(1,)]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Testes da Validação dos Lotes de Ingestão (ingest_validation.py)
+"""
+
+import json
+
+import pytest
+
+from football_betting_analyzer import FootballDataCollector
+
+
+@pytest.fixture
+def collector(tmp_path):
+    return FootballDataCollector(str(tmp_path / 'validacao.db'))
+
+
+def _quarantine(collector):
+    conn = collector._connect()
+    try:
+        return [(tabela, json.loads(dados), motivos) for tabela, dados, motivos in
+                conn.execute('SELECT tabela, dados, motivos FROM quarentena ORDER BY id').fetchall()]
+    finally:
+        conn.close()
+
+
+def test_regras_de_jogo(collector):
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+    collector.add_match('2025-03-01', casa, fora)
+
+    def jogo(data_jogo, id_casa=casa, id_fora=fora, golos_casa=None, golos_fora=None, status='agendado'):
+        return {'data_jogo': data_jogo, 'id_equipa_casa': id_casa, 'id_equipa_fora': id_fora,
+                'golos_casa': golos_casa, 'golos_fora': golos_fora, 'status': status}
+
+    linhas = [
+        jogo('2025-03-08'),                                     # válida
+        jogo('2025-03-08'),                                     # repetida no lote
+        jogo('2025-03-01'),                                     # já gravada
+        jogo('2025-02-30'),                                     # data inexistente
+        jogo('2025-03-15', id_fora=casa),                       # a mesma equipa dos dois lados
+        jogo('2025-03-22', golos_casa=31, golos_fora=0, status='finalizado'),
+        jogo('2025-03-29', status='finalizado'),                # finalizado sem resultado
+        jogo(None)
+    ]
+    assert collector.bulk_insert('jogo', linhas) == 1
+
+    motivos = [m for _, _, m in _quarantine(collector)]
+    assert motivos == [
+        'duplicado',
+        'duplicado',
+        'data_jogo não é uma data',
+        'equipa da casa igual à de fora',
+        'golos_casa fora de [0, 30]',
+        'jogo finalizado sem resultado',
+        'data_jogo em falta'
+    ]
+
+
+def test_regras_de_desempenho_e_lesoes(collector):
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+    jogador = collector.add_player('Avançado', 'Avançado', casa)
+    id_jogo = collector.add_match('2025-03-01', casa, fora, 2, 0, 'finalizado')
+
+    assert collector.bulk_insert('desempenho_equipa_jogo', [
+        {'id_jogo': id_jogo, 'id_equipa': casa, 'golos_sofridos': 0, 'clean_sheet': 1, 'posse_bola': 55},
+        {'id_jogo': id_jogo, 'id_equipa': fora, 'golos_sofridos': 2, 'clean_sheet': 1, 'posse_bola': 145}
+    ]) == 1
+    assert collector.bulk_insert('desempenho_jogador_jogo', [
+        {'id_jogo': id_jogo, 'id_jogador': jogador, 'remates': 2, 'remates_baliza': 3}
+    ]) == 0
+    assert collector.bulk_insert('lesoes', [
+        {'id_jogador': jogador, 'data_inicio': '2025-03-10', 'data_fim_estimada': '2025-03-01'},
+        {'id_jogador': jogador, 'data_inicio': '2025-03-10', 'data_fim_estimada': '2025-04-01'}
+    ]) == 1
+
+    assert [(tabela, m) for tabela, _, m in _quarantine(collector)] == [
+        ('desempenho_equipa_jogo', 'posse_bola fora de [0, 100]; clean_sheet inconsistente com golos_sofridos'),
+        ('desempenho_jogador_jogo', 'remates_baliza acima de remates'),
+        ('lesoes', 'data_fim_estimada anterior a data_inicio')
+    ]
+
+
+def test_sem_validacao_nada_fica_em_quarentena(collector):
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+    id_jogo = collector.add_match('2025-03-01', casa, fora)
+
+    assert collector.bulk_insert('odds', [{'id_jogo': id_jogo, 'casa_apostas': 'X', 'odd_casa': 0.5}],
+                                 validar=False) == 1
+    assert collector.bulk_insert('odds', [{'id_jogo': id_jogo, 'casa_apostas': 'X', 'odd_casa': 2.0}]) == 0
+    assert [m for _, _, m in _quarantine(collector)] == ['duplicado']
+
+
+def test_texto_em_coluna_numerica(collector):
+    casa = collector.add_team('Casa FC')
+    fora = collector.add_team('Fora FC')
+    id_jogo = collector.add_match('2025-03-01', casa, fora)
+
+    assert collector.bulk_insert('xg_jogo', [
+        {'id_jogo': id_jogo, 'id_equipa': casa, 'xg': 'alto'},
+        {'id_jogo': id_jogo, 'id_equipa': fora, 'xg': 1.2}
+    ]) == 1
+    [(tabela, dados, motivos)] = _quarantine(collector)
+    assert (tabela, dados['xg'], motivos) == ('xg_jogo', 'alto', 'xg não numérico')
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes da Instrumentação (instrumentation.py)
+"""
+
+import pstats
+
+from instrumentation import NO_COMPONENT, Metrics, profile
+from prediction_engine import FootballPredictionEngine
+
+
+def test_consultas_atribuidas_ao_componente_ativo(tmp_path):
+    metrics = Metrics(enabled=True)
+    conn = metrics.connect(str(tmp_path / 'metricas.db'))
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    with metrics.timer('externo'):
+        conn.execute('INSERT INTO t VALUES (1)')
+        with metrics.timer('interno'):
+            conn.execute('SELECT * FROM t').fetchall()
+            conn.execute('SELECT * FROM t').fetchall()
+    metrics.count('linhas', 3)
+    conn.close()
+
+    report = metrics.report()
+    componentes = report['componentes']
+    assert componentes['externo']['consultas_sql'] == 1
+    assert componentes['interno']['consultas_sql'] == 2
+    assert componentes['interno']['consultas_por_chamada'] == 2.0
+    assert componentes[NO_COMPONENT]['consultas_sql'] == 1
+    assert report['consultas_sql']['SELECT * FROM t']['chamadas'] == 2
+    assert report['contadores'] == {'linhas': 3}
+
+
+def test_desativada_nao_recolhe_nada(tmp_path):
+    metrics = Metrics()
+    conn = metrics.connect(str(tmp_path / 'metricas.db'))
+    assert type(conn).__name__ == 'Connection'
+    with metrics.timer('componente'):
+        conn.execute('SELECT 1')
+    metrics.count('linhas')
+    conn.close()
+    assert metrics.report() == {'componentes': {}, 'contadores': {}, 'consultas_sql': {}}
+
+
+def test_previsao_por_componente_e_prometheus(tmp_path):
+    metrics = Metrics(enabled=True)
+    engine = FootballPredictionEngine(str(tmp_path / 'motor.db'), metrics=metrics)
+    casa = engine.collector.add_team('Casa FC')
+    fora = engine.collector.add_team('Fora FC')
+    metrics.reset()
+    engine.predict_match_compact(casa, fora)
+
+    componentes = metrics.report()['componentes']
+    assert componentes
+    assert sum(c['consultas_sql'] for c in componentes.values()) > 0
+
+    texto = metrics.to_prometheus()
+    assert '# TYPE football_component_calls_total counter' in texto
+    for nome in componentes:
+        assert f'football_component_calls_total{{component="{nome}"}}' in texto
+
+
+def test_profile_grava_estatisticas(tmp_path):
+    destino = str(tmp_path / 'perfil.prof')
+    with profile(destino):
+        sum(range(1000))
+    assert pstats.Stats(destino).total_calls > 0
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Testes das Previsões ao Vivo (live_predictions.py)
+"""
+
+import asyncio
+
+import pytest
+
+from live_predictions import LivePredictionManager, outcome_probabilities, prematch_goal_rates
+
+
+@pytest.mark.parametrize('probabilidades', [
+    (0.577, 0.091, 0.332),
+    (0.45, 0.28, 0.27),
+    (0.2, 0.3, 0.5),
+    (0.8, 0.15, 0.05)
+])
+def test_estado_inicial_reproduz_previsao_pre_jogo(probabilidades):
+    manager = LivePredictionManager()
+    manager.register_match(1, *probabilidades)
+
+    inicial = manager.matches[1].probabilities()
+    assert inicial == pytest.approx(probabilidades, abs=1e-4)
+
+
+def test_percentagens_sao_normalizadas():
+    manager = LivePredictionManager()
+    manager.register_match(1, 57.7, 9.1, 33.2)
+
+    assert manager.matches[1].probabilities() == pytest.approx((0.577, 0.091, 0.332), abs=1e-4)
+
+
+def test_taxas_de_golos_reproduzem_as_tres_probabilidades():
+    lam_casa, lam_fora = prematch_goal_rates(0.45, 0.28, 0.27)
+
+    assert lam_casa > lam_fora
+    assert outcome_probabilities(lam_casa, lam_fora) == pytest.approx((0.45, 0.28, 0.27), abs=1e-4)
+
+
+def test_golo_e_fim_de_jogo():
+    manager = LivePredictionManager()
+    manager.register_match(1, 0.45, 0.28, 0.27)
+    antes = manager.matches[1].probabilities()
+
+    update = manager.process_event({'id_jogo': 1, 'tipo': 'golo', 'equipa': 'fora', 'minuto': 80})
+    assert update['probabilidades']['vitoria_fora'] > antes[2] * 100
+
+    update = manager.process_event({'id_jogo': 1, 'tipo': 'fim'})
+    assert update['probabilidades'] == {'vitoria_casa': 0.0, 'empate': 0.0, 'vitoria_fora': 100.0}
+    assert 1 not in manager.matches
+
+
+def test_evento_desconhecido_e_rejeitado():
+    manager = LivePredictionManager()
+    manager.register_match(1, 0.45, 0.28, 0.27)
+
+    with pytest.raises(ValueError):
+        manager.process_event({'id_jogo': 1, 'tipo': 'penalti', 'minuto': 60})
+
+
+def test_substituicao_so_avanca_o_minuto():
+    manager = LivePredictionManager()
+    manager.register_match(1, 0.45, 0.28, 0.27)
+    manager.register_match(2, 0.45, 0.28, 0.27)
+
+    substituicao = manager.process_event({'id_jogo': 1, 'tipo': 'substituicao', 'equipa': 'casa', 'minuto': 60})
+    minuto = manager.process_event({'id_jogo': 2, 'tipo': 'minuto', 'minuto': 60})
+    assert substituicao['minuto'] == 60
+    assert substituicao['probabilidades'] == minuto['probabilidades']
+    assert (manager.matches[1].lam_casa, manager.matches[1].lam_fora) == \
+        (manager.matches[2].lam_casa, manager.matches[2].lam_fora)
+
+
+def test_consumidor_ignora_eventos_malformados():
+    manager = LivePredictionManager()
+    manager.register_match(1, 0.45, 0.28, 0.27)
+    eventos = [
+        {'id_jogo': 1, 'tipo': 'minuto', 'minuto': None},
+        {'id_jogo': 1, 'tipo': 'minuto', 'minuto': 'quarenta'},
+        {'id_jogo': 99, 'tipo': 'golo', 'equipa': 'casa'},
+        {'id_jogo': 1, 'tipo': 'golo', 'equipa': 'casa', 'minuto': 30},
+        None
+    ]
+
+    async def run():
+        fila = asyncio.Queue()
+        for evento in eventos:
+            fila.put_nowait(evento)
+        await manager.consume(fila)
+
+    asyncio.run(run())
+    assert (manager.matches[1].golos_casa, manager.matches[1].minuto) == (1, 30)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes do Resultado Compacto de uma Previsão (match_prediction.py)
+"""
+
+import json
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from feature_store import build_feature_store
+from match_prediction import COMPONENT_KEYS, MatchPrediction
+from prediction_engine import FootballPredictionEngine
+
+
+def _assert_json_igual(prediction):
+    assert prediction.to_json() == json.dumps(prediction.to_dict(), ensure_ascii=False)
+
+
+@pytest.mark.parametrize('opcoes', [
+    {},
+    {'componentes': [i / 7 for i in range(len(COMPONENT_KEYS))], 'pontuacao': (0.61234, 1e-7)},
+    {'modelo': 'numpy', 'id_jogo': 42, 'data_jogo': '2025-06-28'},
+    {'id_jogo': 7, 'data_jogo': None},
+])
+def test_json_igual_ao_do_dicionario(opcoes):
+    _assert_json_igual(MatchPrediction('Atlético "B"', 'São João\\Norte', 0.1 + 0.2, 1 / 3, 0.36666, **opcoes))
+
+
+def test_dicionario_no_formato_de_predict_match():
+    prediction = MatchPrediction('Casa FC', 'Fora FC', 0.5, 0.2, 0.3,
+                                 componentes=[0.5] * len(COMPONENT_KEYS), pontuacao=(0.6, 0.4))
+    result = prediction.to_dict()
+    assert result['previsao_principal'] == 'Vitória Casa FC'
+    assert result['confianca'] == 50.0
+    assert result['probabilidades'] == {'vitoria_casa': 50.0, 'empate': 20.0, 'vitoria_fora': 30.0}
+    assert list(result['analise_detalhada']) == list(COMPONENT_KEYS)
+    assert result['pontuacao_final'] == {'casa': 0.6, 'fora': 0.4}
+    assert 'modelo' not in result and 'id_jogo' not in result
+
+
+@pytest.mark.parametrize('probs, resultado', [
+    ((0.5, 0.2, 0.3), 'casa'),
+    ((0.2, 0.3, 0.5), 'fora'),
+    ((0.2, 0.5, 0.3), 'empate'),
+    ((0.2, 0.4, 0.4), 'empate'),  # o empate ganha a igualdade com a vitória de fora
+    ((0.4, 0.2, 0.4), 'fora'),
+])
+def test_resultado_previsto(probs, resultado):
+    prediction = MatchPrediction('A', 'B', *probs)
+    assert prediction.resultado_previsto == resultado
+    assert prediction.confianca == max(probs)
+
+
+def test_previsoes_do_motor_serializam_como_o_dicionario(tmp_path):
+    db_path = str(tmp_path / 'json.db')
+    SyntheticDataGenerator(n_teams=4, n_seasons=1, players_per_team=4, first_season=2024).load(db_path)
+    store_path = str(tmp_path / 'json.fbfs')
+    build_feature_store(db_path, store_path)
+
+    for engine in (FootballPredictionEngine(db_path), FootballPredictionEngine(db_path, store_path)):
+        predictions = list(engine.iter_predictions('1900-01-01', '2999-12-31'))
+        assert predictions
+        for prediction in predictions:
+            _assert_json_igual(prediction)
+            assert json.loads(prediction.to_json()) == prediction.to_dict()
+        assert engine.predict_match(1, 2) == engine.predict_match_compact(1, 2).to_dict()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Testes do Modelo de Aprendizagem Automática (ml_model.py)
+"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from football_betting_analyzer import FootballDataCollector
+from ml_model import (FEATURES, MatchOutcomeModel, build_fixture_matrix, build_training_matrix,
+                      train_model)
+
+
+@pytest.fixture(scope='module')
+def db_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('ml') / 'modelo.db')
+    SyntheticDataGenerator(n_teams=6, n_seasons=2, players_per_team=4, first_season=2023).load(path)
+    return path
+
+
+@pytest.fixture(scope='module')
+def matriz(db_path):
+    conn = sqlite3.connect(db_path)
+    ids, X, y = build_training_matrix(conn)
+    datas = dict(conn.execute("SELECT id_jogo, data_jogo FROM jogo WHERE status = 'finalizado'"))
+    conn.close()
+    return ids, X, y, datas
+
+
+def test_cada_linha_so_usa_jogos_anteriores(db_path, matriz):
+    """A linha de treino de um jogo é igual às features atuais com a base cortada antes dele."""
+    ids, X, _, datas = matriz
+    assert X.shape == (len(ids), len(FEATURES))
+
+    conn = sqlite3.connect(db_path)
+    fixtures = dict((row[0], row) for row in conn.execute(
+        'SELECT id_jogo, data_jogo, id_equipa_casa, id_equipa_fora FROM jogo'))
+    for i in range(0, len(ids), max(1, len(ids) // 25)):
+        id_jogo = int(ids[i])
+        data = datas[id_jogo]
+        # Este jogo e os seguintes passam a agendados (a ordem é data_jogo, id_jogo)
+        conn.execute('''
+            UPDATE jogo SET status = 'agendado'
+            WHERE data_jogo > ? OR (data_jogo = ? AND id_jogo >= ?)
+        ''', (data, data, id_jogo))
+        atual = build_fixture_matrix(conn, [fixtures[id_jogo]])[0]
+        conn.rollback()
+        np.testing.assert_allclose(X[i], atual, err_msg=f"jogo {id_jogo}")
+    conn.close()
+
+
+def test_resultado_do_jogo_nao_entra_nas_suas_features(db_path, matriz):
+    ids, X, y, _ = matriz
+    i = len(ids) // 2
+    conn = sqlite3.connect(db_path)
+    conn.execute('UPDATE jogo SET golos_casa = golos_casa + 5 WHERE id_jogo = ?', (int(ids[i]),))
+    conn.execute('UPDATE desempenho_equipa_jogo SET golos_marcados = golos_marcados + 5 WHERE id_jogo = ?',
+                 (int(ids[i]),))
+    _, X2, y2 = build_training_matrix(conn)
+    conn.rollback()
+    conn.close()
+
+    np.testing.assert_allclose(X2[:i + 1], X[:i + 1])
+    assert y2[i] == 0 and (y2[:i] == y[:i]).all()
+
+
+def test_intervalo_usa_o_historico_anterior(db_path, matriz):
+    ids, X, _, datas = matriz
+    inicio = datas[int(ids[len(ids) // 2])]
+    conn = sqlite3.connect(db_path)
+    ids_parcial, X_parcial, _ = build_training_matrix(conn, data_inicio=inicio)
+    conn.close()
+
+    posicoes = {int(id_jogo): i for i, id_jogo in enumerate(ids)}
+    np.testing.assert_allclose(X_parcial, X[[posicoes[int(i)] for i in ids_parcial]])
+
+
+def test_treino_guarda_e_carrega_o_modelo_numpy(db_path, tmp_path, matriz):
+    _, X, y, _ = matriz
+    path = str(tmp_path / 'modelo.json')
+    resumo = train_model(FootballDataCollector(db_path), path, backend='numpy')
+    assert resumo['backend'] == 'numpy' and resumo['jogos'] == len(y)
+    assert 'log_loss_referencia' in resumo['validacao']
+
+    modelo = MatchOutcomeModel.load(path)
+    probs = modelo.predict_proba(X)
+    assert probs.shape == (len(y), 3)
+    np.testing.assert_allclose(probs.sum(axis=1), 1.0)
+    np.testing.assert_allclose(probs, MatchOutcomeModel.fit(X, y, 'numpy').predict_proba(X), atol=1e-6)
+
+    with pytest.raises(ValueError):
+        MatchOutcomeModel.fit(X[:0], y[:0], 'numpy')
+    with pytest.raises(ValueError):
+        MatchOutcomeModel.fit(X, y, 'xgboost')
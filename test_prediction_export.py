@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Testes da Exportação em Streaming (prediction_export.py)
+"""
+
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from prediction_engine import FootballPredictionEngine
+from prediction_export import export_daily_analysis, flatten_prediction, write_predictions
+
+
+@pytest.fixture(scope='module')
+def engine(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('exportacao') / 'exportacao.db')
+    SyntheticDataGenerator(n_teams=6, n_seasons=1, players_per_team=4, first_season=2023).load(path)
+    return FootballPredictionEngine(path)
+
+
+@pytest.fixture(scope='module')
+def intervalo(engine):
+    conn = sqlite3.connect(engine.collector.db_path)
+    intervalo = conn.execute("SELECT MIN(data_jogo), MAX(data_jogo), COUNT(*) FROM jogo "
+                             "WHERE status = 'agendado'").fetchone()
+    conn.close()
+    return intervalo
+
+
+def test_flatten_prediction():
+    assert flatten_prediction({'a': 1, 'probabilidades': {'casa': 0.5, 'x': {'y': 2}}}) == {
+        'a': 1, 'probabilidades_casa': 0.5, 'probabilidades_x_y': 2}
+
+
+def test_ndjson_uma_previsao_por_linha(engine, intervalo, tmp_path):
+    inicio, fim, agendados = intervalo
+    destino = str(tmp_path / 'previsoes.ndjson')
+
+    assert export_daily_analysis(engine, inicio, fim, 'ndjson', destino) == agendados
+    with open(destino, encoding='utf-8') as f:
+        linhas = [json.loads(linha) for linha in f]
+    esperadas = list(engine.iter_daily_analysis(inicio, fim))
+    assert linhas == json.loads(json.dumps(esperadas))
+
+
+def test_csv_plano_com_cabecalho_da_primeira_previsao(engine, intervalo, tmp_path):
+    inicio, fim, agendados = intervalo
+    destino = str(tmp_path / 'previsoes.csv')
+
+    assert export_daily_analysis(engine, inicio, fim, 'csv', destino) == agendados
+    with open(destino, encoding='utf-8', newline='') as f:
+        linhas = list(csv.DictReader(f))
+    esperadas = [flatten_prediction(p) for p in engine.iter_daily_analysis(inicio, fim)]
+    assert len(linhas) == agendados
+    assert list(linhas[0]) == list(esperadas[0])
+    for linha, esperada in zip(linhas, esperadas):
+        assert {k: str(v) for k, v in esperada.items()} == linha
+
+
+def test_parquet(engine, intervalo, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    inicio, fim, agendados = intervalo
+    destino = str(tmp_path / 'previsoes.parquet')
+
+    assert export_daily_analysis(engine, inicio, fim, 'parquet', destino) == agendados
+    assert pq.read_table(destino).num_rows == agendados
+
+
+def test_formato_desconhecido():
+    with pytest.raises(ValueError):
+        write_predictions([], 'xml')
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Testes do Serviço Assíncrono de Previsões (prediction_service.py)
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from prediction_service import PredictionService, ServiceOverloadedError
+
+
+class _SlowEngine:
+    """Motor falso: cada previsão espera por `liberar` e conta as execuções."""
+
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.chamadas = 0
+
+    def predict_match(self, casa, fora):
+        self.chamadas += 1
+        self.liberar.wait(5)
+        return {'casa': casa, 'fora': fora}
+
+    def iter_daily_analysis(self, data_inicio, data_fim=None, liga=None):
+        self.chamadas += 1
+        yield {'data': data_inicio, 'liga': liga}
+
+
+def _run(service, coro):
+    try:
+        return asyncio.run(coro)
+    finally:
+        service.engine.liberar.set()
+        service.close()
+
+
+def test_pedidos_identicos_partilham_um_calculo():
+    service = PredictionService(_SlowEngine(), max_workers=2)
+
+    async def run():
+        pedidos = [asyncio.ensure_future(service.predict_match(1, 2)) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        assert service.pending == 1
+        service.engine.liberar.set()
+        return await asyncio.gather(*pedidos)
+
+    resultados = _run(service, run())
+    assert resultados == [{'casa': 1, 'fora': 2}] * 20
+    assert service.engine.chamadas == 1
+    assert service.stats['executados'] == 1 and service.stats['agrupados'] == 19
+    assert service.pending == 0
+
+
+def test_acima_do_limite_os_pedidos_novos_sao_recusados():
+    service = PredictionService(_SlowEngine(), max_workers=2, max_pending=2)
+
+    async def run():
+        em_curso = [asyncio.ensure_future(service.predict_match(1, fora)) for fora in (2, 3)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServiceOverloadedError):
+            await service.predict_match(1, 4)
+        # Pedidos iguais aos que estão em curso continuam a ser aceites
+        repetido = asyncio.ensure_future(service.predict_match(1, 2))
+        service.engine.liberar.set()
+        return await asyncio.gather(*em_curso, repetido)
+
+    resultados = _run(service, run())
+    assert [r['fora'] for r in resultados] == [2, 3, 2]
+    assert service.stats['recusados'] == 1
+
+
+def test_tempo_limite_nao_cancela_o_calculo_partilhado():
+    service = PredictionService(_SlowEngine(), max_workers=1, timeout=0.05)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await service.predict_match(1, 2)
+        service.timeout = 5
+        service.engine.liberar.set()
+        return await service.predict_match(1, 2)
+
+    assert _run(service, run()) == {'casa': 1, 'fora': 2}
+    assert service.stats['expirados'] == 1
+    assert service.engine.chamadas == 1
+
+
+def test_protocolo_json():
+    service = PredictionService(_SlowEngine())
+    service.engine.liberar.set()
+
+    async def run():
+        dia = await service.handle_request({'tipo': 'dia', 'data': '2025-06-28', 'liga': 'Liga Sintética'})
+        with pytest.raises(ValueError):
+            await service.handle_request({'tipo': 'epoca'})
+        return dia
+
+    assert _run(service, run()) == [{'data': '2025-06-28', 'liga': 'Liga Sintética'}]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Testes dos Cenários Hipotéticos (scenarios.py): paridade com o motor de previsão
+"""
+
+import sqlite3
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from football_betting_analyzer import FootballDataCollector
+from prediction_engine import FootballPredictionEngine
+from scenarios import ScenarioBase
+
+CASA, FORA, OUTRA = 1, 2, 3
+LESAO = {'gravidade': 'grave', 'impacto_equipa': 4}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'cenarios.db')
+    SyntheticDataGenerator(n_teams=4, n_seasons=1, players_per_team=6, first_season=2023).load(path)
+    return path
+
+
+def _assert_same(cenario, previsao):
+    assert (cenario.prob_casa, cenario.prob_empate, cenario.prob_fora) == pytest.approx(
+        (previsao.prob_casa, previsao.prob_empate, previsao.prob_fora))
+    assert cenario.componentes == pytest.approx(previsao.componentes)
+
+
+def _predict(db_path):
+    return FootballPredictionEngine(db_path).predict_match_compact(CASA, FORA)
+
+
+def _execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def test_sem_alteracoes_igual_ao_motor(db_path):
+    base = ScenarioBase.from_engine(FootballPredictionEngine(db_path), CASA, FORA)
+    _assert_same(base.apply(), _predict(db_path))
+
+
+def test_ausente_igual_a_jogador_fora_do_plantel(db_path):
+    engine = FootballPredictionEngine(db_path)
+    base = ScenarioBase.from_engine(engine, CASA, FORA)
+    # O jogador com mais impacto, para a alteração contar
+    impacts = engine.player_impacts(CASA)
+    jogador = max(impacts, key=impacts.get)
+    cenario = base.apply({'ausentes_casa': [jogador]})
+
+    _execute(db_path, 'UPDATE jogador SET id_equipa = ? WHERE id_jogador = ?', (OUTRA, jogador))
+    previsao = _predict(db_path)
+    _assert_same(cenario, previsao)
+    assert cenario.prob_casa != pytest.approx(base.apply().prob_casa)
+
+
+def test_lesoes_hipoteticas_iguais_a_lesoes_gravadas(db_path):
+    engine = FootballPredictionEngine(db_path)
+    jogador = min(engine.player_impacts(FORA))
+    sem_lesao = _predict(db_path)
+    cenario = ScenarioBase.from_engine(engine, CASA, FORA).apply({'lesoes_fora': [LESAO]})
+
+    FootballDataCollector(db_path).bulk_insert('lesoes', [
+        dict(LESAO, id_jogador=jogador, data_inicio='2025-01-01', tipo_lesao='muscular')
+    ])
+    com_lesao = _predict(db_path)
+    _assert_same(cenario, com_lesao)
+    assert com_lesao.prob_fora != pytest.approx(sem_lesao.prob_fora)
+
+    # E o inverso: a lesão gravada deixa de contar com o jogador recuperado
+    base = ScenarioBase.from_engine(FootballPredictionEngine(db_path), CASA, FORA)
+    _assert_same(base.apply({'recuperados_fora': [jogador]}), sem_lesao)
+
+
+def test_avaliacao_vetorizada_igual_a_apply(db_path):
+    pytest.importorskip('numpy')
+    engine = FootballPredictionEngine(db_path)
+    base = ScenarioBase.from_engine(engine, CASA, FORA)
+    jogadores = sorted(engine.player_impacts(CASA))
+    cenarios = [{}, {'campo': 'neutro'}, {'campo': 'invertido'}, {'lesoes_casa': [LESAO]},
+                {'onze_casa': jogadores[:3], 'ausentes_fora': sorted(engine.player_impacts(FORA))[:2]},
+                {'componentes': {'fator_casa': 0.9}}]
+
+    probs = base.evaluate_many(cenarios)
+    for linha, cenario in zip(probs, cenarios):
+        previsao = base.apply(cenario)
+        assert list(linha) == pytest.approx([previsao.prob_casa, previsao.prob_empate, previsao.prob_fora])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Testes do Calendário por Equipa (schedule_index.py)
+"""
+
+import sqlite3
+
+import pytest
+
+from football_betting_analyzer import FootballDataCollector
+from prediction_engine import FootballPredictionEngine
+from schedule_index import CONGESTION_MAX, REST_FULL_DAYS, TRAVEL_MAX_KM, ScheduleIndex, haversine_km
+
+LISBOA = (38.7527, -9.1847)
+PORTO = (41.1617, -8.5839)
+
+
+@pytest.fixture
+def index():
+    index = ScheduleIndex()
+    # Equipa 1: jogos a 1, 4, 8 e 20 de março (fora no Porto, equipa 2, no dia 8)
+    for data, casa, fora in (('2025-03-04', 1, 3), ('2025-03-01', 1, 2), ('2025-03-08', 2, 1),
+                             ('2025-03-20', 1, 3)):
+        index.add_match(data, casa, fora)
+    index.set_location(1, *LISBOA)
+    index.set_location(2, *PORTO)
+    return index
+
+
+def test_distancia_entre_estadios():
+    assert haversine_km(LISBOA, PORTO) == pytest.approx(274, abs=5)
+    assert haversine_km(LISBOA, LISBOA) == 0.0
+
+
+def test_descanso_congestao_e_viagem(index):
+    assert index.dates[1] == sorted(index.dates[1])
+    assert index.rest_days(1, '2025-03-01') is None
+    assert index.rest_days(1, '2025-03-08') == 4
+    assert index.rest_days(1, '2025-03-20T20:00:00') == 12
+    assert index.matches_in_window(1, '2025-03-08') == 2  # o próprio dia não conta
+    assert index.matches_in_window(1, '2025-03-20') == 1
+    assert index.matches_in_window(1, '2025-03-20', janela=20) == 3
+    assert index.travel_km(1, '2025-03-20', 1) == pytest.approx(haversine_km(PORTO, LISBOA))
+    # Sem coordenadas não há viagem
+    assert index.travel_km(3, '2025-03-20', 1) == 0.0
+
+
+def test_fatores_do_jogo(index):
+    dia = '2025-03-20'
+    descanso_casa, descanso_fora, congestao_casa, congestao_fora, viagem_casa, viagem_fora = \
+        index.fixture_factors(1, 3, dia)
+    assert descanso_casa == 1.0 and descanso_fora == min(16, REST_FULL_DAYS) / REST_FULL_DAYS
+    assert congestao_casa == 1.0 - 1 / CONGESTION_MAX
+    assert viagem_casa == pytest.approx(1.0 - haversine_km(PORTO, LISBOA) / TRAVEL_MAX_KM)
+    assert viagem_fora == 1.0
+    # Equipa sem jogos anteriores: sem fadiga
+    assert index.fixture_factors(4, 5, dia) == (1.0,) * 6
+
+
+def test_fatores_de_uma_jornada_iguais_aos_de_cada_jogo(index):
+    fixtures = [(None, '2025-03-20', 1, 3), (None, '2025-03-20', 2, 1), (None, '2025-03-08', 2, 1),
+                (None, '2025-03-20', 1, 3)]
+    assert index.factors_many(fixtures) == [index.fixture_factors(*f[2:4], f[1]) for f in fixtures]
+
+
+def test_carregado_da_base_igual_ao_construido(tmp_path, index):
+    db_path = str(tmp_path / 'calendario.db')
+    collector = FootballDataCollector(db_path)
+    for nome in ('Lisboa', 'Porto', 'Braga'):
+        collector.add_team(nome)
+    for data, casa, fora in (('2025-03-04', 1, 3), ('2025-03-01', 1, 2), ('2025-03-08', 2, 1),
+                             ('2025-03-20', 1, 3)):
+        collector.add_match(data, casa, fora)
+    collector.set_team_location(1, *LISBOA)
+    collector.set_team_location(2, *PORTO)
+
+    conn = sqlite3.connect(db_path)
+    carregado = ScheduleIndex.load(conn)
+    conn.close()
+    assert carregado.dates == index.dates and carregado.venues == index.venues
+    assert carregado.locations == index.locations
+
+    # O motor usa os fatores como os últimos componentes da previsão
+    engine = FootballPredictionEngine(db_path)
+    prediction = engine.predict_match_compact(1, 3, data_jogo='2025-03-20')
+    assert tuple(prediction.componentes[-6:]) == index.fixture_factors(1, 3, '2025-03-20')
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Testes do Arquivo de Épocas (season_archive.py)
+"""
+
+import sqlite3
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from football_betting_analyzer import FootballDataCollector
+from prediction_engine import FootballPredictionEngine
+from season_archive import HistorySQLiteBackend, archive_season, closed_seasons
+
+HOJE = '2026-10-19'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'arquivo.db')
+    SyntheticDataGenerator(n_teams=4, n_seasons=5, players_per_team=4, first_season=2019).load(path)
+    return path
+
+
+def _count(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _predictions(engine, fixtures):
+    return [engine.predict_match_compact(casa, fora, None, '2025-01-01') for casa, fora in fixtures]
+
+
+def test_arquivo_mantem_janelas_e_jogos_nao_finalizados(db_path):
+    collector = FootballDataCollector(db_path)
+    # Equipa que só jogou na primeira época (ex.: descida de divisão) e um jogo adiado
+    conn = collector._connect()
+    outra = conn.execute('SELECT MIN(id_equipa) FROM equipa').fetchone()[0]
+    conn.close()
+    despromovida = collector.add_team('Despromovida')
+    antigos = [collector.add_match(f'2019-09-{dia:02d}', despromovida, outra, 1, 0, 'finalizado')
+               for dia in (1, 8, 15)]
+    adiado = collector.add_match('2019-10-01', outra, despromovida, status='adiado')
+
+    equipas = [(1, 2), (3, 4), (despromovida, outra)]
+    antes = _predictions(FootballPredictionEngine(db_path), equipas)
+
+    assert closed_seasons(collector, HOJE)[0] == '2019/20'
+    resultado = archive_season(collector, '2019/20', hoje=HOJE)
+    assert resultado['linhas']['jogo'] > 0
+
+    # Os jogos da equipa despromovida e o jogo adiado continuam na base viva
+    for id_jogo in antigos + [adiado]:
+        assert _count(db_path, 'SELECT COUNT(*) FROM jogo WHERE id_jogo = ?', (id_jogo,)) == 1
+    assert _count(db_path, "SELECT COUNT(*) FROM jogo WHERE status <> 'finalizado'") >= 1
+
+    # As janelas do motor não mudaram: as previsões na base viva são as mesmas
+    depois = _predictions(FootballPredictionEngine(db_path), equipas)
+    for previsao, esperada in zip(depois, antes):
+        assert (previsao.prob_casa, previsao.prob_empate, previsao.prob_fora) == pytest.approx(
+            (esperada.prob_casa, esperada.prob_empate, esperada.prob_fora))
+
+    # Repetir não arquiva mais nada (só restam jogos das janelas ou não finalizados)
+    assert '2019/20' not in closed_seasons(collector, HOJE)
+    assert archive_season(collector, '2019/20', hoje=HOJE, vacuum=False)['linhas']['jogo'] == 0
+
+
+def test_modo_historico_ve_a_base_completa(db_path):
+    tabelas = ('jogo', 'desempenho_equipa_jogo', 'desempenho_jogador_jogo')
+    antes = {t: _count(db_path, f'SELECT COUNT(*) FROM {t}') for t in tabelas}
+    collector = FootballDataCollector(db_path)
+    for epoca in closed_seasons(collector, HOJE):
+        archive_season(collector, epoca, hoje=HOJE, vacuum=False)
+    assert _count(db_path, 'SELECT COUNT(*) FROM jogo') < antes['jogo']
+
+    storage = HistorySQLiteBackend(db_path)
+    conn = storage.connect()
+    try:
+        for tabela in tabelas:
+            assert conn.execute(f'SELECT COUNT(*) FROM {tabela}').fetchone()[0] == antes[tabela]
+        # Sem linhas repetidas entre a base viva e os arquivos
+        assert conn.execute('SELECT COUNT(DISTINCT id_jogo) FROM jogo').fetchone()[0] == antes['jogo']
+    finally:
+        conn.close()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Testes dos Backends de Armazenamento (storage.py)
+
+Os testes PostgreSQL só correm com DATABASE_URL (ex.: postgresql://localhost/futebol_teste).
+"""
+
+import datetime
+import os
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from football_betting_analyzer import FootballDataCollector
+from instrumentation import Metrics
+from prediction_engine import FootballPredictionEngine
+from storage import (PostgresCursor, SQLiteBackend, SnapshotSQLiteBackend, _convert_row, backend_from_url,
+                     publish_snapshot, translate_sql)
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+postgres = pytest.mark.skipif(not DATABASE_URL, reason='sem DATABASE_URL (PostgreSQL)')
+
+
+@postgres
+def test_postgres_ids_explicitos_avancam_as_sequencias():
+    pytest.importorskip('psycopg2')
+    storage = backend_from_url(DATABASE_URL)
+    collector = FootballDataCollector(DATABASE_URL, storage=storage)
+    sufixo = uuid.uuid4().hex[:8]
+    conn = collector._connect()
+    maximo = conn.execute('SELECT COALESCE(MAX(id_equipa), 0) FROM equipa').fetchone()[0]
+    conn.close()
+
+    try:
+        explicitos = [maximo + 1000, maximo + 1001]
+        collector.bulk_insert('equipa', [{'id_equipa': id_equipa, 'nome_equipa': f'Explícita {id_equipa} {sufixo}'}
+                                         for id_equipa in explicitos])
+        nova = collector.add_team(f'Nova {sufixo}')
+        assert nova > max(explicitos)
+    finally:
+        conn = collector._connect()
+        conn.execute('DELETE FROM equipa WHERE nome_equipa LIKE ?', (f'% {sufixo}',))
+        conn.commit()
+        conn.close()
+        storage.close()
+
+
+class _FakePsycopgCursor:
+    """Cursor psycopg2 mínimo: regista as instruções e devolve linhas fixas."""
+
+    def __init__(self, linhas=()):
+        self.instrucoes = []
+        self.linhas = list(linhas)
+        self.rowcount = len(self.linhas)
+
+    def execute(self, sql, parametros=()):
+        self.instrucoes.append((sql, parametros))
+
+    def fetchone(self):
+        return self.linhas.pop(0) if self.linhas else None
+
+    def fetchall(self):
+        linhas, self.linhas = self.linhas, []
+        return linhas
+
+
+def test_traducao_de_ddl_e_marcadores():
+    ddl = translate_sql('''
+        CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT, x REAL, ativo BOOLEAN DEFAULT 0)
+    ''')
+    assert 'SERIAL PRIMARY KEY' in ddl and 'DOUBLE PRECISION' in ddl and 'INTEGER DEFAULT 0' in ddl
+    assert translate_sql("SELECT * FROM lesoes WHERE data_fim >= date('now')") == \
+        'SELECT * FROM lesoes WHERE data_fim >= CURRENT_DATE'
+    # '?' só fora de literais; '%' escapado para o psycopg2
+    assert translate_sql("SELECT ? || '?' FROM t WHERE nome LIKE 'a%' AND id = ?") == \
+        "SELECT %s || '?' FROM t WHERE nome LIKE 'a%%' AND id = %s"
+
+
+def test_valores_do_postgres_convertidos_como_no_sqlite():
+    assert _convert_row((Decimal('1.5'), datetime.date(2025, 3, 1), 'x', None)) == (1.5, '2025-03-01', 'x', None)
+    assert _convert_row(None) is None
+
+
+def test_cursor_traduz_regista_e_obtem_o_ultimo_id():
+    metrics = Metrics(enabled=True)
+    raw = _FakePsycopgCursor([(42,)])
+    cursor = PostgresCursor(raw, metrics)
+
+    cursor.execute('INSERT INTO equipa (nome_equipa) VALUES (?)', ('Casa FC',))
+    assert raw.instrucoes[-1] == ('INSERT INTO equipa (nome_equipa) VALUES (%s)', ('Casa FC',))
+    assert cursor.lastrowid == 42
+    assert raw.instrucoes[-1][0] == 'SELECT lastval()'
+    assert metrics.report()['consultas_sql']['INSERT INTO equipa (nome_equipa) VALUES (?)']['chamadas'] == 1
+
+    cursor.execute('SELECT 1')
+    assert cursor.lastrowid is None
+
+
+def test_backend_a_partir_do_url(tmp_path):
+    path = str(tmp_path / 'url.db')
+    assert isinstance(backend_from_url(f'sqlite:///{path}'), SQLiteBackend)
+    assert backend_from_url(path).db_path == path
+    with pytest.raises(ValueError):
+        backend_from_url('postgresql://localhost/x', history=True)
+    with pytest.raises(ValueError):
+        backend_from_url('postgresql://localhost/x', point_in_time=True)
+
+
+def _n_equipas(conn):
+    return conn.execute('SELECT COUNT(*) FROM equipa').fetchone()[0]
+
+
+def test_copia_de_leitura_so_ve_o_publicado(tmp_path):
+    db_path = str(tmp_path / 'viva.db')
+    collector = FootballDataCollector(db_path)
+    collector.add_team('Casa FC')
+    backend = SnapshotSQLiteBackend(db_path)
+
+    collector.add_team('Fora FC')
+    conn = backend.connect()
+    assert _n_equipas(conn) == 1
+    conn.close()
+
+    backend.refresh()
+    conn = backend.connect()
+    assert _n_equipas(conn) == 2
+    with pytest.raises(Exception):
+        conn.execute("INSERT INTO equipa (nome_equipa) VALUES ('X')")
+    conn.close()
+    with pytest.raises(ValueError):
+        backend.bulk_insert(None, 'equipa', ['nome_equipa'], [('X',)])
+
+
+def test_pinned_fixa_a_copia_durante_a_leitura(tmp_path):
+    db_path = str(tmp_path / 'viva.db')
+    collector = FootballDataCollector(db_path)
+    collector.add_team('Casa FC')
+    backend = SnapshotSQLiteBackend(db_path)
+
+    with backend.pinned():
+        antes = backend.connect()
+        collector.add_team('Fora FC')
+        backend.refresh()
+        depois = backend.connect()
+        assert _n_equipas(depois) == _n_equipas(antes) == 1
+        depois.close()  # não fecha a ligação fixada
+        assert _n_equipas(antes) == 1
+    conn = backend.connect()
+    assert _n_equipas(conn) == 2
+    conn.close()
+
+
+def test_publicacao_mantem_so_as_ultimas_versoes(tmp_path):
+    db_path = str(tmp_path / 'viva.db')
+    FootballDataCollector(db_path).add_team('Casa FC')
+    snapshot_path = str(tmp_path / 'leitura')
+
+    versoes = [publish_snapshot(db_path, snapshot_path, keep=2) for _ in range(4)]
+    assert os.path.realpath(snapshot_path) == os.path.realpath(versoes[-1])
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith('leitura.')) == \
+        sorted(os.path.basename(v) for v in versoes[-2:])
+
+
+def test_previsoes_sobre_a_copia_iguais_as_da_base_viva(tmp_path):
+    db_path = str(tmp_path / 'viva.db')
+    SyntheticDataGenerator(n_teams=4, n_seasons=1, players_per_team=4, first_season=2024).load(db_path)
+    viva = FootballPredictionEngine(db_path)
+    copia = FootballPredictionEngine(db_path, storage=backend_from_url(db_path, snapshot=True))
+
+    assert copia.collector.storage.name == 'sqlite-snapshot'
+    for casa, fora in ((1, 2), (3, 4)):
+        assert copia.predict_match_compact(casa, fora).to_dict() == viva.predict_match_compact(casa, fora).to_dict()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Testes do Pipeline de xG (xg_pipeline.py): cargas incrementais contra o recálculo completo
+"""
+
+import random
+
+import pytest
+
+from benchmark import SyntheticDataGenerator
+from football_betting_analyzer import FootballDataCollector
+from xg_pipeline import PENALTY_XG, XG_WINDOW, ingest_shots, shot_xg, update_xg
+
+
+@pytest.fixture
+def collector(tmp_path):
+    path = str(tmp_path / 'xg.db')
+    SyntheticDataGenerator(n_teams=4, n_seasons=2, players_per_team=4, first_season=2022).load(path)
+    return FootballDataCollector(path)
+
+
+def _query(collector, sql):
+    conn = collector._connect()
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def _derived(collector):
+    return (_query(collector, 'SELECT id_jogo, id_equipa, xg, xga, remates, remates_contra FROM xg_jogo '
+                              'ORDER BY id_jogo, id_equipa'),
+            _query(collector, 'SELECT id_equipa, jogos, media_xg, media_xga FROM xg_equipa ORDER BY id_equipa'))
+
+
+def _shots(jogos, rng):
+    for id_jogo, casa, fora in jogos:
+        for _ in range(rng.randint(4, 12)):
+            remate = {'id_jogo': id_jogo, 'id_equipa': rng.choice((casa, fora)), 'minuto': rng.randint(1, 90),
+                      'x': rng.uniform(70, 104), 'y': rng.uniform(10, 58), 'parte_corpo': 'pe',
+                      'situacao': 'jogo_corrido', 'xg': None}
+            if rng.random() < 0.3:
+                remate['xg'] = round(rng.uniform(0.01, 0.6), 3)
+            yield remate
+
+
+def test_shot_xg():
+    assert shot_xg(94.0, 34.0) > shot_xg(80.0, 34.0) > shot_xg(80.0, 5.0)
+    assert shot_xg(94.0, 34.0, 'cabeca') < shot_xg(94.0, 34.0)
+    assert shot_xg(0.0, 0.0, situacao='penalti') == PENALTY_XG
+
+
+def test_cargas_incrementais_iguais_ao_recalculo(collector):
+    jogos = _query(collector, 'SELECT id_jogo, id_equipa_casa, id_equipa_fora FROM jogo ORDER BY data_jogo DESC')
+    assert len(jogos) > 2 * XG_WINDOW
+    agendado = _query(collector, "SELECT id_jogo FROM jogo WHERE status = 'agendado' LIMIT 1")[0][0]
+
+    # Cargas fora da ordem das datas: os jogos recentes primeiro, os antigos por fim
+    rng = random.Random(3)
+    terco = len(jogos) // 3
+    for parte in (jogos[:terco], jogos[2 * terco:], jogos[terco:2 * terco]):
+        ingest_shots(collector, _shots(parte, rng), batch_size=50)
+    # Um jogo com remates que só depois fica finalizado
+    collector.set_match_result(agendado, 2, 1)
+
+    incremental = _derived(collector)
+    assert incremental[0] and incremental[1]
+
+    conn = collector._connect()
+    conn.execute('DELETE FROM xg_jogo')
+    conn.execute('DELETE FROM xg_equipa')
+    conn.commit()
+    conn.close()
+    update_xg(collector)
+    recalculado = _derived(collector)
+
+    for obtidas, esperadas in zip(incremental, recalculado):
+        assert [linha[:2] for linha in obtidas] == [linha[:2] for linha in esperadas]
+        for obtida, esperada in zip(obtidas, esperadas):
+            assert obtida == pytest.approx(esperada)
+    assert all(jogos_equipa == XG_WINDOW for _, jogos_equipa, _, _ in incremental[1])
+
+
+def test_remates_sem_xg_nem_coordenadas_ficam_em_quarentena(collector):
+    id_jogo, casa, _ = _query(collector, 'SELECT id_jogo, id_equipa_casa, id_equipa_fora FROM jogo LIMIT 1')[0]
+    resumo = ingest_shots(collector, [
+        {'id_jogo': id_jogo, 'id_equipa': casa, 'x': 95.0, 'y': 34.0},
+        {'id_jogo': id_jogo, 'id_equipa': casa, 'x': None, 'y': None}
+    ])
+    assert resumo['remates'] == 1
+    assert _query(collector, "SELECT tabela, motivos FROM quarentena") == [('remate', 'xg em falta')]
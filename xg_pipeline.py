@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Pipeline de Remates e Golos Esperados (xG)
+Autor: Manus AI
+Data: 19/10/2026
+
+Carrega remates individuais (tabela `remate`) em streaming e mantém duas tabelas
+derivadas usadas pelo motor de previsão:
+
+- xg_jogo:   xG a favor/contra e remates de cada equipa em cada jogo
+- xg_equipa: média móvel de xG/xGA nos últimos XG_WINDOW jogos com remates
+
+Os remates sem xG recebem o valor de um modelo logístico simples (distância e
+ângulo à baliza, parte do corpo e situação de jogo). Coordenadas em metros num
+campo de 105 x 68, com a baliza atacada em x = 105, y = 34.
+
+Cada carga só recalcula os jogos e equipas afetados, pelo que milhões de remates
+podem ser carregados por partes sem reprocessar o histórico.
+"""
+
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+XG_WINDOW = 10  # a mesma janela de get_team_performance
+
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+GOAL_WIDTH = 7.32
+PENALTY_XG = 0.76
+
+# Coeficientes do modelo logístico (logit = base + distância + ângulo + ajustes)
+XG_INTERCEPT = -0.7
+XG_DISTANCE = -0.11
+XG_ANGLE = 1.2
+XG_BODY_PART = {'pe': 0.0, 'cabeca': -0.9, 'outro': -0.5}
+XG_SITUATION = {'jogo_corrido': 0.0, 'contra_ataque': 0.3, 'bola_parada': -0.2, 'livre_direto': -0.6}
+
+# Jogos por consulta nas agregações (limite de parâmetros do SQLite)
+CHUNK_SIZE = 400
+
+
+def shot_xg(x: float, y: float, parte_corpo: str = 'pe', situacao: str = 'jogo_corrido') -> float:
+    """Probabilidade de golo de um remate a partir da posição e do contexto."""
+    if situacao == 'penalti':
+        return PENALTY_XG
+
+    dx = PITCH_LENGTH - x
+    dy = abs(PITCH_WIDTH / 2 - y)
+    distance = math.hypot(dx, dy)
+
+    # Ângulo sob o qual o remate vê a baliza
+    half_goal = GOAL_WIDTH / 2
+    angle = math.atan2(GOAL_WIDTH * dx, dx * dx + dy * dy - half_goal * half_goal)
+    if angle < 0:
+        angle += math.pi
+
+    logit = (XG_INTERCEPT + XG_DISTANCE * distance + XG_ANGLE * angle +
+             XG_BODY_PART.get(parte_corpo, 0.0) + XG_SITUATION.get(situacao, 0.0))
+    return 1.0 / (1.0 + math.exp(-logit))
+
+
+def _prepare_shots(linhas: Iterable[Dict], jogos: Set[int]) -> Iterator[Dict]:
+    """Completa o xG em falta e regista os jogos afetados, sem materializar a entrada.
+
+    Linhas com valores inválidos (sem xG nem coordenadas, texto em colunas
+    numéricas) seguem sem alteração, para a validação de bulk_insert as pôr em
+    quarentena em vez de interromper a carga.
+    """
+    for linha in linhas:
+        remate = dict(linha)
+        xg = remate.get('xg')
+        try:
+            if xg is None or xg == '':
+                xg = None
+                if remate.get('x') not in (None, '') and remate.get('y') not in (None, ''):
+                    xg = shot_xg(float(remate['x']), float(remate['y']),
+                                 remate.get('parte_corpo') or 'pe', remate.get('situacao') or 'jogo_corrido')
+            remate['xg'] = None if xg is None else float(xg)
+        except (TypeError, ValueError):
+            pass
+        try:
+            jogos.add(int(remate['id_jogo']))
+        except (KeyError, TypeError, ValueError):
+            pass
+        yield remate
+
+
+def _chunks(values: List[int], size: int = CHUNK_SIZE) -> Iterator[List[int]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def aggregate_match_xg(conn, id_jogos: Iterable[int]) -> Set[int]:
+    """Recalcula xg_jogo para os jogos indicados e devolve as equipas envolvidas."""
+    cursor = conn.cursor()
+    equipas = set()
+
+    for chunk in _chunks(sorted(set(id_jogos))):
+        placeholders = ', '.join('?' for _ in chunk)
+        cursor.execute(f'''
+            INSERT INTO xg_jogo (id_jogo, id_equipa, xg, xga, remates, remates_contra)
+            SELECT
+                t.id_jogo,
+                t.id_equipa,
+                COALESCE(SUM(CASE WHEN r.id_equipa = t.id_equipa THEN r.xg END), 0),
+                COALESCE(SUM(CASE WHEN r.id_equipa <> t.id_equipa THEN r.xg END), 0),
+                SUM(CASE WHEN r.id_equipa = t.id_equipa THEN 1 ELSE 0 END),
+                SUM(CASE WHEN r.id_equipa <> t.id_equipa THEN 1 ELSE 0 END)
+            FROM (
+                SELECT id_jogo, id_equipa_casa AS id_equipa FROM jogo WHERE id_jogo IN ({placeholders})
+                UNION ALL
+                SELECT id_jogo, id_equipa_fora FROM jogo WHERE id_jogo IN ({placeholders})
+            ) t
+            JOIN remate r ON r.id_jogo = t.id_jogo
+            GROUP BY t.id_jogo, t.id_equipa
+            ON CONFLICT (id_jogo, id_equipa) DO UPDATE SET
+                xg = excluded.xg, xga = excluded.xga,
+                remates = excluded.remates, remates_contra = excluded.remates_contra
+        ''', chunk + chunk)
+
+        cursor.execute(f'''
+            SELECT id_equipa_casa, id_equipa_fora FROM jogo WHERE id_jogo IN ({placeholders})
+        ''', chunk)
+        for casa, fora in cursor.fetchall():
+            equipas.update((casa, fora))
+
+    return equipas
+
+
+def refresh_team_xg(conn, equipas: Iterable[int], window: int = XG_WINDOW) -> int:
+    """Recalcula a média móvel de xG/xGA (últimos `window` jogos) das equipas indicadas.
+
+    Só contam jogos finalizados: quando o status de um jogo muda, as suas
+    equipas têm de ser recalculadas (ver FootballDataCollector.set_match_result).
+    """
+    cursor = conn.cursor()
+    total = 0
+
+    for chunk in _chunks(sorted(set(equipas))):
+        placeholders = ', '.join('?' for _ in chunk)
+        # Equipas que deixaram de ter jogos finalizados com remates ficam sem média
+        cursor.execute(f'DELETE FROM xg_equipa WHERE id_equipa IN ({placeholders})', chunk)
+        cursor.execute(f'''
+            INSERT INTO xg_equipa (id_equipa, jogos, media_xg, media_xga, atualizado_em)
+            SELECT id_equipa, COUNT(*), AVG(xg), AVG(xga), CURRENT_TIMESTAMP
+            FROM (
+                SELECT x.id_equipa, x.xg, x.xga, ROW_NUMBER() OVER (
+                    PARTITION BY x.id_equipa ORDER BY j.data_jogo DESC, j.id_jogo DESC
+                ) AS ordem
+                FROM xg_jogo x
+                JOIN jogo j ON x.id_jogo = j.id_jogo
+                WHERE x.id_equipa IN ({placeholders}) AND j.status = 'finalizado'
+            ) recentes
+            WHERE ordem <= ?
+            GROUP BY id_equipa
+        ''', chunk + [window])
+        total += len(chunk)
+
+    return total
+
+
+def ingest_shots(collector, linhas: Iterable[Dict], batch_size: int = 5000, validar: bool = True) -> Dict:
+    """Carrega remates em streaming e atualiza o xG dos jogos e equipas afetados.
+
+    As linhas seguem as colunas da tabela `remate`; o xG é calculado com
+    shot_xg quando não vem na entrada. Com validar, os remates sem xG nem
+    coordenadas ficam na quarentena.
+    """
+    jogos: Set[int] = set()
+    total = collector.bulk_insert('remate', _prepare_shots(linhas, jogos), batch_size=batch_size,
+                                  validar=validar)
+    resumo = update_xg(collector, jogos)
+    resumo['remates'] = total
+    return resumo
+
+
+def update_xg(collector, id_jogos: Optional[Iterable[int]] = None) -> Dict:
+    """Recalcula xg_jogo e xg_equipa para os jogos indicados (todos, se omitidos)."""
+    conn = collector._connect()
+    try:
+        if id_jogos is None:
+            cursor = conn.cursor()
+            cursor.execute('SELECT DISTINCT id_jogo FROM remate')
+            id_jogos = [row[0] for row in cursor.fetchall()]
+        id_jogos = list(id_jogos)
+
+        equipas = aggregate_match_xg(conn, id_jogos)
+        refresh_team_xg(conn, equipas)
+        conn.commit()
+    finally:
+        conn.close()
+
+    logger.info(f"xG atualizado: {len(id_jogos)} jogos, {len(equipas)} equipas")
+    return {'jogos': len(id_jogos), 'equipas': len(equipas)}
+
+
+if __name__ == "__main__":
+    import sys
+    from football_betting_analyzer import FootballDataCollector
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "football_data.db"
+    resumo = update_xg(FootballDataCollector(db_path))
+    print(f"xG recalculado: {resumo['jogos']} jogos | {resumo['equipas']} equipas")